@@ -21,7 +21,12 @@ from .models import (
     Supplier, PurchaseOrder, BusinessWebsite, PurchaseOrderItem,
     Reservation, BusinessLayout,
     # YENİ EKLENEN: Personel giriş-çıkış modelleri
-    CheckInLocation, QRCode, AttendanceRecord
+    CheckInLocation, QRCode, AttendanceRecord,
+    NotificationOutbox, OrderRevision, KDSTicket,
+    SalesHourlyRollup, ItemSalesDailyRollup, PaymentTypeDailyRollup, ReportExportJob,
+    StaffDailyMetrics, KDSLatencyHistogram, ReportDataVersion, ReportJob,
+    OrderTransfer, DailyClose, CustomerAccount, CustomerLedgerEntry,
+    CustomerIdentity, CustomerCohortWeekly, IdempotencyKey
 )
 # =============================================================
 
@@ -934,4 +939,164 @@ class TableInlineAdmin(admin.TabularInline):
 class BusinessLayoutAdmin(admin.ModelAdmin):
     list_display = ('business', 'width', 'height', 'updated_at')
     inlines = [TableInlineAdmin]
-    search_fields = ('business__name',)
\ No newline at end of file
+    search_fields = ('business__name',)
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'business', 'event', 'room', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'event')
+    search_fields = ('room', 'event', 'business__name')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    list_select_related = ('business',)
+
+
+@admin.register(OrderRevision)
+class OrderRevisionAdmin(admin.ModelAdmin):
+    list_display = ('order', 'revision', 'updated_at')
+    search_fields = ('order__id',)
+    readonly_fields = ('order', 'revision', 'snapshot', 'updated_at')
+
+
+@admin.register(KDSTicket)
+class KDSTicketAdmin(admin.ModelAdmin):
+    list_display = ('order', 'kds_screen', 'is_listed', 'order_status', 'screen_status_display', 'updated_at')
+    list_filter = ('is_listed', 'kds_screen__business')
+    search_fields = ('order__id', 'display_name')
+    list_select_related = ('order', 'kds_screen')
+
+
+@admin.register(SalesHourlyRollup)
+class SalesHourlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('business', 'hour_start', 'turnover', 'payment_count', 'order_count')
+    list_filter = ('business',)
+    date_hierarchy = 'hour_start'
+    list_select_related = ('business',)
+
+
+@admin.register(ItemSalesDailyRollup)
+class ItemSalesDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('business', 'date', 'menu_item', 'quantity', 'revenue', 'cost')
+    list_filter = ('business',)
+    date_hierarchy = 'date'
+    list_select_related = ('business', 'menu_item')
+
+
+@admin.register(PaymentTypeDailyRollup)
+class PaymentTypeDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('business', 'date', 'payment_type', 'amount', 'payment_count')
+    list_filter = ('business', 'payment_type')
+    date_hierarchy = 'date'
+    list_select_related = ('business',)
+
+
+@admin.register(ReportExportJob)
+class ReportExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'business', 'report_type', 'export_format', 'status', 'row_count', 'requested_by', 'created_at', 'completed_at')
+    list_filter = ('status', 'report_type', 'export_format')
+    search_fields = ('business__name', 'requested_by__username')
+    readonly_fields = ('created_at', 'completed_at')
+    list_select_related = ('business', 'requested_by')
+
+
+@admin.register(StaffDailyMetrics)
+class StaffDailyMetricsAdmin(admin.ModelAdmin):
+    list_display = ('business', 'date', 'staff', 'orders_taken', 'revenue_handled', 'items_prepared', 'prep_sample_count')
+    list_filter = ('business',)
+    date_hierarchy = 'date'
+    search_fields = ('staff__username',)
+    list_select_related = ('business', 'staff')
+
+
+@admin.register(KDSLatencyHistogram)
+class KDSLatencyHistogramAdmin(admin.ModelAdmin):
+    list_display = ('business', 'date', 'hour', 'kds_screen', 'category', 'metric', 'bucket', 'count')
+    list_filter = ('business', 'metric')
+    date_hierarchy = 'date'
+    list_select_related = ('business', 'kds_screen', 'category')
+
+
+@admin.register(ReportDataVersion)
+class ReportDataVersionAdmin(admin.ModelAdmin):
+    list_display = ('business', 'version', 'updated_at')
+    search_fields = ('business__name',)
+    list_select_related = ('business',)
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'business', 'report_type', 'status', 'data_version', 'requested_by', 'created_at', 'completed_at')
+    list_filter = ('status', 'report_type')
+    search_fields = ('business__name', 'requested_by__username')
+    readonly_fields = ('created_at', 'completed_at', 'params_hash', 'result')
+    list_select_related = ('business', 'requested_by')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('id', 'scope', 'key', 'status_code', 'created_at')
+    search_fields = ('scope', 'key')
+    readonly_fields = ('created_at', 'request_hash', 'response_body')
+
+
+@admin.register(OrderTransfer)
+class OrderTransferAdmin(admin.ModelAdmin):
+    list_display = ('order', 'business', 'from_table', 'to_table', 'transferred_by', 'created_at')
+    list_filter = ('business',)
+    list_select_related = ('order', 'business', 'from_table', 'to_table', 'transferred_by')
+    raw_id_fields = ('order',)
+
+
+@admin.register(DailyClose)
+class DailyCloseAdmin(admin.ModelAdmin):
+    """Gün sonu raporları değiştirilemez; admin yalnızca görüntüleme içindir."""
+    list_display = ('business', 'business_date', 'gross_sales', 'payment_count', 'vat_total', 'void_count', 'closed_at', 'closed_by')
+    list_filter = ('business',)
+    date_hierarchy = 'business_date'
+    list_select_related = ('business', 'closed_by')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class CustomerLedgerEntryInline(admin.TabularInline):
+    model = CustomerLedgerEntry
+    extra = 0
+    fields = ('created_at', 'entry_type', 'amount', 'balance_after', 'order', 'payment_type', 'note', 'created_by')
+    readonly_fields = fields
+    can_delete = False
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CustomerAccount)
+class CustomerAccountAdmin(admin.ModelAdmin):
+    """Bakiye yalnızca hareketlerle değişir; admin'den düzenlenemez."""
+    list_display = ('name', 'phone', 'business', 'balance', 'needs_linking', 'last_activity_at')
+    list_filter = ('business', 'needs_linking')
+    search_fields = ('name', 'phone', 'account_key')
+    readonly_fields = ('account_key', 'balance', 'last_activity_at', 'created_at')
+    list_select_related = ('business',)
+    inlines = [CustomerLedgerEntryInline]
+
+
+@admin.register(CustomerIdentity)
+class CustomerIdentityAdmin(admin.ModelAdmin):
+    list_display = ('display_name', 'phone_suffix', 'business', 'first_visit_week', 'visit_count', 'total_spend', 'last_seen_at')
+    list_filter = ('business',)
+    search_fields = ('display_name',)
+    readonly_fields = ('phone_hash',)
+    list_select_related = ('business',)
+
+
+@admin.register(CustomerCohortWeekly)
+class CustomerCohortWeeklyAdmin(admin.ModelAdmin):
+    list_display = ('business', 'cohort_week', 'activity_week', 'customers', 'visits', 'spend')
+    list_filter = ('business',)
+    date_hierarchy = 'cohort_week'
+    list_select_related = ('business',)
@@ -0,0 +1,161 @@
+# core/db_router.py
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+# Okuma replikası takma adları (settings.DATABASES içinde tanımlıysa kullanılır)
+REPORTING_DB = 'reporting'
+PUBLIC_READ_DB = 'public_read'
+
+# Yazma yapan istemcinin sonraki okumalarını birincil veritabanına sabitleyen çerez
+PRIMARY_PIN_COOKIE = 'db_primary_pin'
+
+# Etkin okuma takma adı (use_read_replica bloğu içinde) ve o anki HTTP isteğinin durumu
+_read_alias = ContextVar('read_alias', default=None)
+_request_state = ContextVar('read_replica_request_state', default=None)
+
+
+def _pin_cache_key(user_id):
+    return f"db_primary_pin:user:{user_id}"
+
+
+def _is_pinned_to_primary(state):
+    """İstek bu istekte veya son READ_REPLICA_PIN_SECONDS içinde yazma yaptıysa True."""
+    if state is None:
+        return False
+    if state['wrote']:
+        return True
+    request = state['request']
+    if PRIMARY_PIN_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and cache.get(_pin_cache_key(user.id)))
+
+
+def _replica_available(alias):
+    if alias not in settings.DATABASES:
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except OperationalError as e:
+        logger.warning(f"[DB Router] '{alias}' replikasına bağlanılamadı, birincil veritabanı kullanılıyor: {e}")
+        return False
+    return True
+
+
+def read_replica_db(alias):
+    """
+    Sorgu bazında kullanım için replika takma adını çözer: queryset.using(read_replica_db(REPORTING_DB)).
+    Replika tanımlı/erişilebilir değilse veya istemci az önce yazma yaptıysa birincil döner.
+    """
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block or _is_pinned_to_primary(_request_state.get()):
+        return DEFAULT_DB_ALIAS
+    return alias if _replica_available(alias) else DEFAULT_DB_ALIAS
+
+
+def activate_read_replica(alias):
+    """Okumaları replikaya yönlendirmeye başlar; dönen jeton deactivate_read_replica'ya verilmelidir."""
+    return _read_alias.set(read_replica_db(alias))
+
+
+def deactivate_read_replica(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def use_read_replica(alias):
+    """Blok içindeki okumaları (yazmalar hariç) verilen replikaya yönlendirir."""
+    token = activate_read_replica(alias)
+    try:
+        yield
+    finally:
+        deactivate_read_replica(token)
+
+
+@contextmanager
+def use_primary_db():
+    """
+    Replika bloğu içinde olunsa bile okumaları birincil veritabanına zorlar. Önbelleğe
+    yazılacak veriler gibi replika gecikmesinden etkilenmemesi gereken okumalar için.
+    """
+    token = _read_alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_replica_view(alias):
+    """Fonksiyon tabanlı view'lar için: view gövdesindeki okumaları replikaya yönlendirir."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            with use_read_replica(alias):
+                return view_func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ReadReplicaRouter:
+    """
+    Okumalar yalnızca use_read_replica / read_replica_view / ReadReplicaMixin ile açıkça
+    istendiğinde replikaya gider; diğer her şey birincil veritabanındadır. Birincil üzerinde
+    açık bir transaction varsa (ör. select_for_update) okumalar da birincilde kalır.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or alias == DEFAULT_DB_ALIAS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replikalar birincilin kopyasıdır; nesneler arasındaki ilişkiler her zaman geçerlidir.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReadReplicaPinMiddleware:
+    """
+    Yazma yapan istemcinin sonraki okumalarını READ_REPLICA_PIN_SECONDS boyunca birincil
+    veritabanına sabitler (read-your-writes). Kimliği doğrulanmış kullanıcılar önbellekteki
+    bir işaretle, misafirler çerezle tanınır.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'request': request, 'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state['wrote'] and settings.READ_REPLICA_PIN_SECONDS > 0:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                cache.set(_pin_cache_key(user.id), 1, settings.READ_REPLICA_PIN_SECONDS)
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1', max_age=settings.READ_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
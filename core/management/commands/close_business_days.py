@@ -0,0 +1,39 @@
+# core/management/commands/close_business_days.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Business
+from core.utils.daily_close import close_pending_business_days
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    Kapanış saati geçmiş iş günlerinin gün sonu (Z) raporlarını oluşturur. --since ile
+    geçmiş günler toplu olarak kapatılabilir; zaten kapatılmış günlere dokunulmaz.
+    """
+    help = 'Creates end-of-day (Z-report) closing records for finished business days.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için kapat.')
+        parser.add_argument('--since', type=str, help='Bu iş gününden (YYYY-MM-DD) itibaren kapatılmamış tüm günleri kapat.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın.")
+
+        businesses = Business.objects.all()
+        if options['business']:
+            businesses = businesses.filter(id=options['business'])
+
+        self.stdout.write(self.style.NOTICE(f'{businesses.count()} işletme için gün sonu raporları oluşturuluyor...'))
+        closed_count = 0
+        for business in businesses.iterator():
+            closed_count += close_pending_business_days(business, since=since)
+        self.stdout.write(self.style.SUCCESS(f'{closed_count} iş günü kapatıldı.'))
@@ -0,0 +1,28 @@
+# core/management/commands/rebuild_customer_accounts.py
+
+from django.core.management.base import BaseCommand
+from core.models import Business
+from core.utils.customer_accounts import rebuild_customer_accounts
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    Cari hesapları ve hareketlerini mevcut veresiye kayıtlarından (CreditPaymentDetails)
+    yeniden oluşturur. Cari hesaplar devreye alınmadan önceki veresiyeleri aktarmak için kullanılır.
+    """
+    help = 'Rebuilds customer accounts and ledger entries from existing credit sales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+
+    def handle(self, *args, **options):
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        if options['business']:
+            business_ids = [business_id for business_id in business_ids if business_id == options['business']]
+
+        self.stdout.write(self.style.NOTICE(f'{len(business_ids)} işletme için cari hesaplar oluşturuluyor...'))
+        for business_id in business_ids:
+            rebuild_customer_accounts(business_id)
+        self.stdout.write(self.style.SUCCESS('Cari hesaplar başarıyla oluşturuldu.'))
@@ -0,0 +1,28 @@
+# core/management/commands/rebuild_customer_cohorts.py
+
+from django.core.management.base import BaseCommand
+from core.models import Business
+from core.utils.customer_cohorts import rebuild_customer_cohorts
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    Müşteri kimliklerini (CustomerIdentity) ve haftalık kohort tablosunu paket siparişler,
+    rezervasyonlar ve bekleme listesi kayıtlarından yeniden oluşturur.
+    """
+    help = 'Rebuilds customer identities and weekly cohort tables from takeaway, reservation and waitlist data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+
+    def handle(self, *args, **options):
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        if options['business']:
+            business_ids = [business_id for business_id in business_ids if business_id == options['business']]
+
+        self.stdout.write(self.style.NOTICE(f'{len(business_ids)} işletme için müşteri kohortları oluşturuluyor...'))
+        for business_id in business_ids:
+            rebuild_customer_cohorts(business_id)
+        self.stdout.write(self.style.SUCCESS('Müşteri kohortları başarıyla oluşturuldu.'))
@@ -0,0 +1,28 @@
+# core/management/commands/rebuild_kds_latency.py
+
+from django.core.management.base import BaseCommand
+from core.models import Business
+from core.utils.kds_latency import rebuild_kds_latency_histograms
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    KDS gecikme histogramını (KDSLatencyHistogram) sipariş kalemlerindeki durum geçiş
+    zamanlarından yeniden oluşturur. Geçiş zamanı olmayan eski kalemler atlanır.
+    """
+    help = 'Rebuilds KDS preparation/pickup latency histograms from order item transition timestamps.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+
+    def handle(self, *args, **options):
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        if options['business']:
+            business_ids = [business_id for business_id in business_ids if business_id == options['business']]
+
+        self.stdout.write(self.style.NOTICE(f'{len(business_ids)} işletme için KDS gecikme histogramı oluşturuluyor...'))
+        for business_id in business_ids:
+            rebuild_kds_latency_histograms(business_id)
+        self.stdout.write(self.style.SUCCESS('KDS gecikme histogramları başarıyla oluşturuldu.'))
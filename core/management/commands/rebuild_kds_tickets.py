@@ -0,0 +1,32 @@
+# core/management/commands/rebuild_kds_tickets.py
+
+from django.core.management.base import BaseCommand
+from core.models import Order
+from core.utils.kds_tickets import rebuild_kds_tickets, ACTIVE_ORDER_STATUSES
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    KDSTicket projeksiyonunu aktif (mutfakta bekleyen) siparişler için baştan oluşturur.
+    İlk kurulumda veya projeksiyon mantığı değiştiğinde çalıştırılır.
+    """
+    help = 'Rebuilds KDS ticket projections for active orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+        parser.add_argument('--all', action='store_true', help='Aktif olmayanlar dahil tüm siparişler için oluştur.')
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+        if not options['all']:
+            orders = orders.filter(status__in=ACTIVE_ORDER_STATUSES)
+        if options['business']:
+            orders = orders.filter(business_id=options['business'])
+
+        order_ids = list(orders.values_list('id', flat=True))
+        self.stdout.write(self.style.NOTICE(f'{len(order_ids)} sipariş için KDS fişleri oluşturuluyor...'))
+        for order_id in order_ids:
+            rebuild_kds_tickets(order_id)
+        self.stdout.write(self.style.SUCCESS('KDS fişleri başarıyla oluşturuldu.'))
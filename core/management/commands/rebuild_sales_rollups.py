@@ -0,0 +1,68 @@
+# core/management/commands/rebuild_sales_rollups.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.models import Business, Order
+from core.signals.payment_signals import aggregate_ingredient_deductions, snapshot_recipe_costs
+from core.utils.sales_rollups import rebuild_sales_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    Saatlik/günlük satış özet tablolarını Payment, Order ve OrderItem kayıtlarından yeniden
+    hesaplar. İlk kurulumda veya özetlerde tutarsızlık şüphesinde çalıştırılır.
+    --backfill-costs ile reçete maliyeti sabitlenmemiş eski ödenmiş kalemlere güncel alış
+    fiyatlarıyla maliyet yazılır (menü mühendisliği raporu için).
+    """
+    help = 'Rebuilds hourly/daily sales rollup tables from payments and orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+        parser.add_argument('--since', type=str, help='Sadece bu tarihten (YYYY-MM-DD) itibaren yeniden hesapla.')
+        parser.add_argument('--backfill-costs', action='store_true', help='Maliyeti olmayan ödenmiş kalemlere güncel reçete maliyetini yaz.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın.")
+
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        if options['business']:
+            business_ids = [business_id for business_id in business_ids if business_id == options['business']]
+
+        self.stdout.write(self.style.NOTICE(f'{len(business_ids)} işletme için satış özetleri oluşturuluyor...'))
+        for business_id in business_ids:
+            if options['backfill_costs']:
+                costed = self._backfill_recipe_costs(business_id, since)
+                self.stdout.write(f'İşletme #{business_id}: {costed} kaleme reçete maliyeti yazıldı.')
+            rebuild_sales_rollups(business_id, since=since)
+        self.stdout.write(self.style.SUCCESS('Satış özetleri başarıyla oluşturuldu.'))
+
+
+    def _backfill_recipe_costs(self, business_id, since):
+        orders = Order.objects.filter(
+            business_id=business_id, payment_info__isnull=False, order_items__recipe_cost__isnull=True
+        ).distinct()
+        if since is not None:
+            orders = orders.filter(created_at__date__gte=since)
+
+        costed = 0
+        for order in orders.iterator(chunk_size=200):
+            order_items = list(order.order_items.filter(recipe_cost__isnull=True).select_related(
+                'menu_item', 'variant', 'menu_item__represented_campaign'
+            ).prefetch_related(
+                'extras__variant__recipe_items__ingredient',
+                'variant__recipe_items__ingredient',
+                'menu_item__represented_campaign__campaign_items__variant__recipe_items__ingredient'
+            ))
+            _, _, costs = aggregate_ingredient_deductions(order_items)
+            with transaction.atomic():
+                costed += snapshot_recipe_costs(order_items, costs)
+        return costed
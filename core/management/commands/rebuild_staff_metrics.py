@@ -0,0 +1,38 @@
+# core/management/commands/rebuild_staff_metrics.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Business
+from core.utils.staff_metrics import rebuild_staff_metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    """
+    Günlük personel performans özetlerini (StaffDailyMetrics) ödemelerden ve KDS'te hazırlanan
+    kalemlerden yeniden hesaplar. Hazırlama süreleri kaynak kayıtlarda tutulmadığından korunur.
+    """
+    help = 'Rebuilds daily staff performance metrics from payments and prepared order items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Sadece belirtilen işletme ID\'si için oluştur.')
+        parser.add_argument('--since', type=str, help='Sadece bu tarihten (YYYY-MM-DD) itibaren yeniden hesapla.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın.")
+
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        if options['business']:
+            business_ids = [business_id for business_id in business_ids if business_id == options['business']]
+
+        self.stdout.write(self.style.NOTICE(f'{len(business_ids)} işletme için personel özetleri oluşturuluyor...'))
+        for business_id in business_ids:
+            rebuild_staff_metrics(business_id, since=since)
+        self.stdout.write(self.style.SUCCESS('Personel özetleri başarıyla oluşturuldu.'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-16 23:27
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_checkinlocation_radius_meters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room', models.CharField(max_length=150, verbose_name='Socket.IO Odası')),
+                ('event', models.CharField(max_length=100, verbose_name='Socket.IO Olayı')),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Veri')),
+                ('status', models.CharField(choices=[('pending', 'Beklemede'), ('sent', 'Gönderildi'), ('skipped', 'Atlandı (Bildirim Pasif)'), ('failed', 'Başarısız')], default='pending', max_length=10, verbose_name='Durum')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Son Hata')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Gönderime Uygun Olduğu Zaman')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gönderilme Zamanı')),
+                ('business', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_outbox', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Bildirim Giden Kutusu Kaydı',
+                'verbose_name_plural': 'Bildirim Giden Kutusu',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at', 'id'], name='core_notifi_status_746f4e_idx'), models.Index(fields=['status', 'sent_at'], name='core_notifi_status_0aa0bd_idx')],
+            },
+        ),
+    ]
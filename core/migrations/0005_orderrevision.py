@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-16 23:29
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRevision',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='revision_state', serialize=False, to='core.order', verbose_name='Sipariş')),
+                ('revision', models.PositiveIntegerField(default=0, verbose_name='Revizyon')),
+                ('snapshot', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Son Yayınlanan Veri')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sipariş Revizyonu',
+                'verbose_name_plural': 'Sipariş Revizyonları',
+            },
+        ),
+    ]
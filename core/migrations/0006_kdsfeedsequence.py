@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-16 23:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_orderrevision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KDSFeedSequence',
+            fields=[
+                ('kds_screen', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_sequence', serialize=False, to='core.kdsscreen', verbose_name='KDS Ekranı')),
+                ('value', models.PositiveBigIntegerField(default=0, verbose_name='Son Sıra Numarası')),
+            ],
+            options={
+                'verbose_name': 'KDS Akış Sıra Sayacı',
+                'verbose_name_plural': 'KDS Akış Sıra Sayaçları',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-16 23:37
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_kdsfeedsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KDSTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_listed', models.BooleanField(default=False, help_text='Sipariş aktifse ve bu ekranda bekleyen/hazırlanan kalem varsa True.', verbose_name='Listede Görünür')),
+                ('order_created_at', models.DateTimeField(verbose_name='Sipariş Oluşturulma Zamanı')),
+                ('order_status', models.CharField(max_length=30, verbose_name='Sipariş Durumu')),
+                ('order_type', models.CharField(max_length=20, verbose_name='Sipariş Türü')),
+                ('display_name', models.CharField(max_length=255, verbose_name='Görünen Ad')),
+                ('table_number', models.PositiveIntegerField(blank=True, null=True, verbose_name='Masa Numarası')),
+                ('customer_name', models.CharField(blank=True, max_length=255, null=True, verbose_name='Müşteri Adı')),
+                ('taken_by_staff_username', models.CharField(blank=True, max_length=150, null=True)),
+                ('prepared_by_kitchen_staff_username', models.CharField(blank=True, max_length=150, null=True)),
+                ('kitchen_completed_at', models.DateTimeField(blank=True, null=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('assigned_pager_device_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('assigned_pager_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('screen_status_display', models.CharField(max_length=255, verbose_name='Ekrana Özel Durum')),
+                ('items', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Kalemler')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kds_tickets', to='core.business', verbose_name='İşletme')),
+                ('kds_screen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='core.kdsscreen', verbose_name='KDS Ekranı')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kds_tickets', to='core.order', verbose_name='Sipariş')),
+            ],
+            options={
+                'verbose_name': 'KDS Fişi',
+                'verbose_name_plural': 'KDS Fişleri',
+                'indexes': [models.Index(fields=['kds_screen', 'is_listed', 'order_created_at', 'order'], name='core_kdstic_kds_scr_0f0d36_idx')],
+                'unique_together': {('order', 'kds_screen')},
+            },
+        ),
+    ]
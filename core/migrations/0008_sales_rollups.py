@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-16 23:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_kdsticket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemSalesDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Satılan Adet')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ciro (KDV Hariç)')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_sales_daily_rollups', to='core.business', verbose_name='İşletme')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_rollups', to='core.menuitem', verbose_name='Menü Öğesi')),
+            ],
+            options={
+                'verbose_name': 'Günlük Ürün Satış Özeti',
+                'verbose_name_plural': 'Günlük Ürün Satış Özetleri',
+                'unique_together': {('business', 'date', 'menu_item')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentTypeDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('payment_type', models.CharField(choices=[('credit_card', 'Kredi Kartı'), ('cash', 'Nakit'), ('food_card', 'Yemek Kartı')], max_length=20, verbose_name='Ödeme Türü')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tutar')),
+                ('payment_count', models.IntegerField(default=0, verbose_name='Ödeme Sayısı')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_type_daily_rollups', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Günlük Ödeme Türü Özeti',
+                'verbose_name_plural': 'Günlük Ödeme Türü Özetleri',
+                'unique_together': {('business', 'date', 'payment_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour_start', models.DateTimeField(verbose_name='Saat Başlangıcı')),
+                ('turnover', models.DecimalField(decimal_places=2, default=0, help_text='Bu saatte alınan ödemelerin toplamı (ödeme zamanına göre).', max_digits=14)),
+                ('payment_count', models.IntegerField(default=0, help_text='Bu saatte alınan ödeme sayısı.')),
+                ('order_count', models.IntegerField(default=0, help_text='Bu saatte oluşturulmuş ve ödenmiş sipariş sayısı (sipariş oluşturulma zamanına göre).')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_hourly_rollups', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Saatlik Satış Özeti',
+                'verbose_name_plural': 'Saatlik Satış Özetleri',
+                'unique_together': {('business', 'hour_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-16 23:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(default='detailed_sales', max_length=50, verbose_name='Rapor Türü')),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], max_length=10, verbose_name='Dosya Biçimi')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('status', models.CharField(choices=[('pending', 'Sırada'), ('running', 'Hazırlanıyor'), ('completed', 'Tamamlandı'), ('failed', 'Başarısız')], db_index=True, default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to='report_exports/%Y/%m/', verbose_name='Dosya')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Satır Sayısı')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_export_jobs', to='core.business', verbose_name='İşletme')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Talep Eden')),
+            ],
+            options={
+                'verbose_name': 'Rapor Dışa Aktarımı',
+                'verbose_name_plural': 'Rapor Dışa Aktarımları',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-16 23:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_reportexportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffDailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('orders_taken', models.IntegerField(default=0, help_text='Personelin aldığı ve ödenmiş sipariş sayısı.')),
+                ('revenue_handled', models.DecimalField(decimal_places=2, default=0, help_text='Personelin aldığı siparişlerin ödeme toplamı.', max_digits=14)),
+                ('items_prepared', models.IntegerField(default=0, help_text="Personelin KDS'te 'hazır' olarak işaretlediği kalem sayısı.")),
+                ('prep_seconds_total', models.BigIntegerField(default=0, help_text='Hazırlanan kalemlerin toplam hazırlama süresi (saniye).')),
+                ('prep_sample_count', models.IntegerField(default=0, help_text='Hazırlama süresi ölçülen kalem sayısı.')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staff_daily_metrics', to='core.business', verbose_name='İşletme')),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_metrics', to=settings.AUTH_USER_MODEL, verbose_name='Personel')),
+            ],
+            options={
+                'verbose_name': 'Günlük Personel Performans Özeti',
+                'verbose_name_plural': 'Günlük Personel Performans Özetleri',
+                'indexes': [models.Index(fields=['business', 'date'], name='staff_metrics_biz_date_idx')],
+                'unique_together': {('business', 'staff', 'date')},
+            },
+        ),
+    ]
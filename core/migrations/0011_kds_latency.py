@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-16 23:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_staffdailymetrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='kds_preparing_at',
+            field=models.DateTimeField(blank=True, help_text="Kalemin KDS'te hazırlanmaya başlandığı zaman.", null=True, verbose_name='KDS Hazırlama Başlangıcı'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='kds_ready_at',
+            field=models.DateTimeField(blank=True, help_text="Kalemin KDS'te 'hazır' olarak işaretlendiği zaman.", null=True, verbose_name='KDS Hazır Olma Zamanı'),
+        ),
+        migrations.CreateModel(
+            name='KDSLatencyHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('hour', models.PositiveSmallIntegerField(help_text='Aşamanın başladığı yerel saat (0-23).', verbose_name='Saat')),
+                ('metric', models.CharField(choices=[('prep', 'Hazırlama Süresi'), ('pickup', 'Garson Alma Süresi')], max_length=10, verbose_name='Ölçüm')),
+                ('bucket', models.PositiveSmallIntegerField(verbose_name='Süre Kovası')),
+                ('count', models.IntegerField(default=0, verbose_name='Kalem Sayısı')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kds_latency_histograms', to='core.business', verbose_name='İşletme')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='kds_latency_histograms', to='core.category', verbose_name='Kategori')),
+                ('kds_screen', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='latency_histograms', to='core.kdsscreen', verbose_name='KDS Ekranı')),
+            ],
+            options={
+                'verbose_name': 'KDS Gecikme Histogramı',
+                'verbose_name_plural': 'KDS Gecikme Histogramları',
+                'indexes': [models.Index(fields=['business', 'date'], name='kds_latency_biz_date_idx')],
+                'unique_together': {('business', 'date', 'hour', 'kds_screen', 'category', 'metric', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-16 23:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_kds_latency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDataVersion',
+            fields=[
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='report_data_version', serialize=False, to='core.business', verbose_name='İşletme')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Sürüm')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rapor Veri Sürümü',
+                'verbose_name_plural': 'Rapor Veri Sürümleri',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(max_length=50, verbose_name='Rapor Türü')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('params_hash', models.CharField(max_length=64, verbose_name='Parametre Özeti')),
+                ('data_version', models.BigIntegerField(default=0, verbose_name='Veri Sürümü')),
+                ('status', models.CharField(choices=[('pending', 'Sırada'), ('running', 'Hazırlanıyor'), ('completed', 'Tamamlandı'), ('failed', 'Başarısız')], db_index=True, default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Sonuç')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='core.business', verbose_name='İşletme')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Talep Eden')),
+            ],
+            options={
+                'verbose_name': 'Rapor İşi',
+                'verbose_name_plural': 'Rapor İşleri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['business', 'report_type', 'params_hash', 'data_version'], name='report_job_lookup_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-16 23:58
+
+import datetime
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='day_close_time',
+            field=models.TimeField(default=datetime.time(4, 0), help_text='İş gününün bittiği yerel saat. Gün sonu (Z) raporu bu saatte alınır; gece yarısından sonraki satışlar önceki iş gününe yazılır.', verbose_name='Gün Sonu Kapanış Saati'),
+        ),
+        migrations.CreateModel(
+            name='OrderTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_transfers', to='core.business', verbose_name='İşletme')),
+                ('from_table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transfers_out', to='core.table', verbose_name='Önceki Masa')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='core.order', verbose_name='Sipariş')),
+                ('to_table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transfers_in', to='core.table', verbose_name='Yeni Masa')),
+                ('transferred_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_transfers', to=settings.AUTH_USER_MODEL, verbose_name='Transferi Yapan')),
+            ],
+            options={
+                'verbose_name': 'Masa Transferi',
+                'verbose_name_plural': 'Masa Transferleri',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyClose',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_date', models.DateField(verbose_name='İş Günü')),
+                ('period_start', models.DateTimeField(verbose_name='Dönem Başlangıcı')),
+                ('period_end', models.DateTimeField(verbose_name='Dönem Bitişi')),
+                ('closed_at', models.DateTimeField(auto_now_add=True, verbose_name='Kapanış Zamanı')),
+                ('gross_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam Tahsilat')),
+                ('payment_count', models.IntegerField(default=0, verbose_name='Ödeme Sayısı')),
+                ('net_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='KDV Hariç Satış')),
+                ('vat_total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam KDV')),
+                ('void_count', models.IntegerField(default=0, verbose_name='İptal/Red Sipariş Sayısı')),
+                ('void_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='İptal/Red Tutarı')),
+                ('transfer_count', models.IntegerField(default=0, verbose_name='Masa Transferi Sayısı')),
+                ('credit_sales_count', models.IntegerField(default=0, verbose_name='Veresiye Satış Sayısı')),
+                ('credit_sales_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Veresiye Satış Tutarı')),
+                ('credit_collected_count', models.IntegerField(default=0, verbose_name='Tahsil Edilen Veresiye Sayısı')),
+                ('credit_collected_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tahsil Edilen Veresiye Tutarı')),
+                ('payment_breakdown', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='{ödeme_türü: {amount, count}}', verbose_name='Ödeme Türü Dağılımı')),
+                ('vat_breakdown', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='{kdv_oranı: {net, vat, gross}}', verbose_name='KDV Dağılımı')),
+                ('staff_takings', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='[{staff_id, username, order_count, amount}]', verbose_name='Personel Tahsilatları')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_closes', to='core.business', verbose_name='İşletme')),
+                ('closed_by', models.ForeignKey(blank=True, help_text='Boşsa otomatik kapanış.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_closes', to=settings.AUTH_USER_MODEL, verbose_name='Kapatan')),
+            ],
+            options={
+                'verbose_name': 'Gün Sonu Raporu',
+                'verbose_name_plural': 'Gün Sonu Raporları',
+                'ordering': ['-business_date'],
+                'unique_together': {('business', 'business_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2 on 2026-10-17 00:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_daily_close'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('charge', 'Veresiye Satış'), ('payment', 'Tahsilat'), ('adjustment', 'Düzeltme')], max_length=20, verbose_name='Hareket Türü')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Tutar')),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Hareket Sonrası Bakiye')),
+                ('payment_type', models.CharField(blank=True, max_length=20, null=True, verbose_name='Ödeme Türü')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='Açıklama')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tarih')),
+            ],
+            options={
+                'verbose_name': 'Cari Hesap Hareketi',
+                'verbose_name_plural': 'Cari Hesap Hareketleri',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='creditpaymentdetails',
+            name='settled_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Kısmi tahsilatlarla bu siparişe düşen toplam.', max_digits=10, verbose_name='Kapatılan Tutar'),
+        ),
+        migrations.CreateModel(
+            name='CustomerAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_key', models.CharField(help_text='Normalize edilmiş telefon; telefon yoksa normalize edilmiş isim.', max_length=64, verbose_name='Hesap Anahtarı')),
+                ('name', models.CharField(blank=True, max_length=150, verbose_name='Müşteri Adı')),
+                ('phone', models.CharField(blank=True, max_length=20, null=True, verbose_name='Telefon')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Bakiye (Borç)')),
+                ('last_activity_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Son Hareket')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_accounts', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Cari Hesap',
+                'verbose_name_plural': 'Cari Hesaplar',
+            },
+        ),
+        migrations.AddField(
+            model_name='creditpaymentdetails',
+            name='account',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='credit_sales', to='core.customeraccount', verbose_name='Cari Hesap'),
+        ),
+        migrations.AddIndex(
+            model_name='creditpaymentdetails',
+            index=models.Index(fields=['account', 'paid_at', 'created_at'], name='credit_acct_open_idx'),
+        ),
+        migrations.AddField(
+            model_name='customerledgerentry',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='core.customeraccount', verbose_name='Cari Hesap'),
+        ),
+        migrations.AddField(
+            model_name='customerledgerentry',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to=settings.AUTH_USER_MODEL, verbose_name='İşlemi Yapan'),
+        ),
+        migrations.AddField(
+            model_name='customerledgerentry',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.order', verbose_name='Sipariş'),
+        ),
+        migrations.AddIndex(
+            model_name='customeraccount',
+            index=models.Index(fields=['business', 'balance'], name='cust_acct_biz_balance_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='customeraccount',
+            unique_together={('business', 'account_key')},
+        ),
+        migrations.AddIndex(
+            model_name='customerledgerentry',
+            index=models.Index(fields=['account', '-created_at', '-id'], name='cust_ledger_acct_time_idx'),
+        ),
+    ]
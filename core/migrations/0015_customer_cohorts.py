@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-17 00:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_customer_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerCohortWeekly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort_week', models.DateField(verbose_name='Kohort Haftası')),
+                ('activity_week', models.DateField(verbose_name='Aktivite Haftası')),
+                ('customers', models.IntegerField(default=0, verbose_name='Aktif Müşteri')),
+                ('visits', models.IntegerField(default=0, verbose_name='Ziyaret')),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Harcama')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_cohorts', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Haftalık Müşteri Kohortu',
+                'verbose_name_plural': 'Haftalık Müşteri Kohortları',
+                'unique_together': {('business', 'cohort_week', 'activity_week')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerIdentity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_hash', models.CharField(max_length=64, verbose_name='Telefon Özeti')),
+                ('phone_suffix', models.CharField(blank=True, max_length=4, verbose_name='Telefon Son Haneleri')),
+                ('display_name', models.CharField(blank=True, max_length=150, verbose_name='Müşteri Adı')),
+                ('first_seen_at', models.DateTimeField(verbose_name='İlk Temas')),
+                ('last_seen_at', models.DateTimeField(verbose_name='Son Temas')),
+                ('first_visit_week', models.DateField(help_text='İlk ziyaretin yerel haftasının pazartesisi.', verbose_name='Kohort Haftası')),
+                ('last_visit_date', models.DateField(verbose_name='Son Ziyaret Günü')),
+                ('visit_count', models.IntegerField(default=0, verbose_name='Ziyaret Sayısı')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Sipariş Sayısı')),
+                ('reservation_count', models.IntegerField(default=0, verbose_name='Rezervasyon Sayısı')),
+                ('waitlist_count', models.IntegerField(default=0, verbose_name='Bekleme Listesi Sayısı')),
+                ('total_spend', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam Harcama')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_identities', to='core.business', verbose_name='İşletme')),
+            ],
+            options={
+                'verbose_name': 'Müşteri Kimliği',
+                'verbose_name_plural': 'Müşteri Kimlikleri',
+                'indexes': [models.Index(fields=['business', 'first_visit_week'], name='cust_identity_cohort_idx')],
+                'unique_together': {('business', 'phone_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_customer_cohorts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemsalesdailyrollup',
+            name='cost',
+            field=models.DecimalField(decimal_places=3, default=0, max_digits=14, verbose_name='Reçete Maliyeti'),
+        ),
+        migrations.AddField(
+            model_name='itemsalesdailyrollup',
+            name='costed_quantity',
+            field=models.IntegerField(default=0, verbose_name='Maliyeti Bilinen Adet'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='recipe_cost',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Ödeme anında reçeteden hesaplanan kalem toplam maliyeti (ekstralar dahil). Maliyeti bilinmiyorsa boş.', max_digits=12, null=True),
+        ),
+    ]
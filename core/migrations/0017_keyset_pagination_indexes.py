@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_menu_engineering_costs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendancerecord',
+            name='core_attend_user_id_8fe4c7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['user', 'business', '-timestamp', '-id'], name='attendance_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business', '-created_at', '-id'], name='order_biz_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, verbose_name='Kapsam')),
+                ('key', models.CharField(max_length=255, verbose_name='Anahtar')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='İstek Özeti')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Yanıt Kodu')),
+                ('response_body', models.JSONField(blank=True, null=True, verbose_name='Yanıt')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Tekrar Koruma Anahtarı',
+                'verbose_name_plural': 'Tekrar Koruma Anahtarları',
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 00:32
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportexportjob',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=core.models.report_export_storage, upload_to='report_exports/%Y/%m/', verbose_name='Dosya'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 00:48
+
+from django.db import migrations, models
+
+
+def flag_name_only_accounts(apps, schema_editor):
+    # Eski isimle birleştirilmiş hesaplar farklı müşterileri içerebilir; elle kontrol edilmelidir.
+    CustomerAccount = apps.get_model('core', 'CustomerAccount')
+    CustomerAccount.objects.filter(account_key__startswith='ad:').update(needs_linking=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_report_export_shared_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customeraccount',
+            name='needs_linking',
+            field=models.BooleanField(db_index=True, default=False, help_text='Telefonsuz veresiye için siparişe özel açılan hesap; müşterinin hesabına elle bağlanmalıdır.', verbose_name='Eşleştirme Bekliyor'),
+        ),
+        migrations.AlterField(
+            model_name='customeraccount',
+            name='account_key',
+            field=models.CharField(help_text='Normalize edilmiş telefon; telefon yoksa siparişe özel anahtar (siparis:<id>).', max_length=64, verbose_name='Hesap Anahtarı'),
+        ),
+        migrations.RunPython(flag_name_only_accounts, migrations.RunPython.noop),
+    ]
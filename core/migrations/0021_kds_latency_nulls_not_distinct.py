@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-17 00:51
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+BUCKET_FIELDS = ('business_id', 'date', 'hour', 'kds_screen_id', 'category_id', 'metric', 'bucket')
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    # NULL ekran/kategori ile eşzamanlı eklemelerin ürettiği yinelenen kovalar tek satırda toplanır.
+    KDSLatencyHistogram = apps.get_model('core', 'KDSLatencyHistogram')
+    duplicates = KDSLatencyHistogram.objects.values(*BUCKET_FIELDS).annotate(
+        rows=Count('id'), keep_id=Min('id'), total=Sum('count')
+    ).filter(rows__gt=1).order_by()
+    for group in duplicates:
+        lookup = {field: group[field] for field in BUCKET_FIELDS}
+        rows = KDSLatencyHistogram.objects.filter(**lookup)
+        rows.exclude(id=group['keep_id']).delete()
+        rows.filter(id=group['keep_id']).update(count=group['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_customer_account_needs_linking'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='kdslatencyhistogram',
+            unique_together=set(),
+        ),
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='kdslatencyhistogram',
+            constraint=models.UniqueConstraint(fields=('business', 'date', 'hour', 'kds_screen', 'category', 'metric', 'bucket'), name='kds_latency_bucket_uniq', nulls_distinct=False),
+        ),
+    ]
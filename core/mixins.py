@@ -5,6 +5,7 @@ from rest_framework.exceptions import ValidationError
 # Artık Plan modelini de import ediyoruz, çünkü limitler orada tutuluyor.
 from subscriptions.models import Subscription, Plan
 # --- /GÜNCELLENEN IMPORT ---
+from .db_router import activate_read_replica, deactivate_read_replica
 
 class LimitCheckMixin:
     """
@@ -55,4 +56,25 @@ class LimitCheckMixin:
         if 'business' not in serializer.validated_data:
             serializer.save(business=business)
         else:
-            serializer.save()
\ No newline at end of file
+            serializer.save()
+
+
+class ReadReplicaMixin:
+    """
+    View'ın okumalarını 'read_replica_alias' replikasına yönlendirir (ör. REPORTING_DB).
+    Yönlendirme kimlik doğrulamasından sonra başlar; böylece yazma yapmış kullanıcının
+    okumaları birincil veritabanında kalır. Yanıt sonlandırılırken eski duruma dönülür.
+    """
+    read_replica_alias = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.read_replica_alias:
+            self._read_replica_token = activate_read_replica(self.read_replica_alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_replica_token', None)
+        if token is not None:
+            deactivate_read_replica(token)
+            self._read_replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
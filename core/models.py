@@ -3,9 +3,10 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 import uuid
 from django.utils import timezone
-from datetime import timedelta
+from datetime import timedelta, time
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -197,6 +198,12 @@ class Business(models.Model):
         verbose_name="Zaman Dilimi",
         help_text="İşletmenin bulunduğu yerel zaman dilimi."
     )
+    day_close_time = models.TimeField(
+        default=time(4, 0),
+        verbose_name="Gün Sonu Kapanış Saati",
+        help_text="İş gününün bittiği yerel saat. Gün sonu (Z) raporu bu saatte alınır; "
+                  "gece yarısından sonraki satışlar önceki iş gününe yazılır."
+    )
     
     # === YENİ ALAN BAŞLANGICI ===
     slug = models.SlugField(
@@ -792,6 +799,10 @@ class Order(models.Model):
         verbose_name = "Sipariş"
         verbose_name_plural = "Siparişler"
         ordering = ['-created_at']
+        indexes = [
+            # Sipariş listelerinin imleçli sayfalaması (created_at, id) sırasıyla bu indeksi izler.
+            models.Index(fields=['business', '-created_at', '-id'], name='order_biz_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if self._state.adding and self.order_type == 'takeaway':
@@ -870,6 +881,10 @@ class OrderItem(models.Model):
     delivered = models.BooleanField(default=False, help_text="Bu kalem müşteriye teslim edildi mi?")
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Bu kalemin (ekstralar dahil) KDV hariç birim fiyatı.")
     is_awaiting_staff_approval = models.BooleanField(default=False, help_text="Bu kalem misafir tarafından eklendi ve personel onayı mı bekliyor?")
+    recipe_cost = models.DecimalField(
+        max_digits=12, decimal_places=3, null=True, blank=True,
+        help_text="Ödeme anında reçeteden hesaplanan kalem toplam maliyeti (ekstralar dahil). Maliyeti bilinmiyorsa boş."
+    )
     kds_status = models.CharField(
         max_length=20,
         choices=KDS_ITEM_STATUS_CHOICES,
@@ -895,6 +910,18 @@ class OrderItem(models.Model):
         help_text="Kalemin garson tarafından mutfaktan alındığı zaman.",
         verbose_name="Garson Teslim Alma Zamanı (Kalem)"
     )
+    kds_preparing_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Kalemin KDS'te hazırlanmaya başlandığı zaman.",
+        verbose_name="KDS Hazırlama Başlangıcı"
+    )
+    kds_ready_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Kalemin KDS'te 'hazır' olarak işaretlendiği zaman.",
+        verbose_name="KDS Hazır Olma Zamanı"
+    )
     kdv_rate = models.DecimalField(
         max_digits=5, 
         decimal_places=2, 
@@ -972,6 +999,32 @@ class WaitingCustomer(models.Model):
     def __str__(self):
         return f"{self.name} ({self.party_size} kişi) - Bekliyor: {self.is_waiting}"
 
+class OrderTransfer(models.Model):
+    """Siparişin masalar arası transfer kaydı (gün sonu raporundaki transfer sayısı için)."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='order_transfers', verbose_name="İşletme")
+    order = models.ForeignKey('Order', on_delete=models.CASCADE, related_name='transfers', verbose_name="Sipariş")
+    from_table = models.ForeignKey(
+        Table, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='transfers_out', verbose_name="Önceki Masa"
+    )
+    to_table = models.ForeignKey(
+        Table, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='transfers_in', verbose_name="Yeni Masa"
+    )
+    transferred_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='order_transfers', verbose_name="Transferi Yapan"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Masa Transferi"
+        verbose_name_plural = "Masa Transferleri"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Sipariş #{self.order_id}: {self.from_table_id} -> {self.to_table_id}"
+
 class CreditPaymentDetails(models.Model):
     order = models.OneToOneField(
         Order,
@@ -981,16 +1034,98 @@ class CreditPaymentDetails(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(null=True, blank=True)
+    account = models.ForeignKey(
+        'CustomerAccount', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='credit_sales', verbose_name="Cari Hesap"
+    )
+    settled_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0,
+        verbose_name="Kapatılan Tutar", help_text="Kısmi tahsilatlarla bu siparişe düşen toplam."
+    )
 
     class Meta:
         verbose_name = "Veresiye Detayı"
         verbose_name_plural = "Veresiye Detayları"
+        indexes = [
+            models.Index(fields=['account', 'paid_at', 'created_at'], name='credit_acct_open_idx'),
+        ]
 
     def __str__(self):
         customer_display = self.order.customer.username if self.order.customer else self.order.customer_name
         status = "Ödendi" if self.paid_at else "Ödenmedi"
         return f"Veresiye: Sipariş {self.order.id} ({customer_display or 'Bilinmiyor'}) - Durum: {status}"
 
+class CustomerAccount(models.Model):
+    """
+    Veresiye müşterisinin cari hesabı. 'balance' hareketlerden türetilen güncel borçtur ve
+    her hareketle aynı transaction içinde güncellenir; listeleme geçmişi yeniden okumaz.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='customer_accounts', verbose_name="İşletme")
+    account_key = models.CharField(
+        max_length=64, verbose_name="Hesap Anahtarı",
+        help_text="Normalize edilmiş telefon; telefon yoksa siparişe özel anahtar (siparis:<id>)."
+    )
+    name = models.CharField(max_length=150, blank=True, verbose_name="Müşteri Adı")
+    phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefon")
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Bakiye (Borç)")
+    last_activity_at = models.DateTimeField(default=timezone.now, verbose_name="Son Hareket")
+    needs_linking = models.BooleanField(
+        default=False, db_index=True, verbose_name="Eşleştirme Bekliyor",
+        help_text="Telefonsuz veresiye için siparişe özel açılan hesap; müşterinin hesabına elle bağlanmalıdır."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Cari Hesap"
+        verbose_name_plural = "Cari Hesaplar"
+        unique_together = ('business', 'account_key')
+        indexes = [
+            models.Index(fields=['business', 'balance'], name='cust_acct_biz_balance_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name or self.phone} ({self.business_id}): {self.balance}"
+
+
+class CustomerLedgerEntry(models.Model):
+    """Cari hesap hareketi. Borç (charge) pozitif, tahsilat (payment) negatif tutarla yazılır."""
+    ENTRY_CHARGE = 'charge'
+    ENTRY_PAYMENT = 'payment'
+    ENTRY_ADJUSTMENT = 'adjustment'
+    ENTRY_TYPE_CHOICES = [
+        (ENTRY_CHARGE, 'Veresiye Satış'),
+        (ENTRY_PAYMENT, 'Tahsilat'),
+        (ENTRY_ADJUSTMENT, 'Düzeltme'),
+    ]
+
+    account = models.ForeignKey(CustomerAccount, on_delete=models.CASCADE, related_name='entries', verbose_name="Cari Hesap")
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES, verbose_name="Hareket Türü")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Tutar")
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Hareket Sonrası Bakiye")
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='ledger_entries', verbose_name="Sipariş"
+    )
+    payment_type = models.CharField(max_length=20, blank=True, null=True, verbose_name="Ödeme Türü")
+    note = models.CharField(max_length=255, blank=True, verbose_name="Açıklama")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='ledger_entries', verbose_name="İşlemi Yapan"
+    )
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Tarih")
+
+    class Meta:
+        verbose_name = "Cari Hesap Hareketi"
+        verbose_name_plural = "Cari Hesap Hareketleri"
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['account', '-created_at', '-id'], name='cust_ledger_acct_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entry_type_display()} {self.amount} -> {self.balance_after}"
+
+
 class Shift(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='shifts', verbose_name="İşletme")
     name = models.CharField(max_length=100, help_text="Örn: Sabah Vardiyası, Akşam Vardiyası")
@@ -1058,6 +1193,446 @@ class NotificationSetting(models.Model):
         status = "Aktif" if self.is_active else "Pasif"
         return f"{self.event_type} - {status}"
 
+class NotificationOutbox(models.Model):
+    """
+    Gerçek zamanlı (Socket.IO) olayların, onları doğuran veritabanı değişikliğiyle
+    aynı işlem (transaction) içinde yazıldığı giden kutusu. Kayıtlar relay görevi
+    tarafından işletme bazında sıralı ve toplu olarak yayınlanır.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Beklemede')
+        SENT = 'sent', _('Gönderildi')
+        SKIPPED = 'skipped', _('Atlandı (Bildirim Pasif)')
+        FAILED = 'failed', _('Başarısız')
+
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notification_outbox',
+        verbose_name="İşletme"
+    )
+    room = models.CharField(max_length=150, verbose_name="Socket.IO Odası")
+    event = models.CharField(max_length=100, verbose_name="Socket.IO Olayı")
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Veri")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, verbose_name="Durum")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Deneme Sayısı")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Son Hata")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="Gönderime Uygun Olduğu Zaman")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Gönderilme Zamanı")
+
+    class Meta:
+        verbose_name = "Bildirim Giden Kutusu Kaydı"
+        verbose_name_plural = "Bildirim Giden Kutusu"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id']),
+            models.Index(fields=['status', 'sent_at']),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.event} -> {self.room} [{self.get_status_display()}]"
+
+class OrderRevision(models.Model):
+    """
+    Bir siparişin istemcilere yayınlanan son halini ve revizyon numarasını tutar.
+    'order_status_update' olayları bu anlık görüntüye göre fark (diff) taşır.
+    """
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='revision_state',
+        verbose_name="Sipariş"
+    )
+    revision = models.PositiveIntegerField(default=0, verbose_name="Revizyon")
+    snapshot = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Son Yayınlanan Veri")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sipariş Revizyonu"
+        verbose_name_plural = "Sipariş Revizyonları"
+
+    def __str__(self):
+        return f"Sipariş #{self.order_id} r{self.revision}"
+
+class KDSFeedSequence(models.Model):
+    """
+    KDS ekranı odasına (kds_{business_id}_{slug}) gönderilen akış olaylarının sıra sayacı.
+    Ekran, aldığı olayların sıra numarasında boşluk görürse anlık görüntüyü yeniden ister.
+    """
+    kds_screen = models.OneToOneField(
+        KDSScreen,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_sequence',
+        verbose_name="KDS Ekranı"
+    )
+    value = models.PositiveBigIntegerField(default=0, verbose_name="Son Sıra Numarası")
+
+    class Meta:
+        verbose_name = "KDS Akış Sıra Sayacı"
+        verbose_name_plural = "KDS Akış Sıra Sayaçları"
+
+    def __str__(self):
+        return f"{self.kds_screen_id}: {self.value}"
+
+class KDSTicket(models.Model):
+    """
+    KDS listesi için önceden hesaplanmış projeksiyon: her sipariş ve KDS ekranı için,
+    o ekrana düşen kalemler ve ekrana özel durum metni tek satırda tutulur.
+    Sipariş/kalem değişikliklerinden sonra core.utils.kds_tickets ile yeniden oluşturulur.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='kds_tickets', verbose_name="İşletme")
+    kds_screen = models.ForeignKey(KDSScreen, on_delete=models.CASCADE, related_name='tickets', verbose_name="KDS Ekranı")
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='kds_tickets', verbose_name="Sipariş")
+    is_listed = models.BooleanField(
+        default=False,
+        verbose_name="Listede Görünür",
+        help_text="Sipariş aktifse ve bu ekranda bekleyen/hazırlanan kalem varsa True."
+    )
+    order_created_at = models.DateTimeField(verbose_name="Sipariş Oluşturulma Zamanı")
+    order_status = models.CharField(max_length=30, verbose_name="Sipariş Durumu")
+    order_type = models.CharField(max_length=20, verbose_name="Sipariş Türü")
+    display_name = models.CharField(max_length=255, verbose_name="Görünen Ad")
+    table_number = models.PositiveIntegerField(null=True, blank=True, verbose_name="Masa Numarası")
+    customer_name = models.CharField(max_length=255, null=True, blank=True, verbose_name="Müşteri Adı")
+    taken_by_staff_username = models.CharField(max_length=150, null=True, blank=True)
+    prepared_by_kitchen_staff_username = models.CharField(max_length=150, null=True, blank=True)
+    kitchen_completed_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    assigned_pager_device_id = models.CharField(max_length=100, null=True, blank=True)
+    assigned_pager_name = models.CharField(max_length=100, null=True, blank=True)
+    screen_status_display = models.CharField(max_length=255, verbose_name="Ekrana Özel Durum")
+    items = models.JSONField(default=list, encoder=DjangoJSONEncoder, verbose_name="Kalemler")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "KDS Fişi"
+        verbose_name_plural = "KDS Fişleri"
+        unique_together = ('order', 'kds_screen')
+        indexes = [
+            models.Index(fields=['kds_screen', 'is_listed', 'order_created_at', 'order']),
+        ]
+
+    def __str__(self):
+        return f"Sipariş #{self.order_id} @ {self.kds_screen_id} ({self.screen_status_display})"
+
+# === SATIŞ ÖZET (ROLLUP) TABLOLARI ===
+# Ödeme kaydedildiğinde/silindiğinde core.utils.sales_rollups ile artımlı olarak güncellenir,
+# 'rebuild_sales_rollups' komutuyla kaynaktan yeniden hesaplanabilir.
+
+class SalesHourlyRollup(models.Model):
+    """İşletme başına saatlik satış özeti (yerel saat dilimine göre saat başı)."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='sales_hourly_rollups', verbose_name="İşletme")
+    hour_start = models.DateTimeField(verbose_name="Saat Başlangıcı")
+    turnover = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0,
+        help_text="Bu saatte alınan ödemelerin toplamı (ödeme zamanına göre)."
+    )
+    payment_count = models.IntegerField(default=0, help_text="Bu saatte alınan ödeme sayısı.")
+    order_count = models.IntegerField(
+        default=0,
+        help_text="Bu saatte oluşturulmuş ve ödenmiş sipariş sayısı (sipariş oluşturulma zamanına göre)."
+    )
+
+    class Meta:
+        verbose_name = "Saatlik Satış Özeti"
+        verbose_name_plural = "Saatlik Satış Özetleri"
+        unique_together = ('business', 'hour_start')
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.hour_start}: {self.turnover}"
+
+class ItemSalesDailyRollup(models.Model):
+    """Ürün başına günlük satış özeti (siparişin oluşturulduğu güne göre)."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='item_sales_daily_rollups', verbose_name="İşletme")
+    date = models.DateField(verbose_name="Tarih")
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='daily_sales_rollups', verbose_name="Menü Öğesi")
+    quantity = models.IntegerField(default=0, verbose_name="Satılan Adet")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Ciro (KDV Hariç)")
+    cost = models.DecimalField(max_digits=14, decimal_places=3, default=0, verbose_name="Reçete Maliyeti")
+    costed_quantity = models.IntegerField(default=0, verbose_name="Maliyeti Bilinen Adet")
+
+    class Meta:
+        verbose_name = "Günlük Ürün Satış Özeti"
+        verbose_name_plural = "Günlük Ürün Satış Özetleri"
+        unique_together = ('business', 'date', 'menu_item')
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.date}: {self.menu_item_id} x{self.quantity}"
+
+class PaymentTypeDailyRollup(models.Model):
+    """Ödeme türü başına günlük tahsilat özeti (ödeme zamanına göre)."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='payment_type_daily_rollups', verbose_name="İşletme")
+    date = models.DateField(verbose_name="Tarih")
+    payment_type = models.CharField(max_length=20, choices=Payment.PAYMENT_CHOICES, verbose_name="Ödeme Türü")
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Tutar")
+    payment_count = models.IntegerField(default=0, verbose_name="Ödeme Sayısı")
+
+    class Meta:
+        verbose_name = "Günlük Ödeme Türü Özeti"
+        verbose_name_plural = "Günlük Ödeme Türü Özetleri"
+        unique_together = ('business', 'date', 'payment_type')
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.date}: {self.payment_type} {self.amount}"
+
+class StaffDailyMetrics(models.Model):
+    """Personel başına günlük performans özeti (siparişin oluşturulduğu güne göre)."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='staff_daily_metrics', verbose_name="İşletme")
+    staff = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='daily_metrics', verbose_name="Personel"
+    )
+    date = models.DateField(verbose_name="Tarih")
+    orders_taken = models.IntegerField(default=0, help_text="Personelin aldığı ve ödenmiş sipariş sayısı.")
+    revenue_handled = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0,
+        help_text="Personelin aldığı siparişlerin ödeme toplamı."
+    )
+    items_prepared = models.IntegerField(default=0, help_text="Personelin KDS'te 'hazır' olarak işaretlediği kalem sayısı.")
+    prep_seconds_total = models.BigIntegerField(default=0, help_text="Hazırlanan kalemlerin toplam hazırlama süresi (saniye).")
+    prep_sample_count = models.IntegerField(default=0, help_text="Hazırlama süresi ölçülen kalem sayısı.")
+
+    class Meta:
+        verbose_name = "Günlük Personel Performans Özeti"
+        verbose_name_plural = "Günlük Personel Performans Özetleri"
+        unique_together = ('business', 'staff', 'date')
+        indexes = [
+            models.Index(fields=['business', 'date'], name='staff_metrics_biz_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.date}: {self.staff_id} ({self.orders_taken} sipariş)"
+
+class KDSLatencyHistogram(models.Model):
+    """
+    KDS gecikme histogramı: ekran, kategori ve saat (yerel) başına, sabit süre kovalarındaki
+    kalem sayıları. Yüzdelikler (p50/p90/p99) ham kalemler taranmadan bu kovalardan hesaplanır.
+    """
+    METRIC_PREP = 'prep'
+    METRIC_PICKUP = 'pickup'
+    METRIC_CHOICES = [
+        (METRIC_PREP, 'Hazırlama Süresi'),
+        (METRIC_PICKUP, 'Garson Alma Süresi'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='kds_latency_histograms', verbose_name="İşletme")
+    date = models.DateField(verbose_name="Tarih")
+    hour = models.PositiveSmallIntegerField(verbose_name="Saat", help_text="Aşamanın başladığı yerel saat (0-23).")
+    kds_screen = models.ForeignKey(
+        KDSScreen, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='latency_histograms', verbose_name="KDS Ekranı"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='kds_latency_histograms', verbose_name="Kategori"
+    )
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES, verbose_name="Ölçüm")
+    bucket = models.PositiveSmallIntegerField(verbose_name="Süre Kovası")
+    count = models.IntegerField(default=0, verbose_name="Kalem Sayısı")
+
+    class Meta:
+        verbose_name = "KDS Gecikme Histogramı"
+        verbose_name_plural = "KDS Gecikme Histogramları"
+        constraints = [
+            # Ekran/kategori boş olabilir; NULL'lar eşit sayılmazsa eşzamanlı ilk eklemeler yinelenen satır üretir.
+            models.UniqueConstraint(
+                fields=['business', 'date', 'hour', 'kds_screen', 'category', 'metric', 'bucket'],
+                name='kds_latency_bucket_uniq', nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['business', 'date'], name='kds_latency_biz_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.date} {self.hour:02d}:00 {self.metric}[{self.bucket}] x{self.count}"
+
+def report_export_storage():
+    """Dışa aktarım dosyaları için settings.STORAGES['report_exports'] (worker ve web arasında ortak depolama)."""
+    from django.core.files.storage import storages
+    return storages['report_exports']
+
+class ReportExportJob(models.Model):
+    """Arka planda (Celery) oluşturulan rapor dışa aktarımı; tamamlanınca dosya indirilebilir."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Sırada'),
+        (STATUS_RUNNING, 'Hazırlanıyor'),
+        (STATUS_COMPLETED, 'Tamamlandı'),
+        (STATUS_FAILED, 'Başarısız'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='report_export_jobs', verbose_name="İşletme")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='report_export_jobs', verbose_name="Talep Eden"
+    )
+    report_type = models.CharField(max_length=50, default='detailed_sales', verbose_name="Rapor Türü")
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Dosya Biçimi")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    file = models.FileField(
+        upload_to='report_exports/%Y/%m/', storage=report_export_storage, null=True, blank=True, verbose_name="Dosya"
+    )
+    row_count = models.PositiveIntegerField(default=0, verbose_name="Satır Sayısı")
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Rapor Dışa Aktarımı"
+        verbose_name_plural = "Rapor Dışa Aktarımları"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.report_type}.{self.export_format} #{self.id} ({self.get_status_display()})"
+
+class DailyClose(models.Model):
+    """
+    Gün sonu (Z) raporu: bir iş gününün kapanışta dondurulmuş toplamları. Kayıt oluşturulduktan
+    sonra değiştirilemez; geçmiş dönem raporları ham kayıtlar yerine bu satırları toplar.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='daily_closes', verbose_name="İşletme")
+    business_date = models.DateField(verbose_name="İş Günü")
+    period_start = models.DateTimeField(verbose_name="Dönem Başlangıcı")
+    period_end = models.DateTimeField(verbose_name="Dönem Bitişi")
+    closed_at = models.DateTimeField(auto_now_add=True, verbose_name="Kapanış Zamanı")
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='daily_closes', verbose_name="Kapatan", help_text="Boşsa otomatik kapanış."
+    )
+
+    gross_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam Tahsilat")
+    payment_count = models.IntegerField(default=0, verbose_name="Ödeme Sayısı")
+    net_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="KDV Hariç Satış")
+    vat_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam KDV")
+    void_count = models.IntegerField(default=0, verbose_name="İptal/Red Sipariş Sayısı")
+    void_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="İptal/Red Tutarı")
+    transfer_count = models.IntegerField(default=0, verbose_name="Masa Transferi Sayısı")
+    credit_sales_count = models.IntegerField(default=0, verbose_name="Veresiye Satış Sayısı")
+    credit_sales_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Veresiye Satış Tutarı")
+    credit_collected_count = models.IntegerField(default=0, verbose_name="Tahsil Edilen Veresiye Sayısı")
+    credit_collected_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Tahsil Edilen Veresiye Tutarı")
+
+    payment_breakdown = models.JSONField(
+        default=dict, encoder=DjangoJSONEncoder, verbose_name="Ödeme Türü Dağılımı",
+        help_text="{ödeme_türü: {amount, count}}"
+    )
+    vat_breakdown = models.JSONField(
+        default=dict, encoder=DjangoJSONEncoder, verbose_name="KDV Dağılımı",
+        help_text="{kdv_oranı: {net, vat, gross}}"
+    )
+    staff_takings = models.JSONField(
+        default=list, encoder=DjangoJSONEncoder, verbose_name="Personel Tahsilatları",
+        help_text="[{staff_id, username, order_count, amount}]"
+    )
+
+    class Meta:
+        verbose_name = "Gün Sonu Raporu"
+        verbose_name_plural = "Gün Sonu Raporları"
+        unique_together = ('business', 'business_date')
+        ordering = ['-business_date']
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Gün sonu raporları oluşturulduktan sonra değiştirilemez.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.business_id} Z @ {self.business_date}: {self.gross_sales}"
+
+class ReportDataVersion(models.Model):
+    """
+    İşletmenin rapor verisi sürümü. Her ödeme değişikliğinde artırılır; saklanan rapor
+    sonuçları yalnızca üretildikleri sürüm hâlâ güncelse yeniden kullanılır.
+    """
+    business = models.OneToOneField(
+        Business, on_delete=models.CASCADE, primary_key=True,
+        related_name='report_data_version', verbose_name="İşletme"
+    )
+    version = models.BigIntegerField(default=0, verbose_name="Sürüm")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rapor Veri Sürümü"
+        verbose_name_plural = "Rapor Veri Sürümleri"
+
+    def __str__(self):
+        return f"{self.business_id}: v{self.version}"
+
+class ReportJob(models.Model):
+    """
+    Arka planda (Celery) hesaplanan rapor ve sonucu. Sonuç; işletme, rapor türü,
+    parametreler ve veri sürümüyle anahtarlanır, aynı istekler bu kayıttan karşılanır.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = ReportExportJob.STATUS_CHOICES
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='report_jobs', verbose_name="İşletme")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='report_jobs', verbose_name="Talep Eden"
+    )
+    report_type = models.CharField(max_length=50, verbose_name="Rapor Türü")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+    params_hash = models.CharField(max_length=64, verbose_name="Parametre Özeti")
+    data_version = models.BigIntegerField(default=0, verbose_name="Veri Sürümü")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    result = models.JSONField(null=True, blank=True, verbose_name="Sonuç")
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Rapor İşi"
+        verbose_name_plural = "Rapor İşleri"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['business', 'report_type', 'params_hash', 'data_version'], name='report_job_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} #{self.id} v{self.data_version} ({self.get_status_display()})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    'Idempotency-Key' başlığıyla gönderilen yazma isteğinin ilk başarılı yanıtı. Aynı anahtarla
+    gelen tekrarlar (ör. bağlantı kopunca yeniden gönderim) sipariş tablolarına dokunmadan bu
+    yanıtla karşılanır. Kayıtlar IDEMPOTENCY_KEY_TTL_HOURS sonra temizlenir.
+    """
+    # 'user:<id>' veya kimliği doğrulanmamış misafir istekleri için 'guest'
+    scope = models.CharField(max_length=64, verbose_name="Kapsam")
+    key = models.CharField(max_length=255, verbose_name="Anahtar")
+    request_hash = models.CharField(max_length=64, verbose_name="İstek Özeti")
+    # Yanıt kaydedilene kadar boştur (istek işleniyor).
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Yanıt Kodu")
+    response_body = models.JSONField(null=True, blank=True, verbose_name="Yanıt")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Tekrar Koruma Anahtarı"
+        verbose_name_plural = "Tekrar Koruma Anahtarları"
+        unique_together = ('scope', 'key')
+
+    def __str__(self):
+        return f"{self.scope} / {self.key} ({self.status_code or 'işleniyor'})"
+
 # === YENİ MODEL BAŞLANGICI: BusinessWebsite ===
 
 class BusinessWebsite(models.Model):
@@ -1277,6 +1852,59 @@ class Reservation(models.Model):
     def __str__(self):
         return f"Rez. #{self.id}: {self.customer_name} - Masa {self.table.table_number} ({self.reservation_time.strftime('%d.%m %H:%M')})"
 
+class CustomerIdentity(models.Model):
+    """
+    Paket sipariş, rezervasyon ve bekleme listesi kayıtlarından türetilen müşteri kimliği.
+    Telefon numarası normalize edilip anahtarlı özetle (HMAC) saklanır; numaranın kendisi tutulmaz.
+    Sayaçlar her temasta artırılır; aynı yerel günde birden fazla temas tek ziyaret sayılır.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='customer_identities', verbose_name="İşletme")
+    phone_hash = models.CharField(max_length=64, verbose_name="Telefon Özeti")
+    phone_suffix = models.CharField(max_length=4, blank=True, verbose_name="Telefon Son Haneleri")
+    display_name = models.CharField(max_length=150, blank=True, verbose_name="Müşteri Adı")
+    first_seen_at = models.DateTimeField(verbose_name="İlk Temas")
+    last_seen_at = models.DateTimeField(verbose_name="Son Temas")
+    first_visit_week = models.DateField(verbose_name="Kohort Haftası", help_text="İlk ziyaretin yerel haftasının pazartesisi.")
+    last_visit_date = models.DateField(verbose_name="Son Ziyaret Günü")
+    visit_count = models.IntegerField(default=0, verbose_name="Ziyaret Sayısı")
+    order_count = models.IntegerField(default=0, verbose_name="Sipariş Sayısı")
+    reservation_count = models.IntegerField(default=0, verbose_name="Rezervasyon Sayısı")
+    waitlist_count = models.IntegerField(default=0, verbose_name="Bekleme Listesi Sayısı")
+    total_spend = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam Harcama")
+
+    class Meta:
+        verbose_name = "Müşteri Kimliği"
+        verbose_name_plural = "Müşteri Kimlikleri"
+        unique_together = ('business', 'phone_hash')
+        indexes = [
+            models.Index(fields=['business', 'first_visit_week'], name='cust_identity_cohort_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.display_name or '***' + self.phone_suffix} ({self.visit_count} ziyaret)"
+
+
+class CustomerCohortWeekly(models.Model):
+    """
+    Haftalık kohort tablosu: ilk ziyareti 'cohort_week' haftasında olan müşterilerin
+    'activity_week' haftasındaki aktif müşteri, ziyaret ve harcama toplamları.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='customer_cohorts', verbose_name="İşletme")
+    cohort_week = models.DateField(verbose_name="Kohort Haftası")
+    activity_week = models.DateField(verbose_name="Aktivite Haftası")
+    customers = models.IntegerField(default=0, verbose_name="Aktif Müşteri")
+    visits = models.IntegerField(default=0, verbose_name="Ziyaret")
+    spend = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Harcama")
+
+    class Meta:
+        verbose_name = "Haftalık Müşteri Kohortu"
+        verbose_name_plural = "Haftalık Müşteri Kohortları"
+        unique_together = ('business', 'cohort_week', 'activity_week')
+
+    def __str__(self):
+        return f"{self.business_id} kohort {self.cohort_week} @ {self.activity_week}: {self.customers}"
+
+
 # === PERSONEL GİRİŞ-ÇIKIŞ MODELLERİ ===
 
 class CheckInLocation(models.Model):
@@ -1404,7 +2032,7 @@ class AttendanceRecord(models.Model):
         verbose_name_plural = "Personel Giriş-Çıkış Kayıtları"
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['user', 'business', '-timestamp']),
+            models.Index(fields=['user', 'business', '-timestamp', '-id'], name='attendance_user_time_idx'),
             models.Index(fields=['business', '-timestamp']),
             models.Index(fields=['type', '-timestamp']),
         ]
@@ -0,0 +1,123 @@
+# core/pagination.py
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) gibi benzersiz bir sıralama anahtarı üzerinde imleçli (keyset) sayfalama.
+    Sayfa, son görülen satırın anahtarından sonrasını okur: COUNT(*) ve OFFSET taraması yoktur,
+    derin sayfalar ilk sayfa kadar hızlıdır. Sıralamayla aynı sırada bir bileşik indeks gerekir.
+
+    İsteğe bağlıdır: istemci ?cursor= (ilk sayfa için boş) veya ?pagination=cursor gönderir.
+    Göndermeyen istemciler 'fallback_class' ile (varsa) eski sayfalamayı almaya devam eder.
+    Yanıt: {'next': <sonraki sayfa linki veya null>, 'results': [...]}.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    # Tüm alanlar aynı yönde olmalı; son alan benzersiz olmalıdır (genellikle 'id').
+    ordering = ('-created_at', '-id')
+    fallback_class = None
+
+    def __init__(self):
+        self.fallback = self.fallback_class() if self.fallback_class else None
+        self.keyset_active = False
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def _field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, instance):
+        values = []
+        for name in self._field_names():
+            value = getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, model, token):
+        """İmleci sıralama alanlarının Python değerlerine çevirir; bozuk imleç 404 döner."""
+        try:
+            raw_values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            names = self._field_names()
+            if not isinstance(raw_values, list) or len(raw_values) != len(names):
+                raise ValueError
+            return [model._meta.get_field(name).to_python(value) for name, value in zip(names, raw_values)]
+        except (ValueError, TypeError, UnicodeError, DjangoValidationError):
+            raise NotFound("Geçersiz sayfalama imleci.")
+
+    def _after(self, values):
+        """Sıralamada verilen anahtardan sonra gelen satırlar: (a < va) OR (a = va AND b < vb) ..."""
+        lookup = 'lt' if self.ordering[0].startswith('-') else 'gt'
+        condition = Q()
+        equal_prefix = {}
+        for name, value in zip(self._field_names(), values):
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_active = self.is_requested(request)
+        if not self.keyset_active:
+            return self.fallback.paginate_queryset(queryset, request, view) if self.fallback else None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self._after(self.decode_cursor(queryset.model, token)))
+
+        # Bir fazla satır okunur; varsa sonraki sayfa vardır.
+        rows = list(queryset[:page_size + 1])
+        self.page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(self.page[-1]) if len(rows) > page_size else None
+        return self.page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_active:
+            return self.fallback.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class OrderListPagination(KeysetPagination):
+    """Sipariş listeleri: varsayılan sayfa numaralı, ?cursor= ile (created_at, id) imleçli."""
+    fallback_class = StandardResultsSetPagination
@@ -25,6 +25,10 @@ from .menu_serializers import (
 from .payment_serializers import (
     PaymentSerializer,
     CreditPaymentDetailsSerializer,
+    CustomerAccountSerializer,
+    CustomerLedgerEntrySerializer,
+    CustomerAccountPaymentSerializer,
+    CustomerAccountLinkSerializer,
 )
 from .order_serializers import (
     OrderItemExtraSerializer,
@@ -35,6 +39,7 @@ from .order_serializers import (
     GuestOrderCreateSerializer,
     KDSOrderItemSerializer,
     KDSOrderSerializer,
+    KDSTicketSerializer,
     SimplePagerInfoSerializer,
 )
 from .waiting_customer_serializers import (
@@ -52,6 +57,9 @@ from .stock_serializers import (
 from .report_serializers import (
     StaffPerformanceSerializer,
     DetailedSaleItemSerializer,
+    ReportExportJobSerializer,
+    ReportJobSerializer,
+    DailyCloseSerializer,
 )
 from .pager_serializers import (
     PagerSerializer,
@@ -103,6 +111,10 @@ __all__ = [
     'PurchaseOrderSerializer',
     'PaymentSerializer',
     'CreditPaymentDetailsSerializer',
+    'CustomerAccountSerializer',
+    'CustomerLedgerEntrySerializer',
+    'CustomerAccountPaymentSerializer',
+    'CustomerAccountLinkSerializer',
     'OrderItemExtraSerializer',
     'GuestOrderItemSerializer',
     'OrderItemSerializer',
@@ -111,10 +123,14 @@ __all__ = [
     'GuestOrderCreateSerializer',
     'KDSOrderItemSerializer',
     'KDSOrderSerializer',
+    'KDSTicketSerializer',
     'SimplePagerInfoSerializer',
     'WaitingCustomerSerializer',
     'StaffPerformanceSerializer',
     'DetailedSaleItemSerializer',
+    'ReportExportJobSerializer',
+    'ReportJobSerializer',
+    'DailyCloseSerializer',
     'PagerSerializer',
     'PagerOrderSerializer',
     'CampaignMenuSerializer',
@@ -10,7 +10,7 @@ class BusinessSerializer(serializers.ModelSerializer):
     class Meta:
         model = Business
         # === GÜNCELLEME BURADA: 'timezone' alanı fields listesine eklendi ===
-        fields = ['id', 'owner', 'name', 'address', 'phone', 'is_setup_complete', 'currency_code', 'timezone']
+        fields = ['id', 'owner', 'name', 'address', 'phone', 'is_setup_complete', 'currency_code', 'timezone', 'day_close_time']
 
 
 class TableSerializer(serializers.ModelSerializer):
@@ -2,7 +2,7 @@
 
 from rest_framework import serializers, generics
 from django.db import transaction
-from django.db.models import Prefetch, Q
+from django.db.models import Prefetch, Q, Exists, OuterRef
 from decimal import Decimal
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from django.utils import timezone
@@ -11,7 +11,7 @@ import logging
 from ..models import (
     Order, OrderItem, OrderItemExtra, MenuItem, MenuItemVariant, Table,
     CustomUser as User, OrderTableUser, Business, Pager,
-    CampaignMenu, CampaignMenuItem, KDSScreen
+    CampaignMenu, CampaignMenuItem, KDSScreen, KDSTicket
 )
 from .menu_serializers import MenuItemSerializer, MenuItemVariantSerializer
 from .payment_serializers import PaymentSerializer, CreditPaymentDetailsSerializer
@@ -38,6 +38,111 @@ class OrderItemExtraSerializer(serializers.ModelSerializer):
         fields = ['id', 'variant', 'quantity', 'variant_name', 'variant_price']
 
 
+def load_order_item_catalog(business, menu_item_ids, variant_ids):
+    """
+    Sipariş kalemlerinde geçen ürün ve varyantları işletmeye kapsamlı iki sorguda yükler:
+    ürünler kategori, KDS ve kampanyalarıyla (ve ana varyantı olup olmadığıyla) birlikte,
+    varyantlar (ana ve ekstra) tek bir id__in sorgusuyla.
+    Dönüş: ({ürün_id: MenuItem}, {varyant_id: MenuItemVariant})
+    """
+    menu_items = MenuItem.objects.filter(id__in=menu_item_ids, business=business).select_related(
+        'business', 'category__assigned_kds', 'represented_campaign'
+    ).annotate(
+        has_main_variants=Exists(MenuItemVariant.objects.filter(menu_item=OuterRef('pk'), is_extra=False))
+    ).in_bulk() if menu_item_ids else {}
+    variants = MenuItemVariant.objects.filter(
+        id__in=variant_ids, menu_item__business=business
+    ).in_bulk() if variant_ids else {}
+    return menu_items, variants
+
+
+def _campaign_error(menu_item, today):
+    """Kampanya paketi şu an satılabilir değilse hata mesajını, satılabilirse None döner."""
+    campaign = getattr(menu_item, 'represented_campaign', None)
+    if campaign is None or not campaign.is_active:
+        return f"Kampanya '{menu_item.name}' aktif değil veya bulunamadı."
+    if (campaign.start_date and campaign.start_date > today) or (campaign.end_date and campaign.end_date < today):
+        return f"'{campaign.name}' kampanyası şu an geçerli değil."
+    return None
+
+
+def resolve_order_items_data(business, items_data):
+    """
+    Doğrulanmış kalem listesindeki tüm ürün/varyant/ekstra ID'lerini toplar, tek seferde
+    yükler ve kalemlere 'menu_item_instance', 'variant_instance', 'valid_extras_instances'
+    ekler. Ürünün aktifliği, varyant seçimi ve kampanya geçerliliği bellekte denetlenir.
+    Hatalar kalem sırasıyla (ListSerializer biçiminde) tek bir ValidationError olarak döner.
+    """
+    menu_item_ids = set()
+    variant_ids = set()
+    for data in items_data:
+        menu_item_ids.add(data['menu_item_id'])
+        if data.get('variant'):
+            variant_ids.add(data['variant'])
+        variant_ids.update(extra['variant'] for extra in data['extras'])
+    menu_items, variants = load_order_item_catalog(business, menu_item_ids, variant_ids)
+
+    today = timezone.now().date()
+    errors = []
+    for data in items_data:
+        item_errors = {}
+        errors.append(item_errors)
+        menu_item_id = data['menu_item_id']
+        menu_item = menu_items.get(menu_item_id)
+        if menu_item is None:
+            item_errors['menu_item_id'] = [f"ID'si {menu_item_id} olan ürün bu işletmede bulunamadı veya geçersiz."]
+            continue
+        if not menu_item.is_active:
+            item_errors['menu_item_id'] = [f"'{menu_item.name}' ürünü şu an satışta değil."]
+            continue
+        data['menu_item_instance'] = menu_item
+        data['variant_instance'] = None
+        data['valid_extras_instances'] = []
+
+        if menu_item.is_campaign_bundle:
+            campaign_error = _campaign_error(menu_item, today)
+            if campaign_error:
+                item_errors['non_field_errors'] = [campaign_error]
+            continue
+
+        variant_id = data.get('variant')
+        if variant_id:
+            variant_instance = variants.get(variant_id)
+            if variant_instance is None or variant_instance.menu_item_id != menu_item.id:
+                item_errors['variant_id'] = [f"ID'si {variant_id} olan varyant, ürün ID {menu_item_id} için bulunamadı."]
+                continue
+            if variant_instance.is_extra:
+                item_errors['variant_id'] = ["Seçilen varyant bir ana seçenek olmalı, ekstra değil."]
+                continue
+            data['variant_instance'] = variant_instance
+        elif menu_item.has_main_variants:
+            item_errors['variant_id'] = [f"'{menu_item.name}' ürünü için lütfen bir seçenek (varyant) belirtin."]
+            continue
+
+        for extra in data['extras']:
+            extra_variant = variants.get(extra['variant'])
+            if extra_variant is None or not extra_variant.is_extra:
+                logger.warning(f"Geçersiz ekstra (ID: {extra['variant']}) ürün ID {menu_item_id} için gönderildi.")
+                continue
+            data['valid_extras_instances'].append({'variant_instance': extra_variant, 'quantity': extra['quantity']})
+
+    if any(errors):
+        raise ValidationError(errors)
+    return items_data
+
+
+class GuestOrderItemListSerializer(serializers.ListSerializer):
+    """Kalem listesini tek seferde doğrular; sorgu sayısı kalem ve ekstra sayısından bağımsızdır."""
+
+    def to_internal_value(self, data):
+        items_data = super().to_internal_value(data)
+        business_from_context = self.context.get('business_from_context')
+        if not business_from_context:
+            logger.error("GuestOrderItemSerializer: business_from_context eksik.")
+            raise ValidationError("İşlem yapılacak işletme belirlenemedi (serializer context hatası).")
+        return resolve_order_items_data(business_from_context, items_data)
+
+
 class GuestOrderItemSerializer(serializers.Serializer):
     menu_item_id = serializers.IntegerField(write_only=True)
     variant_id = serializers.IntegerField(required=False, allow_null=True, write_only=True, source='variant')
@@ -49,63 +154,39 @@ class GuestOrderItemSerializer(serializers.Serializer):
         allow_empty=True
     )
 
-    def validate(self, data):
-        menu_item_id = data.get('menu_item_id')
-        if menu_item_id is None:
-            raise ValidationError({"menu_item_id": "menu_item_id gereklidir."})
-
-        business_from_context = self.context.get('business_from_context')
-        if not business_from_context:
-            logger.error("GuestOrderItemSerializer: business_from_context eksik.")
-            raise ValidationError("İşlem yapılacak işletme belirlenemedi (serializer context hatası).")
-
-        try:
-            menu_item = MenuItem.objects.select_related('business', 'represented_campaign__business').get(id=menu_item_id, business=business_from_context)
-            data['menu_item_instance'] = menu_item
-        except MenuItem.DoesNotExist:
-            raise ValidationError(f"ID'si {menu_item_id} olan ürün bu işletmede bulunamadı veya geçersiz.")
-
-        if not menu_item.is_campaign_bundle:
-            variant_obj = data.get('variant')
-            if variant_obj:
-                try:
-                    variant_instance = MenuItemVariant.objects.get(id=variant_obj, menu_item=menu_item)
-                    if variant_instance.is_extra:
-                        raise ValidationError({"variant_id": "Seçilen varyant bir ana seçenek olmalı, ekstra değil."})
-                    data['variant_instance'] = variant_instance
-                except MenuItemVariant.DoesNotExist:
-                    raise ValidationError(f"ID'si {variant_obj} olan varyant, ürün ID {menu_item_id} için bulunamadı.")
-            else:
-                if menu_item.variants.filter(is_extra=False).exists():
-                    raise ValidationError(f"'{menu_item.name}' ürünü için lütfen bir seçenek (varyant) belirtin.")
-                data['variant_instance'] = None
-
-            extras_data = data.get('extras', [])
-            valid_extras = []
-            for extra_item_data in extras_data:
-                extra_variant_id_raw = extra_item_data.get('variant')
-                extra_quantity = extra_item_data.get('quantity', 1)
+    class Meta:
+        list_serializer_class = GuestOrderItemListSerializer
+
+    def validate_extras(self, value):
+        """Ekstraları (varyant_id, miktar) biçimine indirger; veritabanı denetimi liste düzeyindedir."""
+        normalized_extras = []
+        for extra_item_data in value:
+            extra_variant_id_raw = extra_item_data.get('variant')
+            extra_quantity = extra_item_data.get('quantity', 1)
+            if extra_variant_id_raw is None:
+                continue
+            try:
+                extra_variant_id = int(extra_variant_id_raw)
+            except (ValueError, TypeError):
+                logger.warning(f"Geçersiz ekstra (ID: {extra_variant_id_raw}) gönderildi.")
+                continue
+            if not isinstance(extra_quantity, int) or extra_quantity < 1:
+                extra_quantity = 1
+            normalized_extras.append({'variant': extra_variant_id, 'quantity': extra_quantity})
+        return normalized_extras
 
-                if extra_variant_id_raw is None: continue
-                try:
-                    extra_variant_id = int(extra_variant_id_raw)
-                    if not isinstance(extra_quantity, int) or extra_quantity < 1: extra_quantity = 1
-
-                    extra_variant = MenuItemVariant.objects.get(
-                        id=extra_variant_id,
-                        is_extra=True
-                    )
-                    valid_extras.append({
-                        'variant_instance': extra_variant,
-                        'quantity': extra_quantity
-                    })
-                except (ValueError, TypeError, MenuItemVariant.DoesNotExist):
-                    logger.warning(f"Geçersiz ekstra (ID: {extra_variant_id_raw}) ürün ID {menu_item_id} için gönderildi.")
-                    pass
-            data['valid_extras_instances'] = valid_extras
-        else:
-            data['variant_instance'] = None
-            data['valid_extras_instances'] = []
+    def validate(self, data):
+        data.setdefault('extras', [])
+        if self.parent is None:
+            # Tek kalem olarak kullanıldığında liste doğrulamasıyla aynı yol izlenir.
+            business_from_context = self.context.get('business_from_context')
+            if not business_from_context:
+                logger.error("GuestOrderItemSerializer: business_from_context eksik.")
+                raise ValidationError("İşlem yapılacak işletme belirlenemedi (serializer context hatası).")
+            try:
+                resolve_order_items_data(business_from_context, [data])
+            except ValidationError as e:
+                raise ValidationError(e.detail[0])
         return data
 
 
@@ -123,6 +204,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
     item_prepared_by_staff_username = serializers.CharField(source='item_prepared_by_staff.username', read_only=True, allow_null=True)
     
     waiter_picked_up_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    kds_preparing_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    kds_ready_at = serializers.DateTimeField(read_only=True, allow_null=True)
 
     menu_item_id = serializers.PrimaryKeyRelatedField(
         queryset=MenuItem.objects.all(), source='menu_item', write_only=True, required=False
@@ -141,13 +224,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
             'quantity', 'price', 'extras', 'table_user', 'delivered',
             'is_awaiting_staff_approval',
             'kds_status', 'kds_status_display', 'item_prepared_by_staff', 'item_prepared_by_staff_username',
-            'waiter_picked_up_at', 'kdv_rate', 'kdv_amount'
+            'waiter_picked_up_at', 'kds_preparing_at', 'kds_ready_at', 'kdv_rate', 'kdv_amount'
         ]
         read_only_fields = [
             'order', 'menu_item', 'variant', 'extras', 'price', 'delivered',
             'is_awaiting_staff_approval', 'kds_status', 'kds_status_display',
             'item_prepared_by_staff', 'item_prepared_by_staff_username',
-            'waiter_picked_up_at', 'kdv_rate', 'kdv_amount'
+            'waiter_picked_up_at', 'kds_preparing_at', 'kds_ready_at', 'kdv_rate', 'kdv_amount'
         ]
 
 class OrderTableUserSerializer(serializers.ModelSerializer):
@@ -156,6 +239,80 @@ class OrderTableUserSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+def bulk_create_order_items(order, order_items_data_list, is_awaiting_staff_approval):
+    """
+    Doğrulanmış kalem verilerinden sipariş kalemlerini ve ekstralarını bellekte oluşturur ve
+    bulk_create ile iki INSERT'te yazar. Ürün ve varyantlar liste doğrulamasında
+    (resolve_order_items_data) toplu yüklenmiştir; fiyat ve KDV bu fiyatlardan Python'da
+    hesaplanır, sorgu sayısı kalem ve ekstra sayısından bağımsızdır.
+    Dönüş: (KDV hariç toplam, toplam KDV)
+    """
+    today = timezone.now().date()
+
+    total_price_before_kdv = Decimal('0.00')
+    total_kdv_amount = Decimal('0.00')
+    order_items = []
+    extras_per_item = []
+    for item_data_dict in order_items_data_list:
+        menu_item_instance = item_data_dict.get('menu_item_instance')
+        if not menu_item_instance:
+            logger.error(f"Order {order.id}: menu_item_instance missing in item_data_dict during OrderSerializer.create.")
+            raise ValidationError({"order_items_data": "Her sipariş kalemi için geçerli bir ürün (menu_item_instance) sağlanmalıdır."})
+        variant_instance = item_data_dict.get('variant_instance')
+        quantity = item_data_dict.get('quantity', 1)
+        kdv_rate = menu_item_instance.kdv_rate
+
+        valid_extras = [
+            (extra_detail['variant_instance'], extra_detail.get('quantity', 1))
+            for extra_detail in item_data_dict.get('valid_extras_instances', [])
+            if isinstance(extra_detail.get('variant_instance'), MenuItemVariant)
+        ]
+
+        if menu_item_instance.is_campaign_bundle:
+            campaign_error = _campaign_error(menu_item_instance, today)
+            if campaign_error:
+                raise ValidationError(campaign_error)
+            item_price_per_unit_before_kdv = menu_item_instance.represented_campaign.campaign_price
+            valid_extras = []
+        else:
+            main_price = variant_instance.price if variant_instance else Decimal('0.00')
+            extras_total_price = sum(
+                extra_variant.price * Decimal(str(extra_quantity)) for extra_variant, extra_quantity in valid_extras
+            )
+            item_price_per_unit_before_kdv = main_price + extras_total_price
+
+        line_total_before_kdv = item_price_per_unit_before_kdv * quantity
+        total_price_before_kdv += line_total_before_kdv
+        line_kdv_amount = line_total_before_kdv * (kdv_rate / Decimal('100'))
+        total_kdv_amount += line_kdv_amount
+
+        kds_status_for_this_item = None
+        if menu_item_instance.category and menu_item_instance.category.assigned_kds:
+            kds_status_for_this_item = OrderItem.KDS_ITEM_STATUS_PENDING
+
+        order_items.append(OrderItem(
+            order=order,
+            menu_item=menu_item_instance,
+            variant=variant_instance,
+            quantity=quantity,
+            table_user=item_data_dict.get('table_user'),
+            price=item_price_per_unit_before_kdv,
+            is_awaiting_staff_approval=is_awaiting_staff_approval,
+            kds_status=kds_status_for_this_item,
+            kdv_rate=kdv_rate,
+            kdv_amount=line_kdv_amount
+        ))
+        extras_per_item.append(valid_extras)
+
+    OrderItem.objects.bulk_create(order_items)
+    OrderItemExtra.objects.bulk_create([
+        OrderItemExtra(order_item=order_item, variant=extra_variant, quantity=extra_quantity)
+        for order_item, valid_extras in zip(order_items, extras_per_item)
+        for extra_variant, extra_quantity in valid_extras
+    ])
+    return total_price_before_kdv, total_kdv_amount
+
+
 class OrderSerializer(serializers.ModelSerializer):
     order_items = OrderItemSerializer(many=True, read_only=True)
     order_items_data = GuestOrderItemSerializer(many=True, write_only=True, required=False)
@@ -176,6 +333,7 @@ class OrderSerializer(serializers.ModelSerializer):
         allow_empty=True
     )
     table = serializers.PrimaryKeyRelatedField(queryset=Table.objects.all(), required=False, allow_null=True)
+    table_number = serializers.IntegerField(source='table.table_number', read_only=True, allow_null=True)
     customer = serializers.PrimaryKeyRelatedField(queryset=User.objects.filter(user_type='customer'), required=False, allow_null=True)
 
     taken_by_staff_username = serializers.CharField(source='taken_by_staff.username', read_only=True, allow_null=True)
@@ -203,7 +361,7 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = [
-            'id', 'uuid', 'customer', 'business', 'table', 'order_type', 'customer_name',
+            'id', 'uuid', 'customer', 'business', 'table', 'table_number', 'order_type', 'customer_name',
             'customer_phone', 'created_at', 
             'approved_at',
             'kitchen_completed_at',
@@ -221,7 +379,7 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'uuid', 'created_at', 'approved_at', 'kitchen_completed_at', 'picked_up_by_waiter_at', 'delivered_at',
             'status_display', 'taken_by_staff_username', 'prepared_by_kitchen_staff_username',
-            'order_items', 'table_users', 'payment', 'credit_details',
+            'table_number', 'order_items', 'table_users', 'payment', 'credit_details',
             'total_kdv_amount', 'grand_total',
             'assigned_pager_info',
         ]
@@ -267,86 +425,20 @@ class OrderSerializer(serializers.ModelSerializer):
 
         order = Order.objects.create(**validated_data)
 
-        default_kds_status_for_new_item = OrderItem.KDS_ITEM_STATUS_PENDING
-
-        total_price_before_kdv = Decimal('0.00')
-        total_kdv_amount = Decimal('0.00')
-
-        for item_data_dict in order_items_data_list:
-            menu_item_instance = item_data_dict.get('menu_item_instance')
-            variant_instance = item_data_dict.get('variant_instance')
-            quantity = item_data_dict.get('quantity', 1)
-            table_user_name_from_item_data = item_data_dict.get('table_user')
-            valid_extras_instances_data = item_data_dict.get('valid_extras_instances', [])
-
-            if not menu_item_instance:
-                logger.error(f"Order {order.id}: menu_item_instance missing in item_data_dict during OrderSerializer.create.")
-                raise ValidationError({"order_items_data": "Her sipariş kalemi için geçerli bir ürün (menu_item_instance) sağlanmalıdır."})
-
-            item_price_per_unit_before_kdv = Decimal('0.00')
-            kdv_rate = menu_item_instance.kdv_rate
-
-            if menu_item_instance.is_campaign_bundle:
-                try:
-                    campaign = menu_item_instance.represented_campaign
-                    if campaign and campaign.is_active:
-                        now_date = timezone.now().date()
-                        if (campaign.start_date and campaign.start_date > now_date) or \
-                           (campaign.end_date and campaign.end_date < now_date):
-                            raise ValidationError(f"'{campaign.name}' kampanyası şu an geçerli değil.")
-                        item_price_per_unit_before_kdv = campaign.campaign_price
-                    else:
-                        raise ValidationError(f"Kampanya '{menu_item_instance.name}' aktif değil veya bulunamadı.")
-                except (CampaignMenu.DoesNotExist, AttributeError):
-                    raise ValidationError(f"Kampanya '{menu_item_instance.name}' için kampanya detayı düzgün tanımlanmamış/bulunamadı.")
-            else:
-                main_price = variant_instance.price if variant_instance else Decimal('0.00')
-                extras_total_price = sum(
-                    extra_detail['variant_instance'].price * Decimal(str(extra_detail.get('quantity', 1)))
-                    for extra_detail in valid_extras_instances_data if isinstance(extra_detail.get('variant_instance'), MenuItemVariant)
-                )
-                item_price_per_unit_before_kdv = main_price + extras_total_price
-            
-            line_total_before_kdv = item_price_per_unit_before_kdv * quantity
-            total_price_before_kdv += line_total_before_kdv
-
-            line_kdv_amount = line_total_before_kdv * (kdv_rate / Decimal('100'))
-            total_kdv_amount += line_kdv_amount
-
-            kds_status_for_this_item = None
-            if menu_item_instance.category and menu_item_instance.category.assigned_kds:
-                kds_status_for_this_item = default_kds_status_for_new_item
-
-            order_item = OrderItem.objects.create(
-                order=order,
-                menu_item=menu_item_instance,
-                variant=variant_instance, 
-                quantity=quantity,
-                table_user=table_user_name_from_item_data,
-                price=item_price_per_unit_before_kdv,
-                is_awaiting_staff_approval= is_awaiting_approval_flag_for_items,
-                kds_status=kds_status_for_this_item,
-                kdv_rate=kdv_rate,
-                kdv_amount=line_kdv_amount
-            )
+        total_price_before_kdv, total_kdv_amount = bulk_create_order_items(
+            order, order_items_data_list, is_awaiting_approval_flag_for_items
+        )
 
-            if not menu_item_instance.is_campaign_bundle:
-                for extra_detail in valid_extras_instances_data:
-                    if isinstance(extra_detail.get('variant_instance'), MenuItemVariant):
-                        OrderItemExtra.objects.create(
-                            order_item=order_item,
-                            variant=extra_detail['variant_instance'],
-                            quantity=extra_detail.get('quantity', 1)
-                        )
-        
         order.total_kdv_amount = total_kdv_amount
         order.grand_total = total_price_before_kdv + total_kdv_amount
+        # Toplu eklemeler sinyal üretmez; bu kayıt KDS fişlerinin yeniden oluşturulmasını planlar.
         order.save(update_fields=['total_kdv_amount', 'grand_total'])
         
         if validated_data.get('is_split_table'):
-            for user_name in table_users_name_list:
-                if user_name.strip():
-                    OrderTableUser.objects.create(order=order, name=user_name.strip())
+            OrderTableUser.objects.bulk_create([
+                OrderTableUser(order=order, name=user_name.strip())
+                for user_name in table_users_name_list if user_name.strip()
+            ])
         
         if pager_ble_device_id_to_assign_on_create:
             try:
@@ -466,7 +558,11 @@ class KDSOrderItemSerializer(serializers.ModelSerializer):
     def get_extras_display(self, obj: OrderItem):
         if obj.menu_item.is_campaign_bundle:
             return ""
-        extras_qs = obj.extras.select_related('variant').all()
+        # 'extras__variant' önceden yüklendiyse ek sorgu yapılmaz.
+        if 'extras' in getattr(obj, '_prefetched_objects_cache', {}):
+            extras_qs = obj.extras.all()
+        else:
+            extras_qs = obj.extras.select_related('variant').all()
         if not extras_qs:
             return ""
         return ", ".join([f"{extra.variant.name} (x{extra.quantity})" for extra in extras_qs])
@@ -525,7 +621,20 @@ class KDSOrderSerializer(serializers.ModelSerializer):
         
         return int((timezone.now() - obj.created_at).total_seconds() / 60)
 
+    def _get_kds_ticket(self, obj: Order):
+        """Hedef KDS ekranı için önceden hesaplanmış fişi döner; yoksa None (canlı hesaplamaya düşülür)."""
+        target_kds_screen = self.context.get('target_kds_screen')
+        if not target_kds_screen:
+            return None
+        if not hasattr(obj, '_kds_ticket_cache'):
+            obj._kds_ticket_cache = KDSTicket.objects.filter(order=obj, kds_screen=target_kds_screen).first()
+        return obj._kds_ticket_cache
+
     def get_filtered_kds_order_items(self, obj: Order):
+        ticket = self._get_kds_ticket(obj)
+        if ticket is not None:
+            return ticket.items
+
         target_kds_screen = self.context.get('target_kds_screen')
         
         if not target_kds_screen:
@@ -559,6 +668,10 @@ class KDSOrderSerializer(serializers.ModelSerializer):
         return KDSOrderItemSerializer(relevant_items_qs, many=True, context=self.context).data
 
     def get_kds_screen_specific_status_display(self, obj: Order) -> str:
+        ticket = self._get_kds_ticket(obj)
+        if ticket is not None:
+            return ticket.screen_status_display
+
         target_kds_screen = self.context.get('target_kds_screen')
         if not target_kds_screen:
             return obj.get_status_display()
@@ -590,4 +703,50 @@ class KDSOrderSerializer(serializers.ModelSerializer):
             return f"{target_kds_screen.name}: Beklemede" 
 
         logger.warning(f"KDSOrderSerializer: Order {obj.id} için kds_screen_specific_status_display mantığında beklenmedik durum. KDS: {target_kds_screen.name}. Genel durum kullanılıyor.")
-        return obj.get_status_display()
\ No newline at end of file
+        return obj.get_status_display()
+
+
+class KDSTicketSerializer(serializers.ModelSerializer):
+    """KDS listesi için KDSTicket projeksiyonunu KDSOrderSerializer ile aynı biçimde sunar."""
+    id = serializers.IntegerField(source='order_id', read_only=True)
+    table_number = serializers.CharField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(source='order_created_at', read_only=True)
+    status = serializers.CharField(source='order_status', read_only=True)
+    status_display = serializers.SerializerMethodField()
+    kds_screen_specific_status_display = serializers.CharField(source='screen_status_display', read_only=True)
+    order_items = serializers.JSONField(source='items', read_only=True)
+    elapsed_time_since_creation_minutes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = KDSTicket
+        fields = [
+            'id',
+            'display_name',
+            'order_type',
+            'table_number',
+            'customer_name',
+            'created_at',
+            'status',
+            'status_display',
+            'kds_screen_specific_status_display',
+            'order_items',
+            'elapsed_time_since_creation_minutes',
+            'taken_by_staff_username',
+            'prepared_by_kitchen_staff_username',
+            'kitchen_completed_at',
+            'delivered_at',
+            'assigned_pager_device_id',
+            'assigned_pager_name',
+        ]
+
+    def get_status_display(self, obj: KDSTicket) -> str:
+        return dict(Order.ORDER_STATUS_CHOICES).get(obj.order_status, obj.order_status)
+
+    def get_elapsed_time_since_creation_minutes(self, obj: KDSTicket) -> int:
+        if obj.kitchen_completed_at:
+            return int((obj.kitchen_completed_at - obj.order_created_at).total_seconds() / 60)
+
+        if obj.order_status in [Order.STATUS_COMPLETED, Order.STATUS_CANCELLED, Order.STATUS_REJECTED]:
+            return 0
+
+        return int((timezone.now() - obj.order_created_at).total_seconds() / 60)
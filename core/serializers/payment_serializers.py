@@ -1,7 +1,9 @@
 # core/serializers/payment_serializers.py
 
+from decimal import Decimal
+
 from rest_framework import serializers
-from ..models import Payment, CreditPaymentDetails, Order
+from ..models import Payment, CreditPaymentDetails, Order, CustomerAccount, CustomerLedgerEntry
 
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,8 +27,44 @@ class CreditPaymentDetailsSerializer(serializers.ModelSerializer):
             # 'order_display', # Eğer StringRelatedField kullanırsanız
             'notes', 
             'created_at', 
-            'paid_at'
+            'paid_at',
+            'account',
+            'settled_amount',
         ]
         # 'order' alanı genellikle oluşturma sırasında set edilir veya read_only olabilir.
         # Modelde OneToOneField olduğu için, Order oluşturulduktan sonra CreditPaymentDetails oluşturulur.
-        read_only_fields = ['created_at', 'paid_at', 'order']
\ No newline at end of file
+        read_only_fields = ['created_at', 'paid_at', 'order', 'account', 'settled_amount']
+
+
+class CustomerAccountSerializer(serializers.ModelSerializer):
+    """Veresiye müşterisinin cari hesabı ve güncel borcu."""
+
+    class Meta:
+        model = CustomerAccount
+        fields = ['id', 'name', 'phone', 'balance', 'needs_linking', 'last_activity_at', 'created_at']
+        read_only_fields = fields
+
+
+class CustomerLedgerEntrySerializer(serializers.ModelSerializer):
+    entry_type_display = serializers.CharField(source='get_entry_type_display', read_only=True)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, allow_null=True)
+
+    class Meta:
+        model = CustomerLedgerEntry
+        fields = [
+            'id', 'entry_type', 'entry_type_display', 'amount', 'balance_after', 'order',
+            'payment_type', 'note', 'created_by_username', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class CustomerAccountPaymentSerializer(serializers.Serializer):
+    """Cari hesaba (kısmi) tahsilat girişi."""
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    payment_type = serializers.ChoiceField(choices=Payment.PAYMENT_CHOICES)
+    note = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class CustomerAccountLinkSerializer(serializers.Serializer):
+    """Eşleştirme bekleyen hesabın bağlanacağı müşteri hesabı."""
+    target_account = serializers.IntegerField()
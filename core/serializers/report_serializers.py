@@ -1,6 +1,9 @@
 # core/serializers/report_serializers.py
 
 from rest_framework import serializers
+from django.urls import reverse
+
+from ..models import ReportExportJob, ReportJob, DailyClose
 
 class StaffPerformanceSerializer(serializers.Serializer):
     staff_id = serializers.IntegerField()
@@ -10,6 +13,7 @@ class StaffPerformanceSerializer(serializers.Serializer):
     order_count = serializers.IntegerField()
     total_turnover = serializers.DecimalField(max_digits=12, decimal_places=2)
     prepared_item_count = serializers.IntegerField(default=0)
+    avg_prep_seconds = serializers.IntegerField(required=False, allow_null=True)
     staff_permissions = serializers.ListField(child=serializers.CharField(), default=list)
     accessible_kds_names = serializers.ListField(child=serializers.CharField(), required=False, default=list)
     profile_image_url = serializers.URLField(required=False, allow_null=True)
@@ -33,4 +37,70 @@ class DetailedSaleItemSerializer(serializers.Serializer):
     unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
     line_total = serializers.DecimalField(max_digits=10, decimal_places=2)
 
-# ==================== YENİ EKLENEN BÖLÜM SONU ====================
\ No newline at end of file
+# ==================== YENİ EKLENEN BÖLÜM SONU ====================
+
+
+class ReportExportJobSerializer(serializers.ModelSerializer):
+    """Arka plan dışa aktarım işinin durumu; tamamlandıysa indirme bağlantısını içerir."""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportExportJob
+        fields = [
+            'id', 'report_type', 'export_format', 'params', 'status', 'status_display',
+            'row_count', 'error', 'created_at', 'completed_at', 'status_url', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def _absolute(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_status_url(self, obj):
+        return self._absolute(reverse('core:report_export_status', kwargs={'pk': obj.id}))
+
+    def get_download_url(self, obj):
+        if obj.status != ReportExportJob.STATUS_COMPLETED or not obj.file:
+            return None
+        return self._absolute(reverse('core:report_export_download', kwargs={'pk': obj.id}))
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Arka plan rapor işinin durumu; tamamlandıysa rapor sonucunu içerir."""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_url = serializers.SerializerMethodField()
+    result = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'report_type', 'params', 'data_version', 'status', 'status_display',
+            'error', 'created_at', 'completed_at', 'status_url', 'result'
+        ]
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        url = reverse('core:report_job_status', kwargs={'pk': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_result(self, obj):
+        return obj.result if obj.status == ReportJob.STATUS_COMPLETED else None
+
+
+class DailyCloseSerializer(serializers.ModelSerializer):
+    """Gün sonu (Z) raporu; kayıtlar değiştirilemez olduğu için tüm alanlar salt okunurdur."""
+    closed_by_username = serializers.CharField(source='closed_by.username', read_only=True, allow_null=True)
+
+    class Meta:
+        model = DailyClose
+        fields = [
+            'id', 'business_date', 'period_start', 'period_end', 'closed_at', 'closed_by', 'closed_by_username',
+            'gross_sales', 'payment_count', 'net_sales', 'vat_total', 'void_count', 'void_amount',
+            'transfer_count', 'credit_sales_count', 'credit_sales_amount',
+            'credit_collected_count', 'credit_collected_amount',
+            'payment_breakdown', 'vat_breakdown', 'staff_takings',
+        ]
+        read_only_fields = fields
@@ -4,4 +4,11 @@ from .order_signals import *
 from .payment_signals import *
 from .pager_signals import *
 from .business_signals import *
-from .procurement_signals import * # Alım yönetimi sinyalleri eklendi
\ No newline at end of file
+from .procurement_signals import * # Alım yönetimi sinyalleri eklendi
+from .socket_auth_signals import *
+from .kds_ticket_signals import *
+from .cache_signals import *
+from .menu_cache_signals import *
+from .sales_rollup_signals import *
+from .kds_item_signals import *
+from .customer_identity_signals import *
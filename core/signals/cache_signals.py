@@ -0,0 +1,31 @@
+# core/signals/cache_signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import logging
+
+from ..models import NotificationSetting, Payment
+from ..utils.notification_gate import invalidate_notification_settings
+from ..utils.report_jobs import bump_report_data_version
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=NotificationSetting)
+def invalidate_notification_setting_cache(sender, instance, **kwargs):
+    """
+    Bir bildirim ayarı değiştiğinde önbellek sürümü commit sonrasında artırılır;
+    paylaşılan önbellek sayesinde tüm web ve Celery süreçleri yeni değeri hemen okur.
+    """
+    transaction.on_commit(invalidate_notification_settings)
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_report_results_on_payment(sender, instance, **kwargs):
+    """
+    Ödeme eklendiğinde, değiştiğinde veya silindiğinde işletmenin rapor verisi sürümü
+    commit sonrasında artırılır; saklanan rapor sonuçları bir sonraki istekte yeniden üretilir.
+    """
+    business_id = instance.order.business_id
+    transaction.on_commit(lambda: bump_report_data_version(business_id))
@@ -0,0 +1,51 @@
+# core/signals/customer_identity_signals.py
+
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+import logging
+
+from ..models import Payment, Reservation, WaitingCustomer
+from ..utils.customer_cohorts import (
+    record_customer_touch, SOURCE_ORDER, SOURCE_RESERVATION, SOURCE_WAITLIST
+)
+
+logger = logging.getLogger(__name__)
+
+# Telefonu bilinen müşteri temasları (ödenen paket sipariş, oturan rezervasyon, bekleme
+# listesi kaydı) müşteri kimliği ve haftalık kohort tablolarına artımlı olarak işlenir.
+
+
+@receiver(post_save, sender=Payment)
+def record_takeaway_customer_touch(sender, instance, created, **kwargs):
+    if not created:
+        return
+    order = instance.order
+    if order.order_type != 'takeaway' or not order.customer_phone:
+        return
+    record_customer_touch(
+        order.business_id, order.customer_phone, order.customer_name,
+        instance.payment_date, SOURCE_ORDER, spend=instance.amount
+    )
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_reservation_status(sender, instance, **kwargs):
+    instance._previous_status = None
+    if instance.pk:
+        instance._previous_status = Reservation.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Reservation)
+def record_reservation_customer_touch(sender, instance, created, **kwargs):
+    if instance.status != Reservation.Status.SEATED or getattr(instance, '_previous_status', None) == Reservation.Status.SEATED:
+        return
+    record_customer_touch(
+        instance.business_id, instance.customer_phone, instance.customer_name,
+        instance.reservation_time, SOURCE_RESERVATION
+    )
+
+
+@receiver(post_save, sender=WaitingCustomer)
+def record_waitlist_customer_touch(sender, instance, created, **kwargs):
+    if created and instance.phone:
+        record_customer_touch(instance.business_id, instance.phone, instance.name, instance.created_at, SOURCE_WAITLIST)
@@ -0,0 +1,41 @@
+# core/signals/kds_item_signals.py
+
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+import logging
+
+from ..models import OrderItem
+from ..utils.staff_metrics import record_items_prepared, PREPARED_KDS_STATUSES
+from ..utils.kds_latency import record_prep_latencies, record_pickup_latencies
+
+logger = logging.getLogger(__name__)
+
+# Kalemlerin KDS durum geçişleri personel özetlerine ve gecikme histogramına işlenir.
+# KDS'teki toplu .update() yolları (mark_ready_for_pickup) sinyal üretmez; bu yollar
+# aynı yardımcıları açıkça çağırır.
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_previous_kds_status(sender, instance, update_fields=None, **kwargs):
+    instance._previous_kds_status = None
+    if not instance.pk or (update_fields is not None and 'kds_status' not in update_fields):
+        return
+    instance._previous_kds_status = OrderItem.objects.filter(pk=instance.pk).values_list(
+        'kds_status', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=OrderItem)
+def record_kds_item_transition(sender, instance, created, **kwargs):
+    previous_status = getattr(instance, '_previous_kds_status', None)
+    if created or previous_status is None or previous_status == instance.kds_status:
+        return
+
+    if instance.kds_status == OrderItem.KDS_ITEM_STATUS_READY and previous_status not in PREPARED_KDS_STATUSES:
+        ready_at = instance.kds_ready_at or timezone.now()
+        record_items_prepared(instance.order, [instance], instance.item_prepared_by_staff_id, ready_at=ready_at)
+        record_prep_latencies(instance.order, [instance], ready_at)
+        logger.info(f"[KDS Metrics] Kalem #{instance.id} hazırlama süresi personel #{instance.item_prepared_by_staff_id} özetine işlendi.")
+    elif instance.kds_status == OrderItem.KDS_ITEM_STATUS_PICKED_UP:
+        record_pickup_latencies(instance.order, [instance], instance.waiter_picked_up_at or timezone.now())
@@ -0,0 +1,35 @@
+# core/signals/kds_ticket_signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import Order, OrderItem, OrderItemExtra, CreditPaymentDetails
+from ..utils.kds_tickets import schedule_kds_ticket_rebuild
+
+# Toplu .update() çağrıları sinyal üretmez; bu yollar KDS fişlerini açıkça yeniden oluşturur
+# veya aynı işlemde siparişi de kaydeder.
+
+
+@receiver(post_save, sender=Order)
+def refresh_kds_tickets_on_order_save(sender, instance: Order, **kwargs):
+    schedule_kds_ticket_rebuild(instance.id)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def refresh_kds_tickets_on_order_item_change(sender, instance: OrderItem, **kwargs):
+    schedule_kds_ticket_rebuild(instance.order_id)
+
+
+@receiver([post_save, post_delete], sender=OrderItemExtra)
+def refresh_kds_tickets_on_order_item_extra_change(sender, instance: OrderItemExtra, **kwargs):
+    try:
+        order_id = instance.order_item.order_id
+    except OrderItem.DoesNotExist:
+        # Kalem ile birlikte silinen ekstralar; kalemin kendi sinyali fişi günceller.
+        return
+    schedule_kds_ticket_rebuild(order_id)
+
+
+@receiver([post_save, post_delete], sender=CreditPaymentDetails)
+def refresh_kds_tickets_on_credit_change(sender, instance: CreditPaymentDetails, **kwargs):
+    schedule_kds_ticket_rebuild(instance.order_id)
@@ -0,0 +1,43 @@
+# core/signals/menu_cache_signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import logging
+
+from ..models import Business, KDSScreen, Category, MenuItem, MenuItemVariant, CampaignMenu
+from ..utils.menu_snapshot import invalidate_menu_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Misafir menüsü anlık görüntüsünde yer alan her model değiştiğinde işletmenin menü
+# sürümü commit sonrasında artırılır.
+
+
+def _schedule_menu_invalidation(business_id):
+    if business_id:
+        transaction.on_commit(lambda: invalidate_menu_snapshot(business_id))
+
+
+@receiver(post_save, sender=Business)
+def invalidate_menu_on_business_change(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_menu_invalidation(instance.id)
+
+
+@receiver([post_save, post_delete], sender=KDSScreen)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=CampaignMenu)
+def invalidate_menu_on_catalog_change(sender, instance, **kwargs):
+    _schedule_menu_invalidation(instance.business_id)
+
+
+@receiver([post_save, post_delete], sender=MenuItemVariant)
+def invalidate_menu_on_variant_change(sender, instance, **kwargs):
+    try:
+        business_id = instance.menu_item.business_id
+    except MenuItem.DoesNotExist:
+        # Ana ürünle birlikte silinen varyantlar; ürünün kendi sinyali menüyü geçersiz kılar.
+        return
+    _schedule_menu_invalidation(business_id)
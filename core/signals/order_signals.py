@@ -10,6 +10,8 @@ from ..models import (
     Order, OrderItem, Pager, NOTIFICATION_EVENT_TYPES,
 )
 from ..tasks import send_order_update_task
+from ..utils.order_update_coalescer import queue_order_update
+from ..utils.order_revisions import discard_order_revision
 
 logger = logging.getLogger(__name__)
 
@@ -75,12 +77,14 @@ def send_order_update_notification(order, created: bool = False, update_fields=N
     }
     
     # Artık 'message' alanı gönderilmiyor! Flutter localize edecek.
-    send_order_update_task.delay(
-        order_id=order.id, 
-        event_type=event_type, 
-        extra_data=extra_data
+    # Aynı sipariş için kısa aralıklarla gelen olaylar tek bir yayında birleştirilir.
+    queue_order_update(
+        order_id=order.id,
+        event_type=event_type,
+        extra_data=extra_data,
+        item_added_info=item_added_info
     )
-    logger.info(f"Celery task for order #{order.id} (Event: {event_type}) has been queued with structured data.")
+    logger.info(f"Order update for order #{order.id} (Event: {event_type}) has been queued for coalesced delivery.")
 
 
 @receiver(pre_delete, sender=Order)
@@ -97,6 +101,10 @@ def handle_order_deletion_notification(sender, instance: Order, **kwargs):
         }
     )
 
+@receiver(pre_delete, sender=Order)
+def remove_deleted_order_from_kds_feed(sender, instance: Order, **kwargs):
+    discard_order_revision(instance.id)
+
 @receiver(pre_delete, sender=Order)
 def handle_order_pre_delete_for_pager(sender, instance: Order, **kwargs):
     try:
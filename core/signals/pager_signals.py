@@ -2,38 +2,20 @@
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.db import transaction
-from asgiref.sync import async_to_sync
 import logging
 
 # Proje içi importlar
 from ..models import Pager
-# === DEĞİŞİKLİK BURADA: Import yolunu yeni util dosyasından alıyoruz ===
-from ..utils.json_helpers import convert_decimals_to_strings
+from ..utils.outbox import enqueue_business_notification
 
 logger = logging.getLogger(__name__)
 
-def send_pager_status_update_notification_on_commit(pager_id):
-    try:
-        pager_instance = Pager.objects.select_related('business', 'current_order').get(id=pager_id)
-    except Pager.DoesNotExist:
-        logger.error(f"SİNYAL (Pager on_commit): ID'si {pager_id} olan pager bulunamadı.")
-        return
-
+def send_pager_status_update_notification(pager_instance: Pager):
+    """Pager durum olayını çağıranın işlemi içinde giden kutusuna yazar; işlem geri alınırsa olay da yayınlanmaz."""
     if not pager_instance.business_id:
-        logger.error(f"SİNYAL (Pager on_commit): Pager {pager_instance.id} için işletme bilgisi yok. Bildirim gönderilmedi.")
-        return
-    
-    try:
-        from makarna_project.asgi import sio
-        if sio is None:
-            logger.error("SİNYAL (Pager on_commit): makarna_project.asgi.sio instance'ı None! Bildirim gönderilemedi.")
-            return
-    except ImportError:
-        logger.error("SİNYAL (Pager on_commit): makarna_project.asgi.sio import edilemedi! Bildirim gönderilemedi.")
+        logger.error(f"SİNYAL (Pager Outbox): Pager {pager_instance.id} için işletme bilgisi yok. Bildirim gönderilmedi.")
         return
-    
-    business_room_name = f'business_{pager_instance.business_id}'
+
     payload = {
         'event_type': 'pager_status_updated',
         'pager_id': pager_instance.id,
@@ -44,10 +26,9 @@ def send_pager_status_update_notification_on_commit(pager_id):
         'current_order_id': pager_instance.current_order_id,
         'message': f"Çağrı cihazı '{pager_instance.name or pager_instance.device_id}' durumu güncellendi: {pager_instance.get_status_display()}"
     }
-    cleaned_payload = convert_decimals_to_strings(payload)
-    
-    logger.info(f"SİNYAL (Socket.IO Emit - Pager): Oda: {business_room_name}, Event: 'pager_event', Pager ID: {pager_instance.id}, Yeni Durum: {pager_instance.status}")
-    async_to_sync(sio.emit)('pager_event', cleaned_payload, room=business_room_name)
+
+    logger.info(f"SİNYAL (Outbox - Pager): İşletme: {pager_instance.business_id}, Event: 'pager_event', Pager ID: {pager_instance.id}, Yeni Durum: {pager_instance.status}")
+    enqueue_business_notification(pager_instance.business_id, 'pager_event', payload)
 
 
 @receiver(post_save, sender=Pager)
@@ -61,4 +42,4 @@ def pager_status_change_receiver(sender, instance: Pager, created: bool, update_
         logger.info(f"SİNYAL (Pager Updated): Pager #{instance.id} durumu/ataması/adı güncellendi. Alanlar: {update_fields}")
     
     if send_notification:
-        transaction.on_commit(lambda: send_pager_status_update_notification_on_commit(instance.id))
\ No newline at end of file
+        send_pager_status_update_notification(instance)
\ No newline at end of file
@@ -3,13 +3,15 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.db import transaction
-from django.db.models import F
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
 import logging
 from decimal import Decimal
 
 # --- GÜNCELLEME: Stock ve StockMovement modelleri artık import edilmiyor ---
 from ..models import (
-    Payment, Ingredient, IngredientStockMovement, MenuItemVariant
+    Payment, Ingredient, IngredientStockMovement, MenuItemVariant, OrderItem
 )
 
 logger = logging.getLogger(__name__)
@@ -21,95 +23,147 @@ logger = logging.getLogger(__name__)
 # --- /SİLİNDİ ---
 
 
-def deduct_ingredients_for_variant(variant: MenuItemVariant, quantity_sold: int, order_item_instance):
-    """Bir varyant satıldığında reçetesindeki malzemeleri stoktan düşer."""
-    logger.info(f"Reçete işleme başlıyor: Varyant='{variant.name}' (ID: {variant.id}), Satılan Miktar={quantity_sold}")
-    
-    if not hasattr(variant, 'recipe_items'):
-        logger.warning(f"Varyant '{variant.name}' (ID: {variant.id}) için reçete öğeleri bulunamadı. Malzeme düşümü atlanıyor.")
-        return
+def _collect_sold_variants(order_items):
+    """
+    Siparişteki her kalem için satılan varyantları ve miktarlarını döner:
+    [(order_item, variant, satılan_miktar)]. Kampanya paketleri içerdikleri varyantlara,
+    ekstralar da kendi varyantlarına açılır.
+    """
+    sold_variants = []
+    for order_item in order_items:
+        menu_item = order_item.menu_item
+
+        # Durum 1: Satılan ürün bir kampanya paketi ise
+        campaign = getattr(menu_item, 'represented_campaign', None) if menu_item.is_campaign_bundle else None
+        if campaign is not None:
+            for campaign_item in campaign.campaign_items.all():
+                if campaign_item.variant:
+                    sold_variants.append((order_item, campaign_item.variant, order_item.quantity * campaign_item.quantity))
+
+        # Durum 2: Satılan ürün normal bir ürün ise (varyantı olan)
+        elif order_item.variant:
+            sold_variants.append((order_item, order_item.variant, order_item.quantity))
+        else:
+            logger.warning(f"Sipariş kalemi '{menu_item.name}' için varyant bulunamadı.")
+
+        # Durum 3: Satılan ürünün ekstraları varsa, onların da stoğu düşülür
+        for extra in order_item.extras.all():
+            sold_variants.append((order_item, extra.variant, order_item.quantity * extra.quantity))
+    return sold_variants
+
+
+def aggregate_ingredient_deductions(order_items):
+    """
+    Tüm siparişin reçetelerini tek geçişte toplar.
+    Dönüş: ({malzeme_id: toplam_miktar}, [(malzeme_id, order_item, miktar)], {order_item_id: maliyet})
+    İkinci liste, her sipariş kalemi için ayrı stok hareketi yazılabilmesini sağlar. Üçüncü
+    sözlük, alış fiyatı bilinen malzemelerden (stok takibi yapılmasa da) kalem maliyetini verir.
+    """
+    totals = {}
+    lines = {}
+    costs = {}
+    for order_item, variant, quantity_sold in _collect_sold_variants(order_items):
+        for recipe_item in variant.recipe_items.all():
+            quantity_to_deduct = recipe_item.quantity * Decimal(str(quantity_sold))
+            if recipe_item.ingredient.cost_price is not None:
+                costs[order_item.id] = costs.get(order_item.id, Decimal('0.000')) + quantity_to_deduct * recipe_item.ingredient.cost_price
+            if not recipe_item.ingredient.track_stock:
+                continue
+            totals[recipe_item.ingredient_id] = totals.get(recipe_item.ingredient_id, Decimal('0.000')) + quantity_to_deduct
+            line_key = (recipe_item.ingredient_id, order_item.id)
+            if line_key in lines:
+                lines[line_key][2] += quantity_to_deduct
+            else:
+                lines[line_key] = [recipe_item.ingredient_id, order_item, quantity_to_deduct]
+    return totals, [tuple(line) for line in lines.values()], costs
 
-    try:
-        recipe_items = variant.recipe_items.select_related('ingredient', 'ingredient__unit').all()
-        recipe_count = recipe_items.count()
-        logger.info(f"Varyant '{variant.name}' için {recipe_count} adet reçete öğesi bulundu.")
-        
-        if recipe_count == 0:
-            logger.warning(f"Varyant '{variant.name}' (ID: {variant.id}) için hiç reçete öğesi yok. Malzeme düşümü atlanıyor.")
-            return
-    except Exception as e:
-        logger.error(f"Reçete öğeleri alınırken hata: {e}", exc_info=True)
-        return
 
-    for recipe_item in recipe_items:
-        ingredient = recipe_item.ingredient
-        quantity_to_deduct = recipe_item.quantity * Decimal(str(quantity_sold))
+def snapshot_recipe_costs(order_items, costs):
+    """
+    Kalemlerin reçete maliyetini ödeme anındaki alış fiyatlarıyla sabitler; sonraki fiyat
+    değişiklikleri geçmiş satışların kârlılığını değiştirmez. Tek bir toplu UPDATE yapılır.
+    """
+    costed_items = []
+    for order_item in order_items:
+        if order_item.id in costs:
+            order_item.recipe_cost = costs[order_item.id].quantize(Decimal('0.001'))
+            costed_items.append(order_item)
+    if costed_items:
+        OrderItem.objects.bulk_update(costed_items, ['recipe_cost'])
+    return len(costed_items)
 
-        logger.info(f"İşlenen malzeme: '{ingredient.name}' (ID: {ingredient.id}), Reçetedeki miktar: {recipe_item.quantity}, Düşülecek toplam: {quantity_to_deduct}")
 
-        # Sadece stok takibi aktifse envanterden düş
-        if not ingredient.track_stock:
-            logger.info(f"Envanter Düşümü Atlandı (Takip Dışı): '{ingredient.name}'")
-            continue
+def apply_ingredient_deductions(order, totals, lines):
+    """
+    Etkilenen malzemeleri tek ve sıralı bir select_for_update ile kilitler, her malzeme için
+    tek bir F-ifadeli UPDATE uygular ve stok hareketlerini toplu olarak yazar.
+    Kilitler her zaman ID sırasıyla alındığından eşzamanlı ödemeler birbirini kilitlemez.
+    """
+    locked_ingredients = list(
+        Ingredient.objects.select_for_update().select_related('supplier')
+        .filter(id__in=list(totals), track_stock=True).order_by('id')
+    )
+    if not locked_ingredients:
+        return
 
-        try:
-            with transaction.atomic():
-                ingredient_to_update = Ingredient.objects.select_for_update().get(id=ingredient.id)
-                
-                original_quantity = ingredient_to_update.stock_quantity
-                new_quantity = max(Decimal('0.000'), original_quantity - quantity_to_deduct)
-
-                supplier_email = None
-                if hasattr(ingredient_to_update, 'supplier') and ingredient_to_update.supplier:
-                    supplier_email = ingredient_to_update.supplier.email
-
-                IngredientStockMovement.objects.create(
-                    ingredient=ingredient_to_update,
-                    movement_type='SALE',
-                    quantity_change=-quantity_to_deduct,
-                    quantity_before=original_quantity,
-                    quantity_after=new_quantity,
-                    user=order_item_instance.order.taken_by_staff,
-                    description=f"Sipariş #{order_item_instance.order.id} ile satış.",
-                    related_order_item=order_item_instance
-                )
-                
-                ingredient_to_update.stock_quantity = new_quantity
-                
-                update_fields = ['stock_quantity']
-                if (ingredient_to_update.alert_threshold is not None and
-                    new_quantity <= ingredient_to_update.alert_threshold and
-                    not ingredient_to_update.low_stock_notification_sent and
-                    supplier_email):
-                    
-                    from ..tasks import send_low_stock_notification_email_task
-                    send_low_stock_notification_email_task.delay(ingredient_to_update.id)
-                    ingredient_to_update.low_stock_notification_sent = True
-                    update_fields.append('low_stock_notification_sent')
-                    logger.info(f"DÜŞÜK STOK: '{ingredient_to_update.name}' için tedarikçiye e-posta görevi kuyruğa alındı.")
-
-                elif (ingredient_to_update.alert_threshold is not None and
-                      new_quantity > ingredient_to_update.alert_threshold and
-                      ingredient_to_update.low_stock_notification_sent):
-                    
-                    ingredient_to_update.low_stock_notification_sent = False
-                    update_fields.append('low_stock_notification_sent')
-                    logger.info(f"STOK YENİLENDİ: '{ingredient_to_update.name}' için düşük stok bildirim bayrağı sıfırlandı.")
-                    
-                ingredient_to_update.save(update_fields=update_fields)
-
-                logger.info(
-                    f"Malzeme Stoğu Düşürüldü: '{ingredient.name}' (ID: {ingredient.id}), "
-                    f"Miktar: {quantity_to_deduct} {ingredient.unit.abbreviation}. "
-                    f"Sipariş Kalemi: {order_item_instance.id}"
-                )
-
-        except Ingredient.DoesNotExist:
-            logger.error(f"MALZEME STOK DÜŞME HATASI: Reçetedeki malzeme (ID: {ingredient.id}) bulunamadı.")
-        except Exception as e:
-            logger.error(f"MALZEME STOK DÜŞME HATASI: Malzeme '{ingredient.name}' düşülürken beklenmedik hata: {e}", exc_info=True)
-
-    logger.info(f"Reçete işleme tamamlandı: Varyant='{variant.name}' (ID: {variant.id})")
+    now = timezone.now()
+    running_quantities = {}
+    low_stock_ingredient_ids = []
+    for ingredient in locked_ingredients:
+        total = totals[ingredient.id]
+        running_quantities[ingredient.id] = ingredient.stock_quantity
+        new_quantity = max(Decimal('0.000'), ingredient.stock_quantity - total)
+
+        update_kwargs = {
+            'stock_quantity': Greatest(F('stock_quantity') - total, Value(Decimal('0.000'))),
+            'last_updated': now,
+        }
+        supplier_email = ingredient.supplier.email if ingredient.supplier else None
+        if (ingredient.alert_threshold is not None and
+                new_quantity <= ingredient.alert_threshold and
+                not ingredient.low_stock_notification_sent and
+                supplier_email):
+            update_kwargs['low_stock_notification_sent'] = True
+            low_stock_ingredient_ids.append(ingredient.id)
+            logger.info(f"DÜŞÜK STOK: '{ingredient.name}' için tedarikçiye e-posta görevi kuyruğa alınacak.")
+        elif (ingredient.alert_threshold is not None and
+                new_quantity > ingredient.alert_threshold and
+                ingredient.low_stock_notification_sent):
+            update_kwargs['low_stock_notification_sent'] = False
+            logger.info(f"STOK YENİLENDİ: '{ingredient.name}' için düşük stok bildirim bayrağı sıfırlandı.")
+
+        Ingredient.objects.filter(id=ingredient.id).update(**update_kwargs)
+
+    movements = []
+    for ingredient_id, order_item, quantity_to_deduct in lines:
+        if ingredient_id not in running_quantities:
+            continue
+        quantity_before = running_quantities[ingredient_id]
+        quantity_after = max(Decimal('0.000'), quantity_before - quantity_to_deduct)
+        running_quantities[ingredient_id] = quantity_after
+        movements.append(IngredientStockMovement(
+            ingredient_id=ingredient_id,
+            movement_type='SALE',
+            quantity_change=-quantity_to_deduct,
+            quantity_before=quantity_before,
+            quantity_after=quantity_after,
+            user=order.taken_by_staff,
+            description=f"Sipariş #{order.id} ile satış.",
+            related_order_item=order_item
+        ))
+    IngredientStockMovement.objects.bulk_create(movements)
+
+    if low_stock_ingredient_ids:
+        from ..tasks import send_low_stock_notification_email_task
+        for ingredient_id in low_stock_ingredient_ids:
+            transaction.on_commit(
+                lambda ingredient_id=ingredient_id: send_low_stock_notification_email_task.delay(ingredient_id)
+            )
+
+    logger.info(
+        f"Malzeme Stoğu Düşürüldü: Sipariş #{order.id} için {len(locked_ingredients)} malzeme güncellendi, "
+        f"{len(movements)} stok hareketi yazıldı."
+    )
 
 
 @receiver(post_save, sender=Payment)
@@ -117,7 +171,7 @@ def deduct_ingredients_for_variant(variant: MenuItemVariant, quantity_sold: int,
 def handle_payment_and_stock_deduction(sender, instance: Payment, created: bool, **kwargs):
     """
     Bir ödeme kaydı oluşturulduğunda, siparişteki ürünlere göre SADECE malzeme (reçete)
-    stoklarını düşer.
+    stoklarını düşer ve kalemlerin reçete maliyetini sabitler.
     """
     if not created or not instance.order or not instance.order.is_paid:
         logger.info(f"Ödeme sinyali atlandı: Payment ID={instance.id}, Created={created}, Order={instance.order}, Is_Paid={instance.order.is_paid if instance.order else 'N/A'}")
@@ -127,62 +181,34 @@ def handle_payment_and_stock_deduction(sender, instance: Payment, created: bool,
     order = instance.order
 
     try:
-        order_items = order.order_items.select_related(
+        order_items = list(order.order_items.select_related(
             'menu_item', 
             'variant', 
             'menu_item__represented_campaign'
         ).prefetch_related(
-            'extras__variant__recipe_items__ingredient__unit', 
-            'variant__recipe_items__ingredient__unit'
-        ).all()
-        
-        order_items_count = order_items.count()
-        logger.info(f"Sipariş #{order.id} için {order_items_count} adet sipariş kalemi bulundu.")
+            'extras__variant__recipe_items__ingredient',
+            'variant__recipe_items__ingredient',
+            'menu_item__represented_campaign__campaign_items__variant__recipe_items__ingredient'
+        ))
+        logger.info(f"Sipariş #{order.id} için {len(order_items)} adet sipariş kalemi bulundu.")
         
-        if order_items_count == 0:
+        if not order_items:
             logger.warning(f"Sipariş #{order.id} için hiç sipariş kalemi bulunamadı. Stok düşümü atlanıyor.")
             return
 
-        for order_item in order_items:
-            logger.info(f"İşlenen sipariş kalemi: '{order_item.menu_item.name}' x{order_item.quantity}")
-            
-            # Durum 1: Satılan ürün bir kampanya paketi ise
-            if order_item.menu_item.is_campaign_bundle and hasattr(order_item.menu_item, 'represented_campaign'):
-                logger.info(f"Kampanya paketi tespit edildi: '{order_item.menu_item.name}'")
-                campaign = order_item.menu_item.represented_campaign
-                if not campaign:
-                    logger.warning(f"Kampanya paketi '{order_item.menu_item.name}' için kampanya bulunamadı.")
-                    continue
-                
-                for campaign_item in campaign.campaign_items.select_related('variant').all():
-                    if campaign_item.variant:
-                        total_quantity_sold = order_item.quantity * campaign_item.quantity
-                        logger.info(f"Kampanya öğesi işleniyor: '{campaign_item.variant.name}' x{total_quantity_sold}")
-                        deduct_ingredients_for_variant(campaign_item.variant, total_quantity_sold, order_item)
-                        # --- SİLİNDİ: deduct_variant_stock çağrısı kaldırıldı ---
-
-            # Durum 2: Satılan ürün normal bir ürün ise (varyantı olan)
-            elif order_item.variant:
-                logger.info(f"Normal ürün işleniyor: '{order_item.variant.name}' x{order_item.quantity}")
-                deduct_ingredients_for_variant(order_item.variant, order_item.quantity, order_item)
-                # --- SİLİNDİ: deduct_variant_stock çağrısı kaldırıldı ---
-            else:
-                logger.warning(f"Sipariş kalemi '{order_item.menu_item.name}' için varyant bulunamadı.")
-
-            # Durum 3: Satılan ürünün ekstraları varsa, onların da stoğunu düş
-            try:
-                extras_count = order_item.extras.count()
-                if extras_count > 0:
-                    logger.info(f"{extras_count} adet ekstra bulundu.")
-                    for extra in order_item.extras.select_related('variant').all():
-                        total_extra_quantity_sold = order_item.quantity * extra.quantity
-                        logger.info(f"Ekstra işleniyor: '{extra.variant.name}' x{total_extra_quantity_sold}")
-                        deduct_ingredients_for_variant(extra.variant, total_extra_quantity_sold, order_item)
-                        # --- SİLİNDİ: deduct_variant_stock çağrısı kaldırıldı ---
-            except Exception as extra_error:
-                logger.error(f"Ekstra işlenirken hata: {extra_error}")
+        totals, lines, costs = aggregate_ingredient_deductions(order_items)
+        # Maliyet anlık görüntüsü, satış özetleri sinyalinden önce yazılır (aynı transaction);
+        # özet tablolarındaki maliyet sütunu bu değerlerden beslenir.
+        snapshot_recipe_costs(order_items, costs)
+        if not totals:
+            logger.info(f"Sipariş #{order.id} için stok takibi yapılan malzeme yok. Stok düşümü atlanıyor.")
+            return
+
+        # Hata halinde yalnızca stok düşümü geri alınır, ödeme kaydı etkilenmez.
+        with transaction.atomic():
+            apply_ingredient_deductions(order, totals, lines)
         
         logger.info(f"TÜMÜ TAMAMLANDI: Sipariş #{order.id} için tüm stok düşümleri ve e-posta kontrolleri tamamlandı.")
         
     except Exception as e:
-        logger.error(f"Sipariş işlenirken genel hata: {e}", exc_info=True)
\ No newline at end of file
+        logger.error(f"Sipariş işlenirken genel hata: {e}", exc_info=True)
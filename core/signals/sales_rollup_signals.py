@@ -0,0 +1,44 @@
+# core/signals/sales_rollup_signals.py
+
+from django.db.models.signals import pre_save, post_save, pre_delete
+from django.dispatch import receiver
+import logging
+
+from ..models import Payment
+from ..utils.sales_rollups import apply_payment_to_rollups
+from ..utils.staff_metrics import apply_payment_to_staff_metrics
+
+logger = logging.getLogger(__name__)
+
+# Satış ve personel özetleri ödeme ile aynı işlemde güncellenir; işlem geri alınırsa özetler de geri alınır.
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment_for_rollups(sender, instance, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk:
+        instance._rollup_previous = Payment.objects.filter(pk=instance.pk).values(
+            'amount', 'payment_type', 'payment_date'
+        ).first()
+
+
+@receiver(post_save, sender=Payment)
+def update_sales_rollups_on_payment(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        # Güncellenen ödeme (ör. update_or_create): eski katkı geri alınıp yenisi eklenir.
+        apply_payment_to_rollups(instance.order, previous['amount'], previous['payment_type'], previous['payment_date'], sign=-1)
+        apply_payment_to_staff_metrics(instance.order, previous['amount'], sign=-1)
+    elif not created:
+        return
+    apply_payment_to_rollups(instance.order, instance.amount, instance.payment_type, instance.payment_date)
+    apply_payment_to_staff_metrics(instance.order, instance.amount)
+    logger.info(f"[Sales Rollup] Ödeme #{instance.id} (Sipariş #{instance.order_id}) satış özetlerine işlendi.")
+
+
+@receiver(pre_delete, sender=Payment)
+def revert_sales_rollups_on_payment_delete(sender, instance, **kwargs):
+    # pre_delete kullanılır: sipariş silinirken kalemler henüz silinmemiştir.
+    apply_payment_to_rollups(instance.order, instance.amount, instance.payment_type, instance.payment_date, sign=-1)
+    apply_payment_to_staff_metrics(instance.order, instance.amount, sign=-1)
+    logger.info(f"[Sales Rollup] Silinen ödeme #{instance.id} satış özetlerinden düşüldü.")
@@ -0,0 +1,51 @@
+# core/signals/socket_auth_signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+import logging
+
+from ..models import Business, CustomUser, KDSScreen
+from ..utils.socket_auth_cache import invalidate_socket_auth_user, invalidate_socket_auth_business
+
+logger = logging.getLogger(__name__)
+
+# Önbellek, işlem commit edildikten sonra temizlenir; aksi halde eşzamanlı bir
+# bağlantı eski veriyi yeniden önbelleğe yazabilir.
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_socket_auth_on_user_change(sender, instance, **kwargs):
+    user_id = instance.id
+    transaction.on_commit(lambda: invalidate_socket_auth_user(user_id))
+
+
+@receiver([post_save, post_delete], sender=Business)
+def invalidate_socket_auth_on_business_change(sender, instance, **kwargs):
+    business_id = instance.id
+    owner_id = instance.owner_id
+    transaction.on_commit(lambda: invalidate_socket_auth_business(business_id))
+    transaction.on_commit(lambda: invalidate_socket_auth_user(owner_id))
+
+
+@receiver([post_save, post_delete], sender=KDSScreen)
+def invalidate_socket_auth_on_kds_screen_change(sender, instance, **kwargs):
+    business_id = instance.business_id
+    transaction.on_commit(lambda: invalidate_socket_auth_business(business_id))
+
+
+@receiver(m2m_changed, sender=CustomUser.accessible_kds_screens.through)
+def invalidate_socket_auth_on_kds_access_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        user_id = instance.id
+        transaction.on_commit(lambda: invalidate_socket_auth_user(user_id))
+    elif pk_set:
+        for user_id in pk_set:
+            transaction.on_commit(lambda user_id=user_id: invalidate_socket_auth_user(user_id))
+    else:
+        # KDS ekranı tarafından 'clear' yapıldığında etkilenen kullanıcılar bilinmez.
+        business_id = instance.business_id
+        transaction.on_commit(lambda: invalidate_socket_auth_business(business_id))
@@ -16,83 +16,68 @@ import jwt  # 🆕 JWT decode için
 
 from .models import Order, Table, KDSScreen, Business, CustomUser
 from .utils.order_helpers import get_user_business, PermissionKeys
+from .utils.socket_auth_cache import get_socket_auth_context
+from .utils.kds_feed import build_kds_feed_snapshot
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
-@database_sync_to_async
-def get_user_from_token(token_key):
-    """Verilen JWT token'ından kullanıcıyı doğrular ve döndürür."""
-    User = get_user_model()
-    
+def get_user_id_from_token(token_key):
+    """
+    JWT token'ını yalnızca imzalı claim'ler üzerinden doğrular ve kullanıcı ID'sini döner.
+    Veritabanına gidilmez; kullanıcı/işletme bilgisi önbellekli yetki kaydından okunur.
+    """
     # 🆕 METOD 1: AccessToken ile doğrulama (öncelikli)
     try:
         access_token = AccessToken(token_key)
         user_id = access_token['user_id']
-        user = User.objects.select_related(
-            'owned_business', 'associated_business'
-        ).prefetch_related('accessible_kds_screens').get(id=user_id)
-        logger.info(f"SocketIO: Token validated via AccessToken for user {user.username}")
-        return user
-    except (InvalidToken, TokenError) as e:
+        logger.info(f"SocketIO: Token validated via AccessToken for user ID {user_id}")
+        return user_id
+    except (InvalidToken, TokenError, KeyError) as e:
         logger.warning(f"SocketIO AccessToken validation failed: {e}")
         # AccessToken failed, try manual JWT decode
         pass
-    except User.DoesNotExist:
-        logger.warning(f"SocketIO: User not found for token")
-        return None
-    
+
     # 🆕 METOD 2: Manual JWT decode (fallback)
     try:
         logger.info(f"SocketIO: Trying manual JWT decode for token: ...{token_key[-8:] if len(token_key) > 8 else token_key}")
-        
+
         # Manual JWT decode without library validation
         decoded_data = jwt.decode(
-            token_key, 
-            settings.SECRET_KEY, 
+            token_key,
+            settings.SECRET_KEY,
             algorithms=["HS256"],
             options={"verify_exp": False}  # 🔑 KEY: Don't verify expiration
         )
-        
+
         user_id = decoded_data.get('user_id')
         if not user_id:
             logger.warning(f"SocketIO: No user_id in token payload")
             return None
-            
-        user = User.objects.select_related(
-            'owned_business', 'associated_business'
-        ).prefetch_related('accessible_kds_screens').get(id=user_id)
-        
-        logger.info(f"SocketIO: Token validated via manual JWT decode for user {user.username}")
-        return user
-        
+
+        logger.info(f"SocketIO: Token validated via manual JWT decode for user ID {user_id}")
+        return user_id
+
     except jwt.InvalidTokenError as e:
         logger.warning(f"SocketIO Manual JWT validation failed: {e}")
         return None
-    except User.DoesNotExist:
-        logger.warning(f"SocketIO: User not found in manual JWT decode")
-        return None
     except Exception as e:
         logger.error(f"SocketIO: Unexpected error in manual JWT decode: {e}", exc_info=True)
         return None
 
 # 🆕 ENHANCED: Token refresh özelliği ekle
 @database_sync_to_async
-def try_refresh_token_and_get_user(refresh_token_from_client):
-    """Client'tan gelen refresh token ile yeni access token üret ve kullanıcıyı döndür"""
+def try_refresh_token(refresh_token_from_client):
+    """Client'tan gelen refresh token ile yeni access token üretir; kullanıcı ID'si ve token'ı döner."""
     try:
         from rest_framework_simplejwt.tokens import RefreshToken
         refresh = RefreshToken(refresh_token_from_client)
         new_access_token = str(refresh.access_token)
-        
-        # Yeni access token ile kullanıcıyı al
-        user = User.objects.select_related(
-            'owned_business', 'associated_business'
-        ).prefetch_related('accessible_kds_screens').get(id=refresh['user_id'])
-        
-        logger.info(f"SocketIO: Token refreshed successfully for user {user.username}")
-        return user, new_access_token
-        
+        user_id = refresh['user_id']
+
+        logger.info(f"SocketIO: Token refreshed successfully for user ID {user_id}")
+        return user_id, new_access_token
+
     except Exception as e:
         logger.warning(f"SocketIO: Token refresh failed: {e}")
         return None, None
@@ -121,31 +106,33 @@ def register_events(sio_server):
             if refresh_token_list:
                 refresh_token = refresh_token_list[0]
 
-        user = None
+        user_id = None
         new_access_token = None
         
         # 🆕 Ana token ile dene
         if token:
-            user = await get_user_from_token(token)
+            user_id = get_user_id_from_token(token)
             
         # 🆕 Ana token başarısızsa refresh token ile dene
-        if not user and refresh_token:
+        if not user_id and refresh_token:
             logger.info(f"SocketIO: Main token failed, trying refresh token")
-            user, new_access_token = await try_refresh_token_and_get_user(refresh_token)
-            if user and new_access_token:
-                logger.info(f"SocketIO: Successfully refreshed token for user {user.username}")
+            user_id, new_access_token = await try_refresh_token(refresh_token)
+            if user_id and new_access_token:
+                logger.info(f"SocketIO: Successfully refreshed token for user ID {user_id}")
 
-        if user and user.is_authenticated:
+        auth_context = await database_sync_to_async(get_socket_auth_context)(user_id) if user_id else None
+
+        if auth_context and auth_context['is_active']:
             # === Admin kullanıcısı için özel bağlantı mantığı ===
-            if user.user_type == 'admin' or user.is_superuser:
-                user_room_name = f'user_{user.id}'
+            if auth_context['is_admin']:
+                user_room_name = f'user_{user_id}'
                 admin_room_name = 'admin_room'
                 await sio_server.enter_room(sid, user_room_name)
                 await sio_server.enter_room(sid, admin_room_name)
                 
                 await sio_server.save_session(sid, {
-                    'user_id': user.id,
-                    'user_type': user.user_type,
+                    'user_id': user_id,
+                    'user_type': auth_context['user_type'],
                     'type': 'authenticated_user'
                 })
                 
@@ -155,25 +142,23 @@ def register_events(sio_server):
                     response_data['new_access_token'] = new_access_token
                     
                 await sio_server.emit('connected_and_ready', response_data, room=sid)
-                logger.info(f"Socket.IO: Admin kullanıcısı {user.username} (ID: {user.id}) bağlandı.")
+                logger.info(f"Socket.IO: Admin kullanıcısı {auth_context['username']} (ID: {user_id}) bağlandı.")
                 return True
 
             # Diğer kullanıcılar için mevcut mantık
-            user_business = await database_sync_to_async(get_user_business)(user)
-            if user_business:
-                business_id = user_business.id
-                
-                user_room_name = f'user_{user.id}'
+            business_id = auth_context['business_id']
+            if business_id:
+                user_room_name = f'user_{user_id}'
                 await sio_server.enter_room(sid, user_room_name)
-                logger.info(f"Socket.IO (Connect): İstemci {sid} (Kullanıcı ID: {user.id}) kişisel odasına '{user_room_name}' katıldı.")
+                logger.info(f"Socket.IO (Connect): İstemci {sid} (Kullanıcı ID: {user_id}) kişisel odasına '{user_room_name}' katıldı.")
                 
                 business_room_name = f'business_{business_id}'
                 await sio_server.enter_room(sid, business_room_name)
-                logger.info(f"Socket.IO (Connect): İstemci {sid} (Kullanıcı ID: {user.id}) genel işletme odasına '{business_room_name}' katıldı.")
+                logger.info(f"Socket.IO (Connect): İstemci {sid} (Kullanıcı ID: {user_id}) genel işletme odasına '{business_room_name}' katıldı.")
 
                 await sio_server.save_session(sid, {
-                    'user_id': user.id,
-                    'user_type': user.user_type,
+                    'user_id': user_id,
+                    'user_type': auth_context['user_type'],
                     'business_id': business_id,
                     'type': 'authenticated_user'
                 })
@@ -185,10 +170,10 @@ def register_events(sio_server):
                     logger.info(f"Socket.IO: Sending new access token to client {sid}")
                 
                 await sio_server.emit('connected_and_ready', response_data, room=sid)
-                logger.info(f"Socket.IO: İstemci {sid} (Kullanıcı ID: {user.id}) bağlandı. 'connected_and_ready' olayı gönderildi.")
+                logger.info(f"Socket.IO: İstemci {sid} (Kullanıcı ID: {user_id}) bağlandı. 'connected_and_ready' olayı gönderildi.")
                 return True
             else:
-                logger.warning(f"Socket.IO: İstemci {sid} (Kullanıcı: {user.username}) için işletme bilgisi bulunamadı. Bağlantı reddedildi.")
+                logger.warning(f"Socket.IO: İstemci {sid} (Kullanıcı: {auth_context['username']}) için işletme bilgisi bulunamadı. Bağlantı reddedildi.")
                 return False
         else:
             logger.warning(f"Socket.IO: İstemci {sid} bağlantısı reddedildi (Geçersiz/yetkisiz token).")
@@ -226,14 +211,12 @@ def register_events(sio_server):
             logger.warning(f"Socket.IO (KDS Join): SID {sid} için session'dan veri alınamadı.")
             return
 
-        try:
-            user = await database_sync_to_async(User.objects.get)(id=user_id)
-            business = await database_sync_to_async(Business.objects.get)(id=business_id)
-        except (User.DoesNotExist, Business.DoesNotExist):
-            logger.error(f"Socket.IO (KDS Join): SID {sid} için Kullanıcı veya İşletme bulunamadı.")
+        auth_context = await database_sync_to_async(get_socket_auth_context)(user_id)
+        if not auth_context or not auth_context['is_active']:
+            logger.error(f"Socket.IO (KDS Join): SID {sid} için Kullanıcı bulunamadı veya aktif değil.")
             return
 
-        has_access = await can_user_access_kds(user, kds_slug, business)
+        has_access = auth_context['business_id'] == business_id and kds_slug in auth_context['kds_slugs']
         
         if has_access:
             if 'current_kds_room' in session and session['current_kds_room']:
@@ -246,9 +229,15 @@ def register_events(sio_server):
             session['current_kds_room'] = kds_room_name
             await sio_server.save_session(sid, session)
             
-            logger.info(f"Socket.IO (KDS): İstemci {sid} (Kullanıcı: {user.username}) EK OLARAK '{kds_room_name}' odasına başarıyla katıldı.")
+            logger.info(f"Socket.IO (KDS): İstemci {sid} (Kullanıcı: {auth_context['username']}) EK OLARAK '{kds_room_name}' odasına başarıyla katıldı.")
+
+            # Odaya katıldıktan sonra alınan anlık görüntü, arada kaçan olayları da kapsar.
+            snapshot_payload = await database_sync_to_async(build_kds_feed_snapshot)(business_id, kds_slug)
+            if snapshot_payload is not None:
+                await sio_server.emit('kds_feed_snapshot', snapshot_payload, room=sid)
+                logger.info(f"Socket.IO (KDS): '{kds_room_name}' anlık görüntüsü {sid} istemcisine gönderildi ({len(snapshot_payload['items'])} kalem, seq {snapshot_payload['seq']}).")
         else:
-            logger.warning(f"Socket.IO (KDS Join): SID {sid} kullanıcısı {user.username}, KDS ekranı '{kds_slug}' için YETKİSİZ.")
+            logger.warning(f"Socket.IO (KDS Join): SID {sid} kullanıcısı {auth_context['username']}, KDS ekranı '{kds_slug}' için YETKİSİZ.")
 
     @sio_server.event
     async def join_guest_table_room(sid, data):
@@ -305,20 +294,3 @@ def get_order_status_for_guest(table_uuid):
     except Exception as e:
         logger.error(f"Socket.IO (Misafir): {table_uuid} için başlangıç durumu alınırken hata: {e}", exc_info=True)
     return None
-
-@database_sync_to_async
-def can_user_access_kds(user, kds_slug, business):
-    """Kullanıcının belirtilen KDS ekranına erişimi olup olmadığını kontrol eder."""
-    try:
-        kds_screen = KDSScreen.objects.get(slug=kds_slug, business=business, is_active=True)
-        
-        if user.user_type == 'business_owner' and user.owned_business == kds_screen.business:
-            return True
-        
-        if user.user_type in ['staff', 'kitchen_staff']:
-            if user.associated_business == kds_screen.business:
-                return user.accessible_kds_screens.filter(id=kds_screen.id).exists()
-        
-        return False
-    except KDSScreen.DoesNotExist:
-        return False
\ No newline at end of file
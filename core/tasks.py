@@ -3,9 +3,10 @@
 from celery import shared_task
 from django.conf import settings
 import logging
-from urllib.parse import urlparse
+import os
+import pickle
 import redis
-import json
+import socketio
 from django.core.mail import send_mail
 import asyncio
 import aiosmtplib
@@ -13,66 +14,97 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
 from socket import timeout as SocketTimeout
-import weakref
-import gc
 
-from .models import Order, Ingredient, Supplier
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+from datetime import timedelta
+
+from .models import Order, Ingredient, Supplier, NotificationOutbox
 from .serializers import OrderSerializer
 import uuid
 from datetime import datetime
 from .utils.json_helpers import convert_decimals_to_strings
 from .utils.notification_gate import is_notification_active
+from .utils.order_update_coalescer import drain_order_updates
+from .utils.order_revisions import record_order_revision
+from .utils.order_read_model import load_order_for_response
 
 logger = logging.getLogger(__name__)
 
-# Redis istemcisini kurma (değişiklik yok)
-try:
-    url = urlparse(settings.REDIS_URL)
-    redis_opts = {
-        'host': url.hostname,
-        'port': url.port,
-        'ssl': url.scheme == 'rediss',
-        'ssl_cert_reqs': None,
-        'decode_responses': False,
-    }
-    if url.password:
-        redis_opts['password'] = url.password
+# pg_try_advisory_xact_lock için sabit anahtar ("OUTBOX" kelimesinden türetilmiştir)
+OUTBOX_RELAY_LOCK_ID = 0x4F5554424F58
 
-    redis_client = redis.Redis(**redis_opts)
-    logger.info("Redis client successfully initialized.")
-    
-except Exception as e:
-    logger.error(f"Failed to initialize Redis client: {e}")
-    redis_client = None
 
-_connection_pool = weakref.WeakValueDictionary()
+class _WorkerRedisManager(socketio.RedisManager):
+    """
+    Sadece yayın yapan (write_only) Redis yöneticisi.
+    socketio.RedisManager hataları yutar; burada hatayı yukarı fırlatıyoruz ki
+    çağıran taraf bildirimin gönderilip gönderilmediğini bilebilsin.
+    """
+    def _publish(self, data):
+        return self.redis.publish(self.channel, pickle.dumps(data))
+
+    def emit_batch(self, messages):
+        """(event, data, room) üçlülerini tek bir pipeline ile yayınlar."""
+        pipe = self.redis.pipeline(transaction=False)
+        for event, data, room in messages:
+            pipe.publish(self.channel, pickle.dumps({
+                'method': 'emit', 'event': event, 'data': data,
+                'namespace': '/', 'room': room, 'skip_sid': None,
+                'callback': None, 'host_id': self.host_id,
+            }))
+        return pipe.execute()
+
+
+class SocketIOPublisher:
+    """
+    Celery worker süreci başına tek, uzun ömürlü Socket.IO yayıncısı.
 
-def cleanup_connections():
-    try:
-        gc.collect()
-        logger.debug(f"Connection cleanup completed. Pool size: {len(_connection_pool)}")
-    except Exception as e:
-        logger.error(f"Connection cleanup error: {e}")
+    makarna_project/asgi.py içindeki AsyncRedisManager'ın dinlediği pub/sub
+    kanalına, aynı mesaj formatıyla yayın yapar. Redis bağlantı havuzu süreç
+    boyunca yeniden kullanılır; fork sonrası (prefork havuzu) yeniden kurulur.
+    """
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+        self._manager = None
+        self._pid = None
+
+    def _redis_options(self):
+        options = {
+            'socket_timeout': 5,
+            'socket_connect_timeout': 5,
+            'socket_keepalive': True,
+            'health_check_interval': 30,
+        }
+        if self.url.startswith('rediss://'):
+            options['ssl_cert_reqs'] = None
+        return options
+
+    def _get_manager(self):
+        pid = os.getpid()
+        if self._manager is None or self._pid != pid:
+            self._manager = _WorkerRedisManager(
+                self.url,
+                channel=self.channel,
+                write_only=True,
+                redis_options=self._redis_options(),
+            )
+            self._pid = pid
+            logger.info(f"[Notification] Socket.IO publisher initialized (PID: {pid}, channel: {self.channel}).")
+        return self._manager
+
+    def emit(self, event, data, room):
+        self._get_manager().emit(event, data, room=room)
+
+    def emit_many(self, messages):
+        if messages:
+            self._get_manager().emit_batch(messages)
+
+
+socket_publisher = SocketIOPublisher(settings.REDIS_URL, settings.SOCKETIO_REDIS_CHANNEL)
 
-async def safe_emit_notification(sio, event, data, room):
-    connection_ref = None
-    try:
-        await asyncio.wait_for(sio.emit(event, data, room=room), timeout=5.0)
-        logger.info(f"[Notification] Successfully sent to room: {room}")
-        return True
-    except asyncio.TimeoutError:
-        logger.warning(f"[Notification] Timeout while sending to room: {room}")
-        return False
-    except Exception as e:
-        logger.error(f"[Notification] Error sending to room {room}: {e}")
-        return False
-    finally:
-        if connection_ref:
-            try:
-                connection_ref.close()
-            except:
-                pass
-        cleanup_connections()
 
 def send_socket_io_notification(room, event, data):
     event_type_to_check = data.get('event_type')
@@ -80,106 +112,31 @@ def send_socket_io_notification(room, event, data):
         if not is_notification_active(event_type_to_check):
             logger.info(f"[Notification Gate] Bildirim engellendi (pasif): {event_type_to_check}")
             return 'blocked'
-    success = False
     try:
-        from makarna_project.asgi import sio
-        async def emit_notification_with_cleanup():
-            connection = None
-            try:
-                success = await safe_emit_notification(sio, event, data, room)
-                return success
-            except Exception as e:
-                logger.error(f"[Notification] Emit with cleanup failed: {e}")
-                return False
-            finally:
-                if connection:
-                    try:
-                        await connection.disconnect()
-                    except:
-                        pass
-                cleanup_connections()
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                task = asyncio.create_task(emit_notification_with_cleanup())
-                task.add_done_callback(lambda t: cleanup_connections())
-            else:
-                success = loop.run_until_complete(emit_notification_with_cleanup())
-        except RuntimeError:
-            success = asyncio.run(emit_notification_with_cleanup())
-        if success:
-            logger.info(f"[Notification] Sent via Socket.IO server to room: {room}")
+        socket_publisher.emit(event, data, room)
+        logger.info(f"[Notification] Sent via Redis pub/sub to room: {room}")
+        return 'sent'
+    except redis.exceptions.RedisError as e:
+        logger.error(f"[Notification] Redis pub/sub failed for room {room}: {e}")
     except Exception as e:
-        logger.error(f"[Notification] Direct Socket.IO emit failed: {e}")
-    finally:
-        cleanup_connections()
-    if not success and redis_client:
-        redis_connection = None
-        try:
-            message = {
-                "uid": "emitter",
-                "type": 2,
-                "data": [event, data],
-                "nsp": "/"
-            }
-            room_key = f"socket.io#{room}"
-            redis_connection = redis_client
-            redis_connection.publish(room_key, json.dumps(message))
-            logger.info(f"[Notification] Sent via Redis pub/sub to room: {room}")
-            success = True
-        except Exception as e:
-            logger.error(f"[Notification] Redis pub/sub failed: {e}")
-        finally:
-            if redis_connection and hasattr(redis_connection, 'connection_pool'):
-                try:
-                    redis_connection.connection_pool.disconnect()
-                except:
-                    pass
-    if not success:
-        http_session = None
-        try:
-            import requests
-            webhook_url = "https://order-ai-7bd2c97ec9ef.herokuapp.com/api/webhook/socket-emit/"
-            payload = {
-                'room': room,
-                'event': event,
-                'data': data
-            }
-            http_session = requests.Session()
-            response = http_session.post(webhook_url, json=payload, timeout=5)
-            if response.status_code == 200:
-                logger.info(f"[Notification] Sent via HTTP webhook to room: {room}")
-                success = True
-            else:
-                logger.debug(f"[Notification] HTTP webhook not available: {response.status_code}")
-        except Exception as e:
-            logger.debug(f"[Notification] HTTP webhook not available: {e}")
-        finally:
-            if http_session:
-                try:
-                    http_session.close()
-                except:
-                    pass
-    cleanup_connections()
-    return 'sent' if success else 'failed'
+        logger.error(f"[Notification] Unexpected error while sending to room {room}: {e}", exc_info=True)
+    return 'failed'
 
 # === GÜNCELLEME BAŞLIYOR ===
 @shared_task(name="send_order_update_notification")
 def send_order_update_task(order_id, event_type, extra_data=None):
     """
-    WebSocket üzerinden sipariş güncelleme bildirimini gönderen Celery task'i.
+    Sipariş güncelleme bildirimini (işletme ve ilgili KDS odaları) giden kutusuna yazan Celery task'i.
     Artık 'message' parametresi yok!
     """
+    from .utils.outbox import enqueue_notification
+
     logger.info(f"[Celery Task] Sending notification for Order ID: {order_id}, Event: {event_type}")
     order = None
     serialized_order = None
     try:
-        order = Order.objects.select_related(
-            'table', 'customer', 'business', 'taken_by_staff'
-        ).prefetch_related(
-            'order_items__menu_item__category__assigned_kds',
-            'order_items__variant'
-        ).get(id=order_id)
+        # Yayın yükü, HTTP yanıtlarıyla aynı okuma modelinden serialize edilir.
+        order = load_order_for_response(order_id)
 
         serialized_order = OrderSerializer(order).data
 
@@ -187,49 +144,33 @@ def send_order_update_task(order_id, event_type, extra_data=None):
             'notification_id': f"{uuid.uuid4()}",
             'event_type': event_type,
             'order_id': order.id,
-            'updated_order_data': convert_decimals_to_strings(serialized_order),
             'table_number': order.table.table_number if order.table else None,
             'timestamp': datetime.now().isoformat()
         }
-        if extra_data:
-            update_data.update(extra_data)
-
-        business_room = f"business_{order.business_id}"
-        business_status = send_socket_io_notification(business_room, 'order_status_update', update_data)
-
-        kds_sent_count = 0
-        kds_blocked_count = 0
         kds_screens_with_items = {
             item.menu_item.category.assigned_kds
             for item in order.order_items.all()
             if item.menu_item and item.menu_item.category and item.menu_item.category.assigned_kds
         }
 
-        for kds in kds_screens_with_items:
-            kds_room = f"kds_{order.business_id}_{kds.slug}"
-            kds_data = update_data.copy()
-            kds_data['kds_slug'] = kds.slug
-            kds_status = send_socket_io_notification(kds_room, 'order_status_update', kds_data)
-            if kds_status == 'sent':
-                kds_sent_count += 1
-            elif kds_status == 'blocked':
-                kds_blocked_count += 1
-        
-        if business_status == 'sent':
-            logger.info(f"[Celery Task] ✅ Business notification sent successfully for order {order_id}")
-        elif business_status == 'blocked':
-            logger.info(f"[Celery Task] 🔵 Business notification for order {order_id} was blocked by admin settings.")
-        else:
-            logger.error(f"[Celery Task] ❌ Business notification failed for order {order_id}")
-            
-        total_kds_notifications = len(kds_screens_with_items)
-        if kds_sent_count == total_kds_notifications:
-            logger.info(f"[Celery Task] ✅ All {kds_sent_count} KDS notifications sent successfully for order {order_id}")
-        elif kds_sent_count + kds_blocked_count == total_kds_notifications:
-            logger.info(f"[Celery Task] 🔵 KDS notifications for order {order_id}: {kds_sent_count} sent, {kds_blocked_count} blocked.")
-        else:
-            kds_failed_count = total_kds_notifications - kds_sent_count - kds_blocked_count
-            logger.warning(f"[Celery Task] ⚠️ KDS notifications for order {order_id}: {kds_sent_count} sent, {kds_blocked_count} blocked, {kds_failed_count} failed.")
+        # Revizyon ve olaylar aynı işlemde giden kutusuna yazılır: revizyonlu olaylar işletmenin tek,
+        # sıralı akışından çıkar (r N+1, r N'den önce yayınlanamaz) ve Redis kesintisinde kaybolmaz.
+        with transaction.atomic():
+            update_data.update(record_order_revision(order.id, serialized_order))
+            if extra_data:
+                update_data.update(extra_data)
+
+            enqueue_notification(f"business_{order.business_id}", 'order_status_update', update_data, business_id=order.business_id)
+            for kds in kds_screens_with_items:
+                kds_data = update_data.copy()
+                kds_data['kds_slug'] = kds.slug
+                enqueue_notification(
+                    f"kds_{order.business_id}_{kds.slug}", 'order_status_update', kds_data, business_id=order.business_id
+                )
+
+        logger.info(
+            f"[Celery Task] Order {order_id} update queued in outbox for business room and {len(kds_screens_with_items)} KDS room(s)."
+        )
 
     except Order.DoesNotExist:
         logger.error(f"[Celery Task] Order with ID {order_id} not found.")
@@ -237,24 +178,121 @@ def send_order_update_task(order_id, event_type, extra_data=None):
     except Exception as e:
         logger.error(f"[Celery Task] Failed to send notification for order {order_id}. Error: {e}", exc_info=True)
         raise
-    finally:
-        order = None
-        serialized_order = None
-        cleanup_connections()
-        gc.collect()
 # === GÜNCELLEME SONU ===
 
+@shared_task(name="flush_order_update_notifications")
+def flush_order_update_notifications(order_id):
+    """
+    Debounce penceresi içinde aynı sipariş için biriken olayları tek bir
+    bildirim olarak gönderir.
+    """
+    merged = drain_order_updates(order_id)
+    if merged is None:
+        logger.info(f"[Celery Task] No pending coalesced events for order {order_id}.")
+        return
+    event_type, extra_data = merged
+    logger.info(
+        f"[Celery Task] Flushing {extra_data.get('coalesced_event_count')} coalesced events for order {order_id} "
+        f"as '{event_type}' ({extra_data.get('event_types')})."
+    )
+    send_order_update_task(order_id, event_type, extra_data)
+
+@shared_task(name="relay_notification_outbox")
+def relay_notification_outbox(batch_size=None, max_batches=None):
+    """
+    NotificationOutbox kayıtlarını toplu olarak Socket.IO'ya aktarır.
+    Aynı işletmenin olayları id sırasıyla gönderilir; gönderilemeyen bir olay,
+    o işletmenin sonraki olaylarını yeniden denenene kadar bekletir.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    max_batches = max_batches or settings.NOTIFICATION_OUTBOX_MAX_BATCHES
+    total_sent = 0
+    for _ in range(max_batches):
+        with transaction.atomic():
+            if not _acquire_outbox_relay_lock():
+                logger.info("[Outbox Relay] Başka bir relay çalışıyor, kısa süre sonra tekrar denenecek.")
+                relay_notification_outbox.apply_async(countdown=1)
+                return total_sent
+            processed, sent = _relay_outbox_batch(batch_size)
+        total_sent += sent
+        if processed < batch_size:
+            break
+    else:
+        # Kuyruk hâlâ dolu; diğer görevleri bloklamamak için kalan iş yeni bir göreve devredilir.
+        relay_notification_outbox.delay()
+    return total_sent
+
+
+def _acquire_outbox_relay_lock():
+    """PostgreSQL'de aynı anda tek relay'in çalışmasını işlem süresince garanti eder."""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [OUTBOX_RELAY_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def _relay_outbox_batch(batch_size):
+    """
+    Gönderime hazır en fazla batch_size olayı yayınlar. (ilerleme, gönderilen) döner; ilerleme yalnızca
+    yayınlanan veya atlanan kayıtları sayar, böylece yayın hatasında relay döngüsü boşuna dönmez.
+    """
+    now = timezone.now()
+    pending = NotificationOutbox.objects.filter(status=NotificationOutbox.Status.PENDING)
+    ready = pending.filter(available_at__lte=now)
+    # Geri çekilme (backoff) süresindeki en eski kayıttan sonraki olaylar sırayı bozmamak için bekletilir.
+    # Bekleyen kayıtlar sorguda dışlanır; partiyi doldurup diğer işletmelerin olaylarını geciktirmezler.
+    blocked_from = pending.filter(available_at__gt=now).values('business_id').annotate(first_id=Min('id'))
+    for row in blocked_from:
+        ready = ready.exclude(business_id=row['business_id'], id__gt=row['first_id'])
+    batch = list(ready.order_by('id')[:batch_size])
+    if not batch:
+        return 0, 0
+
+    to_publish = []
+    skipped = []
+    for entry in batch:
+        event_type = entry.payload.get('event_type') if isinstance(entry.payload, dict) else None
+        if event_type and not is_notification_active(event_type):
+            skipped.append(entry.id)
+            continue
+        to_publish.append(entry)
+
+    if skipped:
+        NotificationOutbox.objects.filter(id__in=skipped).update(status=NotificationOutbox.Status.SKIPPED, sent_at=now)
+
+    if not to_publish:
+        return len(skipped), 0
+
+    try:
+        socket_publisher.emit_many([(entry.event, entry.payload, entry.room) for entry in to_publish])
+    except Exception as e:
+        logger.error(f"[Outbox Relay] {len(to_publish)} olay yayınlanamadı: {e}")
+        for entry in to_publish:
+            entry.attempts += 1
+            entry.last_error = str(e)[:1000]
+            if entry.attempts >= settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS:
+                entry.status = NotificationOutbox.Status.FAILED
+            else:
+                entry.available_at = now + timedelta(seconds=min(2 ** entry.attempts, 60))
+        NotificationOutbox.objects.bulk_update(to_publish, ['attempts', 'last_error', 'status', 'available_at'])
+        return len(skipped), 0
+
+    NotificationOutbox.objects.filter(id__in=[entry.id for entry in to_publish]).update(
+        status=NotificationOutbox.Status.SENT, sent_at=now
+    )
+    logger.info(f"[Outbox Relay] {len(to_publish)} olay yayınlandı.")
+    return len(skipped) + len(to_publish), len(to_publish)
+
+
 @shared_task(name="send_bulk_order_notifications")
 def send_bulk_order_notifications(notification_list):
-    try:
-        for notification in notification_list:
-            send_order_update_task.delay(
-                notification.get('order_id'),
-                notification.get('event_type'),
-                notification.get('extra_data')
-            )
-    finally:
-        cleanup_connections()
+    for notification in notification_list:
+        send_order_update_task.delay(
+            notification.get('order_id'),
+            notification.get('event_type'),
+            notification.get('extra_data')
+        )
 
 @shared_task(name="test_socket_connection")
 def test_socket_connection():
@@ -276,42 +314,179 @@ def test_socket_connection():
     except Exception as e:
         logger.error(f"[Celery Task] Socket connection test failed: {e}")
         return False
-    finally:
-        cleanup_connections()
 
 @shared_task(name="cleanup_old_notifications")
 def cleanup_old_notifications():
     try:
-        from datetime import timedelta
-        from django.utils import timezone
         cutoff_date = timezone.now() - timedelta(days=7)
-        logger.info(f"[Celery Task] Notification cleanup completed for dates before {cutoff_date}")
+        deleted_count, _ = NotificationOutbox.objects.filter(
+            status__in=[NotificationOutbox.Status.SENT, NotificationOutbox.Status.SKIPPED],
+            sent_at__lt=cutoff_date
+        ).delete()
+        logger.info(f"[Celery Task] Notification cleanup completed for dates before {cutoff_date}. Deleted outbox rows: {deleted_count}")
     except Exception as e:
         logger.error(f"[Celery Task] Notification cleanup failed: {e}")
-    finally:
-        cleanup_connections()
+
+@shared_task(name="generate_report_export")
+def generate_report_export_task(job_id):
+    """
+    Detaylı satış raporunu sunucu tarafı imleçle okuyup geçici dosyaya akıtır ve
+    varsayılan depolama alanına kaydeder. Bellek kullanımı rapor boyutundan bağımsızdır.
+    """
+    import tempfile
+    from django.core.files import File
+    from .models import ReportExportJob
+    from .utils.outbox import enqueue_notification
+    from .utils.sales_export import detailed_sales_queryset, iter_export_rows, iter_export
+
+    try:
+        job = ReportExportJob.objects.select_related('business').get(id=job_id)
+    except ReportExportJob.DoesNotExist:
+        logger.warning(f"[Report Export] İş #{job_id} bulunamadı.")
+        return
+
+    ReportExportJob.objects.filter(id=job.id).update(status=ReportExportJob.STATUS_RUNNING)
+    row_count = 0
+    try:
+        queryset = detailed_sales_queryset(
+            job.business,
+            datetime.fromisoformat(job.params['start_date']),
+            datetime.fromisoformat(job.params['end_date'])
+        )
+
+        def counted_rows():
+            nonlocal row_count
+            for row in iter_export_rows(queryset):
+                row_count += 1
+                yield row
+
+        with tempfile.TemporaryFile() as temp_file:
+            for chunk in iter_export(job.export_format, counted_rows()):
+                temp_file.write(chunk)
+            temp_file.seek(0)
+            job.file.save(f"detailed_sales_{job.business_id}_{job.id}.{job.export_format}", File(temp_file), save=False)
+
+        job.status = ReportExportJob.STATUS_COMPLETED
+        job.row_count = row_count
+        job.completed_at = timezone.now()
+        job.save(update_fields=['file', 'status', 'row_count', 'completed_at'])
+        logger.info(f"[Report Export] İş #{job.id} tamamlandı: {row_count} satır.")
+    except Exception as e:
+        logger.error(f"[Report Export] İş #{job.id} başarısız: {e}", exc_info=True)
+        job.status = ReportExportJob.STATUS_FAILED
+        job.error = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'completed_at'])
+
+    if job.requested_by_id:
+        enqueue_notification(f'user_{job.requested_by_id}', 'report_export_update', {
+            'event_type': 'report_export_update',
+            'job_id': job.id,
+            'status': job.status,
+            'row_count': job.row_count,
+        }, business_id=job.business_id)
+
+
+@shared_task(name="generate_report_job")
+def generate_report_job_task(job_id):
+    """
+    Rapor işini web süreçlerinin dışında hesaplar ve sonucu kaydeder. Aynı anahtarla gelen
+    sonraki istekler, veri sürümü değişene kadar bu sonuçtan karşılanır.
+    """
+    from .models import ReportJob
+    from .utils.outbox import enqueue_notification
+    from .utils.report_jobs import build_report_result
+
+    try:
+        job = ReportJob.objects.select_related('business').get(id=job_id)
+    except ReportJob.DoesNotExist:
+        logger.warning(f"[Report Job] İş #{job_id} bulunamadı.")
+        return
+
+    ReportJob.objects.filter(id=job.id).update(status=ReportJob.STATUS_RUNNING)
+    try:
+        job.result = build_report_result(job.report_type, job.business, job.params, data_version=job.data_version)
+        job.status = ReportJob.STATUS_COMPLETED
+        job.completed_at = timezone.now()
+        job.save(update_fields=['result', 'status', 'completed_at'])
+        logger.info(f"[Report Job] İş #{job.id} ({job.report_type}) tamamlandı.")
+    except Exception as e:
+        logger.error(f"[Report Job] İş #{job.id} başarısız: {e}", exc_info=True)
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'completed_at'])
+
+    if job.requested_by_id:
+        enqueue_notification(f'user_{job.requested_by_id}', 'report_job_update', {
+            'event_type': 'report_job_update',
+            'job_id': job.id,
+            'report_type': job.report_type,
+            'status': job.status,
+        }, business_id=job.business_id)
+
+
+@shared_task(name="cleanup_old_report_jobs")
+def cleanup_old_report_jobs():
+    """Saklama süresi dolan rapor işlerini ve sonuçlarını siler."""
+    from .models import ReportJob
+
+    cutoff_date = timezone.now() - timedelta(hours=settings.REPORT_EXPORT_RETENTION_HOURS)
+    deleted_count, _ = ReportJob.objects.filter(created_at__lt=cutoff_date).delete()
+    logger.info(f"[Celery Task] Report job cleanup completed. Deleted jobs: {deleted_count}")
+
+
+@shared_task(name="cleanup_expired_idempotency_keys")
+def cleanup_expired_idempotency_keys():
+    """Saklama süresi dolan tekrar koruma anahtarlarını ve yanıtlarını siler."""
+    from .models import IdempotencyKey
+
+    cutoff_date = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted_count, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff_date).delete()
+    logger.info(f"[Celery Task] Idempotency key cleanup completed. Deleted keys: {deleted_count}")
+
+
+@shared_task(name="close_business_days")
+def close_business_days():
+    """Kapanış saati geçmiş iş günlerinin gün sonu (Z) raporlarını oluşturur."""
+    from .utils.daily_close import close_all_business_days
+
+    closed_count = close_all_business_days()
+    logger.info(f"[Celery Task] Daily close completed. Closed days: {closed_count}")
+
+
+@shared_task(name="cleanup_old_report_exports")
+def cleanup_old_report_exports():
+    """Süresi dolan dışa aktarım dosyalarını ve kayıtlarını siler."""
+    from .models import ReportExportJob
+
+    cutoff_date = timezone.now() - timedelta(hours=settings.REPORT_EXPORT_RETENTION_HOURS)
+    deleted_count = 0
+    for job in ReportExportJob.objects.filter(created_at__lt=cutoff_date).iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted_count += 1
+    logger.info(f"[Celery Task] Report export cleanup completed. Deleted jobs: {deleted_count}")
 
 @shared_task(name="send_test_notification")
 def send_test_notification(business_id=67):
-    try:
-        test_data = {
-            'event_type': 'order_approved_for_kitchen',
-            'order_id': 99999,
-            'table_number': 999,
-            'message': '🧪 Backend test bildirimi - Manuel gönderim',
-            'notification_id': f"manual_test_{uuid.uuid4()}",
-            'timestamp': datetime.now().isoformat()
-        }
-        room = f"business_{business_id}"
-        status = send_socket_io_notification(room, 'order_status_update', test_data)
-        if status != 'failed':
-            logger.info(f"[Celery Task] 🧪 Manual test notification sent to {room} with status: {status}")
-            return True
-        else:
-            logger.error(f"[Celery Task] 🧪 Manual test notification failed for {room}")
-            return False
-    finally:
-        cleanup_connections()
+    test_data = {
+        'event_type': 'order_approved_for_kitchen',
+        'order_id': 99999,
+        'table_number': 999,
+        'message': '🧪 Backend test bildirimi - Manuel gönderim',
+        'notification_id': f"manual_test_{uuid.uuid4()}",
+        'timestamp': datetime.now().isoformat()
+    }
+    room = f"business_{business_id}"
+    status = send_socket_io_notification(room, 'order_status_update', test_data)
+    if status != 'failed':
+        logger.info(f"[Celery Task] 🧪 Manual test notification sent to {room} with status: {status}")
+        return True
+    else:
+        logger.error(f"[Celery Task] 🧪 Manual test notification failed for {room}")
+        return False
 
 # ==================== GÜVENLİ E-POSTA SİSTEMİ ====================
 
@@ -483,10 +658,6 @@ Teşekkürler,
         else:
             logger.error(f"[Email] ❌ Tüm retry denemeleri tükendi. Malzeme ID: {ingredient_id}")
             return {"status": "failed", "reason": "max_retries_exceeded", "ingredient_id": ingredient_id}
-    finally:
-        ingredient = None
-        cleanup_connections()
-        gc.collect()
 
 @shared_task(name="send_manual_low_stock_email")
 def send_manual_low_stock_email_task(supplier_id, ingredient_ids):
@@ -499,8 +670,6 @@ def send_manual_low_stock_email_task(supplier_id, ingredient_ids):
     except Supplier.DoesNotExist:
         logger.error(f"[Email] ❌ Tedarikçi ID {supplier_id} bulunamadı.")
         return {"status": "error", "reason": "supplier_not_found"}
-    finally:
-        cleanup_connections()
     if not ingredients.exists():
         logger.warning(f"[Email] ⚠️ E-posta için malzeme bulunamadı. ID'ler: {ingredient_ids}")
         return {"status": "skipped", "reason": "no_ingredients_found"}
@@ -539,9 +708,4 @@ Teşekkürler,
         return {"status": "success", "supplier": supplier.name}
     except Exception as e:
         logger.error(f"[Email] ❌ Manuel e-posta gönderimi hatası: {e}")
-        return {"status": "error", "reason": str(e)}
-    finally:
-        supplier = None
-        ingredients = None
-        cleanup_connections()
-        gc.collect()
\ No newline at end of file
+        return {"status": "error", "reason": str(e)}
\ No newline at end of file
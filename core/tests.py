@@ -1,5 +1,378 @@
 # core/tests.py
 
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from .db_router import PRIMARY_PIN_COOKIE, REPORTING_DB, ReadReplicaPinMiddleware, read_replica_db, use_read_replica
+from .mixins import ReadReplicaMixin
+from .models import (
+    Business, Category, CreditPaymentDetails, CustomerAccount, CustomUser, IdempotencyKey, KDSLatencyHistogram, KDSScreen, MenuItem, MenuItemVariant,
+    Order, OrderItem, OrderItemExtra, Table
+)
+from .serializers import OrderSerializer
+from .utils.customer_accounts import charge_credit_sale, link_customer_account, record_account_payment
+from .utils.kds_latency import LATENCY_BUCKET_BOUNDS, build_kds_latency_report, percentiles_from_buckets
+from .utils.order_read_model import load_order_for_response
+
+
+class OrderTestCase(TestCase):
+    """İşletme sahibi, KDS'e bağlı kategori ve 10 ürünlük (varyant + ekstra) menü."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create(username='order_owner', user_type='business_owner')
+        cls.business = Business.objects.create(owner=cls.owner, name='Test İşletmesi', address='-')
+        kds = KDSScreen.objects.create(business=cls.business, name='Mutfak')
+        category = Category.objects.create(business=cls.business, name='Ana', assigned_kds=kds)
+        cls.menu = []
+        for index in range(10):
+            menu_item = MenuItem.objects.create(business=cls.business, name=f'Ürün {index}', category=category)
+            variant = MenuItemVariant.objects.create(menu_item=menu_item, name='Normal', price=Decimal('10.00'))
+            extra = MenuItemVariant.objects.create(menu_item=menu_item, name='Ekstra', price=Decimal('2.00'), is_extra=True)
+            cls.menu.append((menu_item, variant, extra))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def _create_order(self, item_count, **order_fields):
+        table = Table.objects.create(business=self.business, table_number=Table.objects.count() + 1)
+        order = Order.objects.create(business=self.business, table=table, order_type='table', **order_fields)
+        for menu_item, variant, extra in self.menu[:item_count]:
+            order_item = OrderItem.objects.create(order=order, menu_item=menu_item, variant=variant, price=Decimal('12.00'))
+            OrderItemExtra.objects.create(order_item=order_item, variant=extra)
+        return order
+
+
+class OrderResponseQueryCountTests(OrderTestCase):
+    """
+    Sipariş yanıtlarının sorgu sayısı kalem sayısından bağımsız olmalıdır. Her eylem aynı
+    siparişi 2 ve 10 kalemle çalıştırır; sayılar eşit ve üst sınırın altında kalmalıdır.
+    """
+    # Sınırlar ölçülen değerlerin biraz üzerindedir; aşılırsa yanıt yolunda fazladan sorgu oluşmuştur.
+    READ_MODEL_QUERY_CAP = 8
+
+    def _count_action_queries(self, item_count, path, data=None, ignored_tables=(), **order_fields):
+        order = self._create_order(item_count, **order_fields)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/orders/{order.id}/{path}/', data or {}, format='json', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(response.data['order_items']), item_count)
+        return len([
+            query for query in queries.captured_queries
+            if not any(table in query['sql'] for table in ignored_tables)
+        ])
+
+    def assertConstantQueries(self, path, cap, data=None, ignored_tables=(), **order_fields):
+        # İlk çağrı özet satırlarını ve önbellekleri oluşturur; ölçüm sonraki çağrılardadır.
+        self._count_action_queries(len(self.menu), path, data, ignored_tables, **order_fields)
+        small = self._count_action_queries(2, path, data, ignored_tables, **order_fields)
+        large = self._count_action_queries(10, path, data, ignored_tables, **order_fields)
+        self.assertEqual(small, large, f"'{path}' sorgu sayısı kalem sayısıyla artıyor: {small} -> {large}")
+        self.assertLessEqual(large, cap)
+
+    def test_read_model_serialization(self):
+        for item_count in (2, 10):
+            order = self._create_order(item_count)
+            with CaptureQueriesContext(connection) as queries:
+                OrderSerializer(load_order_for_response(order.id)).data
+            self.assertLessEqual(len(queries), self.READ_MODEL_QUERY_CAP)
+
+    def test_approve_guest_order(self):
+        self.assertConstantQueries('approve-guest-order', 25, status=Order.STATUS_PENDING_APPROVAL)
+
+    def test_deliver_all_items(self):
+        self.assertConstantQueries('deliver', 25, status=Order.STATUS_READY_FOR_DELIVERY)
+
+    def test_mark_as_paid(self):
+        # Günlük ürün satış özeti ürün başına bir satır günceller; bu yazım yanıt yolunun dışındadır.
+        self.assertConstantQueries(
+            'mark-as-paid', 55, {'payment_type': 'cash', 'amount': '1000.00'},
+            ignored_tables=('core_itemsalesdailyrollup',), status=Order.STATUS_APPROVED
+        )
+
+
+class KDSLatencyReportQueryCountTests(TestCase):
+    """
+    KDS gecikme raporu histogramı tek sorguda toplar. 1 ekran/1 kategori/1 saat ile 4 ekran/
+    8 kategori/24 saat ve 30 günlük veri aynı sayıda sorguyla raporlanmalıdır.
+    """
+    START_DATE = date(2026, 1, 1)
+    END_DATE = date(2026, 1, 30)
+    REPORT_QUERY_CAP = 1
+    VIEW_QUERY_CAP = 3
+
+    @classmethod
+    def _seed(cls, username, screen_count, category_count, hours):
+        owner = CustomUser.objects.create(username=username, user_type='business_owner')
+        business = Business.objects.create(owner=owner, name=f'{username} İşletmesi', address='-')
+        screens = [KDSScreen.objects.create(business=business, name=f'Ekran {index}') for index in range(screen_count)]
+        categories = [
+            Category.objects.create(business=business, name=f'Kategori {index}', assigned_kds=screens[index % screen_count])
+            for index in range(category_count)
+        ]
+        rows = []
+        for day_offset in range((cls.END_DATE - cls.START_DATE).days + 1):
+            for category in categories:
+                for hour in hours:
+                    for metric, _ in KDSLatencyHistogram.METRIC_CHOICES:
+                        for bucket in (1, 4, 9):
+                            rows.append(KDSLatencyHistogram(
+                                business=business, date=cls.START_DATE + timedelta(days=day_offset), hour=hour,
+                                kds_screen_id=category.assigned_kds_id, category=category,
+                                metric=metric, bucket=bucket, count=bucket
+                            ))
+        KDSLatencyHistogram.objects.bulk_create(rows)
+        return owner, business
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small_owner, cls.small_business = cls._seed('latency_small', 1, 1, [12])
+        cls.large_owner, cls.large_business = cls._seed('latency_large', 4, 8, range(24))
+
+    def _count_report_queries(self, business):
+        with CaptureQueriesContext(connection) as queries:
+            report = build_kds_latency_report(business, self.START_DATE, self.END_DATE)
+        return len(queries), report
+
+    def test_report_queries_independent_of_breakdowns(self):
+        small, small_report = self._count_report_queries(self.small_business)
+        large, large_report = self._count_report_queries(self.large_business)
+        self.assertEqual(len(small_report['by_hour']), 1)
+        self.assertEqual(len(large_report['by_hour']), 24)
+        self.assertEqual(len(large_report['by_kds_screen']), 4)
+        self.assertEqual(len(large_report['by_category']), 8)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.REPORT_QUERY_CAP)
+
+    @override_settings(REPORT_JOBS_ENABLED=False)
+    def test_view_queries_independent_of_breakdowns(self):
+        counts = []
+        for owner in (self.small_owner, self.large_owner):
+            client = APIClient()
+            client.force_authenticate(owner)
+            url = f'/api/reports/kds-latency/?start_date={self.START_DATE}&end_date={self.END_DATE}'
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200, response.data)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[1], self.VIEW_QUERY_CAP)
+
+    def test_percentiles_from_buckets(self):
+        self.assertEqual(percentiles_from_buckets({}), {'p50': None, 'p90': None, 'p99': None})
+        # Tek kova [30, 60): yüzdelikler kova içinde doğrusal dağılır.
+        self.assertEqual(percentiles_from_buckets({1: 10}), {'p50': 45, 'p90': 57, 'p99': 60})
+        # Yarısı [0, 30), yarısı [60, 90): p50 ilk kovanın üst sınırında, p90 ikinci kovanın içinde.
+        self.assertEqual(percentiles_from_buckets({0: 5, 2: 5}, percentiles=(50, 90)), {'p50': 30, 'p90': 84})
+        # Üst sınırsız son kovada alt sınır döner.
+        last_bucket = len(LATENCY_BUCKET_BOUNDS)
+        self.assertEqual(percentiles_from_buckets({last_bucket: 3}), {
+            'p50': LATENCY_BUCKET_BOUNDS[-1], 'p90': LATENCY_BUCKET_BOUNDS[-1], 'p99': LATENCY_BUCKET_BOUNDS[-1]
+        })
+
+
+class CustomerAccountTests(OrderTestCase):
+    """Cari hesaplar yalnızca telefonla birleşir; aynı isimli telefonsuz müşteriler ayrı kalır."""
+
+    def _credit_sale(self, name, phone=None, total='50.00'):
+        order = self._create_order(1, customer_name=name, customer_phone=phone, grand_total=Decimal(total))
+        credit_details = CreditPaymentDetails.objects.create(order=order)
+        charge_credit_sale(order, credit_details)
+        credit_details.refresh_from_db()
+        return credit_details
+
+    def test_same_name_without_phone_is_not_merged(self):
+        first = self._credit_sale('Ali')
+        second = self._credit_sale(' ali ')
+        self.assertNotEqual(first.account_id, second.account_id)
+        self.assertTrue(CustomerAccount.objects.get(id=first.account_id).needs_linking)
+
+        record_account_payment(first.account, Decimal('50.00'), 'cash')
+        second.refresh_from_db()
+        self.assertEqual(second.settled_amount, Decimal('0.00'))
+
+    def test_same_phone_is_merged(self):
+        first = self._credit_sale('Ali', '0532 111 22 33')
+        second = self._credit_sale('Ali Veli', '+90 532 111 22 33')
+        self.assertEqual(first.account_id, second.account_id)
+        self.assertFalse(first.account.needs_linking)
+
+    def test_link_moves_open_credit_and_balance(self):
+        name_only = self._credit_sale('Ali', total='30.00')
+        with_phone = self._credit_sale('Ali', '05321112233', total='20.00')
+        target = link_customer_account(name_only.account, with_phone.account)
+        self.assertEqual(target.balance, Decimal('50.00'))
+        name_only.refresh_from_db()
+        self.assertEqual(name_only.account_id, target.id)
+        source = CustomerAccount.objects.get(account_key=f'siparis:{name_only.order_id}')
+        self.assertEqual(source.balance, Decimal('0.00'))
+        self.assertFalse(source.needs_linking)
+
+
+class OrderCursorPaginationTests(TestCase):
+    """?cursor= ile sipariş listesi (created_at, id) üzerinde, aynı zamanlı siparişler atlanmadan gezilir."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create(username='cursor_owner', user_type='business_owner')
+        cls.business = Business.objects.create(owner=cls.owner, name='İmleç Testi', address='-')
+        orders = [Order.objects.create(business=cls.business, order_type='takeaway') for _ in range(7)]
+        # Aynı zaman damgası: sıra yalnızca id ile belirlenir.
+        Order.objects.filter(id__in=[order.id for order in orders[2:5]]).update(created_at=orders[2].created_at)
+        cls.expected_ids = list(
+            Order.objects.filter(business=cls.business).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_pages_cover_all_orders_once(self):
+        seen = []
+        url = '/api/orders/?cursor=&page_size=3'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+            seen.extend(order['id'] for order in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, self.expected_ids)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get('/api/orders/', HTTP_HOST='localhost')
+        self.assertEqual(response.data['count'], len(self.expected_ids))
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/orders/?cursor=bozuk', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 404)
+
+
+class IdempotencyKeyTests(OrderTestCase):
+    """Aynı Idempotency-Key ile tekrarlanan istek sipariş tablolarına dokunmadan ilk yanıtı alır."""
+
+    def _post(self, path, data, key):
+        return self.client.post(path, data, format='json', HTTP_HOST='localhost', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_create_replays_first_response(self):
+        table = Table.objects.create(business=self.business, table_number=50)
+        menu_item, variant, _ = self.menu[0]
+        data = {'table': table.id, 'order_type': 'table', 'order_items_data': [
+            {'menu_item_id': menu_item.id, 'variant_id': variant.id, 'quantity': 1}
+        ]}
+        first = self._post('/api/orders/', data, 'tablet-1')
+        self.assertEqual(first.status_code, 201)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self._post('/api/orders/', data, 'tablet-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json()['id'], first.data['id'])
+        self.assertEqual(Order.objects.filter(table=table).count(), 1)
+        self.assertFalse(any('core_order' in query['sql'] for query in queries.captured_queries))
+
+        other = self._post('/api/orders/', {**data, 'order_type': 'takeaway'}, 'tablet-1')
+        self.assertEqual(other.status_code, 422)
+
+    def test_mark_as_paid_retry_does_not_pay_twice(self):
+        order = self._create_order(2, status=Order.STATUS_APPROVED)
+        data = {'payment_type': 'cash', 'amount': '24.00'}
+        first = self._post(f'/api/orders/{order.id}/mark-as-paid/', data, 'pay-1')
+        retry = self._post(f'/api/orders/{order.id}/mark-as-paid/', data, 'pay-1')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.json()['id'], order.id)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_guest_order_retry_does_not_add_items_twice(self):
+        table = Table.objects.create(business=self.business, table_number=51)
+        menu_item, variant, _ = self.menu[0]
+        data = {'order_items_data': [{'menu_item_id': menu_item.id, 'variant_id': variant.id, 'quantity': 2}]}
+        guest_client = APIClient()
+        for _ in range(2):
+            response = guest_client.post(
+                f'/api/guest/orders/{table.uuid}/', data, format='json', HTTP_HOST='localhost', HTTP_IDEMPOTENCY_KEY='guest-1'
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(OrderItem.objects.get(order__table=table).quantity, 2)
+
+    def test_failed_request_releases_key(self):
+        order = self._create_order(1, status=Order.STATUS_APPROVED)
+        failed = self._post(f'/api/orders/{order.id}/mark-as-paid/', {'payment_type': 'cash'}, 'pay-2')
+        self.assertEqual(failed.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.filter(key='pay-2').exists())
+
+
+class _ReportingProbeView(ReadReplicaMixin, APIView):
+    """GET okumanın yönlendirildiği veritabanını döner; POST bir yazma yapar."""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    read_replica_alias = REPORTING_DB
+
+    def get(self, request):
+        return Response({'db': CustomUser.objects.all().db})
+
+    def post(self, request):
+        CustomUser.objects.create(username=f'replica_writer_{CustomUser.objects.count()}')
+        return Response({'db': CustomUser.objects.all().db})
+
+
+@skipUnless(REPORTING_DB in settings.DATABASES, "'reporting' veritabanı tanımlı değil (REPORTING_DATABASE_URL).")
+class ReadReplicaRouterTests(TransactionTestCase):
+    """
+    Okumaların 'reporting' replikasına yönlendirilmesi ve birincile sabitlenmesi. TestCase her testi
+    birincilde bir atomic bloğa sardığından (router o durumda birincili seçer) TransactionTestCase kullanılır.
+    """
+    databases = {DEFAULT_DB_ALIAS, REPORTING_DB}
+
+    def setUp(self):
+        CustomUser.objects.create(username='replica_reader')
+
+    def test_use_read_replica_routes_reads(self):
+        with use_read_replica(REPORTING_DB):
+            with CaptureQueriesContext(connections[REPORTING_DB]) as replica_queries, \
+                    CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary_queries:
+                self.assertEqual(list(CustomUser.objects.values_list('username', flat=True)), ['replica_reader'])
+            self.assertEqual(len(replica_queries), 1)
+            self.assertEqual(len(primary_queries), 0)
+        self.assertEqual(CustomUser.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_atomic_block_pins_to_primary(self):
+        with transaction.atomic():
+            self.assertEqual(read_replica_db(REPORTING_DB), DEFAULT_DB_ALIAS)
+            with use_read_replica(REPORTING_DB):
+                self.assertEqual(CustomUser.objects.all().db, DEFAULT_DB_ALIAS)
+        with use_read_replica(REPORTING_DB):
+            # Replika bloğu içinde açılan işlem de okumaları birincile taşır (ör. select_for_update).
+            with transaction.atomic():
+                self.assertEqual(CustomUser.objects.all().db, DEFAULT_DB_ALIAS)
+            self.assertEqual(CustomUser.objects.all().db, REPORTING_DB)
+
+    def test_mixin_routes_reads_and_middleware_pins_after_write(self):
+        factory = APIRequestFactory()
+        handler = ReadReplicaPinMiddleware(_ReportingProbeView.as_view())
+
+        self.assertEqual(handler(factory.get('/')).data['db'], REPORTING_DB)
+
+        write_response = handler(factory.post('/'))
+        self.assertIn(PRIMARY_PIN_COOKIE, write_response.cookies)
+
+        pinned_request = factory.get('/')
+        pinned_request.COOKIES[PRIMARY_PIN_COOKIE] = write_response.cookies[PRIMARY_PIN_COOKIE].value
+        self.assertEqual(handler(pinned_request).data['db'], DEFAULT_DB_ALIAS)
+
+    def test_missing_alias_falls_back_to_primary(self):
+        self.assertEqual(read_replica_db('missing_replica'), DEFAULT_DB_ALIAS)
+        with use_read_replica('missing_replica'):
+            self.assertEqual(CustomUser.objects.all().db, DEFAULT_DB_ALIAS)
@@ -15,6 +15,10 @@ from core.views import (
     PaymentViewSet,
     ReportView,
     DetailedSalesReportView,
+    ReportExportJobView,
+    ReportExportDownloadView,
+    KDSLatencyReportView,
+    ReportJobView,
     RegisterView,
     CategoryViewSet,
     OrderItemViewSet,
@@ -25,6 +29,10 @@ from core.views import (
     GuestMenuView,
     StaffUserViewSet,
     StaffPerformanceReportView,
+    DailyCloseViewSet,
+    CustomerAccountViewSet,
+    CustomerCohortReportView,
+    MenuEngineeringReportView,
     AdminUserManagementViewSet,
     KDSOrderViewSet,
     PasswordResetRequestView,
@@ -91,6 +99,8 @@ router.register(r'purchase-orders', PurchaseOrderViewSet, basename='purchaseorde
 router.register(r'reservations', ReservationViewSet, basename='reservation')
 router.register(r'layouts', BusinessLayoutViewSet, basename='layout')
 router.register(r'layout-elements', LayoutElementViewSet, basename='layoutelement')
+router.register(r'daily-closes', DailyCloseViewSet, basename='dailyclose')
+router.register(r'customer-accounts', CustomerAccountViewSet, basename='customeraccount')
 
 # YÖNETİCİ API'leri için ayrı bir DefaultRouter
 admin_router = DefaultRouter()
@@ -155,7 +165,13 @@ urlpatterns = [
     # Raporlar
     path('reports/general/', ReportView.as_view(), name='report_general'),
     path('reports/detailed-sales/', DetailedSalesReportView.as_view(), name='detailed_sales_report'),
+    path('reports/exports/<int:pk>/', ReportExportJobView.as_view(), name='report_export_status'),
+    path('reports/exports/<int:pk>/download/', ReportExportDownloadView.as_view(), name='report_export_download'),
+    path('reports/jobs/<int:pk>/', ReportJobView.as_view(), name='report_job_status'),
+    path('reports/kds-latency/', KDSLatencyReportView.as_view(), name='kds_latency_report'),
     path('reports/staff-performance/', StaffPerformanceReportView.as_view(), name='staff_performance_report'),
+    path('reports/customer-cohorts/', CustomerCohortReportView.as_view(), name='customer_cohort_report'),
+    path('reports/menu-engineering/', MenuEngineeringReportView.as_view(), name='menu_engineering_report'),
 
     # Kimlik Doğrulama ve Hesap Yönetimi
     path('register/', RegisterView.as_view(), name='register'),
@@ -0,0 +1,116 @@
+# core/utils/cache_utils.py
+
+import logging
+import random
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Önbellek anahtarları için ön ekler
+NAMESPACE_VERSION_KEY = "cache_version_{namespace}"
+BUSINESS_VERSION_KEY = "cache_version_{namespace}_business_{business_id}"
+LOCK_KEY = "{key}_lock"
+
+# Yeniden hesaplama kilidinin en fazla ne kadar tutulacağı (saniye)
+DEFAULT_LOCK_TIMEOUT = 10
+# Kilidi alamayan isteklerin değeri bekleme süresi ve aralığı (saniye)
+DEFAULT_WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+
+def _version_key(namespace, business_id=None):
+    if business_id is None:
+        return NAMESPACE_VERSION_KEY.format(namespace=namespace)
+    return BUSINESS_VERSION_KEY.format(namespace=namespace, business_id=business_id)
+
+
+def get_cache_version(namespace, business_id=None):
+    """Ad alanının (verilmişse işletmeye özel) güncel sürüm numarasını döner."""
+    return cache.get(_version_key(namespace, business_id), 0)
+
+
+def bump_cache_version(namespace, business_id=None):
+    """
+    Ad alanının sürümünü artırır. Eski sürümle üretilmiş tüm anahtarlar artık okunmaz
+    ve zaman aşımıyla kendiliğinden silinir.
+    """
+    version_key = _version_key(namespace, business_id)
+    try:
+        return cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, None)
+        return 1
+
+
+def make_cache_key(namespace, *parts, business_id=None):
+    """
+    Sürümlü önbellek anahtarı üretir. 'business_id' verilirse anahtar hem ad alanının
+    hem de o işletmenin sürümünü içerir; ikisinden biri artırıldığında anahtar değişir.
+    """
+    if business_id is None:
+        prefix = f"{namespace}:v{get_cache_version(namespace)}"
+    else:
+        namespace_key = _version_key(namespace)
+        business_key = _version_key(namespace, business_id)
+        versions = cache.get_many([namespace_key, business_key])
+        prefix = (
+            f"{namespace}:b{business_id}:"
+            f"v{versions.get(namespace_key, 0)}.{versions.get(business_key, 0)}"
+        )
+    return ":".join([prefix, *(str(part) for part in parts)])
+
+
+def get_or_compute(key, compute, timeout, lock_timeout=DEFAULT_LOCK_TIMEOUT, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+    """
+    Değeri önbellekten döner; yoksa 'compute()' ile hesaplayıp yazar.
+
+    Aynı anahtar için eşzamanlı isteklerde yalnızca kilidi alan hesaplama yapar, diğerleri
+    kısa bir süre değerin yazılmasını bekler (cache stampede koruması). Değer, süresi
+    dolmadan önce rastgele bir erken yenileme payıyla da yenilenebilir; böylece tüm
+    süreçler aynı anda boş önbelleğe düşmez.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None:
+        # Erken yenileme: süresi dolmaya yakın değerler için tek bir istek yenilemeyi üstlenir
+        # (kilidi alamayan diğer istekler mevcut değeri kullanmaya devam eder).
+        refresh_at = entry['expires_at'] - timeout * 0.1 * random.random()
+        if now < refresh_at or not cache.add(LOCK_KEY.format(key=key), 1, lock_timeout):
+            return entry['value']
+        return _compute_and_store(key, compute, timeout)
+
+    lock_key = LOCK_KEY.format(key=key)
+    acquired = cache.add(lock_key, 1, lock_timeout)
+    if acquired:
+        return _compute_and_store(key, compute, timeout)
+    if acquired is None:
+        # IGNORE_EXCEPTIONS açıkken Redis erişilemezse add() None döner: kilidi tutan biri yoktur,
+        # beklemek yalnızca gecikme ekler. Değer hemen hesaplanır (önbelleğe yazılmaz).
+        logger.debug(f"[Cache] '{key}' için önbellek erişilemiyor, değer doğrudan hesaplanıyor.")
+        return compute()
+
+    deadline = now + wait_timeout
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        found = cache.get_many([key, lock_key])
+        if key in found:
+            return found[key]['value']
+        if lock_key not in found:
+            # Kilit bırakıldı ama değer yok (hesaplama başarısız oldu veya önbellek kesildi).
+            break
+
+    # Kilidi tutan süreç zamanında bitiremediyse bu istek kendi değerini hesaplar.
+    logger.warning(f"[Cache] '{key}' için değer beklenirken bulunamadı, yeniden hesaplanıyor.")
+    return compute()
+
+
+def _compute_and_store(key, compute, timeout):
+    try:
+        value = compute()
+        # Fiziksel süre, erken yenileme sırasında eski değerin hâlâ okunabilmesi için biraz daha uzundur.
+        cache.set(key, {'value': value, 'expires_at': time.time() + timeout}, int(timeout * 1.1) + 1)
+        return value
+    finally:
+        cache.delete(LOCK_KEY.format(key=key))
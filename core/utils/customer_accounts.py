@@ -0,0 +1,216 @@
+# core/utils/customer_accounts.py
+
+import logging
+import re
+from decimal import Decimal
+
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+
+from ..models import CustomerAccount, CustomerLedgerEntry, CreditPaymentDetails
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+
+def normalize_phone(phone):
+    """Telefonu yalnızca rakamlara indirger; ülke kodu/baştaki sıfır farkları için son 10 hane alınır."""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-10:] if len(digits) > 10 else digits
+
+
+def account_key_for(name, phone, order_id=None):
+    """
+    Hesaplar yalnızca telefonla birleştirilir. Aynı isimli farklı müşteriler tek hesapta
+    toplanmasın diye telefonsuz veresiye siparişe özel bir hesaba yazılır.
+    """
+    normalized_phone = normalize_phone(phone)
+    if normalized_phone:
+        return f"tel:{normalized_phone}"
+    if ' '.join((name or '').split()) and order_id:
+        return f"siparis:{order_id}"
+    return None
+
+
+def get_or_create_account(business, name, phone, order_id=None):
+    """
+    Müşterinin cari hesabını bulur veya oluşturur. Telefonsuz siparişin hesabı eşleştirme
+    bekliyor olarak işaretlenir. Ne telefon ne isim varsa None döner.
+    """
+    account_key = account_key_for(name, phone, order_id)
+    if not account_key:
+        return None
+    account = CustomerAccount.objects.filter(business=business, account_key=account_key).first()
+    if account:
+        return account
+    try:
+        with transaction.atomic():
+            return CustomerAccount.objects.create(
+                business=business, account_key=account_key, name=name or '', phone=phone or None,
+                needs_linking=not account_key.startswith('tel:')
+            )
+    except IntegrityError:
+        return CustomerAccount.objects.get(business=business, account_key=account_key)
+
+
+@transaction.atomic
+def post_ledger_entry(account_id, entry_type, amount, order=None, payment_type=None, note='', user=None):
+    """
+    Hesaba hareket yazar ve bakiyeyi aynı transaction içinde günceller. Hesap satırı
+    kilitlendiği için eşzamanlı hareketlerin 'balance_after' değerleri sıralıdır.
+    """
+    account = CustomerAccount.objects.select_for_update().get(id=account_id)
+    now = timezone.now()
+    account.balance += amount
+    account.last_activity_at = now
+    account.save(update_fields=['balance', 'last_activity_at'])
+    return CustomerLedgerEntry.objects.create(
+        account=account, entry_type=entry_type, amount=amount, balance_after=account.balance,
+        order=order, payment_type=payment_type, note=note, created_by=user, created_at=now
+    )
+
+
+@transaction.atomic
+def charge_credit_sale(order, credit_details, user=None):
+    """
+    Veresiye kaydedilen siparişi müşterinin hesabına borç olarak yazar. Sipariş zaten bir
+    hesaba yazılmışsa tekrar borçlandırılmaz.
+    """
+    if credit_details.account_id:
+        return None
+    account = get_or_create_account(order.business, order.customer_name, order.customer_phone, order.id)
+    if account is None:
+        logger.warning(f"Sipariş #{order.id} veresiye kaydı müşteri bilgisi olmadığı için cari hesaba yazılamadı.")
+        return None
+    credit_details.account = account
+    credit_details.save(update_fields=['account'])
+    return post_ledger_entry(
+        account.id, CustomerLedgerEntry.ENTRY_CHARGE, Decimal(str(order.grand_total)),
+        order=order, note=f"Sipariş #{order.id}", user=user
+    )
+
+
+@transaction.atomic
+def settle_credit_order(credit_details, payment_type, user=None):
+    """
+    Hesaba bağlı tek bir veresiye siparişinin kalan borcunu tahsil edilmiş sayar (sipariş
+    doğrudan 'ödendi' işaretlendiğinde). Kalan tutar hesaptan düşülür.
+    """
+    if not credit_details.account_id:
+        return None
+    credit_details = CreditPaymentDetails.objects.select_for_update().select_related('order').get(id=credit_details.id)
+    remaining = Decimal(str(credit_details.order.grand_total)) - credit_details.settled_amount
+    if remaining <= ZERO:
+        return None
+    credit_details.settled_amount += remaining
+    credit_details.save(update_fields=['settled_amount'])
+    return post_ledger_entry(
+        credit_details.account_id, CustomerLedgerEntry.ENTRY_PAYMENT, -remaining,
+        order=credit_details.order, payment_type=payment_type, note=f"Sipariş #{credit_details.order_id} tahsilatı", user=user
+    )
+
+
+@transaction.atomic
+def record_account_payment(account, amount, payment_type, user=None, note=''):
+    """
+    Hesaba (kısmi) tahsilat yazar ve tutarı en eski açık veresiye siparişlerine dağıtır.
+    Yalnızca açık siparişler okunur. Dönüş: (hareket, tamamen kapanan veresiye kayıtları).
+    Tamamen kapanan siparişlerin 'ödendi' olarak işaretlenmesi çağırana aittir.
+    """
+    account = CustomerAccount.objects.select_for_update().get(id=account.id)
+    if amount <= ZERO:
+        raise ValueError("Tahsilat tutarı pozitif olmalıdır.")
+    if amount > account.balance:
+        raise ValueError(f"Tahsilat tutarı hesap bakiyesini ({account.balance}) aşamaz.")
+
+    entry = post_ledger_entry(
+        account.id, CustomerLedgerEntry.ENTRY_PAYMENT, -amount, payment_type=payment_type, note=note, user=user
+    )
+
+    remaining = amount
+    fully_settled = []
+    open_credits = CreditPaymentDetails.objects.select_for_update().filter(
+        account=account, paid_at__isnull=True
+    ).select_related('order').order_by('created_at', 'id')
+    for credit_details in open_credits:
+        if remaining <= ZERO:
+            break
+        due = Decimal(str(credit_details.order.grand_total)) - credit_details.settled_amount
+        applied = min(due, remaining)
+        credit_details.settled_amount += applied
+        credit_details.save(update_fields=['settled_amount'])
+        remaining -= applied
+        if credit_details.settled_amount >= credit_details.order.grand_total:
+            fully_settled.append(credit_details)
+
+    logger.info(
+        f"Cari hesap #{account.id}: {amount} tahsilat alındı, {len(fully_settled)} veresiye sipariş kapandı "
+        f"(yeni bakiye: {entry.balance_after})."
+    )
+    return entry, fully_settled
+
+
+@transaction.atomic
+def link_customer_account(source, target, user=None):
+    """
+    Eşleştirme bekleyen (telefonsuz) hesabı müşterinin gerçek hesabına bağlar: açık veresiye
+    kayıtları hedefe taşınır, kalan borç iki düzeltme hareketiyle aktarılır. Kaynak hesabın
+    geçmişi denetim için korunur.
+    """
+    if source.id == target.id or source.business_id != target.business_id:
+        raise ValueError("Hesap yalnızca aynı işletmedeki başka bir hesaba bağlanabilir.")
+    # Kilitler sabit sırayla alınır.
+    locked = {
+        account.id: account
+        for account in CustomerAccount.objects.select_for_update().filter(id__in=[source.id, target.id]).order_by('id')
+    }
+    source, target = locked[source.id], locked[target.id]
+    if not source.needs_linking:
+        raise ValueError("Bu hesap eşleştirme beklemiyor.")
+
+    moved = CreditPaymentDetails.objects.filter(account=source, paid_at__isnull=True).update(account=target)
+    if source.balance:
+        note = f"Hesap #{source.id} -> #{target.id} eşleştirmesi"
+        post_ledger_entry(source.id, CustomerLedgerEntry.ENTRY_ADJUSTMENT, -source.balance, note=note, user=user)
+        post_ledger_entry(target.id, CustomerLedgerEntry.ENTRY_ADJUSTMENT, source.balance, note=note, user=user)
+    CustomerAccount.objects.filter(id=source.id).update(needs_linking=False)
+    logger.info(f"Cari hesap #{source.id}, #{target.id} hesabına bağlandı ({moved} açık veresiye taşındı).")
+    return CustomerAccount.objects.get(id=target.id)
+
+
+@transaction.atomic
+def rebuild_customer_accounts(business_id):
+    """
+    İşletmenin cari hesaplarını mevcut veresiye kayıtlarından yeniden oluşturur (ilk geçiş
+    veya onarım için). Kapanmış veresiyeler için borç ve tahsilat hareketi birlikte yazılır.
+    """
+    CustomerLedgerEntry.objects.filter(account__business_id=business_id).delete()
+    CustomerAccount.objects.filter(business_id=business_id).update(balance=ZERO)
+    credits = CreditPaymentDetails.objects.filter(order__business_id=business_id).select_related(
+        'order__business', 'order__payment_info'
+    ).order_by('created_at', 'id')
+
+    count = 0
+    for credit_details in credits.iterator(chunk_size=500):
+        order = credit_details.order
+        account = get_or_create_account(order.business, order.customer_name, order.customer_phone, order.id)
+        if account is None:
+            continue
+        grand_total = Decimal(str(order.grand_total))
+        charge = post_ledger_entry(
+            account.id, CustomerLedgerEntry.ENTRY_CHARGE, grand_total, order=order, note=f"Sipariş #{order.id}"
+        )
+        CustomerLedgerEntry.objects.filter(id=charge.id).update(created_at=credit_details.created_at)
+        settled = grand_total if credit_details.paid_at else ZERO
+        if credit_details.paid_at:
+            payment_info = getattr(order, 'payment_info', None)
+            payment = post_ledger_entry(
+                account.id, CustomerLedgerEntry.ENTRY_PAYMENT, -grand_total, order=order,
+                payment_type=payment_info.payment_type if payment_info else None, note=f"Sipariş #{order.id} tahsilatı"
+            )
+            CustomerLedgerEntry.objects.filter(id=payment.id).update(created_at=credit_details.paid_at)
+        CreditPaymentDetails.objects.filter(id=credit_details.id).update(account=account, settled_amount=settled)
+        count += 1
+    logger.info(f"[Customer Accounts] İşletme #{business_id} için {count} veresiye kaydı cari hesaplara işlendi.")
+    return count
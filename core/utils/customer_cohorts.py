@@ -0,0 +1,159 @@
+# core/utils/customer_cohorts.py
+
+import hashlib
+import hmac
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..models import (
+    Payment, Reservation, WaitingCustomer, CustomerIdentity, CustomerCohortWeekly
+)
+from .customer_accounts import normalize_phone
+from .sales_rollups import _increment, local_date
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+SOURCE_ORDER = 'order'
+SOURCE_RESERVATION = 'reservation'
+SOURCE_WAITLIST = 'waitlist'
+SOURCE_COUNTER_FIELDS = {
+    SOURCE_ORDER: 'order_count',
+    SOURCE_RESERVATION: 'reservation_count',
+    SOURCE_WAITLIST: 'waitlist_count',
+}
+
+
+def hash_phone(phone):
+    """Normalize edilmiş telefonun anahtarlı özeti (HMAC-SHA256). Telefon yoksa None."""
+    normalized = normalize_phone(phone)
+    if not normalized:
+        return None
+    return hmac.new(settings.SECRET_KEY.encode('utf-8'), normalized.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+@transaction.atomic
+def record_customer_touch(business_id, phone, name, occurred_at, source, spend=ZERO):
+    """
+    Müşteri temasını (ödenen paket sipariş, oturan rezervasyon, bekleme listesi kaydı)
+    kimlik ve haftalık kohort tablolarına işler. Kimlik satırı kilitlenir; böylece aynı
+    müşterinin eşzamanlı temasları ziyaret ve aktif müşteri sayılarını iki kez artırmaz.
+    """
+    phone_hash = hash_phone(phone)
+    if not phone_hash:
+        return
+    spend = Decimal(str(spend))
+    day = local_date(occurred_at)
+    week = week_start(day)
+
+    identity, created = CustomerIdentity.objects.select_for_update().get_or_create(
+        business_id=business_id, phone_hash=phone_hash,
+        defaults={
+            'phone_suffix': normalize_phone(phone)[-2:], 'display_name': name or '',
+            'first_seen_at': occurred_at, 'last_seen_at': occurred_at,
+            'first_visit_week': week, 'last_visit_date': day,
+        }
+    )
+    new_visit = created or day > identity.last_visit_date
+    new_active_week = created or week > week_start(identity.last_visit_date)
+
+    updates = {
+        SOURCE_COUNTER_FIELDS[source]: F(SOURCE_COUNTER_FIELDS[source]) + 1,
+        'total_spend': F('total_spend') + spend,
+    }
+    if new_visit:
+        updates['visit_count'] = F('visit_count') + 1
+    if not created and day > identity.last_visit_date:
+        updates['last_visit_date'] = day
+    if occurred_at > identity.last_seen_at:
+        updates['last_seen_at'] = occurred_at
+        if name:
+            updates['display_name'] = name
+    CustomerIdentity.objects.filter(id=identity.id).update(**updates)
+
+    _increment(
+        CustomerCohortWeekly,
+        {'business_id': business_id, 'cohort_week': identity.first_visit_week, 'activity_week': week},
+        {'customers': int(new_active_week), 'visits': int(new_visit), 'spend': spend}
+    )
+
+
+def _iter_customer_touches(business_id):
+    """Kaynak tablolardaki tüm müşteri temasları: (zaman, telefon, isim, kaynak, harcama)."""
+    for row in Payment.objects.filter(
+        order__business_id=business_id, order__order_type='takeaway', order__customer_phone__isnull=False
+    ).exclude(order__customer_phone='').values('payment_date', 'order__customer_phone', 'order__customer_name', 'amount'):
+        yield row['payment_date'], row['order__customer_phone'], row['order__customer_name'], SOURCE_ORDER, row['amount']
+    for row in Reservation.objects.filter(
+        business_id=business_id, status=Reservation.Status.SEATED
+    ).values('reservation_time', 'customer_phone', 'customer_name'):
+        yield row['reservation_time'], row['customer_phone'], row['customer_name'], SOURCE_RESERVATION, ZERO
+    for row in WaitingCustomer.objects.filter(
+        business_id=business_id, phone__isnull=False
+    ).exclude(phone='').values('created_at', 'phone', 'name'):
+        yield row['created_at'], row['phone'], row['name'], SOURCE_WAITLIST, ZERO
+
+
+def rebuild_customer_cohorts(business_id):
+    """
+    Müşteri kimliklerini ve haftalık kohort tablosunu kaynak kayıtlardan yeniden oluşturur.
+    Temaslar zaman sırasıyla bellekte işlenir; sonuç toplu olarak yazılır.
+    """
+    identities = {}
+    cohorts = defaultdict(lambda: {'customers': 0, 'visits': 0, 'spend': ZERO})
+    for occurred_at, phone, name, source, spend in sorted(_iter_customer_touches(business_id), key=lambda touch: touch[0]):
+        phone_hash = hash_phone(phone)
+        if not phone_hash:
+            continue
+        day = local_date(occurred_at)
+        week = week_start(day)
+        identity = identities.get(phone_hash)
+        if identity is None:
+            identity = identities[phone_hash] = CustomerIdentity(
+                business_id=business_id, phone_hash=phone_hash, phone_suffix=normalize_phone(phone)[-2:],
+                display_name=name or '', first_seen_at=occurred_at, last_seen_at=occurred_at,
+                first_visit_week=week, last_visit_date=day, total_spend=ZERO,
+            )
+            new_visit = new_active_week = True
+        else:
+            new_visit = day > identity.last_visit_date
+            new_active_week = week > week_start(identity.last_visit_date)
+            identity.last_visit_date = max(identity.last_visit_date, day)
+            identity.last_seen_at = occurred_at
+            if name:
+                identity.display_name = name
+        identity.visit_count += int(new_visit)
+        setattr(identity, SOURCE_COUNTER_FIELDS[source], getattr(identity, SOURCE_COUNTER_FIELDS[source]) + 1)
+        identity.total_spend += spend or ZERO
+
+        cohort = cohorts[(identity.first_visit_week, week)]
+        cohort['customers'] += int(new_active_week)
+        cohort['visits'] += int(new_visit)
+        cohort['spend'] += spend or ZERO
+
+    with transaction.atomic():
+        CustomerIdentity.objects.filter(business_id=business_id).delete()
+        CustomerCohortWeekly.objects.filter(business_id=business_id).delete()
+        CustomerIdentity.objects.bulk_create(identities.values(), batch_size=1000)
+        CustomerCohortWeekly.objects.bulk_create(
+            [
+                CustomerCohortWeekly(business_id=business_id, cohort_week=cohort_week, activity_week=activity_week, **values)
+                for (cohort_week, activity_week), values in cohorts.items()
+            ],
+            batch_size=1000
+        )
+    logger.info(
+        f"[Customer Cohorts] İşletme #{business_id} için {len(identities)} müşteri kimliği ve "
+        f"{len(cohorts)} kohort satırı yeniden oluşturuldu."
+    )
@@ -0,0 +1,236 @@
+# core/utils/daily_close.py
+
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytz
+from django.db import transaction, IntegrityError
+from django.db.models import Sum, Count
+from django.utils import timezone
+
+from ..models import (
+    Business, Order, OrderItem, Payment, CreditPaymentDetails, OrderTransfer, DailyClose
+)
+from .sales_rollups import LINE_TOTAL
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+# Gün sonu raporunda doğrudan toplanan sayısal alanlar (çok günlü özet bunları toplar)
+DAILY_CLOSE_TOTAL_FIELDS = (
+    'gross_sales', 'payment_count', 'net_sales', 'vat_total', 'void_count', 'void_amount',
+    'transfer_count', 'credit_sales_count', 'credit_sales_amount',
+    'credit_collected_count', 'credit_collected_amount',
+)
+
+
+def _business_tz(business):
+    try:
+        return pytz.timezone(business.timezone)
+    except pytz.UnknownTimeZoneError:
+        return timezone.get_current_timezone()
+
+
+def business_day_bounds(business, business_date):
+    """
+    İş gününün [başlangıç, bitiş) aralığı: işletmenin yerel saatinde 'business_date'
+    günündeki kapanış saatinden ertesi günün kapanış saatine kadar.
+    """
+    tz = _business_tz(business)
+    start = tz.localize(datetime.combine(business_date, business.day_close_time))
+    end = tz.localize(datetime.combine(business_date + timedelta(days=1), business.day_close_time))
+    return start, end
+
+
+def current_business_date(business, now=None):
+    """Verilen anın (varsayılan: şimdi) düştüğü iş günü."""
+    local_now = (now or timezone.now()).astimezone(_business_tz(business))
+    if local_now.time() < business.day_close_time:
+        return local_now.date() - timedelta(days=1)
+    return local_now.date()
+
+
+def build_daily_close_totals(business, period_start, period_end):
+    """
+    Dönemin gün sonu toplamlarını hesaplar. Her kırılım tek bir gruplu sorguyla alınır;
+    ham kayıtlar Python'a taşınmaz.
+    """
+    payments = Payment.objects.filter(
+        order__business=business, payment_date__gte=period_start, payment_date__lt=period_end
+    )
+
+    payment_breakdown = {}
+    gross_sales, payment_count = ZERO, 0
+    for row in payments.values('payment_type').annotate(amount=Sum('amount'), count=Count('id')).order_by('payment_type'):
+        payment_breakdown[row['payment_type']] = {'amount': row['amount'] or ZERO, 'count': row['count']}
+        gross_sales += row['amount'] or ZERO
+        payment_count += row['count']
+
+    vat_breakdown = {}
+    net_sales, vat_total = ZERO, ZERO
+    vat_rows = OrderItem.objects.filter(
+        order__business=business,
+        order__payment_info__payment_date__gte=period_start,
+        order__payment_info__payment_date__lt=period_end,
+    ).values('kdv_rate').annotate(net=Sum(LINE_TOTAL), vat=Sum('kdv_amount')).order_by('kdv_rate')
+    for row in vat_rows:
+        net, vat = row['net'] or ZERO, row['vat'] or ZERO
+        vat_breakdown[str(row['kdv_rate'])] = {'net': net, 'vat': vat, 'gross': net + vat}
+        net_sales += net
+        vat_total += vat
+
+    staff_takings = [
+        {
+            'staff_id': row['order__taken_by_staff_id'],
+            'username': row['order__taken_by_staff__username'],
+            'order_count': row['count'],
+            'amount': row['amount'] or ZERO,
+        }
+        for row in payments.values('order__taken_by_staff_id', 'order__taken_by_staff__username').annotate(
+            amount=Sum('amount'), count=Count('id')
+        ).order_by('-amount')
+    ]
+
+    voids = Order.objects.filter(
+        business=business,
+        status__in=[Order.STATUS_CANCELLED, Order.STATUS_REJECTED],
+        created_at__gte=period_start, created_at__lt=period_end,
+    ).aggregate(count=Count('id'), amount=Sum('grand_total'))
+
+    credit_details = CreditPaymentDetails.objects.filter(order__business=business)
+    credit_sales = credit_details.filter(
+        created_at__gte=period_start, created_at__lt=period_end
+    ).aggregate(count=Count('id'), amount=Sum('order__grand_total'))
+    credit_collected = credit_details.filter(
+        paid_at__gte=period_start, paid_at__lt=period_end
+    ).aggregate(count=Count('id'), amount=Sum('order__grand_total'))
+
+    transfer_count = OrderTransfer.objects.filter(
+        business=business, created_at__gte=period_start, created_at__lt=period_end
+    ).count()
+
+    return {
+        'gross_sales': gross_sales,
+        'payment_count': payment_count,
+        'net_sales': net_sales,
+        'vat_total': vat_total,
+        'void_count': voids['count'],
+        'void_amount': voids['amount'] or ZERO,
+        'transfer_count': transfer_count,
+        'credit_sales_count': credit_sales['count'],
+        'credit_sales_amount': credit_sales['amount'] or ZERO,
+        'credit_collected_count': credit_collected['count'],
+        'credit_collected_amount': credit_collected['amount'] or ZERO,
+        'payment_breakdown': payment_breakdown,
+        'vat_breakdown': vat_breakdown,
+        'staff_takings': staff_takings,
+    }
+
+
+def close_business_day(business, business_date, closed_by=None):
+    """
+    İş gününü kapatır ve toplamları değişmez bir DailyClose kaydına yazar. Gün zaten
+    kapatılmışsa (eşzamanlı kapanış dahil) mevcut kayıt döner; ikinci bir kayıt oluşmaz.
+    Dönüş: (kayıt, yeni oluşturuldu mu).
+    """
+    existing = DailyClose.objects.filter(business=business, business_date=business_date).first()
+    if existing:
+        return existing, False
+
+    period_start, period_end = business_day_bounds(business, business_date)
+    totals = build_daily_close_totals(business, period_start, period_end)
+    try:
+        with transaction.atomic():
+            daily_close = DailyClose.objects.create(
+                business=business, business_date=business_date,
+                period_start=period_start, period_end=period_end,
+                closed_by=closed_by, **totals
+            )
+    except IntegrityError:
+        return DailyClose.objects.get(business=business, business_date=business_date), False
+
+    logger.info(
+        f"[Daily Close] İşletme #{business.id} için {business_date} iş günü kapatıldı "
+        f"(tahsilat: {daily_close.gross_sales}, ödeme: {daily_close.payment_count})."
+    )
+    return daily_close, True
+
+
+def close_pending_business_days(business, since=None, now=None):
+    """
+    Bitmiş ancak henüz kapatılmamış iş günlerini kapatır. 'since' verilmezse yalnızca
+    son biten gün kapatılır. Kapatılan gün sayısını döner.
+    """
+    last_ended = current_business_date(business, now) - timedelta(days=1)
+    day = since or last_ended
+    already_closed = set(
+        DailyClose.objects.filter(business=business, business_date__range=(day, last_ended))
+        .values_list('business_date', flat=True)
+    )
+    closed = 0
+    while day <= last_ended:
+        if day not in already_closed:
+            _, created = close_business_day(business, day)
+            closed += int(created)
+        day += timedelta(days=1)
+    return closed
+
+
+def close_all_business_days(now=None):
+    """Tüm işletmelerin son biten iş gününü kapatır (periyodik görev)."""
+    closed = 0
+    for business in Business.objects.only('id', 'timezone', 'day_close_time').iterator():
+        closed += close_pending_business_days(business, now=now)
+    return closed
+
+
+def summarize_daily_closes(business, start_date, end_date):
+    """
+    Tarih aralığındaki kapatılmış günlerin toplamı. Ham kayıtlar yerine gün sonu
+    satırları toplanır; kapatılmamış günler 'missing_dates' içinde listelenir.
+    """
+    closes = list(
+        DailyClose.objects.filter(business=business, business_date__range=(start_date, end_date))
+        .order_by('business_date')
+    )
+
+    summary = {field: 0 for field in DAILY_CLOSE_TOTAL_FIELDS}
+    payment_breakdown, vat_breakdown, staff_takings = {}, {}, {}
+    for close in closes:
+        for field in DAILY_CLOSE_TOTAL_FIELDS:
+            summary[field] += getattr(close, field)
+        for payment_type, values in close.payment_breakdown.items():
+            entry = payment_breakdown.setdefault(payment_type, {'amount': ZERO, 'count': 0})
+            entry['amount'] += Decimal(str(values['amount']))
+            entry['count'] += values['count']
+        for rate, values in close.vat_breakdown.items():
+            entry = vat_breakdown.setdefault(rate, {'net': ZERO, 'vat': ZERO, 'gross': ZERO})
+            for key in entry:
+                entry[key] += Decimal(str(values[key]))
+        for row in close.staff_takings:
+            entry = staff_takings.setdefault(
+                row['staff_id'], {'staff_id': row['staff_id'], 'username': row['username'], 'order_count': 0, 'amount': ZERO}
+            )
+            entry['order_count'] += row['order_count']
+            entry['amount'] += Decimal(str(row['amount']))
+
+    closed_dates = {close.business_date for close in closes}
+    missing_dates = []
+    day = start_date
+    while day <= end_date:
+        if day not in closed_dates:
+            missing_dates.append(day)
+        day += timedelta(days=1)
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'closed_day_count': len(closes),
+        'missing_dates': missing_dates,
+        **summary,
+        'payment_breakdown': payment_breakdown,
+        'vat_breakdown': dict(sorted(vat_breakdown.items(), key=lambda item: Decimal(item[0]))),
+        'staff_takings': sorted(staff_takings.values(), key=lambda row: row['amount'], reverse=True),
+    }
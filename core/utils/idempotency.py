@@ -0,0 +1,126 @@
+# core/utils/idempotency.py
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from ..models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _request_scope(request):
+    user = getattr(request, 'user', None)
+    return f'user:{user.pk}' if user is not None and user.is_authenticated else 'guest'
+
+
+def request_fingerprint(request):
+    """Aynı anahtarın farklı bir istekte kullanılmasını yakalamak için yöntem, yol ve gövdenin özeti."""
+    encoded = json.dumps(
+        [request.method, request.path, request.data],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _is_reclaimable(record, now):
+    if record.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS):
+        return True
+    # Yanıtı hiç kaydedilmemiş eski anahtar: işleyen süreç yarıda kalmış.
+    return record.status_code is None and \
+        record.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+
+
+def claim_idempotency_key(scope, key, request_hash):
+    """
+    Anahtarı bu istek adına ayırır. (kayıt, True) dönerse istek işlenmelidir; (kayıt, False)
+    dönerse aynı anahtarla daha önce gelmiş bir istek vardır. Süresi dolmuş veya yarıda kalmış
+    kayıtlar yeniden ayrılır.
+    """
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(scope=scope, key=key, request_hash=request_hash), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+            if record is None:
+                continue
+            if not _is_reclaimable(record, timezone.now()):
+                return record, False
+            # Yalnızca okunan kayıt silinir; eşzamanlı bir ayırma başka bir kayıt oluşturduysa dokunulmaz.
+            IdempotencyKey.objects.filter(id=record.id, created_at=record.created_at).delete()
+    return IdempotencyKey.objects.get(scope=scope, key=key), False
+
+
+def store_idempotent_response(record, response):
+    """Başarılı yanıtı JSON olarak saklar; tekrarlar bu gövdeyi ve kodu birebir alır."""
+    body = json.loads(JSONRenderer().render(response.data)) if response.data is not None else None
+    IdempotencyKey.objects.filter(id=record.id).update(status_code=response.status_code, response_body=body)
+
+
+def replay_idempotent_response(record, request_hash):
+    if record.request_hash != request_hash:
+        return Response(
+            {'detail': f"Bu {IDEMPOTENCY_HEADER} farklı bir istek için kullanılmış."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record.status_code is None:
+        return Response(
+            {'detail': "Aynı anahtarlı istek hâlâ işleniyor. Lütfen kısa süre sonra tekrar deneyin."},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response(record.response_body, status=record.status_code, headers={REPLAY_HEADER: 'true'})
+
+
+def idempotent(view_method):
+    """
+    'Idempotency-Key' başlığı taşıyan yazma isteklerini tekrarlara karşı korur. İlk istek anahtarı
+    ayırır ve işlenir; başarılı (2xx) yanıtı saklanır. Aynı anahtarla gelen tekrarlar sipariş
+    tablolarına, kilitlere ve bildirimlere dokunmadan saklanan yanıtı alır. Hata yanıtlarında
+    anahtar bırakılır; istemci aynı anahtarla yeniden deneyebilir. Başlık yoksa davranış değişmez.
+
+    Görünümün kendi transaction.atomic'inin dışında (en üstte) kullanılmalıdır; böylece anahtar
+    ayrımı ve yanıt kaydı sipariş işleminden bağımsız olarak kalıcı olur.
+    """
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f"{IDEMPOTENCY_HEADER} en fazla {MAX_KEY_LENGTH} karakter olabilir."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        request_hash = request_fingerprint(request)
+        record, claimed = claim_idempotency_key(_request_scope(request), key, request_hash)
+        if not claimed:
+            logger.info(f"[Idempotency] {request.method} {request.path} tekrarı saklanan yanıtla karşılandı (anahtar: {key}).")
+            return replay_idempotent_response(record, request_hash)
+
+        try:
+            response = view_method(view, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if status.is_success(response.status_code):
+            store_idempotent_response(record, response)
+        else:
+            record.delete()
+        return response
+    return wrapper
@@ -0,0 +1,159 @@
+# core/utils/kds_feed.py
+
+import logging
+
+from django.db.models import F
+
+from ..models import Order, OrderItem, OrderRevision, KDSScreen, KDSFeedSequence
+from .outbox import enqueue_notification
+
+logger = logging.getLogger(__name__)
+
+KDS_FEED_SOCKET_EVENT = 'kds_feed_update'
+ACTIVE_ORDER_STATUSES = (Order.STATUS_APPROVED, Order.STATUS_PREPARING, Order.STATUS_READY_FOR_PICKUP)
+ACTIVE_ITEM_STATUSES = (OrderItem.KDS_ITEM_STATUS_PENDING, OrderItem.KDS_ITEM_STATUS_PREPARING)
+
+
+def _extras_display(item):
+    menu_item = item.get('menu_item') or {}
+    if menu_item.get('is_campaign_bundle'):
+        return ""
+    return ", ".join(f"{extra['variant_name']} (x{extra['quantity']})" for extra in item.get('extras') or [])
+
+
+def _build_feed_item(snapshot, item):
+    menu_item = item.get('menu_item') or {}
+    variant = item.get('variant') or {}
+    return {
+        'item_id': item['id'],
+        'order_id': snapshot['id'],
+        'order_type': snapshot.get('order_type'),
+        'table_number': snapshot.get('table_number'),
+        'customer_name': snapshot.get('customer_name'),
+        'order_status': snapshot.get('status'),
+        'order_created_at': snapshot.get('created_at'),
+        'menu_item_name': menu_item.get('name'),
+        'variant_name': variant.get('name'),
+        'quantity': item.get('quantity'),
+        'extras_display': _extras_display(item),
+        'table_user': item.get('table_user'),
+        'kds_status': item.get('kds_status'),
+        'kds_status_display': item.get('kds_status_display'),
+        'item_prepared_by_staff_username': item.get('item_prepared_by_staff_username'),
+    }
+
+
+def extract_kds_feed(snapshot):
+    """
+    OrderSerializer anlık görüntüsünden KDS ekranlarında görünmesi gereken kalemleri çıkarır.
+    Dönüş: {kds_slug: {'kds_screen_id': id, 'items': {item_id: feed_item}}}
+    """
+    feed = {}
+    if not snapshot:
+        return feed
+    if snapshot.get('is_paid') or snapshot.get('credit_details') or snapshot.get('status') not in ACTIVE_ORDER_STATUSES:
+        return feed
+
+    for item in snapshot.get('order_items') or []:
+        if item.get('is_awaiting_staff_approval') or item.get('delivered'):
+            continue
+        if item.get('kds_status') not in ACTIVE_ITEM_STATUSES:
+            continue
+        category = (item.get('menu_item') or {}).get('category') or {}
+        kds_details = category.get('assigned_kds_details') or {}
+        kds_slug = kds_details.get('slug')
+        if not kds_slug or not kds_details.get('is_active', True):
+            continue
+        screen_feed = feed.setdefault(kds_slug, {'kds_screen_id': kds_details.get('id'), 'items': {}})
+        screen_feed['items'][item['id']] = _build_feed_item(snapshot, item)
+    return feed
+
+
+def _advance_sequence(kds_screen_id, count):
+    """Ekranın sıra sayacını 'count' kadar artırır ve son değeri döner; ekran silinmişse None."""
+    updated = KDSFeedSequence.objects.filter(kds_screen_id=kds_screen_id).update(value=F('value') + count)
+    if not updated:
+        if not KDSScreen.objects.filter(id=kds_screen_id).exists():
+            return None
+        KDSFeedSequence.objects.get_or_create(kds_screen_id=kds_screen_id)
+        KDSFeedSequence.objects.filter(kds_screen_id=kds_screen_id).update(value=F('value') + count)
+    return KDSFeedSequence.objects.values_list('value', flat=True).get(kds_screen_id=kds_screen_id)
+
+
+def publish_kds_feed_changes(business_id, previous_snapshot, current_snapshot):
+    """
+    Siparişin önceki ve yeni anlık görüntüsünü karşılaştırıp her KDS odasına kalem bazlı
+    ekleme/güncelleme/silme olaylarını sıra numarasıyla giden kutusuna yazar.
+    Çağıranın işlemi içinde çalışmalıdır; sıra sayacının satır kilidi olay sırasını korur.
+    """
+    previous_feed = extract_kds_feed(previous_snapshot)
+    current_feed = extract_kds_feed(current_snapshot)
+
+    # Kilitlenme (deadlock) riskini azaltmak için ekranlar her zaman aynı sırayla işlenir.
+    for kds_slug in sorted(set(previous_feed) | set(current_feed)):
+        before = previous_feed.get(kds_slug, {}).get('items', {})
+        after = current_feed.get(kds_slug, {}).get('items', {})
+        kds_screen_id = (current_feed.get(kds_slug) or previous_feed.get(kds_slug))['kds_screen_id']
+
+        events = []
+        for item_id, feed_item in after.items():
+            if item_id not in before:
+                events.append({'event_type': 'kds_item_added', 'item': feed_item})
+            elif before[item_id] != feed_item:
+                events.append({'event_type': 'kds_item_updated', 'item': feed_item})
+        for item_id, feed_item in before.items():
+            if item_id not in after:
+                events.append({'event_type': 'kds_item_removed', 'item_id': item_id, 'order_id': feed_item['order_id']})
+
+        if not events:
+            continue
+
+        last_sequence = _advance_sequence(kds_screen_id, len(events))
+        if last_sequence is None:
+            continue
+        first_sequence = last_sequence - len(events) + 1
+        room_name = f'kds_{business_id}_{kds_slug}'
+        for offset, event in enumerate(events):
+            event['kds_slug'] = kds_slug
+            event['seq'] = first_sequence + offset
+            enqueue_notification(room_name, KDS_FEED_SOCKET_EVENT, event, business_id=business_id)
+        logger.info(f"[KDS Feed] {room_name}: {len(events)} olay (seq {first_sequence}-{last_sequence}) kuyruğa alındı.")
+
+
+def build_kds_feed_snapshot(business_id, kds_slug):
+    """
+    'join_kds_room' sonrası ekrana gönderilecek başlangıç verisi. Sıra numarası kalemlerden
+    önce okunur; bu numaradan büyük olaylar anlık görüntüden sonraki değişiklikleri taşır.
+    """
+    from ..serializers import OrderSerializer
+
+    kds_screen = KDSScreen.objects.filter(business_id=business_id, slug=kds_slug, is_active=True).first()
+    if kds_screen is None:
+        return None
+    sequence = KDSFeedSequence.objects.filter(kds_screen=kds_screen).values_list('value', flat=True).first() or 0
+
+    active_orders = Order.objects.filter(
+        business_id=business_id,
+        status__in=ACTIVE_ORDER_STATUSES,
+        is_paid=False,
+        credit_payment_details__isnull=True,
+        order_items__menu_item__category__assigned_kds=kds_screen,
+    ).distinct()
+    snapshots = dict(
+        OrderRevision.objects.filter(order__in=active_orders, revision__gt=0).values_list('order_id', 'snapshot')
+    )
+
+    # Henüz hiç yayınlanmamış siparişler (ör. geçiş öncesi oluşturulanlar) anlık olarak serileştirilir.
+    missing_orders = active_orders.exclude(id__in=list(snapshots)).select_related('table').prefetch_related(
+        'order_items__menu_item__category__assigned_kds', 'order_items__variant', 'order_items__extras__variant'
+    )
+    for order in missing_orders:
+        snapshots[order.id] = OrderSerializer(order).data
+
+    items = []
+    for order_id in sorted(snapshots):
+        screen_feed = extract_kds_feed(snapshots[order_id]).get(kds_slug)
+        if screen_feed:
+            items.extend(screen_feed['items'].values())
+    items.sort(key=lambda feed_item: (str(feed_item['order_created_at']), feed_item['item_id']))
+    return {'event_type': 'kds_feed_snapshot', 'kds_slug': kds_slug, 'seq': sequence, 'items': items}
@@ -0,0 +1,205 @@
+# core/utils/kds_latency.py
+
+import logging
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models import OrderItem, KDSLatencyHistogram
+from .sales_rollups import _increment
+
+logger = logging.getLogger(__name__)
+
+# Kova üst sınırları (saniye). Kova i: [BOUNDS[i-1], BOUNDS[i]); son kova: >= BOUNDS[-1].
+LATENCY_BUCKET_BOUNDS = (30, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600)
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+def latency_bucket(seconds):
+    return bisect_right(LATENCY_BUCKET_BOUNDS, seconds)
+
+
+def preparation_started_at(order_item, order):
+    """
+    Kalemin hazırlamasının başladığı an. KDS'te 'hazırlanıyor' adımı atlandıysa mutfağa
+    iletildiği an (sipariş onayı veya sonradan eklenen kalem için kalemin oluşturulması) kullanılır.
+    """
+    if order_item.kds_preparing_at:
+        return order_item.kds_preparing_at
+    if order.approved_at and order.approved_at > order_item.created_at:
+        return order.approved_at
+    return order_item.created_at
+
+
+def _item_placements(order_item_ids):
+    """Kalem ID'si -> (KDS ekranı ID'si, kategori ID'si); tek sorgu."""
+    return {
+        row['id']: (row['menu_item__category__assigned_kds_id'], row['menu_item__category_id'])
+        for row in OrderItem.objects.filter(id__in=order_item_ids).values(
+            'id', 'menu_item__category_id', 'menu_item__category__assigned_kds_id'
+        )
+    }
+
+
+def _record_samples(business_id, metric, samples):
+    """
+    (kalem ID'si, başlangıç, bitiş) örneklerini histogram kovalarına işler. Aynı kovaya
+    düşen örnekler tek bir F-güncellemesiyle artırılır; satırlar sabit sırayla güncellenir.
+    """
+    samples = [(item_id, started_at, ended_at) for item_id, started_at, ended_at in samples if started_at and ended_at]
+    if not samples:
+        return
+    placements = _item_placements([item_id for item_id, _, _ in samples])
+    counts = Counter()
+    for item_id, started_at, ended_at in samples:
+        kds_screen_id, category_id = placements.get(item_id, (None, None))
+        local_start = timezone.localtime(started_at)
+        seconds = max((ended_at - started_at).total_seconds(), 0)
+        counts[(local_start.date(), local_start.hour, kds_screen_id or 0, category_id or 0, latency_bucket(seconds))] += 1
+
+    for (day, hour, kds_screen_id, category_id, bucket), count in sorted(counts.items()):
+        _increment(
+            KDSLatencyHistogram,
+            {
+                'business_id': business_id, 'date': day, 'hour': hour, 'metric': metric, 'bucket': bucket,
+                'kds_screen_id': kds_screen_id or None, 'category_id': category_id or None,
+            },
+            {'count': count}
+        )
+
+
+def record_prep_latencies(order, order_items, ready_at):
+    """'Hazır' durumuna geçen kalemlerin hazırlama sürelerini histograma işler."""
+    _record_samples(
+        order.business_id, KDSLatencyHistogram.METRIC_PREP,
+        [(item.id, preparation_started_at(item, order), ready_at) for item in order_items]
+    )
+
+
+def record_pickup_latencies(order, order_items, picked_up_at):
+    """Garsonun aldığı kalemlerin 'hazır' anından alınmasına kadar geçen süreleri işler."""
+    _record_samples(
+        order.business_id, KDSLatencyHistogram.METRIC_PICKUP,
+        [(item.id, item.kds_ready_at, picked_up_at) for item in order_items]
+    )
+
+
+def rebuild_kds_latency_histograms(business_id):
+    """
+    İşletmenin gecikme histogramını kalemlerdeki geçiş zamanlarından (kds_preparing_at,
+    kds_ready_at, waiter_picked_up_at) yeniden oluşturur. Kalemler imleçle okunur.
+    """
+    counts = Counter()
+    items = OrderItem.objects.filter(order__business_id=business_id, kds_ready_at__isnull=False).values(
+        'created_at', 'kds_preparing_at', 'kds_ready_at', 'waiter_picked_up_at', 'order__approved_at',
+        'menu_item__category_id', 'menu_item__category__assigned_kds_id'
+    )
+    for row in items.iterator(chunk_size=2000):
+        prep_started_at = row['kds_preparing_at'] or max(row['created_at'], row['order__approved_at'] or row['created_at'])
+        intervals = [(KDSLatencyHistogram.METRIC_PREP, prep_started_at, row['kds_ready_at'])]
+        if row['waiter_picked_up_at']:
+            intervals.append((KDSLatencyHistogram.METRIC_PICKUP, row['kds_ready_at'], row['waiter_picked_up_at']))
+        for metric, started_at, ended_at in intervals:
+            local_start = timezone.localtime(started_at)
+            seconds = max((ended_at - started_at).total_seconds(), 0)
+            counts[(
+                local_start.date(), local_start.hour, row['menu_item__category__assigned_kds_id'],
+                row['menu_item__category_id'], metric, latency_bucket(seconds)
+            )] += 1
+
+    with transaction.atomic():
+        KDSLatencyHistogram.objects.filter(business_id=business_id).delete()
+        KDSLatencyHistogram.objects.bulk_create(
+            [
+                KDSLatencyHistogram(
+                    business_id=business_id, date=day, hour=hour, kds_screen_id=kds_screen_id,
+                    category_id=category_id, metric=metric, bucket=bucket, count=count
+                )
+                for (day, hour, kds_screen_id, category_id, metric, bucket), count in counts.items()
+            ],
+            batch_size=1000
+        )
+    logger.info(f"[KDS Latency] İşletme #{business_id} için gecikme histogramı yeniden oluşturuldu ({len(counts)} satır).")
+
+
+def percentiles_from_buckets(bucket_counts, percentiles=REPORT_PERCENTILES):
+    """
+    {kova: adet} histogramından yüzdelikleri (saniye) hesaplar. Değer, kova içinde doğrusal
+    enterpolasyonla bulunur; son (üst sınırsız) kovada alt sınır döner.
+    """
+    total = sum(bucket_counts.values())
+    if not total:
+        return {f'p{p}': None for p in percentiles}
+    result = {}
+    for p in percentiles:
+        rank = total * p / 100
+        cumulative = 0
+        for bucket in sorted(bucket_counts):
+            count = bucket_counts[bucket]
+            if cumulative + count >= rank:
+                lower = LATENCY_BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0
+                if bucket >= len(LATENCY_BUCKET_BOUNDS):
+                    value = lower
+                else:
+                    value = lower + (LATENCY_BUCKET_BOUNDS[bucket] - lower) * (rank - cumulative) / count
+                result[f'p{p}'] = round(value)
+                break
+            cumulative += count
+    return result
+
+
+def build_kds_latency_report(business, start_date, end_date, kds_screen_id=None, category_id=None):
+    """
+    Tarih aralığındaki histogram satırlarını tek sorguda toplar; hazırlama ve garson alma
+    sürelerinin yüzdeliklerini KDS ekranı, kategori ve günün saati kırılımlarında döner.
+    """
+    rows = KDSLatencyHistogram.objects.filter(business=business, date__range=(start_date, end_date))
+    if kds_screen_id:
+        rows = rows.filter(kds_screen_id=kds_screen_id)
+    if category_id:
+        rows = rows.filter(category_id=category_id)
+    rows = rows.values(
+        'kds_screen_id', 'kds_screen__name', 'category_id', 'category__name', 'hour', 'metric', 'bucket'
+    ).annotate(total=Sum('count')).order_by()
+
+    breakdowns = {
+        'overall': defaultdict(lambda: defaultdict(Counter)),
+        'by_kds_screen': defaultdict(lambda: defaultdict(Counter)),
+        'by_category': defaultdict(lambda: defaultdict(Counter)),
+        'by_hour': defaultdict(lambda: defaultdict(Counter)),
+    }
+    labels = {'by_kds_screen': {}, 'by_category': {}}
+    for row in rows:
+        metric, bucket, total = row['metric'], row['bucket'], row['total']
+        breakdowns['overall'][None][metric][bucket] += total
+        breakdowns['by_kds_screen'][row['kds_screen_id']][metric][bucket] += total
+        breakdowns['by_category'][row['category_id']][metric][bucket] += total
+        breakdowns['by_hour'][row['hour']][metric][bucket] += total
+        labels['by_kds_screen'][row['kds_screen_id']] = row['kds_screen__name']
+        labels['by_category'][row['category_id']] = row['category__name']
+
+    def summarize(histograms):
+        return {
+            metric: {'count': sum(histograms[metric].values()), **percentiles_from_buckets(histograms[metric])}
+            for metric, _ in KDSLatencyHistogram.METRIC_CHOICES
+        }
+
+    return {
+        'overall': summarize(breakdowns['overall'][None]),
+        'by_kds_screen': [
+            {'kds_screen_id': key, 'kds_screen_name': labels['by_kds_screen'][key], **summarize(histograms)}
+            for key, histograms in breakdowns['by_kds_screen'].items()
+        ],
+        'by_category': [
+            {'category_id': key, 'category_name': labels['by_category'][key], **summarize(histograms)}
+            for key, histograms in breakdowns['by_category'].items()
+        ],
+        'by_hour': [
+            {'hour': hour, **summarize(breakdowns['by_hour'][hour])}
+            for hour in sorted(breakdowns['by_hour'])
+        ],
+        'bucket_bounds_seconds': list(LATENCY_BUCKET_BOUNDS),
+    }
@@ -0,0 +1,136 @@
+# core/utils/kds_tickets.py
+
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from ..models import Order, OrderItem, KDSTicket
+from .transaction_hooks import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_ORDER_STATUSES = (Order.STATUS_APPROVED, Order.STATUS_PREPARING, Order.STATUS_READY_FOR_PICKUP)
+ACTIONABLE_ITEM_STATUSES = (OrderItem.KDS_ITEM_STATUS_PENDING, OrderItem.KDS_ITEM_STATUS_PREPARING)
+HIDDEN_ITEM_STATUSES = (OrderItem.KDS_ITEM_STATUS_READY, OrderItem.KDS_ITEM_STATUS_PICKED_UP)
+
+
+def _order_display_name(order):
+    if order.order_type == 'table' and order.table:
+        return f"Masa {order.table.table_number}"
+    elif order.customer_name:
+        return order.customer_name
+    elif order.customer:
+        return order.customer.username
+    return f"Sipariş #{order.id}"
+
+
+def _screen_status_display(order, kds_screen, screen_items):
+    """KDSOrderSerializer'ın ekrana özel durum mantığının, önceden yüklenmiş kalemler üzerindeki karşılığı."""
+    active_items = [item for item in screen_items if not item.is_awaiting_staff_approval and not item.delivered]
+
+    if not active_items:
+        if screen_items and all(item.kds_status == OrderItem.KDS_ITEM_STATUS_READY for item in screen_items):
+            return f"{kds_screen.name}: Tamamlandı"
+        return f"{kds_screen.name}: Bekleyen Ürün Yok"
+
+    if any(item.kds_status == OrderItem.KDS_ITEM_STATUS_PREPARING for item in active_items):
+        return f"{kds_screen.name}: Hazırlanıyor"
+
+    if any(item.kds_status == OrderItem.KDS_ITEM_STATUS_PENDING for item in active_items):
+        if order.status == Order.STATUS_APPROVED:
+            return f"{kds_screen.name}: Mutfağa İletildi"
+        return f"{kds_screen.name}: Beklemede"
+
+    return order.get_status_display()
+
+
+def _load_order(order_id):
+    return Order.objects.select_related(
+        'table', 'customer', 'taken_by_staff', 'prepared_by_kitchen_staff',
+        'assigned_pager_instance', 'credit_payment_details'
+    ).prefetch_related(
+        Prefetch(
+            'order_items',
+            queryset=OrderItem.objects.select_related(
+                'menu_item__category__assigned_kds',
+                'variant',
+                'item_prepared_by_staff'
+            ).prefetch_related('extras__variant').order_by('id')
+        )
+    ).filter(id=order_id).first()
+
+
+def rebuild_kds_tickets(order_id):
+    """
+    Bir siparişin tüm KDS fişlerini veritabanındaki güncel haline göre yeniden oluşturur.
+    Siparişte kalemi kalmayan ekranların fişleri silinir.
+    """
+    from ..serializers.order_serializers import KDSOrderItemSerializer
+
+    order = _load_order(order_id)
+    if order is None:
+        KDSTicket.objects.filter(order_id=order_id).delete()
+        return
+
+    items_by_screen = {}
+    for item in order.order_items.all():
+        category = item.menu_item.category if item.menu_item else None
+        if category and category.assigned_kds:
+            items_by_screen.setdefault(category.assigned_kds, []).append(item)
+
+    has_credit = getattr(order, 'credit_payment_details', None) is not None
+    order_is_active = order.status in ACTIVE_ORDER_STATUSES and not order.is_paid and not has_credit
+    pager = getattr(order, 'assigned_pager_instance', None)
+
+    with transaction.atomic():
+        for kds_screen, screen_items in items_by_screen.items():
+            visible_items = [
+                item for item in screen_items
+                if not item.is_awaiting_staff_approval and item.kds_status not in HIDDEN_ITEM_STATUSES
+            ]
+            is_listed = order_is_active and any(
+                not item.is_awaiting_staff_approval and not item.delivered and item.kds_status in ACTIONABLE_ITEM_STATUSES
+                for item in screen_items
+            )
+            KDSTicket.objects.update_or_create(
+                order=order,
+                kds_screen=kds_screen,
+                defaults={
+                    'business_id': order.business_id,
+                    'is_listed': is_listed,
+                    'order_created_at': order.created_at,
+                    'order_status': order.status,
+                    'order_type': order.order_type,
+                    'display_name': _order_display_name(order),
+                    'table_number': order.table.table_number if order.table else None,
+                    'customer_name': order.customer_name,
+                    'taken_by_staff_username': order.taken_by_staff.username if order.taken_by_staff else None,
+                    'prepared_by_kitchen_staff_username': order.prepared_by_kitchen_staff.username if order.prepared_by_kitchen_staff else None,
+                    'kitchen_completed_at': order.kitchen_completed_at,
+                    'delivered_at': order.delivered_at,
+                    'assigned_pager_device_id': pager.device_id if pager else None,
+                    'assigned_pager_name': pager.name if pager else None,
+                    'screen_status_display': _screen_status_display(order, kds_screen, screen_items),
+                    'items': KDSOrderItemSerializer(visible_items, many=True).data,
+                }
+            )
+        KDSTicket.objects.filter(order=order).exclude(
+            kds_screen__in=list(items_by_screen)
+        ).delete()
+
+
+def _rebuild_scheduled_order(order_id):
+    try:
+        rebuild_kds_tickets(order_id)
+    except Exception as e:
+        logger.error(f"[KDS Ticket] Sipariş #{order_id} için KDS fişleri oluşturulamadı: {e}", exc_info=True)
+
+
+def schedule_kds_ticket_rebuild(order_id):
+    """
+    KDS fişlerinin işlem commit edildikten sonra yeniden oluşturulmasını planlar.
+    Aynı işlemdeki birden çok değişiklik tek bir yeniden oluşturmaya indirgenir.
+    """
+    on_commit_once(('kds_ticket_rebuild', order_id), partial(_rebuild_scheduled_order, order_id))
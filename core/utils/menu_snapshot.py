@@ -0,0 +1,115 @@
+# core/utils/menu_snapshot.py
+
+import hashlib
+import logging
+import struct
+import zlib
+
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from ..db_router import use_primary_db
+from ..models import MenuItem, Category
+from .cache_utils import make_cache_key, get_or_compute, bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+# Önbellek ad alanı; menüyü etkileyen her değişiklikte işletmenin sürümü artırılır.
+CACHE_NAMESPACE = "guest_menu"
+# Sürüm artırılmasa bile anlık görüntünün en fazla ne kadar tutulacağı (saniye)
+CACHE_TIMEOUT = 60 * 60
+
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+COMPRESSION_LEVEL = 6
+
+
+def _deflate(data, final):
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # Z_FULL_FLUSH çıktıyı bayt sınırında bitirir ve sonraki verinin bu bloğa referans
+    # vermemesini sağlar; böylece ayrı sıkıştırılmış bir devam bloğu arkasına eklenebilir.
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_FULL_FLUSH)
+
+
+def build_menu_snapshot(business):
+    """
+    İşletmenin misafir menüsünü (ürünler, kategoriler, işletme adı) bir kez serileştirir.
+    JSON gövdesi kapanış parantezi olmadan saklanır; isteğe özel alanlar arkasına eklenir.
+    """
+    from ..serializers import MenuItemSerializer, CategorySerializer
+
+    menu_items_qs = MenuItem.objects.filter(business=business, is_active=True).select_related(
+        'category__assigned_kds', 'represented_campaign'
+    ).prefetch_related('variants')
+    categories_qs = Category.objects.filter(business=business).select_related('assigned_kds')
+
+    body = JSONRenderer().render({
+        'menu_items': MenuItemSerializer(menu_items_qs, many=True).data,
+        'categories': CategorySerializer(categories_qs, many=True).data,
+        'business_name': business.name,
+    })
+    prefix = body[:-1]
+    logger.info(f"[Guest Menu] İşletme #{business.id} için menü anlık görüntüsü oluşturuldu ({len(prefix)} bayt).")
+    return {
+        'prefix': prefix,
+        'prefix_deflate': _deflate(prefix, final=False),
+        'prefix_crc': zlib.crc32(prefix),
+        'digest': hashlib.sha256(prefix).hexdigest(),
+    }
+
+
+def _build_menu_snapshot_from_primary(business):
+    # Anlık görüntü önbellekte uzun süre kalır; replika gecikmesi yüzünden az önce
+    # güncellenen menünün eski hali saklanmasın diye her zaman birincilden okunur.
+    with use_primary_db():
+        return build_menu_snapshot(business)
+
+
+def get_menu_snapshot(business):
+    """Menü anlık görüntüsünü paylaşılan önbellekten döner, yoksa oluşturur."""
+    cache_key = make_cache_key(CACHE_NAMESPACE, 'snapshot', business_id=business.id)
+    return get_or_compute(cache_key, lambda: _build_menu_snapshot_from_primary(business), CACHE_TIMEOUT)
+
+
+def invalidate_menu_snapshot(business_id):
+    """İşletmenin menü anlık görüntüsünü tüm süreçlerde geçersiz kılar."""
+    bump_cache_version(CACHE_NAMESPACE, business_id)
+
+
+def _accepts_gzip(request):
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return any(part.split(';')[0].strip() == 'gzip' for part in accept_encoding.split(','))
+
+
+def render_menu_response(request, snapshot, extra_data):
+    """
+    Önbellekteki menü gövdesini isteğe özel alanlarla (aktif sipariş, masa bilgisi) birleştirip
+    güçlü ETag ile döner. 'If-None-Match' eşleşirse 304 döner; istemci gzip kabul ediyorsa
+    önceden sıkıştırılmış menü bloğuna yalnızca küçük devam kısmı sıkıştırılarak eklenir.
+    """
+    suffix = b',' + JSONRenderer().render(extra_data)[1:]
+    digest = hashlib.sha256(snapshot['digest'].encode() + suffix).hexdigest()[:40]
+    use_gzip = _accepts_gzip(request)
+    # Farklı içerik kodlamaları farklı temsillerdir; güçlü ETag'ler de farklı olmalıdır.
+    etag = f'"{digest}-gzip"' if use_gzip else f'"{digest}"'
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponse(status=304)
+    elif use_gzip:
+        body_length = len(snapshot['prefix']) + len(suffix)
+        response = HttpResponse(
+            GZIP_HEADER
+            + snapshot['prefix_deflate']
+            + _deflate(suffix, final=True)
+            + struct.pack('<II', zlib.crc32(suffix, snapshot['prefix_crc']), body_length & 0xffffffff),
+            content_type='application/json'
+        )
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(snapshot['prefix'] + suffix, content_type='application/json')
+
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    # İstemci her açılışta doğrulama yapar; gövde yalnızca değiştiyse yeniden indirilir.
+    response['Cache-Control'] = 'no-cache'
+    return response
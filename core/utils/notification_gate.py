@@ -1,41 +1,37 @@
 # core/utils/notification_gate.py
 
-from django.core.cache import cache
 from ..models import NotificationSetting
+from .cache_utils import make_cache_key, get_or_compute, bump_cache_version
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Önbellek anahtarı için bir ön ek
-CACHE_PREFIX = "notification_setting_"
+# Önbellek ad alanı; ayarlar değiştiğinde sürümü artırılarak tüm süreçlerde geçersiz kılınır.
+CACHE_NAMESPACE = "notification_setting"
 # Ayarların önbellekte ne kadar süre kalacağı (saniye cinsinden)
 CACHE_TIMEOUT = 300  # 5 dakika
 
-def is_notification_active(event_type: str) -> bool:
-    """
-    Bir bildirim türünün aktif olup olmadığını kontrol eder.
-    Sonucu performansı artırmak için önbelleğe alır.
-    """
-    cache_key = f"{CACHE_PREFIX}{event_type}"
-    
-    # 1. Önbelleği kontrol et
-    is_active = cache.get(cache_key)
-    
-    if is_active is not None:
-        # Önbellekte bulundu, doğrudan döndür
-        return is_active
-
-    # 2. Önbellekte yoksa, veritabanından sorgula
+
+def _load_notification_setting(event_type: str) -> bool:
     try:
         setting = NotificationSetting.objects.get(event_type=event_type)
-        is_active = setting.is_active
+        return setting.is_active
     except NotificationSetting.DoesNotExist:
         # Eğer ayar veritabanında yoksa (yeni eklenen bir bildirim tipi gibi),
         # varsayılan olarak aktif kabul edelim ki sistem durmasın.
         logger.warning(f"'{event_type}' için bildirim ayarı bulunamadı. Varsayılan olarak AKTİF kabul ediliyor.")
-        is_active = True
-    
-    # 3. Sonucu önbelleğe kaydet
-    cache.set(cache_key, is_active, CACHE_TIMEOUT)
-    
-    return is_active
\ No newline at end of file
+        return True
+
+
+def is_notification_active(event_type: str) -> bool:
+    """
+    Bir bildirim türünün aktif olup olmadığını kontrol eder.
+    Sonucu performansı artırmak için önbelleğe alır.
+    """
+    cache_key = make_cache_key(CACHE_NAMESPACE, event_type)
+    return get_or_compute(cache_key, lambda: _load_notification_setting(event_type), CACHE_TIMEOUT)
+
+
+def invalidate_notification_settings():
+    """Tüm bildirim ayarı önbelleğini geçersiz kılar (NotificationSetting değiştiğinde çağrılır)."""
+    bump_cache_version(CACHE_NAMESPACE)
@@ -0,0 +1,37 @@
+# core/utils/order_read_model.py
+
+from django.db.models import Prefetch
+
+from ..models import Order, OrderItem, OrderItemExtra, MenuItemVariant
+
+
+def order_response_queryset():
+    """
+    OrderSerializer'ın dokunduğu tüm ilişkileri önceden yükleyen sorgu planı (OrderViewSet
+    ile aynı). Sorgu sayısı kalem ve ekstra sayısından bağımsızdır: ürünün kategorisi/KDS'i
+    ve kampanyası, kalemin varyantı ve ürünün varyant listesi, ekstraların varyantları.
+    """
+    return Order.objects.select_related(
+        'table', 'customer', 'business', 'taken_by_staff', 'prepared_by_kitchen_staff'
+    ).prefetch_related(
+        Prefetch('order_items', queryset=OrderItem.objects.select_related(
+            'menu_item__category__assigned_kds__business', 'menu_item__represented_campaign',
+            'item_prepared_by_staff', 'variant__menu_item'
+        ).prefetch_related(
+            Prefetch('menu_item__variants', queryset=MenuItemVariant.objects.all()),
+            Prefetch('extras', queryset=OrderItemExtra.objects.select_related('variant__menu_item')),
+        )),
+        'table_users',
+        'payment_info',
+        'credit_payment_details',
+        'assigned_pager_instance',
+    )
+
+
+def load_order_for_response(order_id):
+    """
+    Bir işlemden sonra siparişi yanıt ve yayın için yeniden okur. refresh_from_db() önbelleğe
+    alınmış ilişkileri attığından eylemler bunun yerine bu fonksiyonu kullanır; dönen nesne
+    bir kez serialize edilip hem HTTP yanıtında hem bildirim yükünde kullanılmalıdır.
+    """
+    return order_response_queryset().get(id=order_id)
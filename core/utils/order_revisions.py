@@ -0,0 +1,99 @@
+# core/utils/order_revisions.py
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import OrderRevision
+from .json_helpers import convert_decimals_to_strings
+from .kds_feed import publish_kds_feed_changes
+
+logger = logging.getLogger(__name__)
+
+ITEMS_KEY = 'order_items'
+
+
+def diff_order_snapshots(previous, current):
+    """
+    İki sipariş anlık görüntüsü arasındaki farkı çıkarır.
+    Üst seviye alanlardan yalnızca değişenler, kalemlerden ise eklenenler (tam),
+    değişenler (id + değişen alanlar) ve silinenlerin id'leri döner.
+    """
+    fields = {
+        key: value for key, value in current.items()
+        if key != ITEMS_KEY and previous.get(key) != value
+    }
+
+    previous_items = {item['id']: item for item in previous.get(ITEMS_KEY) or []}
+    current_items = {item['id']: item for item in current.get(ITEMS_KEY) or []}
+
+    items_added = []
+    items_changed = []
+    for item_id, item in current_items.items():
+        old_item = previous_items.get(item_id)
+        if old_item is None:
+            items_added.append(item)
+        elif old_item != item:
+            changed = {key: value for key, value in item.items() if old_item.get(key) != value}
+            changed['id'] = item_id
+            items_changed.append(changed)
+    items_removed = [item_id for item_id in previous_items if item_id not in current_items]
+
+    diff = {}
+    if fields:
+        diff['fields'] = fields
+    if items_added:
+        diff['items_added'] = items_added
+    if items_changed:
+        diff['items_changed'] = items_changed
+    if items_removed:
+        diff['items_removed'] = items_removed
+    return diff
+
+
+def record_order_revision(order_id, serialized_order):
+    """
+    Siparişin yeni halini kaydeder ve 'order_status_update' olayına eklenecek alanları döner.
+    Önceki bir anlık görüntü varsa (ve delta modu açıksa) yalnızca 'order_diff' gönderilir;
+    istemci 'base_revision' kendi revizyonuyla eşleşmezse resync uç noktasından tam veriyi çeker.
+    """
+    snapshot = convert_decimals_to_strings(serialized_order)
+
+    with transaction.atomic():
+        OrderRevision.objects.get_or_create(order_id=order_id)
+        state = OrderRevision.objects.select_for_update().get(order_id=order_id)
+        base_revision = state.revision
+        previous = state.snapshot if base_revision else None
+
+        if previous == snapshot:
+            return {'revision': base_revision, 'base_revision': base_revision, 'order_diff': {}}
+
+        state.revision = base_revision + 1
+        state.snapshot = snapshot
+        state.save(update_fields=['revision', 'snapshot', 'updated_at'])
+
+        publish_kds_feed_changes(snapshot.get('business'), previous, snapshot)
+
+    fields = {'revision': state.revision, 'base_revision': base_revision}
+    if previous is None or not settings.ORDER_UPDATE_DELTA_PAYLOADS:
+        fields['updated_order_data'] = snapshot
+    else:
+        fields['order_diff'] = diff_order_snapshots(previous, snapshot)
+    logger.debug(f"[Order Revision] Sipariş #{order_id}: r{base_revision} -> r{state.revision}")
+    return fields
+
+
+def get_order_snapshot(order_id):
+    """Resync için son yayınlanan anlık görüntüyü ve revizyonunu döner; kayıt yoksa None."""
+    state = OrderRevision.objects.filter(order_id=order_id, revision__gt=0).first()
+    if state is None:
+        return None
+    return state.revision, state.snapshot
+
+
+def discard_order_revision(order_id):
+    """Silinen siparişin KDS ekranlarındaki kalemlerini kaldırır; revizyon kaydı siparişle birlikte silinir."""
+    state = OrderRevision.objects.filter(order_id=order_id, revision__gt=0).first()
+    if state is not None:
+        publish_kds_feed_changes(state.snapshot.get('business'), state.snapshot, None)
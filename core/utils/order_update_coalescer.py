@@ -0,0 +1,197 @@
+# core/utils/order_update_coalescer.py
+
+import json
+import logging
+import threading
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "order_update_coalesce"
+# Flush görevi kaybolursa anahtarların sonsuza kadar kalmaması için pencereye eklenen güvenlik payı
+KEY_TTL_PADDING_SECONDS = 60
+GENERIC_EVENT_TYPE = 'order_updated'
+
+
+def merge_order_update_events(events):
+    """
+    Aynı sipariş için pencere içinde biriken olayları tek bir bildirime indirger.
+    Birincil olay, genel 'order_updated' dışındaki en son olaydır; tüm olay tipleri
+    ve eklenen ürün bilgileri extra_data içinde taşınır.
+    """
+    event_types = []
+    item_added_info = []
+    for event in events:
+        if event['event_type'] not in event_types:
+            event_types.append(event['event_type'])
+        if event.get('item_added_info'):
+            item_added_info.append(event['item_added_info'])
+
+    primary_event = events[-1]
+    for event in reversed(events):
+        if event['event_type'] != GENERIC_EVENT_TYPE:
+            primary_event = event
+            break
+
+    extra_data = dict(primary_event.get('extra_data') or {})
+    extra_data['event_types'] = event_types
+    extra_data['coalesced_event_count'] = len(events)
+    if item_added_info:
+        extra_data['item_added_info'] = item_added_info
+    return primary_event['event_type'], extra_data
+
+
+class RedisCoalescingStore:
+    """Olayları Redis listesinde biriktirir; flush işlemini Celery görevi yapar."""
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            options = {'socket_timeout': 5, 'socket_connect_timeout': 5}
+            if self.url.startswith('rediss://'):
+                options['ssl_cert_reqs'] = None
+            self._client = redis.Redis.from_url(self.url, **options)
+        return self._client
+
+    def _keys(self, order_id):
+        return f"{KEY_PREFIX}:{order_id}:events", f"{KEY_PREFIX}:{order_id}:scheduled"
+
+    def push(self, order_id, event, ttl):
+        """Olayı ekler; pencerenin ilk olayıysa True döner."""
+        events_key, scheduled_key = self._keys(order_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(events_key, json.dumps(event))
+        pipe.expire(events_key, ttl)
+        pipe.set(scheduled_key, 1, nx=True, ex=ttl)
+        _, _, is_first = pipe.execute()
+        return bool(is_first)
+
+    def drain(self, order_id):
+        events_key, scheduled_key = self._keys(order_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(events_key, 0, -1)
+        pipe.delete(events_key, scheduled_key)
+        raw_events, _ = pipe.execute()
+        return [json.loads(raw) for raw in raw_events]
+
+    def schedule_flush(self, order_id, window):
+        from ..tasks import flush_order_update_notifications
+        flush_order_update_notifications.apply_async(args=[order_id], countdown=window)
+
+
+class LocalCoalescingStore:
+    """
+    Redis olmayan ortamlar (lokal geliştirme, testler) için süreç içi karşılık.
+    Pencere dolduğunda birleştirilmiş olay tek bir Celery görevi olarak kuyruğa alınır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = {}
+
+    def push(self, order_id, event, ttl):
+        with self._lock:
+            is_first = order_id not in self._events
+            self._events.setdefault(order_id, []).append(event)
+        return is_first
+
+    def drain(self, order_id):
+        with self._lock:
+            return self._events.pop(order_id, [])
+
+    def schedule_flush(self, order_id, window):
+        timer = threading.Timer(window, self._flush, args=[order_id])
+        timer.daemon = True
+        timer.start()
+
+    def _flush(self, order_id):
+        merged = drain_order_updates(order_id)
+        if merged:
+            event_type, extra_data = merged
+            send_order_update_now(order_id, event_type, extra_data)
+
+
+_store = None
+
+
+def get_coalescing_store():
+    global _store
+    if _store is None:
+        if settings.ORDER_UPDATE_COALESCE_BACKEND == 'redis':
+            _store = RedisCoalescingStore(settings.REDIS_URL)
+        else:
+            _store = LocalCoalescingStore()
+    return _store
+
+
+def send_order_update_now(order_id, event_type, extra_data=None):
+    """
+    Bildirimi birleştirmeden gönderir. Broker erişilemezse görev bu süreçte çalıştırılır (olay
+    giden kutusuna yazılır, relay beat ile gönderir). Commit sonrası çağrıldığından hata fırlatmaz.
+    """
+    from ..tasks import send_order_update_task
+
+    try:
+        send_order_update_task.delay(order_id=order_id, event_type=event_type, extra_data=extra_data)
+        return
+    except Exception as e:
+        logger.warning(f"[Coalescer] Sipariş #{order_id} bildirimi kuyruğa alınamadı, süreç içinde işleniyor: {e}")
+    try:
+        send_order_update_task(order_id=order_id, event_type=event_type, extra_data=extra_data)
+    except Exception as e:
+        logger.error(f"[Coalescer] Sipariş #{order_id} bildirimi işlenemedi: {e}", exc_info=True)
+
+
+def queue_order_update(order_id, event_type, extra_data=None, item_added_info=None):
+    """
+    Sipariş güncelleme bildirimini doğrudan göndermek yerine sipariş bazlı pencereye ekler.
+    Pencere kapalıysa (0) veya depo erişilemezse bildirim hemen gönderilir. Commit sonrası
+    (on_commit) çalıştığı için hiçbir hata çağırana fırlatılmaz.
+    """
+    window = settings.ORDER_UPDATE_COALESCE_WINDOW_SECONDS
+    if window <= 0:
+        send_order_update_now(order_id, event_type, extra_data)
+        return
+
+    event = {
+        'event_type': event_type,
+        'extra_data': extra_data or {},
+        'item_added_info': item_added_info,
+    }
+    store = get_coalescing_store()
+    try:
+        is_first = store.push(order_id, event, int(window) + KEY_TTL_PADDING_SECONDS)
+    except Exception as e:
+        logger.warning(f"[Coalescer] Sipariş #{order_id} için olay birleştirilemedi, doğrudan gönderiliyor: {e}")
+        send_order_update_now(order_id, event_type, extra_data)
+        return
+    if not is_first:
+        return
+
+    try:
+        store.schedule_flush(order_id, window)
+    except Exception as e:
+        # Flush planlanamazsa pencere açık kalmamalı: aksi halde penceredeki sonraki olaylar
+        # flush'sız birikir ve TTL ile kaybolur. Biriken olaylar boşaltılıp hemen gönderilir.
+        logger.error(f"[Coalescer] Sipariş #{order_id} için flush planlanamadı, olaylar hemen gönderiliyor: {e}")
+        try:
+            merged = drain_order_updates(order_id)
+        except Exception as drain_error:
+            logger.error(f"[Coalescer] Sipariş #{order_id} penceresi boşaltılamadı: {drain_error}")
+            merged = (event_type, extra_data)
+        if merged:
+            send_order_update_now(order_id, *merged)
+
+
+def drain_order_updates(order_id):
+    """Sipariş için biriken olayları alır ve birleştirir. Olay yoksa None döner."""
+    events = get_coalescing_store().drain(order_id)
+    if not events:
+        return None
+    return merge_order_update_events(events)
@@ -0,0 +1,43 @@
+# core/utils/outbox.py
+
+import logging
+import uuid
+
+from ..models import NotificationOutbox
+from .json_helpers import convert_decimals_to_strings
+from .transaction_hooks import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+
+def _schedule_outbox_relay():
+    from ..tasks import relay_notification_outbox
+    try:
+        relay_notification_outbox.delay()
+    except Exception as e:
+        # Kayıt veritabanında duruyor; bir sonraki relay çalışmasında gönderilecek.
+        logger.warning(f"[Outbox] Relay görevi kuyruğa alınamadı: {e}")
+
+
+def enqueue_notification(room, event, payload, business_id=None):
+    """
+    Socket.IO olayını giden kutusuna yazar. Çağıranın işlemi (transaction) içinde
+    çalışır; işlem geri alınırsa olay da yayınlanmaz. Commit sonrası relay tetiklenir.
+    """
+    cleaned_payload = convert_decimals_to_strings(payload)
+    cleaned_payload.setdefault('notification_id', f"outbox_{uuid.uuid4()}")
+    entry = NotificationOutbox.objects.create(
+        business_id=business_id,
+        room=room,
+        event=event,
+        payload=cleaned_payload,
+    )
+    # Aynı işlemde birden çok olay yazıldığında relay görevi tek kez tetiklenir.
+    on_commit_once('outbox_relay', _schedule_outbox_relay)
+    logger.info(f"[Outbox] Olay kaydedildi: #{entry.id} '{event}' -> {room}")
+    return entry
+
+
+def enqueue_business_notification(business_id, event, payload):
+    """İşletmenin genel odasına (business_{id}) gidecek olayı giden kutusuna yazar."""
+    return enqueue_notification(f'business_{business_id}', event, payload, business_id=business_id)
@@ -0,0 +1,134 @@
+# core/utils/report_jobs.py
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from ..db_router import REPORTING_DB, read_replica_db, use_read_replica
+from ..models import ReportJob, ReportDataVersion
+from ..serializers import ReportJobSerializer
+from ..tasks import generate_report_job_task
+from .sales_rollups import _increment
+
+logger = logging.getLogger(__name__)
+
+# Rapor türü -> (sonucu üreten fonksiyon, yalnızca işletme sahibi mi görebilir)
+# Fonksiyonlar (business, params) alır ve JSON'a çevrilebilir veri döner.
+# Detaylı satış burada yoktur: satır listesi tek JSON olarak saklanmaz, büyük aralıklar dışa aktarımla alınır.
+REPORT_TYPES = {
+    'general': ('core.views.report_views.build_general_report', False),
+    'kds_latency': ('core.views.report_views.build_kds_latency_report_data', False),
+    'staff_performance': ('core.views.staff_report_views.build_staff_performance_report', True),
+    'customer_cohorts': ('core.views.customer_report_views.build_customer_cohort_report', False),
+    'menu_engineering': ('core.views.menu_engineering_views.build_menu_engineering_report', False),
+}
+
+
+def get_report_data_version(business_id):
+    return ReportDataVersion.objects.filter(business_id=business_id).values_list('version', flat=True).first() or 0
+
+
+def bump_report_data_version(business_id):
+    """İşletmenin rapor verisi sürümünü artırır; önceki sürümle üretilmiş sonuçlar artık kullanılmaz."""
+    _increment(ReportDataVersion, {'business_id': business_id}, {'version': 1})
+
+
+def params_fingerprint(params):
+    encoded = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def reporting_db_for(business_id, data_version=None):
+    """
+    Raporun okunacağı veritabanı. Replika, işin veri sürümüne henüz ulaşmadıysa (gecikme)
+    sonuç bu sürümle saklanacağı için birincil veritabanı kullanılır.
+    """
+    alias = read_replica_db(REPORTING_DB)
+    if data_version and alias != DEFAULT_DB_ALIAS:
+        replica_version = ReportDataVersion.objects.using(alias).filter(
+            business_id=business_id
+        ).values_list('version', flat=True).first() or 0
+        if replica_version < data_version:
+            logger.info(f"[Report Job] '{alias}' replikası geride (v{replica_version} < v{data_version}); birincil kullanılıyor.")
+            return DEFAULT_DB_ALIAS
+    return alias
+
+
+def build_report_result(report_type, business, params, data_version=None):
+    """Raporu (varsa raporlama replikasından) üretir ve API yanıtıyla birebir aynı JSON temsiline çevirir."""
+    builder = import_string(REPORT_TYPES[report_type][0])
+    with use_read_replica(reporting_db_for(business.id, data_version)):
+        return json.loads(JSONRenderer().render(builder(business, params)))
+
+
+def is_owner_only_report(report_type):
+    return REPORT_TYPES[report_type][1]
+
+
+def find_reusable_report_job(business_id, report_type, params_hash, data_version):
+    """
+    Aynı anahtarla (işletme, tür, parametreler, veri sürümü) üretilmiş veya üretilmekte olan
+    işi döner. Ödemeye bağlı olmayan veriler (KDS süreleri vb.) için sonuçlar ayrıca
+    REPORT_RESULT_MAX_AGE_SECONDS sonra eskimiş sayılır.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.REPORT_RESULT_MAX_AGE_SECONDS)
+    return ReportJob.objects.filter(
+        business_id=business_id,
+        report_type=report_type,
+        params_hash=params_hash,
+        data_version=data_version,
+        created_at__gte=cutoff,
+        status__in=[ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING, ReportJob.STATUS_COMPLETED],
+    ).order_by('-created_at').first()
+
+
+def report_job_response(request, business, report_type, params):
+    """
+    Rapor isteğini web isteği içinde hesaplamadan karşılar: güncel bir sonuç varsa onu
+    (eski yanıt biçimiyle) döner, yoksa Celery işi kuyruğa alınıp 202 ile iş bilgisi döner.
+    Sonuç hazır olduğunda 'user_{id}' odasına 'report_job_update' olayı gönderilir.
+    """
+    if not settings.REPORT_JOBS_ENABLED:
+        return Response(build_report_result(report_type, business, params))
+
+    data_version = get_report_data_version(business.id)
+    params_hash = params_fingerprint(params)
+    job = find_reusable_report_job(business.id, report_type, params_hash, data_version)
+
+    if job and job.status == ReportJob.STATUS_PENDING and \
+            job.created_at < timezone.now() - timedelta(seconds=settings.REPORT_JOB_PENDING_TIMEOUT_SECONDS):
+        # Hiçbir worker işi almamış (kuyruk tüketilmiyor olabilir); iş eskimiş sayılır ve yeniden kuyruğa alınır.
+        ReportJob.objects.filter(id=job.id, status=ReportJob.STATUS_PENDING).update(
+            status=ReportJob.STATUS_FAILED, error="Zaman aşımı: iş bir worker tarafından alınmadı.", completed_at=timezone.now()
+        )
+        logger.warning(f"[Report Job] İş #{job.id} {settings.REPORT_JOB_PENDING_TIMEOUT_SECONDS} sn içinde alınmadı; eskimiş sayıldı.")
+        job = None
+
+    if job and job.status == ReportJob.STATUS_COMPLETED:
+        response = Response(job.result)
+        response['X-Report-Job-Id'] = str(job.id)
+        response['X-Report-Generated-At'] = job.completed_at.isoformat()
+        return response
+
+    if job is None:
+        job = ReportJob.objects.create(
+            business=business,
+            requested_by=request.user,
+            report_type=report_type,
+            params=params,
+            params_hash=params_hash,
+            data_version=data_version,
+        )
+        transaction.on_commit(lambda: generate_report_job_task.delay(job.id))
+        logger.info(f"[Report Job] İşletme #{business.id} için '{report_type}' raporu kuyruğa alındı (iş #{job.id}, v{data_version}).")
+
+    return Response(ReportJobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,235 @@
+# core/utils/sales_export.py
+
+import csv
+import io
+import zipfile
+from datetime import datetime, date
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F, ExpressionWrapper, DecimalField
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from ..db_router import REPORTING_DB, read_replica_db
+from ..models import OrderItem
+
+# Dışa aktarılan sütunlar: (satır anahtarı, başlık)
+EXPORT_COLUMNS = [
+    ('order_id', 'Sipariş No'),
+    ('created_at', 'Tarih'),
+    ('order_type', 'Sipariş Türü'),
+    ('table_number', 'Masa'),
+    ('customer_name', 'Müşteri'),
+    ('item_name', 'Ürün'),
+    ('variant_name', 'Varyant'),
+    ('quantity', 'Adet'),
+    ('unit_price', 'Birim Fiyat'),
+    ('line_total', 'Satır Toplamı'),
+]
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+# Sunucu tarafı imleçten bir seferde çekilecek satır sayısı
+CURSOR_CHUNK_SIZE = 2000
+# Akışa yazılmadan önce biriktirilecek en fazla bayt
+FLUSH_THRESHOLD = 64 * 1024
+
+
+def detailed_sales_queryset(business, start_date, end_date):
+    """Detaylı satış raporunun (ödenmiş siparişlerin tüm kalemleri) sorgusu; varsa raporlama replikasından okunur."""
+    return OrderItem.objects.using(read_replica_db(REPORTING_DB)).filter(
+        order__business=business,
+        order__is_paid=True,
+        order__created_at__range=(start_date, end_date)
+    ).annotate(
+        line_total=ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField())
+    ).values(
+        'order__id', 'order__created_at', 'order__order_type', 'order__table__table_number',
+        'order__customer_name', 'menu_item__name', 'variant__name', 'quantity',
+        'price', 'line_total'
+    ).order_by('order__created_at', 'id')
+
+
+def to_export_row(item):
+    """Sorgu satırını Flutter tarafının beklediği alan isimlerine çevirir."""
+    return {
+        'order_id': item['order__id'],
+        'created_at': item['order__created_at'],
+        'order_type': item['order__order_type'],
+        'table_number': item['order__table__table_number'],
+        'customer_name': item['order__customer_name'],
+        'item_name': item['menu_item__name'],
+        'variant_name': item['variant__name'],
+        'quantity': item['quantity'],
+        'unit_price': item['price'],
+        'line_total': item['line_total'],
+    }
+
+
+def iter_export_rows(queryset):
+    """
+    Satırları sunucu tarafı imleçle (iterator) parça parça okur; bellek kullanımı sabittir.
+    İmleç bir işlem içinde açılır; bağlantı havuzu (PgBouncer/Neon pooler) işlem modunda
+    çalışsa bile imleç aynı sunucu bağlantısında kalır.
+    """
+    with transaction.atomic(using=queryset.db):
+        for item in queryset.iterator(chunk_size=CURSOR_CHUNK_SIZE):
+            yield to_export_row(item)
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def iter_csv(rows):
+    """Satırları Excel uyumlu (UTF-8 BOM, noktalı virgül ayraçlı) CSV parçalarına çevirir."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    buffer.write('\ufeff')
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    for row in rows:
+        writer.writerow([_cell_text(row[key]) for key, _ in EXPORT_COLUMNS])
+        if buffer.tell() >= FLUSH_THRESHOLD:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """zipfile'ın yazdığı baytları biriktirir; konumlanamayan akış olarak davranır."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Satışlar" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool) or value is None:
+        return '<c/>' if value is None else f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, (datetime, date)):
+        value = _cell_text(value) if isinstance(value, datetime) else value.isoformat()
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def iter_xlsx(rows):
+    """
+    Satırları harici kütüphane kullanmadan, tek sayfalık bir XLSX dosyası olarak akıtır.
+    Sayfa XML'i zip içine parça parça yazılır (data descriptor); bellek kullanımı sabittir.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            header = ''.join(_xlsx_cell(title) for _, title in EXPORT_COLUMNS)
+            sheet.write(f'<row>{header}</row>'.encode('utf-8'))
+            pending = []
+            pending_size = 0
+            for row in rows:
+                row_xml = '<row>' + ''.join(_xlsx_cell(row[key]) for key, _ in EXPORT_COLUMNS) + '</row>'
+                pending.append(row_xml)
+                pending_size += len(row_xml)
+                if pending_size >= FLUSH_THRESHOLD:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending, pending_size = [], 0
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def iter_export(export_format, rows):
+    return iter_xlsx(rows) if export_format == 'xlsx' else iter_csv(rows)
+
+
+async def _aiterate(iterator):
+    """
+    Senkron üreteci ASGI altında tek tek tüketir. Django, senkron akışları ASGI'da önce
+    tamamen belleğe alır; bu sarmalayıcı her parçayı aynı (thread_sensitive) iş parçacığında
+    üretir, böylece veritabanı imleci aynı bağlantıda kalır.
+    """
+    sentinel = object()
+    iterator = iter(iterator)
+    try:
+        while True:
+            chunk = await sync_to_async(next)(iterator, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk
+    finally:
+        # İstemci bağlantıyı keserse açık işlem ve imleç de aynı iş parçacığında kapatılır.
+        await sync_to_async(iterator.close)()
+
+
+def streaming_export_response(request, export_format, rows, filename):
+    """CSV/XLSX dışa aktarımını StreamingHttpResponse olarak döner."""
+    chunks = iter_export(export_format, rows)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,169 @@
+# core/utils/sales_rollups.py
+
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import transaction, IntegrityError
+from django.db.models import Sum, Count, F, Q, ExpressionWrapper, DecimalField
+from django.db.models.functions import TruncHour, TruncDate
+from django.utils import timezone
+
+from ..models import (
+    Payment, Order, OrderItem, SalesHourlyRollup, ItemSalesDailyRollup, PaymentTypeDailyRollup
+)
+
+logger = logging.getLogger(__name__)
+
+LINE_TOTAL = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+# Ödeme anında reçete maliyeti sabitlenmiş kalemler (menü mühendisliği raporu için)
+COSTED = Q(recipe_cost__isnull=False)
+
+
+def local_hour_start(value):
+    """Zamanı yerel saat dilimindeki saat başına yuvarlar (rapor kovalarıyla aynı)."""
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def local_date(value):
+    return timezone.localtime(value).date()
+
+
+def _increment(model, lookup, deltas):
+    """
+    Özet satırındaki sayaçları F-ifadeleriyle artırır; satır yoksa oluşturur.
+    Eşzamanlı ilk oluşturma çakışmasında güncelleme yeniden denenir.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _order_item_totals(order_id):
+    return list(
+        OrderItem.objects.filter(order_id=order_id).values('menu_item_id').annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum(LINE_TOTAL),
+            total_cost=Sum('recipe_cost'),
+            costed_quantity=Sum('quantity', filter=COSTED)
+        ).order_by('menu_item_id')
+    )
+
+
+def apply_payment_to_rollups(order: Order, amount, payment_type, payment_date, sign=1):
+    """
+    Bir ödemenin katkısını özet tablolarına ekler (sign=1) veya geri alır (sign=-1).
+    Ödeme zamanı: saatlik ciro ve ödeme türü özetleri. Sipariş oluşturulma zamanı:
+    sipariş sayısı ve ürün özetleri (ReportView'ın mevcut anlamıyla aynı).
+    Satırlar her zaman aynı sırayla güncellenir; eşzamanlı ödemeler birbirini kilitlemez.
+    """
+    business_id = order.business_id
+    amount = Decimal(str(amount)) * sign
+    payment_hour = local_hour_start(payment_date)
+    order_hour = local_hour_start(order.created_at)
+
+    if payment_hour == order_hour:
+        _increment(SalesHourlyRollup, {'business_id': business_id, 'hour_start': payment_hour},
+                   {'turnover': amount, 'payment_count': sign, 'order_count': sign})
+    else:
+        for hour_start in sorted([payment_hour, order_hour]):
+            deltas = {'turnover': amount, 'payment_count': sign} if hour_start == payment_hour else {'order_count': sign}
+            _increment(SalesHourlyRollup, {'business_id': business_id, 'hour_start': hour_start}, deltas)
+
+    _increment(
+        PaymentTypeDailyRollup,
+        {'business_id': business_id, 'date': local_date(payment_date), 'payment_type': payment_type},
+        {'amount': amount, 'payment_count': sign}
+    )
+
+    order_date = local_date(order.created_at)
+    for row in _order_item_totals(order.id):
+        _increment(
+            ItemSalesDailyRollup,
+            {'business_id': business_id, 'date': order_date, 'menu_item_id': row['menu_item_id']},
+            {
+                'quantity': row['total_quantity'] * sign,
+                'revenue': (row['total_revenue'] or Decimal('0.00')) * sign,
+                'cost': (row['total_cost'] or Decimal('0.000')) * sign,
+                'costed_quantity': (row['costed_quantity'] or 0) * sign,
+            }
+        )
+
+
+def rebuild_sales_rollups(business_id, since=None):
+    """
+    İşletmenin özet tablolarını kaynak tablolardan (Payment, Order, OrderItem) küme tabanlı
+    sorgularla yeniden hesaplar. 'since' (yerel tarih) verilirse yalnızca o günden sonrası
+    silinip yeniden oluşturulur.
+    """
+    current_tz = timezone.get_current_timezone()
+    payments = Payment.objects.filter(order__business_id=business_id)
+    orders = Order.objects.filter(business_id=business_id, payment_info__isnull=False)
+    order_items = OrderItem.objects.filter(order__business_id=business_id, order__payment_info__isnull=False)
+
+    hourly_rollups = SalesHourlyRollup.objects.filter(business_id=business_id)
+    item_rollups = ItemSalesDailyRollup.objects.filter(business_id=business_id)
+    payment_type_rollups = PaymentTypeDailyRollup.objects.filter(business_id=business_id)
+    if since is not None:
+        since_start = timezone.make_aware(datetime.combine(since, datetime.min.time()), current_tz)
+        payments = payments.filter(payment_date__gte=since_start)
+        orders = orders.filter(created_at__gte=since_start)
+        order_items = order_items.filter(order__created_at__gte=since_start)
+        hourly_rollups = hourly_rollups.filter(hour_start__gte=since_start)
+        item_rollups = item_rollups.filter(date__gte=since)
+        payment_type_rollups = payment_type_rollups.filter(date__gte=since)
+
+    hourly = {}
+    for row in payments.annotate(hour=TruncHour('payment_date', tzinfo=current_tz)).values('hour').annotate(
+        turnover=Sum('amount'), payment_count=Count('id')
+    ):
+        hourly[row['hour']] = {'turnover': row['turnover'], 'payment_count': row['payment_count'], 'order_count': 0}
+    for row in orders.annotate(hour=TruncHour('created_at', tzinfo=current_tz)).values('hour').annotate(
+        order_count=Count('id')
+    ):
+        hourly.setdefault(row['hour'], {'turnover': Decimal('0.00'), 'payment_count': 0, 'order_count': 0})
+        hourly[row['hour']]['order_count'] = row['order_count']
+
+    with transaction.atomic():
+        hourly_rollups.delete()
+        item_rollups.delete()
+        payment_type_rollups.delete()
+
+        SalesHourlyRollup.objects.bulk_create(
+            [SalesHourlyRollup(business_id=business_id, hour_start=hour, **values) for hour, values in hourly.items()],
+            batch_size=1000
+        )
+        PaymentTypeDailyRollup.objects.bulk_create(
+            [
+                PaymentTypeDailyRollup(
+                    business_id=business_id, date=row['day'], payment_type=row['payment_type'],
+                    amount=row['total_amount'], payment_count=row['count']
+                )
+                for row in payments.annotate(day=TruncDate('payment_date', tzinfo=current_tz)).values(
+                    'day', 'payment_type'
+                ).annotate(total_amount=Sum('amount'), count=Count('id'))
+            ],
+            batch_size=1000
+        )
+        ItemSalesDailyRollup.objects.bulk_create(
+            [
+                ItemSalesDailyRollup(
+                    business_id=business_id, date=row['day'], menu_item_id=row['menu_item_id'],
+                    quantity=row['total_quantity'], revenue=row['total_revenue'] or Decimal('0.00'),
+                    cost=row['total_cost'] or Decimal('0.000'), costed_quantity=row['costed_quantity'] or 0
+                )
+                for row in order_items.annotate(day=TruncDate('order__created_at', tzinfo=current_tz)).values(
+                    'day', 'menu_item_id'
+                ).annotate(
+                    total_quantity=Sum('quantity'), total_revenue=Sum(LINE_TOTAL),
+                    total_cost=Sum('recipe_cost'), costed_quantity=Sum('quantity', filter=COSTED)
+                )
+            ],
+            batch_size=1000
+        )
+    logger.info(f"[Sales Rollup] İşletme #{business_id} için satış özetleri yeniden oluşturuldu ({len(hourly)} saatlik satır).")
@@ -0,0 +1,94 @@
+# core/utils/socket_auth_cache.py
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import PermissionDenied
+
+from ..models import KDSScreen
+from .order_helpers import get_user_business
+from .cache_utils import get_cache_version, bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+# Önbellek anahtarları için ön ekler
+USER_CONTEXT_KEY = "socket_auth_user_{user_id}"
+# İşletmeye özel sürüm numarasının tutulduğu önbellek ad alanı
+CACHE_NAMESPACE = "socket_auth"
+
+
+def _get_business_version(business_id):
+    return get_cache_version(CACHE_NAMESPACE, business_id)
+
+
+def build_socket_auth_context(user_id):
+    """
+    Socket.IO oturumu için gereken kullanıcı, işletme ve KDS erişim bilgisini
+    veritabanından tek seferde toplar. Kullanıcı yoksa None döner.
+    """
+    User = get_user_model()
+    try:
+        user = User.objects.select_related('owned_business', 'associated_business').get(id=user_id)
+    except User.DoesNotExist:
+        return None
+
+    is_admin = user.user_type == 'admin' or user.is_superuser
+    business = None
+    if not is_admin:
+        try:
+            business = get_user_business(user)
+        except PermissionDenied:
+            business = None
+
+    kds_slugs = []
+    business_version = 0
+    if business:
+        # Sürüm, veriler okunmadan önce alınır; okuma sırasında gelen bir değişiklik önbelleği eskitir.
+        business_version = _get_business_version(business.id)
+        screens = KDSScreen.objects.filter(business=business, is_active=True)
+        if user.user_type in ['staff', 'kitchen_staff']:
+            screens = screens.filter(authorized_staff=user)
+        elif user.user_type != 'business_owner':
+            screens = screens.none()
+        kds_slugs = list(screens.values_list('slug', flat=True))
+
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'user_type': user.user_type,
+        'is_active': user.is_active,
+        'is_admin': is_admin,
+        'business_id': business.id if business else None,
+        'business_version': business_version,
+        'kds_slugs': kds_slugs,
+    }
+
+
+def get_socket_auth_context(user_id):
+    """
+    Kullanıcının Socket.IO yetki bilgisini önce önbellekten, yoksa veritabanından döner.
+    İşletme sürümü değişmişse (KDS ekranı veya işletme güncellendiyse) kayıt yeniden oluşturulur.
+    """
+    cache_key = USER_CONTEXT_KEY.format(user_id=user_id)
+    context = cache.get(cache_key)
+    if context is not None:
+        business_id = context.get('business_id')
+        if business_id is None or _get_business_version(business_id) == context.get('business_version'):
+            return context
+
+    context = build_socket_auth_context(user_id)
+    if context is not None:
+        cache.set(cache_key, context, settings.SOCKET_AUTH_CACHE_TIMEOUT)
+    return context
+
+
+def invalidate_socket_auth_user(user_id):
+    """Tek bir kullanıcının önbellekteki Socket.IO yetki bilgisini siler."""
+    cache.delete(USER_CONTEXT_KEY.format(user_id=user_id))
+
+
+def invalidate_socket_auth_business(business_id):
+    """İşletme sürümünü artırarak o işletmeye bağlı tüm kullanıcı kayıtlarını geçersiz kılar."""
+    bump_cache_version(CACHE_NAMESPACE, business_id)
@@ -0,0 +1,106 @@
+# core/utils/staff_metrics.py
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import Payment, OrderItem, StaffDailyMetrics
+from .sales_rollups import _increment, local_date
+from .kds_latency import preparation_started_at
+
+logger = logging.getLogger(__name__)
+
+# Hazırlanmış sayılan KDS durumları (hazır veya garson tarafından alınmış)
+PREPARED_KDS_STATUSES = (OrderItem.KDS_ITEM_STATUS_READY, OrderItem.KDS_ITEM_STATUS_PICKED_UP)
+
+
+def apply_payment_to_staff_metrics(order, amount, sign=1):
+    """
+    Ödemenin katkısını siparişi alan personelin günlük özetine ekler (sign=1) veya
+    geri alır (sign=-1). Gün, siparişin oluşturulduğu yerel tarihtir.
+    """
+    if not order.taken_by_staff_id:
+        return
+    _increment(
+        StaffDailyMetrics,
+        {'business_id': order.business_id, 'staff_id': order.taken_by_staff_id, 'date': local_date(order.created_at)},
+        {'orders_taken': sign, 'revenue_handled': Decimal(str(amount)) * sign}
+    )
+
+
+def prep_seconds_for_item(order_item, order, ready_at):
+    """Kalemin hazırlamaya başlanmasından 'hazır' işaretlendiği ana kadar geçen süre."""
+    return max(int((ready_at - preparation_started_at(order_item, order)).total_seconds()), 0)
+
+
+def record_items_prepared(order, order_items, staff_id, ready_at=None):
+    """
+    'Hazır' durumuna geçen kalemleri hazırlayan personelin günlük özetine işler.
+    Kalemler tek bir siparişe ait olmalıdır; özet satırı tek bir güncellemeyle artırılır.
+    """
+    if not staff_id or not order_items:
+        return
+    ready_at = ready_at or timezone.now()
+    prep_seconds = sum(prep_seconds_for_item(item, order, ready_at) for item in order_items)
+    _increment(
+        StaffDailyMetrics,
+        {'business_id': order.business_id, 'staff_id': staff_id, 'date': local_date(order.created_at)},
+        {'items_prepared': len(order_items), 'prep_seconds_total': prep_seconds, 'prep_sample_count': len(order_items)}
+    )
+
+
+def rebuild_staff_metrics(business_id, since=None):
+    """
+    Personel özetlerindeki sipariş, ciro ve hazırlanan kalem sayılarını kaynak tablolardan
+    yeniden hesaplar. Hazırlama süreleri geçmiş kayıtlardan türetilemediği için mevcut
+    satırlardaki süre toplamları korunur.
+    """
+    current_tz = timezone.get_current_timezone()
+    payments = Payment.objects.filter(order__business_id=business_id, order__taken_by_staff__isnull=False)
+    prepared_items = OrderItem.objects.filter(
+        order__business_id=business_id,
+        item_prepared_by_staff__isnull=False,
+        kds_status__in=PREPARED_KDS_STATUSES
+    )
+    existing = StaffDailyMetrics.objects.filter(business_id=business_id)
+    if since is not None:
+        since_start = timezone.make_aware(datetime.combine(since, datetime.min.time()), current_tz)
+        payments = payments.filter(order__created_at__gte=since_start)
+        prepared_items = prepared_items.filter(order__created_at__gte=since_start)
+        existing = existing.filter(date__gte=since)
+
+    rows = defaultdict(lambda: {
+        'orders_taken': 0, 'revenue_handled': Decimal('0.00'), 'items_prepared': 0,
+        'prep_seconds_total': 0, 'prep_sample_count': 0,
+    })
+    for row in existing.filter(prep_sample_count__gt=0).values('staff_id', 'date', 'prep_seconds_total', 'prep_sample_count'):
+        rows[(row['staff_id'], row['date'])].update(
+            prep_seconds_total=row['prep_seconds_total'], prep_sample_count=row['prep_sample_count']
+        )
+    for row in payments.annotate(day=TruncDate('order__created_at', tzinfo=current_tz)).values(
+        'order__taken_by_staff_id', 'day'
+    ).annotate(total_amount=Sum('amount'), count=Count('id')):
+        rows[(row['order__taken_by_staff_id'], row['day'])].update(
+            orders_taken=row['count'], revenue_handled=row['total_amount'] or Decimal('0.00')
+        )
+    for row in prepared_items.annotate(day=TruncDate('order__created_at', tzinfo=current_tz)).values(
+        'item_prepared_by_staff_id', 'day'
+    ).annotate(count=Count('id')):
+        rows[(row['item_prepared_by_staff_id'], row['day'])]['items_prepared'] = row['count']
+
+    with transaction.atomic():
+        existing.delete()
+        StaffDailyMetrics.objects.bulk_create(
+            [
+                StaffDailyMetrics(business_id=business_id, staff_id=staff_id, date=day, **values)
+                for (staff_id, day), values in rows.items()
+            ],
+            batch_size=1000
+        )
+    logger.info(f"[Staff Metrics] İşletme #{business_id} için personel özetleri yeniden oluşturuldu ({len(rows)} satır).")
@@ -0,0 +1,38 @@
+# core/utils/transaction_hooks.py
+
+import threading
+import weakref
+
+from django.db import transaction
+
+# Bağlantı takma adı -> {anahtar: planlanmış geri çağrının zayıf referansı}
+_scheduled = threading.local()
+
+
+def _scheduled_callbacks(using):
+    registry = getattr(_scheduled, 'callbacks', None)
+    if registry is None:
+        registry = _scheduled.callbacks = {}
+    return registry.setdefault(using, {})
+
+
+def on_commit_once(key, func, using=None):
+    """
+    func'u işlem commit edildikten sonra çalıştırır; aynı işlemde aynı anahtarla gelen sonraki
+    çağrılar yok sayılır. Kayıt geri çağrı çalışınca silinir. Geri çağrıya yalnızca zayıf referans
+    tutulur: işlem (veya kaydın yapıldığı savepoint) geri alınınca Django geri çağrıyı bırakır,
+    referans ölür ve sonraki işlemde anahtar yeniden planlanabilir.
+    """
+    alias = transaction.get_connection(using).alias
+    scheduled = _scheduled_callbacks(alias)
+    existing = scheduled.get(key)
+    if existing is not None and existing() is not None:
+        return
+
+    def callback():
+        if scheduled.get(key) is callback_ref:
+            del scheduled[key]
+        func()
+
+    callback_ref = scheduled[key] = weakref.ref(callback)
+    transaction.on_commit(callback, using=alias)
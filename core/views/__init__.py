@@ -9,7 +9,14 @@ from .business_views import BusinessViewSet, BusinessLayoutViewSet, LayoutElemen
 from .menu_views import CategoryViewSet, MenuItemViewSet, MenuItemVariantViewSet
 from .order_views import OrderViewSet, OrderItemViewSet
 from .payment_views import PaymentViewSet
-from .report_views import ReportView, DetailedSalesReportView
+from .report_views import (
+    ReportView,
+    DetailedSalesReportView,
+    ReportExportJobView,
+    ReportExportDownloadView,
+    KDSLatencyReportView,
+    ReportJobView,
+)
 from .stock_views import (
     IngredientViewSet, 
     UnitOfMeasureViewSet, 
@@ -28,6 +35,10 @@ from .guest_api_views import (
     GuestTakeawayOrderUpdateView
 )
 from .staff_report_views import StaffPerformanceReportView
+from .daily_close_views import DailyCloseViewSet
+from .customer_account_views import CustomerAccountViewSet
+from .customer_report_views import CustomerCohortReportView
+from .menu_engineering_views import MenuEngineeringReportView
 from .admin_views import AdminUserManagementViewSet, NotificationSettingViewSet
 from .kds_views import KDSOrderViewSet
 from .pager_views import PagerViewSet
@@ -64,7 +75,15 @@ __all__ = [
     'PaymentViewSet',
     'ReportView',
     'DetailedSalesReportView',
+    'ReportExportJobView',
+    'ReportExportDownloadView',
+    'KDSLatencyReportView',
+    'ReportJobView',
     'StaffPerformanceReportView',
+    'DailyCloseViewSet',
+    'CustomerAccountViewSet',
+    'CustomerCohortReportView',
+    'MenuEngineeringReportView',
     'IngredientViewSet',
     'UnitOfMeasureViewSet',
     'RecipeItemViewSet',
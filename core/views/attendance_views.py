@@ -12,6 +12,7 @@ import uuid
 import logging
 
 from core.models import CheckInLocation, QRCode, AttendanceRecord, Business, CustomUser
+from core.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +48,14 @@ def validate_coordinates(latitude, longitude):
     except (ValueError, TypeError):
         return False
 
+class AttendanceHistoryPagination(KeysetPagination):
+    """Giriş-çıkış geçmişi için imleçli sayfalama; sayfa boyutu mevcut 'limit' parametresiyle aynıdır."""
+    ordering = ('-timestamp', '-id')
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+
 class AttendanceViewSet(viewsets.ViewSet):
     """
     Personel giriş-çıkış işlemleri için ViewSet
@@ -489,33 +498,38 @@ class AttendanceViewSet(viewsets.ViewSet):
             except ValueError:
                 return Response({'error': 'Geçersiz bitiş tarihi formatı (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
         
+        records_query = records_query.select_related('check_in_location')
+
+        # İmleçli sayfalama (?cursor=): (timestamp, id) üzerinde, COUNT ve OFFSET olmadan.
+        paginator = AttendanceHistoryPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(records_query, request, view=self)
+            return paginator.get_paginated_response([self._serialize_record(record) for record in page])
+
         # Sayfalama
         limit = min(int(request.GET.get('limit', 100)), 500)  # Max 500 kayıt
         offset = int(request.GET.get('offset', 0))
         
-        total_count = records_query.count()
-        records = records_query.select_related('check_in_location').order_by('-timestamp')[offset:offset+limit]
-        
-        # Response hazırla - DÜZELTME: Burada liste formatı doğru
-        records_data = []
-        for record in records:
-            records_data.append({
-                'id': record.id,
-                'user_id': record.user.id,  # DÜZELTME: user_id alanı eklendi
-                'business': record.business.id,
-                'type': record.type,
-                'timestamp': record.timestamp.isoformat(),
-                'latitude': float(record.latitude) if record.latitude else None,
-                'longitude': float(record.longitude) if record.longitude else None,
-                'check_in_location_id': record.check_in_location.id if record.check_in_location else None,  # DÜZELTME: field adı düzeltildi
-                'location_name': record.check_in_location.name if record.check_in_location else None,
-                'notes': record.notes,
-                'qr_code_data': record.qr_code_data,
-                'is_manual_entry': record.is_manual_entry,
-            })
+        records = records_query.order_by('-timestamp', '-id')[offset:offset+limit]
         
         # DÜZELTME: Response formatı düzeltildi
-        return Response(records_data)
+        return Response([self._serialize_record(record) for record in records])
+
+    def _serialize_record(self, record):
+        return {
+            'id': record.id,
+            'user_id': record.user_id,  # DÜZELTME: user_id alanı eklendi
+            'business': record.business_id,
+            'type': record.type,
+            'timestamp': record.timestamp.isoformat(),
+            'latitude': float(record.latitude) if record.latitude else None,
+            'longitude': float(record.longitude) if record.longitude else None,
+            'check_in_location_id': record.check_in_location_id,  # DÜZELTME: field adı düzeltildi
+            'location_name': record.check_in_location.name if record.check_in_location else None,
+            'notes': record.notes,
+            'qr_code_data': record.qr_code_data,
+            'is_manual_entry': record.is_manual_entry,
+        }
 
 
 @api_view(['GET'])
@@ -14,6 +14,7 @@ from ..serializers.business_website_serializers import (
 )
 # === YENİ: Yerleşim planı için serializer'ları import ediyoruz ===
 from ..serializers.business_serializers import BusinessLayoutSerializer
+from ..db_router import PUBLIC_READ_DB, read_replica_view
 
 class BusinessWebsiteDetailView(generics.RetrieveUpdateAPIView):
     """
@@ -36,6 +37,7 @@ class BusinessWebsiteDetailView(generics.RetrieveUpdateAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@read_replica_view(PUBLIC_READ_DB)
 def business_public_website_api(request, business_slug):
     """
     Herkese açık işletme web sitesi API'si (JSON)
@@ -112,6 +114,7 @@ def business_website_preview_api(request):
     except Business.DoesNotExist:
         return Response({'error': 'İşletme bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
 
+@read_replica_view(PUBLIC_READ_DB)
 def business_website_view(request, business_slug):
     """İşletme web sitesi template view"""
     try:
@@ -0,0 +1,133 @@
+# core/views/customer_account_views.py
+
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Q
+import logging
+
+from ..models import CustomerAccount
+from ..serializers import (
+    CustomerAccountSerializer, CustomerLedgerEntrySerializer, CustomerAccountPaymentSerializer,
+    CustomerAccountLinkSerializer, OrderSerializer
+)
+from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.customer_accounts import record_account_payment, link_customer_account, normalize_phone
+from ..utils.outbox import enqueue_business_notification
+from ..utils.order_revisions import record_order_revision
+from ..utils.order_read_model import load_order_for_response
+from ..pagination import StandardResultsSetPagination
+from .order_actions.financial_actions import _finalize_order_as_paid
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerAccountViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Veresiye müşterilerinin cari hesapları. Liste varsayılan olarak yalnızca borcu olan
+    hesapları bakiyeye göre döner (?include_settled=true ile tümü, ?needs_linking=true ile
+    eşleştirme bekleyenler); ekstre ve tahsilat hesap bazındadır.
+    """
+    serializer_class = CustomerAccountSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    queryset = CustomerAccount.objects.all()
+
+    def _get_business(self):
+        user = self.request.user
+        business = get_user_business(user)
+        if not business:
+            raise PermissionDenied("Bu işlem için yetkili bir işletmeniz bulunmuyor.")
+        if user.user_type == 'staff' and PermissionKeys.MANAGE_CREDIT_SALES not in user.staff_permissions:
+            raise PermissionDenied("Veresiye hesaplarını görüntüleme yetkiniz yok.")
+        return business
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(business=self._get_business())
+        if self.action != 'list':
+            return queryset
+
+        search = self.request.query_params.get('search', '').strip()
+        if search:
+            phone = normalize_phone(search)
+            search_filter = Q(name__icontains=search)
+            if phone:
+                search_filter |= Q(account_key__contains=phone)
+            queryset = queryset.filter(search_filter)
+        if self.request.query_params.get('needs_linking') == 'true':
+            # Telefonsuz veresiye hesapları: müşterinin hesabına elle bağlanmayı bekler.
+            return queryset.filter(needs_linking=True).order_by('-last_activity_at')
+        if self.request.query_params.get('include_settled') == 'true':
+            return queryset.order_by('-last_activity_at')
+        return queryset.filter(balance__gt=0).order_by('-balance', 'id')
+
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """Hesap ekstresi: hareketler yeniden eskiye, hareket sonrası bakiyeleriyle."""
+        account = self.get_object()
+        entries = account.entries.select_related('created_by').order_by('-created_at', '-id')
+        page = self.paginate_queryset(entries)
+        if page is not None:
+            return self.get_paginated_response(CustomerLedgerEntrySerializer(page, many=True).data)
+        return Response(CustomerLedgerEntrySerializer(entries, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def payments(self, request, pk=None):
+        """
+        Hesaba (kısmi) tahsilat yazar. Tutar en eski açık veresiye siparişlerine dağıtılır;
+        borcu tamamen kapanan siparişler ödendi olarak işaretlenir.
+        """
+        account = self.get_object()
+        serializer = CustomerAccountPaymentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payment_type = serializer.validated_data['payment_type']
+
+        with transaction.atomic():
+            try:
+                entry, fully_settled = record_account_payment(
+                    account, serializer.validated_data['amount'], payment_type,
+                    user=request.user, note=serializer.validated_data['note']
+                )
+            except ValueError as e:
+                return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            settled_orders = []
+            for credit_details in fully_settled:
+                order = credit_details.order
+                _finalize_order_as_paid(order, payment_type, order.grand_total, request.user, settle_ledger=False)
+                settled_orders.append(order)
+
+            # Revizyon ve outbox kaydı ödemeyle aynı işlemde yazılır; biri geri alınırsa diğeri de alınır.
+            for order in settled_orders:
+                order_data = OrderSerializer(load_order_for_response(order.id), context={'request': request}).data
+                enqueue_business_notification(order.business_id, 'order_status_update', {
+                    'event_type': 'order_completed_update',
+                    'order_id': order.id,
+                    'table_id': order.table_id,
+                    **record_order_revision(order.id, order_data),
+                })
+
+        account.refresh_from_db()
+        return Response({
+            'account': CustomerAccountSerializer(account).data,
+            'entry': CustomerLedgerEntrySerializer(entry).data,
+            'settled_order_ids': [order.id for order in settled_orders],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def link(self, request, pk=None):
+        """Eşleştirme bekleyen (telefonsuz) hesabı müşterinin telefonlu hesabına bağlar."""
+        account = self.get_object()
+        serializer = CustomerAccountLinkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = self.get_queryset().filter(id=serializer.validated_data['target_account']).first()
+        if target is None:
+            return Response({'detail': "Hedef hesap bulunamadı."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            target = link_customer_account(account, target, user=request.user)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(CustomerAccountSerializer(target).data)
@@ -0,0 +1,148 @@
+# core/views/customer_report_views.py
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+import logging
+
+from ..models import CustomerIdentity, CustomerCohortWeekly
+from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.customer_cohorts import week_start
+from ..utils.report_jobs import report_job_response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COHORT_WEEKS = 12
+MAX_COHORT_WEEKS = 52
+# Ziyaret sıklığı dağılımı: (etiket, en az, en fazla)
+VISIT_FREQUENCY_BUCKETS = (('1', 1, 1), ('2', 2, 2), ('3-4', 3, 4), ('5-9', 5, 9), ('10+', 10, None))
+
+
+def resolve_customer_cohort_params(query_params):
+    """Kohort aralığını mutlak haftalara (pazartesi) çevirir; saklanan sonuçlar aynı aralık için yeniden kullanılır."""
+    start_date_str = query_params.get('start_date')
+    end_date_str = query_params.get('end_date')
+    if start_date_str and end_date_str:
+        try:
+            start_week = week_start(datetime.strptime(start_date_str, "%Y-%m-%d").date())
+            end_week = week_start(datetime.strptime(end_date_str, "%Y-%m-%d").date())
+        except ValueError:
+            raise ValidationError({"detail": "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."})
+        if start_week > end_week:
+            raise ValidationError({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."})
+        if (end_week - start_week).days // 7 >= MAX_COHORT_WEEKS:
+            raise ValidationError({"detail": f"En fazla {MAX_COHORT_WEEKS} haftalık aralık seçilebilir."})
+    else:
+        try:
+            weeks = min(max(int(query_params.get('weeks', DEFAULT_COHORT_WEEKS)), 1), MAX_COHORT_WEEKS)
+        except ValueError:
+            raise ValidationError({"weeks": "Geçerli bir hafta sayısı girin."})
+        end_week = week_start(timezone.localdate())
+        start_week = end_week - timedelta(weeks=weeks - 1)
+    return {'start_week': start_week.isoformat(), 'end_week': end_week.isoformat()}
+
+
+def _spend_per_visit(spend, visits):
+    return (spend / visits).quantize(Decimal('0.01')) if visits else None
+
+
+def build_customer_cohort_report(business, params):
+    """
+    Ziyaret sıklığı, ziyaret başına harcama ve haftalık tutunma (retention) raporu. Veriler
+    önceden hesaplanmış kimlik ve haftalık kohort tablolarından iki sorguyla okunur.
+    """
+    start_week = date.fromisoformat(params['start_week'])
+    end_week = date.fromisoformat(params['end_week'])
+
+    frequency = CustomerIdentity.objects.filter(
+        business=business, first_visit_week__range=(start_week, end_week)
+    ).aggregate(
+        customers=Count('id'),
+        returning=Count('id', filter=Q(visit_count__gte=2)),
+        total_visits=Sum('visit_count'),
+        total_spend=Sum('total_spend'),
+        **{
+            f'bucket_{label}': Count('id', filter=Q(visit_count__gte=low) & (Q(visit_count__lte=high) if high else Q()))
+            for label, low, high in VISIT_FREQUENCY_BUCKETS
+        }
+    )
+
+    cohort_rows = CustomerCohortWeekly.objects.filter(
+        business=business, cohort_week__range=(start_week, end_week), activity_week__lte=end_week
+    ).values('cohort_week', 'activity_week', 'customers', 'visits', 'spend').order_by('cohort_week', 'activity_week')
+
+    cohorts = {}
+    weekly_totals = {}
+    for row in cohort_rows:
+        cohort = cohorts.setdefault(row['cohort_week'], {'cohort_week': row['cohort_week'], 'size': 0, 'weeks': []})
+        offset = (row['activity_week'] - row['cohort_week']).days // 7
+        if offset == 0:
+            cohort['size'] = row['customers']
+        cohort['weeks'].append({
+            'week_offset': offset,
+            'activity_week': row['activity_week'],
+            'active_customers': row['customers'],
+            'retention_rate': round(row['customers'] * 100 / cohort['size'], 1) if cohort['size'] else None,
+            'visits': row['visits'],
+            'spend': row['spend'],
+            'spend_per_visit': _spend_per_visit(row['spend'], row['visits']),
+        })
+        totals = weekly_totals.setdefault(row['activity_week'], {'visits': 0, 'spend': Decimal('0.00'), 'active_customers': 0})
+        totals['visits'] += row['visits']
+        totals['spend'] += row['spend']
+        totals['active_customers'] += row['customers']
+
+    customers = frequency['customers']
+    total_visits = frequency['total_visits'] or 0
+    total_spend = frequency['total_spend'] or Decimal('0.00')
+    return {
+        'start_week': start_week,
+        'end_week': end_week,
+        'summary': {
+            'new_customers': customers,
+            'returning_customers': frequency['returning'],
+            'repeat_rate': round(frequency['returning'] * 100 / customers, 1) if customers else None,
+            'avg_visits_per_customer': round(total_visits / customers, 2) if customers else None,
+            'spend_per_visit': _spend_per_visit(total_spend, total_visits),
+        },
+        'visit_frequency': [
+            {'visits': label, 'customers': frequency[f'bucket_{label}']}
+            for label, _, _ in VISIT_FREQUENCY_BUCKETS
+        ],
+        'cohorts': list(cohorts.values()),
+        'weekly': [
+            {
+                'week': week, **values,
+                'spend_per_visit': _spend_per_visit(values['spend'], values['visits']),
+            }
+            for week, values in sorted(weekly_totals.items())
+        ],
+    }
+
+
+class CustomerCohortReportView(APIView):
+    """Müşteri tekrar ziyaret ve kohort raporu (?weeks=12 veya ?start_date=&end_date=)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        try:
+            business_for_report = get_user_business(user)
+        except PermissionDenied as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        if not business_for_report:
+            return Response({"detail": "Raporları görüntülemek için yetkili bir işletmeniz bulunmuyor."}, status=status.HTTP_403_FORBIDDEN)
+
+        if user.user_type == 'staff' and PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
+            return Response({"detail": "Raporları görüntüleme yetkiniz yok."}, status=status.HTTP_403_FORBIDDEN)
+
+        params = resolve_customer_cohort_params(request.query_params)
+        return report_job_response(request, business_for_report, 'customer_cohorts', params)
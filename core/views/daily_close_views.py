@@ -0,0 +1,93 @@
+# core/views/daily_close_views.py
+
+from datetime import datetime, timedelta
+
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.utils import timezone
+import logging
+
+from ..models import DailyClose
+from ..serializers import DailyCloseSerializer
+from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.daily_close import (
+    business_day_bounds, close_business_day, current_business_date, summarize_daily_closes
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_date(value, field_name):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValidationError({field_name: "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."})
+
+
+class DailyCloseViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Gün sonu (Z) raporları. Kayıtlar periyodik görevle kapanış saatinde oluşturulur;
+    işletme sahibi biten bir günü elle de kapatabilir. Çok günlü özet, ham kayıtlar
+    yerine kapatılmış günlerin toplamıdır.
+    """
+    serializer_class = DailyCloseSerializer
+    permission_classes = [IsAuthenticated]
+    queryset = DailyClose.objects.all()
+
+    def _get_business(self):
+        user = self.request.user
+        business = get_user_business(user)
+        if not business:
+            raise PermissionDenied("Raporları görüntülemek için yetkili bir işletmeniz bulunmuyor.")
+        if user.user_type == 'staff' and PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
+            raise PermissionDenied("Raporları görüntüleme yetkiniz yok.")
+        return business
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(business=self._get_business()).select_related('closed_by')
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        if start_date:
+            queryset = queryset.filter(business_date__gte=_parse_date(start_date, 'start_date'))
+        if end_date:
+            queryset = queryset.filter(business_date__lte=_parse_date(end_date, 'end_date'))
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD aralığındaki kapatılmış günlerin toplamı."""
+        business = self._get_business()
+        start_date = _parse_date(request.query_params.get('start_date'), 'start_date')
+        end_date = _parse_date(request.query_params.get('end_date'), 'end_date')
+        if start_date > end_date:
+            raise ValidationError({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."})
+        return Response(summarize_daily_closes(business, start_date, end_date))
+
+    @action(detail=False, methods=['post'])
+    def close(self, request):
+        """Biten bir iş gününü elle kapatır (varsayılan: son biten gün). Yalnızca işletme sahibi."""
+        business = self._get_business()
+        if request.user.user_type != 'business_owner':
+            raise PermissionDenied("Gün sonu kapanışını yalnızca işletme sahibi yapabilir.")
+
+        business_date = request.data.get('business_date')
+        if business_date:
+            business_date = _parse_date(business_date, 'business_date')
+        else:
+            business_date = current_business_date(business) - timedelta(days=1)
+
+        _, period_end = business_day_bounds(business, business_date)
+        if period_end > timezone.now():
+            return Response(
+                {"detail": f"{business_date} iş günü henüz bitmedi; kapanış {period_end.isoformat()} sonrasında yapılabilir."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        daily_close, created = close_business_day(business, business_date, closed_by=request.user)
+        return Response(
+            self.get_serializer(daily_close).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
@@ -6,7 +6,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.http import Http404
 from django.db import transaction, IntegrityError
-from django.db.models import Q, Prefetch
+from django.db.models import Q
 from asgiref.sync import async_to_sync
 import logging
 from collections import Counter
@@ -24,95 +24,102 @@ from ..models import (
 from ..serializers import (
     GuestOrderCreateSerializer, MenuItemSerializer, CategorySerializer, OrderSerializer, GuestOrderItemSerializer
 )
+from ..utils.menu_snapshot import get_menu_snapshot, render_menu_response
+from ..utils.order_read_model import order_response_queryset, load_order_for_response
+from ..utils.idempotency import idempotent
+from ..db_router import PUBLIC_READ_DB
+from ..mixins import ReadReplicaMixin
 
 logger = logging.getLogger(__name__)
 
-def add_item_to_guest_order(order: Order, item_data_dict: dict, is_awaiting_staff_approval_flag: bool):
-    menu_item_instance = item_data_dict.get('menu_item_instance')
+def _guest_item_unit_price(item_data_dict):
+    menu_item_instance = item_data_dict['menu_item_instance']
+    if menu_item_instance.is_campaign_bundle:
+        # Kampanya geçerliliği liste doğrulamasında (resolve_order_items_data) denetlendi.
+        return menu_item_instance.represented_campaign.campaign_price
     variant_instance = item_data_dict.get('variant_instance')
-    quantity_to_add = item_data_dict.get('quantity', 1)
-    table_user = item_data_dict.get('table_user', None)
-    valid_extras_instances = item_data_dict.get('valid_extras_instances', [])
-
-    if not menu_item_instance:
-        logger.error("Hata: add_item_to_guest_order -> menu_item_instance bulunamadı.")
-        raise ValidationError({"detail": "Sipariş kalemi için ürün bilgisi eksik."})
-
-    incoming_extras_counter = Counter()
-    if valid_extras_instances:
-        for extra_detail in valid_extras_instances:
-            if isinstance(extra_detail.get('variant_instance'), MenuItemVariant):
-                incoming_extras_counter[(extra_detail['variant_instance'].id, extra_detail.get('quantity', 1))] += 1
-
-    matching_items_query = order.order_items.filter(
-        menu_item=menu_item_instance,
-        variant=variant_instance,
+    main_price = variant_instance.price if variant_instance else Decimal('0.00')
+    return main_price + sum(
+        extra_detail['variant_instance'].price * Decimal(str(extra_detail.get('quantity', 1)))
+        for extra_detail in item_data_dict.get('valid_extras_instances', [])
+    )
+
+
+def add_items_to_guest_order(order: Order, items_data_list: list, is_awaiting_staff_approval_flag: bool):
+    """
+    Misafirin gönderdiği kalemleri siparişe ekler. Aynı ürün/varyant/ekstra bileşimine sahip
+    bekleyen kalemin miktarı artırılır, diğerleri yeni kalem olarak eklenir. Siparişin
+    mevcut kalemleri tek seferde okunur; güncellemeler ve eklemeler toplu yazılır, böylece
+    sorgu sayısı kalem sayısından bağımsızdır. Toplu yazımlar sinyal üretmediği için
+    çağıran siparişi kaydetmelidir (KDS fişleri Order kaydıyla yeniden oluşturulur).
+    """
+    def extras_key(extras):
+        return frozenset(Counter(extras).items())
+
+    candidates = {}
+    for existing_item in order.order_items.filter(
         is_awaiting_staff_approval=is_awaiting_staff_approval_flag
-    ).prefetch_related('extras__variant')
-
-    found_item = None
-    for existing_item in matching_items_query:
-        existing_extras_counter = Counter(
-            (extra.variant_id, extra.quantity) for extra in existing_item.extras.all()
+    ).prefetch_related('extras'):
+        key = (
+            existing_item.menu_item_id, existing_item.variant_id,
+            extras_key((extra.variant_id, extra.quantity) for extra in existing_item.extras.all())
         )
-        if existing_extras_counter == incoming_extras_counter:
-            found_item = existing_item
-            break
-
-    item_price_per_unit = Decimal('0.00')
-
-    if menu_item_instance.is_campaign_bundle:
-        try:
-            campaign = menu_item_instance.represented_campaign
-            if campaign and campaign.is_active:
-                from django.utils import timezone
-                now_date = timezone.now().date()
-                if (campaign.start_date and campaign.start_date > now_date) or \
-                   (campaign.end_date and campaign.end_date < now_date):
-                    raise ValidationError(f"'{campaign.name}' kampanyası şu an geçerli değil.")
-                item_price_per_unit = campaign.campaign_price
-            else:
-                raise ValidationError(f"Kampanya '{menu_item_instance.name}' aktif değil veya bulunamadı.")
-        except (CampaignMenu.DoesNotExist, AttributeError):
-            raise ValidationError(f"Kampanya '{menu_item_instance.name}' için kampanya detayı düzgün tanımlanmamış/bulunamadı.")
-    else:
-        main_price = variant_instance.price if variant_instance else Decimal('0.00')
-        extras_total_price = sum(
-            extra_detail['variant_instance'].price * Decimal(str(extra_detail.get('quantity', 1)))
-            for extra_detail in valid_extras_instances if isinstance(extra_detail.get('variant_instance'), MenuItemVariant)
+        candidates.setdefault(key, existing_item)
+
+    updated_items = {}
+    new_items = []
+    new_items_extras = []
+    for item_data_dict in items_data_list:
+        menu_item_instance = item_data_dict.get('menu_item_instance')
+        if not menu_item_instance:
+            logger.error("Hata: add_items_to_guest_order -> menu_item_instance bulunamadı.")
+            raise ValidationError({"detail": "Sipariş kalemi için ürün bilgisi eksik."})
+        variant_instance = item_data_dict.get('variant_instance')
+        quantity_to_add = item_data_dict.get('quantity', 1)
+        valid_extras_instances = item_data_dict.get('valid_extras_instances', [])
+        item_price_per_unit = _guest_item_unit_price(item_data_dict)
+
+        key = (
+            menu_item_instance.id, variant_instance.id if variant_instance else None,
+            extras_key((extra['variant_instance'].id, extra.get('quantity', 1)) for extra in valid_extras_instances)
         )
-        item_price_per_unit = main_price + extras_total_price
-
-    with transaction.atomic():
+        found_item = candidates.get(key)
         if found_item:
             found_item.quantity += quantity_to_add
             found_item.price = item_price_per_unit
-            found_item.save(update_fields=['quantity', 'price'])
-            processed_item = found_item
-            logger.info(f"Guest Add: OrderItem ID {found_item.id} miktarı {quantity_to_add} artırıldı. Yeni miktar: {found_item.quantity}.")
-        else:
-            kds_status_for_new_item = OrderItem.KDS_ITEM_STATUS_CHOICES[0][0] if menu_item_instance.category and menu_item_instance.category.assigned_kds else None
-            order_item = OrderItem.objects.create(
-                order=order,
-                menu_item=menu_item_instance,
-                variant=variant_instance,
-                quantity=quantity_to_add,
-                table_user=None,
-                price=item_price_per_unit,
-                is_awaiting_staff_approval=is_awaiting_staff_approval_flag,
-                kds_status=kds_status_for_new_item
-            )
-            for extra_data in valid_extras_instances:
-                if isinstance(extra_data.get('variant_instance'), MenuItemVariant):
-                    OrderItemExtra.objects.create(
-                        order_item=order_item,
-                        variant=extra_data['variant_instance'],
-                        quantity=extra_data.get('quantity', 1)
-                    )
-            processed_item = order_item
-            logger.info(f"Guest Add: Yeni OrderItem ID {order_item.id} Sipariş ID {order.id} için oluşturuldu.")
-
-    return OrderItem.objects.select_related('menu_item', 'menu_item__category', 'variant').prefetch_related('extras__variant').get(id=processed_item.id)
+            if found_item.pk:
+                updated_items[found_item.pk] = found_item
+            logger.info(f"Guest Add: OrderItem ID {found_item.pk} miktarı {quantity_to_add} artırıldı. Yeni miktar: {found_item.quantity}.")
+            continue
+
+        kds_status_for_new_item = OrderItem.KDS_ITEM_STATUS_CHOICES[0][0] if menu_item_instance.category and menu_item_instance.category.assigned_kds else None
+        order_item = OrderItem(
+            order=order,
+            menu_item=menu_item_instance,
+            variant=variant_instance,
+            quantity=quantity_to_add,
+            table_user=None,
+            price=item_price_per_unit,
+            is_awaiting_staff_approval=is_awaiting_staff_approval_flag,
+            kds_status=kds_status_for_new_item
+        )
+        candidates[key] = order_item
+        new_items.append(order_item)
+        new_items_extras.append(valid_extras_instances)
+
+    with transaction.atomic():
+        if updated_items:
+            OrderItem.objects.bulk_update(updated_items.values(), ['quantity', 'price'])
+        OrderItem.objects.bulk_create(new_items)
+        OrderItemExtra.objects.bulk_create([
+            OrderItemExtra(order_item=order_item, variant=extra_data['variant_instance'], quantity=extra_data.get('quantity', 1))
+            for order_item, valid_extras_instances in zip(new_items, new_items_extras)
+            for extra_data in valid_extras_instances
+        ])
+    logger.info(
+        f"Guest Add: Sipariş ID {order.id} için {len(updated_items)} kalem güncellendi, {len(new_items)} yeni kalem oluşturuldu."
+    )
+    return len(updated_items), len(new_items)
 
 class GuestOrderCreateView(generics.GenericAPIView):
     serializer_class = GuestOrderCreateSerializer
@@ -128,6 +135,7 @@ class GuestOrderCreateView(generics.GenericAPIView):
             logger.warning("GuestOrderCreateView.get_serializer_context: table_instance_for_context set edilmemiş olabilir.")
         return context
 
+    @idempotent
     def post(self, request, table_uuid):
         try:
             self.table_instance_for_context = Table.objects.select_related('business').get(uuid=table_uuid)
@@ -165,9 +173,7 @@ class GuestOrderCreateView(generics.GenericAPIView):
 
             if active_order:
                 logger.info(f"Masa {table_instance.table_number} için mevcut aktif sipariş (ID: {active_order.id}, Durum: {active_order.status}) bulundu. Ürünler bu siparişe eklenecek/güncellenecek.")
-                from django.utils import timezone
-                for item_data_dict in items_to_add_data_list:
-                    add_item_to_guest_order(active_order, item_data_dict, is_awaiting_staff_approval_flag=True)
+                add_items_to_guest_order(active_order, items_to_add_data_list, is_awaiting_staff_approval_flag=True)
 
                 if active_order.status != Order.STATUS_PENDING_APPROVAL or active_order.taken_by_staff is not None:
                     logger.info(f"Sipariş #{active_order.id} misafir tarafından güncellendi. Durum '{Order.STATUS_PENDING_APPROVAL}' olarak sıfırlanıyor.")
@@ -213,16 +219,17 @@ class GuestOrderCreateView(generics.GenericAPIView):
                     extra_data=extra_data
                 )
             )
-            final_order_to_return.refresh_from_db()
+            final_order_to_return = load_order_for_response(final_order_to_return.id)
             full_order_serializer = OrderSerializer(final_order_to_return, context=self.get_serializer_context())
             return Response(full_order_serializer.data, status=response_status_code)
         else:
             logger.error("GuestOrderCreateView: Sipariş oluşturma/güncelleme sonrası final_order_to_return None kaldı.")
             return Response({"detail": "Sipariş işlenirken beklenmedik bir sorun oluştu."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class GuestMenuView(generics.ListAPIView):
+class GuestMenuView(ReadReplicaMixin, generics.ListAPIView):
     serializer_class = MenuItemSerializer
     permission_classes = [AllowAny]
+    read_replica_alias = PUBLIC_READ_DB
 
     def get_queryset(self):
         return MenuItem.objects.none()
@@ -237,7 +244,7 @@ class GuestMenuView(generics.ListAPIView):
         except (ValueError, Table.DoesNotExist, Http404):
             return Response({"detail": "Geçersiz veya bulunamayan masa kodu."}, status=status.HTTP_404_NOT_FOUND)
 
-        active_order = Order.objects.filter(
+        active_order = order_response_queryset().filter(
             table=table,
             business=business,
             customer__isnull=True,
@@ -245,68 +252,45 @@ class GuestMenuView(generics.ListAPIView):
             credit_payment_details__isnull=True
         ).exclude(
             Q(status=Order.STATUS_REJECTED) | Q(status=Order.STATUS_CANCELLED) | Q(status=Order.STATUS_COMPLETED)
-        ).prefetch_related(
-            Prefetch('order_items', queryset=OrderItem.objects.select_related('menu_item__category', 'variant').prefetch_related('extras__variant')),
-            'table_users'
-        ).select_related('payment_info', 'taken_by_staff').order_by('-created_at').first()
+        ).order_by('-created_at').first()
 
         active_order_data = None
         if active_order:
             active_order_data = OrderSerializer(active_order, context=self.get_serializer_context()).data
 
-        menu_items_qs = MenuItem.objects.filter(business=business, is_active=True).prefetch_related(
-            'variants'
-        ).select_related('category', 'category__parent')
-
-        categories_qs = Category.objects.filter(business=business).prefetch_related('subcategories')
-
-        menu_item_serializer = MenuItemSerializer(menu_items_qs, many=True, context=self.get_serializer_context())
-        category_serializer = CategorySerializer(categories_qs, many=True, context=self.get_serializer_context())
-
-        return Response({
-            'menu_items': menu_item_serializer.data,
-            'categories': category_serializer.data,
-            'business_name': business.name,
+        # Menü (ürünler, kategoriler, işletme adı) paylaşılan önbellekteki anlık görüntüden gelir.
+        return render_menu_response(request, get_menu_snapshot(business), {
             'table_number': table.table_number,
             'table_uuid': str(table.uuid),
             'active_order': active_order_data,
-        }, status=status.HTTP_200_OK)
+        })
 
-class GuestTakeawayMenuView(generics.ListAPIView):
+class GuestTakeawayMenuView(ReadReplicaMixin, generics.ListAPIView):
     serializer_class = MenuItemSerializer
     permission_classes = [AllowAny]
+    read_replica_alias = PUBLIC_READ_DB
 
     def get_queryset(self):
         return MenuItem.objects.none()
 
     def get(self, request, order_uuid):
         try:
-            active_order = Order.objects.filter(
+            active_order = order_response_queryset().filter(
                 uuid=order_uuid,
                 order_type='takeaway'
             ).exclude(
                 Q(status__in=[Order.STATUS_COMPLETED, Order.STATUS_CANCELLED, Order.STATUS_REJECTED])
-            ).prefetch_related(
-                Prefetch('order_items', queryset=OrderItem.objects.select_related('menu_item__category', 'variant').prefetch_related('extras__variant'))
-            ).select_related('business').first()
+            ).first()
 
             if not active_order:
                 return Response({"detail": "Geçersiz veya tamamlanmış sipariş linki."}, status=status.HTTP_404_NOT_FOUND)
 
             business = active_order.business
-            menu_items_qs = MenuItem.objects.filter(business=business, is_active=True).prefetch_related('variants__stock').select_related('category', 'category__parent')
-            categories_qs = Category.objects.filter(business=business).prefetch_related('subcategories')
-
-            menu_item_serializer = MenuItemSerializer(menu_items_qs, many=True, context={'request': request})
-            category_serializer = CategorySerializer(categories_qs, many=True, context={'request': request})
             active_order_data = OrderSerializer(active_order, context={'request': request}).data
 
-            return Response({
-                'menu_items': menu_item_serializer.data,
-                'categories': category_serializer.data,
-                'business_name': business.name,
+            return render_menu_response(request, get_menu_snapshot(business), {
                 'active_order': active_order_data,
-            }, status=status.HTTP_200_OK)
+            })
 
         except (ValueError, Order.DoesNotExist, Http404):
             return Response({"detail": "Geçersiz sipariş kodu."}, status=status.HTTP_404_NOT_FOUND)
@@ -322,6 +306,7 @@ class GuestTakeawayOrderUpdateView(generics.GenericAPIView):
             context['business_from_context'] = self.business_instance_for_context
         return context
 
+    @idempotent
     def post(self, request, order_uuid):
         try:
             order_to_update = Order.objects.filter(
@@ -344,8 +329,7 @@ class GuestTakeawayOrderUpdateView(generics.GenericAPIView):
                 return Response({'detail': 'Eklenecek ürün bulunmuyor.'}, status=status.HTTP_400_BAD_REQUEST)
 
             with transaction.atomic():
-                for item_data_dict in validated_items:
-                    add_item_to_guest_order(order_to_update, item_data_dict, is_awaiting_staff_approval_flag=True)
+                add_items_to_guest_order(order_to_update, validated_items, is_awaiting_staff_approval_flag=True)
 
                 order_to_update.status = Order.STATUS_PENDING_APPROVAL
                 order_to_update.save(update_fields=['status'])
@@ -366,7 +350,7 @@ class GuestTakeawayOrderUpdateView(generics.GenericAPIView):
                 )
             )
 
-            order_to_update.refresh_from_db()
+            order_to_update = load_order_for_response(order_to_update.id)
             final_order_data = OrderSerializer(order_to_update, context={'request': request}).data
 
             return Response(final_order_data, status=status.HTTP_200_OK)
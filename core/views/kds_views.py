@@ -12,8 +12,11 @@ import json
 from django.db.models import Prefetch, Q, Exists, OuterRef
 from decimal import Decimal
 
-from ..models import Order, CustomUser, OrderItem, CreditPaymentDetails, KDSScreen, Business, Category
-from ..serializers import KDSOrderSerializer
+from ..models import Order, CustomUser, OrderItem, CreditPaymentDetails, KDSScreen, Business, Category, KDSTicket
+from ..serializers import KDSOrderSerializer, KDSTicketSerializer
+from ..utils.kds_tickets import rebuild_kds_tickets
+from ..utils.staff_metrics import record_items_prepared
+from ..utils.kds_latency import record_prep_latencies
 from ..utils.order_helpers import get_user_business, PermissionKeys
 from ..signals.order_signals import send_order_update_notification
 
@@ -130,6 +133,25 @@ class KDSOrderViewSet(viewsets.ReadOnlyModelViewSet):
         
         return relevant_orders
 
+    def list(self, request, *args, **kwargs):
+        """
+        KDS listesi, ekran bazlı KDSTicket projeksiyonundan tek bir indeksli sorguyla okunur;
+        sipariş başına kalem/ekstra/kategori sorgusu yapılmaz.
+        """
+        target_kds_screen = getattr(self, 'target_kds_screen', None)
+        if not target_kds_screen:
+            return Response([])
+
+        tickets = KDSTicket.objects.filter(
+            kds_screen=target_kds_screen,
+            is_listed=True
+        ).order_by('order_created_at', 'order_id')
+
+        page = self.paginate_queryset(tickets)
+        if page is not None:
+            return self.get_paginated_response(KDSTicketSerializer(page, many=True).data)
+        return Response(KDSTicketSerializer(tickets, many=True).data)
+
     @action(detail=True, methods=['post'], url_path='start-preparation')
     @transaction.atomic
     def start_preparation(self, request, kds_slug=None, pk=None):
@@ -210,7 +232,8 @@ class KDSOrderViewSet(viewsets.ReadOnlyModelViewSet):
             )
             item.kds_status = OrderItem.KDS_ITEM_STATUS_PREPARING 
             item.item_prepared_by_staff = request.user
-            item.save(update_fields=['kds_status', 'item_prepared_by_staff'])
+            item.kds_preparing_at = timezone.now()
+            item.save(update_fields=['kds_status', 'item_prepared_by_staff', 'kds_preparing_at'])
             updated_item_ids.append(item.id)
         
         update_fields_for_notification = []
@@ -228,6 +251,7 @@ class KDSOrderViewSet(viewsets.ReadOnlyModelViewSet):
             )
         )
         
+        rebuild_kds_tickets(order.id)
         order.refresh_from_db()
         serializer = self.get_serializer(order)
         return Response(serializer.data)
@@ -259,13 +283,29 @@ class KDSOrderViewSet(viewsets.ReadOnlyModelViewSet):
             kds_status__in=[OrderItem.KDS_ITEM_STATUS_PENDING, OrderItem.KDS_ITEM_STATUS_PREPARING]
         )
 
-        if not items_to_mark_ready.exists():
+        # Satırlar kilitlenir: eşzamanlı bir istek aynı kalemleri işaretleyip personel özetine ve
+        # gecikme histogramına ikinci kez yazamaz (kilit bırakılınca kalemler artık filtreye uymaz).
+        items_being_marked = list(
+            items_to_mark_ready.select_for_update(of=('self',)).only('id', 'created_at', 'kds_preparing_at')
+        )
+        if not items_being_marked:
             return Response({'detail': 'Bu KDS için hazır olarak işaretlenecek aktif ürün bulunmuyor.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_item_count = items_to_mark_ready.update(
+        ready_at = timezone.now()
+        updated_item_count = items_to_mark_ready.filter(id__in=[item.id for item in items_being_marked]).update(
             kds_status=OrderItem.KDS_ITEM_STATUS_READY,
-            item_prepared_by_staff=request.user
+            item_prepared_by_staff=request.user,
+            kds_ready_at=ready_at
         )
+        # Toplu güncelleme sinyal üretmez; personel özeti ve gecikme histogramı burada güncellenir.
+        # Yalnızca bu isteğin güncellediği kalemler sayılır.
+        if updated_item_count != len(items_being_marked):
+            ready_ids = set(OrderItem.objects.filter(
+                id__in=[item.id for item in items_being_marked], kds_ready_at=ready_at, item_prepared_by_staff=request.user
+            ).values_list('id', flat=True))
+            items_being_marked = [item for item in items_being_marked if item.id in ready_ids]
+        record_items_prepared(order, items_being_marked, request.user.id, ready_at=ready_at)
+        record_prep_latencies(order, items_being_marked, ready_at)
         logger.info(f"KDS '{target_kds_screen.name}': Order #{order.id} için {updated_item_count} kalem 'KDS Hazır' olarak işaretlendi.")
 
         # ==================== ÇÖZÜMÜN UYGULANDIĞI YER BAŞLANGICI ====================
@@ -325,6 +365,7 @@ class KDSOrderViewSet(viewsets.ReadOnlyModelViewSet):
             
         # ==================== ÇÖZÜMÜN UYGULANDIĞI YER SONU ====================
             
+        rebuild_kds_tickets(order.id)
         order.refresh_from_db()
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,167 @@
+# core/views/menu_engineering_views.py
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+import logging
+
+from ..models import ItemSalesDailyRollup
+from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.report_jobs import report_job_response
+
+logger = logging.getLogger(__name__)
+
+# Kasavana-Smith yöntemi: bir ürün, beklenen payın (%100 / ürün sayısı) en az %70'ini
+# satıyorsa popüler sayılır.
+POPULARITY_FACTOR = Decimal('0.70')
+
+CLASS_STAR = 'star'
+CLASS_PLOWHORSE = 'plowhorse'
+CLASS_PUZZLE = 'puzzle'
+CLASS_DOG = 'dog'
+
+
+def resolve_menu_engineering_params(query_params):
+    """Dönemi mutlak tarihlere çevirir (?start_date=&end_date= veya ?time_range=week|month|year)."""
+    start_date_str = query_params.get('start_date')
+    end_date_str = query_params.get('end_date')
+    today = timezone.localdate()
+    if start_date_str and end_date_str:
+        try:
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValidationError({"detail": "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."})
+        if start_date > end_date:
+            raise ValidationError({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."})
+    else:
+        time_range_filter = query_params.get('time_range', 'month')
+        end_date = today
+        if time_range_filter == 'week':
+            start_date = today - timedelta(days=today.weekday())
+        elif time_range_filter == 'year':
+            start_date = today.replace(month=1, day=1)
+        else:
+            start_date = today.replace(day=1)
+
+    try:
+        category_id = int(query_params['category']) if query_params.get('category') else None
+    except ValueError:
+        raise ValidationError({"detail": "Geçersiz kategori ID'si."})
+    return {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(), 'category': category_id}
+
+
+def _classify(popular, profitable):
+    if popular:
+        return CLASS_STAR if profitable else CLASS_PLOWHORSE
+    return CLASS_PUZZLE if profitable else CLASS_DOG
+
+
+def build_menu_engineering_report(business, params):
+    """
+    Menü mühendisliği raporu: her ürün satış payına (popülerlik) ve birim katkı payına
+    (kârlılık) göre star / plowhorse / puzzle / dog olarak sınıflandırılır. Veriler günlük
+    ürün satış özetinden tek bir gruplu sorguyla okunur; maliyet, ödeme anında sabitlenen
+    reçete maliyetidir. Maliyeti bilinmeyen satışlar katkı payı hesabına katılmaz.
+    """
+    start_date = date.fromisoformat(params['start_date'])
+    end_date = date.fromisoformat(params['end_date'])
+
+    rollups = ItemSalesDailyRollup.objects.filter(business=business, date__range=(start_date, end_date))
+    if params.get('category'):
+        rollups = rollups.filter(menu_item__category_id=params['category'])
+    rows = list(
+        rollups.values('menu_item_id', 'menu_item__name', 'menu_item__category__name').annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('revenue'),
+            total_cost=Sum('cost'),
+            total_costed_quantity=Sum('costed_quantity'),
+        ).filter(total_quantity__gt=0).order_by('-total_quantity', 'menu_item_id')
+    )
+
+    items = []
+    total_quantity = 0
+    total_margin = Decimal('0.00')
+    margin_quantity = 0
+    for row in rows:
+        quantity = row['total_quantity']
+        revenue = row['total_revenue'] or Decimal('0.00')
+        costed_quantity = row['total_costed_quantity'] or 0
+        unit_price = revenue / quantity
+        # Birim maliyet yalnızca maliyeti sabitlenmiş satışlardan hesaplanır.
+        unit_cost = (row['total_cost'] or Decimal('0.000')) / costed_quantity if costed_quantity else None
+        unit_margin = unit_price - unit_cost if unit_cost is not None else None
+        if unit_margin is not None:
+            total_margin += unit_margin * quantity
+            margin_quantity += quantity
+        total_quantity += quantity
+        items.append({
+            'menu_item_id': row['menu_item_id'],
+            'name': row['menu_item__name'],
+            'category': row['menu_item__category__name'],
+            'quantity_sold': quantity,
+            'revenue': revenue,
+            'avg_price': unit_price.quantize(Decimal('0.01')),
+            'unit_cost': unit_cost.quantize(Decimal('0.01')) if unit_cost is not None else None,
+            'unit_margin': unit_margin,
+            'total_margin': (unit_margin * quantity).quantize(Decimal('0.01')) if unit_margin is not None else None,
+            'cost_coverage': round(costed_quantity * 100 / quantity, 1),
+        })
+
+    popularity_threshold = (Decimal('100') / len(items) * POPULARITY_FACTOR) if items else None
+    margin_threshold = total_margin / margin_quantity if margin_quantity else None
+    counts = {CLASS_STAR: 0, CLASS_PLOWHORSE: 0, CLASS_PUZZLE: 0, CLASS_DOG: 0}
+    for item in items:
+        menu_mix = Decimal(item['quantity_sold'] * 100) / total_quantity
+        item['menu_mix'] = round(menu_mix, 2)
+        if item['unit_margin'] is None:
+            item['classification'] = None
+        else:
+            item['classification'] = _classify(
+                menu_mix >= popularity_threshold, item['unit_margin'] >= margin_threshold
+            )
+            counts[item['classification']] += 1
+            item['unit_margin'] = item['unit_margin'].quantize(Decimal('0.01'))
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'category': params.get('category'),
+        'item_count': len(items),
+        'total_quantity': total_quantity,
+        'popularity_threshold': round(popularity_threshold, 2) if popularity_threshold is not None else None,
+        'margin_threshold': margin_threshold.quantize(Decimal('0.01')) if margin_threshold is not None else None,
+        'classification_counts': counts,
+        'items': items,
+    }
+
+
+class MenuEngineeringReportView(APIView):
+    """
+    Menü mühendisliği (popülerlik x katkı payı) raporu. Sınıflandırma dönem içindeki satışlara
+    göredir; ?category= ile kategori içinde yapılabilir.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        try:
+            business_for_report = get_user_business(user)
+        except PermissionDenied as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        if not business_for_report:
+            return Response({"detail": "Raporları görüntülemek için yetkili bir işletmeniz bulunmuyor."}, status=status.HTTP_403_FORBIDDEN)
+
+        if user.user_type == 'staff' and PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
+            return Response({"detail": "Raporları görüntüleme yetkiniz yok."}, status=status.HTTP_403_FORBIDDEN)
+
+        params = resolve_menu_engineering_params(request.query_params)
+        return report_job_response(request, business_for_report, 'menu_engineering', params)
@@ -8,20 +8,24 @@ from django.db import transaction
 from django.db.models import Prefetch, Q
 from decimal import Decimal
 import logging
-from asgiref.sync import async_to_sync
 
-from makarna_project.asgi import sio
 from ...models import Order, CreditPaymentDetails, Payment
 from ...serializers import OrderSerializer
 from ...utils.order_helpers import PermissionKeys, get_user_business
-from ...utils.json_helpers import convert_decimals_to_strings
+from ...utils.order_read_model import load_order_for_response
+from ...utils.outbox import enqueue_business_notification
+from ...utils.order_revisions import record_order_revision
+from ...utils.customer_accounts import charge_credit_sale, settle_credit_order
 from ...services.payment_service_factory import PaymentServiceFactory
 
 logger = logging.getLogger(__name__)
 
 @transaction.atomic
-def _finalize_order_as_paid(order: Order, payment_type: str, amount: Decimal, request_user):
-    """Bir siparişi ödenmiş olarak işaretler ve ilgili işlemleri yapar."""
+def _finalize_order_as_paid(order: Order, payment_type: str, amount: Decimal, request_user, settle_ledger=True):
+    """
+    Bir siparişi ödenmiş olarak işaretler ve ilgili işlemleri yapar. Veresiye siparişin
+    cari hesapta kalan borcu, settle_ledger=False (tahsilat zaten hesaba yazılmış) değilse düşülür.
+    """
     if order.is_paid:
         # Zaten ödenmişse tekrar işlem yapma
         return order
@@ -29,6 +33,8 @@ def _finalize_order_as_paid(order: Order, payment_type: str, amount: Decimal, re
     if hasattr(order, 'credit_payment_details') and order.credit_payment_details:
         credit_details = order.credit_payment_details
         if credit_details.paid_at is None:
+            if settle_ledger:
+                settle_credit_order(credit_details, payment_type, request_user)
             credit_details.paid_at = timezone.now()
             credit_details.save(update_fields=['paid_at'])
             logger.info(f"Sipariş #{order.id} için veresiye kaydı kapatıldı.")
@@ -91,26 +97,17 @@ def mark_as_paid_action(view_instance, request, pk=None):
     
     original_table_id = order.table.id if order.table else None
     
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
     order_serializer = OrderSerializer(order, context={'request': request})
     
-    if sio:
-        room_name = f'business_{order.business.id}'
-        # === DEĞİŞİKLİK BURADA ===
-        # 'event_type' artık .arb dosyasındaki anahtarla eşleşiyor.
-        # Hardcoded 'message' alanı kaldırıldı, çünkü bu metin artık mobil uygulama tarafında oluşturulacak.
-        payload = {
-            'event_type': 'order_completed_update',
-            'order_id': order.id,
-            'table_id': original_table_id,
-            'updated_order_data': order_serializer.data,
-        }
-        try:
-            cleaned_payload = convert_decimals_to_strings(payload)
-            async_to_sync(sio.emit)('order_status_update', cleaned_payload, room=room_name)
-            logger.info(f"Socket.IO (Ödeme): 'order_status_update' (order_completed_update) {room_name} odasına gönderildi (Sipariş ID: {order.id}).")
-        except Exception as e_socket:
-            logger.error(f"Socket.IO event gönderilirken hata (ödeme - sipariş {order.id}): {e_socket}", exc_info=True)
+    # 'event_type' .arb dosyasındaki anahtarla eşleşir; bildirim metni mobil uygulama tarafında oluşturulur.
+    payload = {
+        'event_type': 'order_completed_update',
+        'order_id': order.id,
+        'table_id': original_table_id,
+        **record_order_revision(order.id, order_serializer.data),
+    }
+    enqueue_business_notification(order.business_id, 'order_status_update', payload)
 
     return Response(order_serializer.data, status=status.HTTP_200_OK)
 
@@ -155,25 +152,16 @@ def check_qr_payment_status_action(view_instance, request, pk=None):
             
             # Başarılı finalizasyon sonrası socket bildirimi gönder
             original_table_id = finalized_order.table.id if finalized_order.table else None
-            finalized_order.refresh_from_db()
+            finalized_order = load_order_for_response(finalized_order.id)
             order_serializer = OrderSerializer(finalized_order, context={'request': request})
 
-            if sio:
-                room_name = f'business_{finalized_order.business.id}'
-                # === DEĞİŞİKLİK BURADA ===
-                # 'event_type' standartlaştırıldı ve hardcoded 'message' kaldırıldı.
-                payload = {
-                    'event_type': 'order_completed_update',
-                    'order_id': finalized_order.id,
-                    'table_id': original_table_id,
-                    'updated_order_data': order_serializer.data,
-                }
-                try:
-                    cleaned_payload = convert_decimals_to_strings(payload)
-                    async_to_sync(sio.emit)('order_status_update', cleaned_payload, room=room_name)
-                    logger.info(f"Socket.IO (QR Ödeme): 'order_status_update' (order_completed_update) {room_name} odasına gönderildi (Sipariş ID: {finalized_order.id}).")
-                except Exception as e_socket:
-                    logger.error(f"Socket.IO event gönderilirken hata (QR ödeme - sipariş {finalized_order.id}): {e_socket}", exc_info=True)
+            payload = {
+                'event_type': 'order_completed_update',
+                'order_id': finalized_order.id,
+                'table_id': original_table_id,
+                **record_order_revision(finalized_order.id, order_serializer.data),
+            }
+            enqueue_business_notification(finalized_order.business_id, 'order_status_update', payload)
             
         return Response(status_response, status=status.HTTP_200_OK)
         
@@ -207,7 +195,7 @@ def save_credit_payment_action(view_instance, request, pk=None):
 
     Payment.objects.filter(order=order).delete()
 
-    CreditPaymentDetails.objects.update_or_create(
+    credit_details, _ = CreditPaymentDetails.objects.update_or_create(
         order=order,
         defaults={'notes': notes, 'paid_at': None}
     )
@@ -220,32 +208,27 @@ def save_credit_payment_action(view_instance, request, pk=None):
     
     order.save(update_fields=['customer_name', 'customer_phone', 'is_paid', 'status', 'delivered_at'])
     logger.info(f"Order ID {order.id} veresiye olarak kaydedildi. is_paid={order.is_paid}, status={order.status}.")
+    charge_credit_sale(order, credit_details, user)
     
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
     order_serializer = OrderSerializer(order, context={'request': request})
     
-    if sio:
-        room_name = f'business_{order.business.id}'
-        # === DEĞİŞİKLİK BURADA ===
-        # 'message' alanı kaldırıldı. Not: 'order_credit_sale' için .arb dosyanıza özel bir
-        # çeviri anahtarı ekleyebilir ve socket_service.dart'taki _buildLocalizedMessage
-        # fonksiyonuna yeni bir 'case' ekleyerek daha açıklayıcı bir bildirim oluşturabilirsiniz.
-        payload = {
-            'event_type': 'order_credit_sale',
-            'order_id': order.id,
-            'updated_order_data': order_serializer.data,
-        }
-        try:
-            cleaned_payload = convert_decimals_to_strings(payload)
-            async_to_sync(sio.emit)('order_status_update', cleaned_payload, room=room_name)
-            logger.info(f"Socket.IO (Veresiye): 'order_status_update' (credit_sale) {room_name} odasına gönderildi (Sipariş ID: {order.id}).")
-        except Exception as e_socket:
-            logger.error(f"Socket.IO event gönderilirken hata (veresiye - sipariş {order.id}): {e_socket}", exc_info=True)
+    # Not: 'order_credit_sale' için .arb dosyanıza özel bir çeviri anahtarı ekleyebilir ve
+    # socket_service.dart'taki _buildLocalizedMessage fonksiyonuna yeni bir 'case' ekleyebilirsiniz.
+    payload = {
+        'event_type': 'order_credit_sale',
+        'order_id': order.id,
+        **record_order_revision(order.id, order_serializer.data),
+    }
+    enqueue_business_notification(order.business_id, 'order_status_update', payload)
 
     return Response(order_serializer.data, status=status.HTTP_200_OK)
 
 def list_credit_sales_action(view_instance, request):
-    """Ödenmemiş veresiye satışları listeler."""
+    """
+    Ödenmemiş veresiye satışları listeler; ?customer_account=<id> ile tek bir cari hesabın
+    açık siparişleri alınır. Müşteri bazında güncel borçlar için cari hesap listesi kullanılır.
+    """
     user = request.user
     user_business = get_user_business(user)
 
@@ -257,13 +240,21 @@ def list_credit_sales_action(view_instance, request):
     if not user_business:
         if not (user.is_staff or user.is_superuser):
             raise PermissionDenied("Veresiye satışları görüntüleme yetkiniz yok.")
-        queryset = base_queryset.filter(credit_payment_details__isnull=False, is_paid=False)
+        queryset = base_queryset.filter(credit_payment_details__paid_at__isnull=True, credit_payment_details__isnull=False, is_paid=False)
     else:
         queryset = base_queryset.filter(
             business=user_business,
             credit_payment_details__isnull=False,
+            credit_payment_details__paid_at__isnull=True,
             is_paid=False
         )
+
+    customer_account_id = request.query_params.get('customer_account')
+    if customer_account_id:
+        try:
+            queryset = queryset.filter(credit_payment_details__account_id=int(customer_account_id))
+        except ValueError:
+            raise ValidationError({'customer_account': 'Geçersiz hesap ID.'})
     
     page = view_instance.paginate_queryset(queryset)
     if page is not None:
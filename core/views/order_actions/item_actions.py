@@ -7,14 +7,14 @@ from django.utils import timezone
 from django.db import transaction
 from decimal import Decimal
 import logging
-from asgiref.sync import async_to_sync
 
-from makarna_project.asgi import sio
 from ...models import Order, MenuItem, MenuItemVariant, OrderItem, OrderItemExtra, NOTIFICATION_EVENT_TYPES
 from ...serializers import OrderSerializer
 from ...utils.order_helpers import PermissionKeys
+from ...utils.order_read_model import load_order_for_response
 from ...signals.order_signals import send_order_update_notification
-from ...utils.json_helpers import convert_decimals_to_strings
+from ...utils.outbox import enqueue_business_notification
+from ...utils.order_revisions import record_order_revision
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +99,7 @@ def add_item_action(view_instance, request, pk=None):
 
     order.save(update_fields=['status', 'taken_by_staff', 'approved_at'])
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
 
     item_added_info = {
         'item_name': processed_item.menu_item.name,
@@ -162,24 +162,18 @@ def deliver_item_action(view_instance, request, pk=None):
         order_updated = True
         logger.info(f"[DELIVER_ITEM] All items in Order ID {order.id} are now delivered. Order delivered_at updated.")
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
     order_serializer = OrderSerializer(order, context={'request': request})
 
-    if sio:
-        room_name = f'business_{order.business.id}'
-        payload = {
-            'event_type': 'order_item_delivered',
-            'message_key': 'notificationOrderItemDelivered',
-            'message_params': [str(order.id), str(order_item.id), order_item.menu_item.name],
-            'order_id': order.id,
-            'item_id': order_item.id,
-            'all_items_delivered_in_order': all_items_delivered and order_updated,
-            'updated_order_data': convert_decimals_to_strings(order_serializer.data)
-        }
-        try:
-            async_to_sync(sio.emit)('order_status_update', payload, room=room_name)
-            logger.info(f"Socket.IO 'order_status_update' (item_delivered) for Order ID {order.id}, Item {order_item.id} sent.")
-        except Exception as e_socket:
-            logger.error(f"Socket.IO error sending order_item_delivered event: {e_socket}", exc_info=True)
+    payload = {
+        'event_type': 'order_item_delivered',
+        'message_key': 'notificationOrderItemDelivered',
+        'message_params': [str(order.id), str(order_item.id), order_item.menu_item.name],
+        'order_id': order.id,
+        'item_id': order_item.id,
+        'all_items_delivered_in_order': all_items_delivered and order_updated,
+        **record_order_revision(order.id, order_serializer.data),
+    }
+    enqueue_business_notification(order.business_id, 'order_status_update', payload)
 
     return Response(order_serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
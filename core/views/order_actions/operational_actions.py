@@ -6,13 +6,13 @@ from rest_framework.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import Q
 import logging
-from asgiref.sync import async_to_sync
 
-from makarna_project.asgi import sio
-from ...models import Order, Table
+from ...models import Order, Table, OrderTransfer
 from ...serializers import OrderSerializer
 from ...utils.order_helpers import PermissionKeys, get_user_business
+from ...utils.order_read_model import load_order_for_response
 from ...signals.order_signals import send_order_update_notification
+from ...utils.order_revisions import get_order_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -62,12 +62,18 @@ def transfer_order_action(view_instance, request):
         return Response({"detail": f"Masa {new_table.table_number} başka bir aktif sipariş tarafından kullanılıyor."}, status=status.HTTP_400_BAD_REQUEST)
 
     original_table_number_for_notification = order_to_transfer.table.table_number if order_to_transfer.table else None
+    original_table_id = order_to_transfer.table_id
 
     order_to_transfer.table = new_table
     order_to_transfer.save(update_fields=['table'])
+    OrderTransfer.objects.create(
+        business=user_business, order=order_to_transfer,
+        from_table_id=original_table_id, to_table=new_table, transferred_by=user
+    )
 
     logger.info(f"Sipariş {order_to_transfer.id}, Masa {original_table_number_for_notification or 'YOK'} -> Masa {new_table.table_number} olarak transfer edildi.")
     
+    order_to_transfer = load_order_for_response(order_to_transfer.id)
     order_serializer = OrderSerializer(order_to_transfer, context={'request': request})
 
     transaction.on_commit(
@@ -117,4 +123,20 @@ def destroy_order_action(view_instance, instance: Order):
         
     else:
         logger.info(f"Sipariş {order_id} zaten {instance.get_status_display()} durumunda, işlem yapılmadı.")
-        return Response({"detail": f"Sipariş zaten {instance.get_status_display()} durumunda."}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response({"detail": f"Sipariş zaten {instance.get_status_display()} durumunda."}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def order_snapshot_action(view_instance, request, pk=None):
+    """
+    İstemci 'order_status_update' olaylarında revizyon boşluğu tespit ettiğinde
+    siparişin son yayınlanan tam halini ve revizyon numarasını döner.
+    """
+    order = view_instance.get_object()
+    stored = get_order_snapshot(order.id)
+    if stored is not None:
+        revision, snapshot = stored
+    else:
+        # Henüz hiç yayın yapılmamış; ilk olay tam veri taşıyacağı için revizyon 0 döner.
+        revision = 0
+        snapshot = OrderSerializer(order, context={'request': request}).data
+    return Response({'order_id': order.id, 'revision': revision, 'order': snapshot}, status=status.HTTP_200_OK)
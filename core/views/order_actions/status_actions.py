@@ -11,6 +11,7 @@ from decimal import Decimal
 from ...models import Order, OrderItem
 from ...serializers import OrderSerializer
 from ...utils.order_helpers import PermissionKeys
+from ...utils.order_read_model import load_order_for_response
 # <<< GÜNCELLEME: Merkezi bildirim fonksiyonunu import ediyoruz >>>
 from ...signals.order_signals import send_order_update_notification
 
@@ -37,7 +38,7 @@ def approve_guest_order_action(view_instance, request, pk=None):
     updated_item_count = order.order_items.filter(is_awaiting_staff_approval=True).update(is_awaiting_staff_approval=False)
     logger.info(f"Sipariş #{order.id} kullanıcı {user.username} tarafından ONAYLANDI. {updated_item_count} kalem onaylandı.")
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
     
     # <<< YENİ: Bildirimi doğrudan ve sadece buradan gönderiyoruz >>>
     transaction.on_commit(
@@ -86,7 +87,7 @@ def reject_guest_order_action(view_instance, request, pk=None):
         update_fields_for_notification.append('taken_by_staff')
         order.save(update_fields=update_fields_for_notification)
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
 
     # <<< YENİ: Bildirimi doğrudan ve sadece buradan gönderiyoruz >>>
     transaction.on_commit(
@@ -124,7 +125,7 @@ def mark_order_picked_up_by_waiter_action(view_instance, request, pk=None):
     order.save(update_fields=['status', 'picked_up_by_waiter_at'])
     logger.info(f"Sipariş #{order.id} garson {user.username} tarafından mutfaktan alındı ve durumu '{Order.STATUS_READY_FOR_DELIVERY}' olarak güncellendi.")
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
     
     # <<< YENİ: Bildirimi doğrudan ve sadece buradan gönderiyoruz >>>
     transaction.on_commit(
@@ -169,7 +170,7 @@ def deliver_all_items_action(view_instance, request, pk=None):
     order.save(update_fields=['delivered_at'])
     logger.info(f"[DELIVER_ORDER_ALL] Order ID {order.id} marked as delivered at {now}.")
 
-    order.refresh_from_db()
+    order = load_order_for_response(order.id)
 
     # <<< YENİ: Bildirimi doğrudan ve sadece buradan gönderiyoruz >>>
     transaction.on_commit(
@@ -16,7 +16,6 @@ from decimal import Decimal
 from contextlib import contextmanager
 from django.conf import settings
 
-from rest_framework.pagination import PageNumberPagination
 
 from ..models import (
     Order, OrderItem, OrderItemExtra, MenuItem, MenuItemVariant, Table,
@@ -24,10 +23,13 @@ from ..models import (
 )
 from ..serializers import OrderSerializer, OrderItemSerializer
 from ..utils.order_helpers import PermissionKeys, get_user_business
-from ..utils.json_helpers import convert_decimals_to_strings
+from ..utils.outbox import enqueue_business_notification
+from ..utils.order_revisions import record_order_revision
+from ..utils.order_read_model import order_response_queryset, load_order_for_response
+from ..utils.idempotency import idempotent
 from ..permissions import IsOnActiveShift
+from ..pagination import OrderListPagination
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
 from ..signals.order_signals import send_order_update_notification
 
@@ -81,23 +83,12 @@ def handle_db_lock_timeout(max_wait_time=5):
             # Cleanup hatası kritik değil
             pass
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsOnActiveShift]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OrderListPagination
 
-    queryset = Order.objects.all().prefetch_related(
-        Prefetch('order_items', queryset=OrderItem.objects.select_related('menu_item__category__assigned_kds', 'item_prepared_by_staff', 'variant').prefetch_related('extras__variant')),
-        'table_users',
-        'payment_info',
-        'credit_payment_details',
-        'assigned_pager_instance',
-    ).select_related('table', 'customer', 'business', 'taken_by_staff', 'prepared_by_kitchen_staff')
+    queryset = order_response_queryset()
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -162,11 +153,17 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-created_at')
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     @transaction.atomic
     def perform_create(self, serializer):
         try:
             with handle_db_lock_timeout():
                 order = serializer.save(taken_by_staff=self.request.user)
+                # Yanıt, yeni siparişin önceden yüklenmiş halinden serialize edilir.
+                serializer.instance = load_order_for_response(order.id)
                 transaction.on_commit(
                     lambda: send_order_update_notification(
                         order=order, 
@@ -180,6 +177,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             raise
 
     @action(detail=True, methods=['post'], url_path='add-item')
+    @idempotent
     @transaction.atomic
     def add_item(self, request, pk=None):
         """Race condition koruması ile item ekleme"""
@@ -356,6 +354,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         return status_actions.deliver_all_items_action(self, request, pk=pk)
 
     @action(detail=True, methods=['post'], url_path='mark-as-paid')
+    @idempotent
     @transaction.atomic
     def mark_as_paid(self, request, pk=None):
         return financial_actions.mark_as_paid_action(self, request, pk=pk)
@@ -388,6 +387,10 @@ class OrderViewSet(viewsets.ModelViewSet):
     def check_qr_payment_status(self, request, pk=None):
         return financial_actions.check_qr_payment_status_action(self, request, pk=pk)
 
+    @action(detail=True, methods=['get'], url_path='snapshot')
+    def snapshot(self, request, pk=None):
+        return operational_actions.order_snapshot_action(self, request, pk=pk)
+
 
 class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet):
     queryset = OrderItem.objects.all()
@@ -464,7 +467,7 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
                             has_valid_update = True
             
             if not has_valid_update:
-                return Response(OrderSerializer(order_item.order, context={'request': self.request}).data, status=status.HTTP_200_OK)
+                return Response(OrderSerializer(load_order_for_response(order_item.order_id), context={'request': self.request}).data, status=status.HTTP_200_OK)
 
             for field, value in update_data.items():
                 setattr(order_item, field, value)
@@ -477,10 +480,9 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
             updated_item = order_item
             logger.info(f"OrderItem ID {updated_item.id} güncellendi. Değişen alanlar: {update_data.keys()}")
 
-            order = updated_item.order
-            order.refresh_from_db() 
+            order = load_order_for_response(updated_item.order_id)
             
-            all_items_delivered = not order.order_items.filter(delivered=False).exists()
+            all_items_delivered = all(item.delivered for item in order.order_items.all())
             order_updated_main_fields = []
             if all_items_delivered and order.delivered_at is None:
                 order.delivered_at = timezone.now()
@@ -493,19 +495,13 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
         final_order_serializer = OrderSerializer(order, context={'request': self.request})
         
         # GÜNCELLEME: Sabit kodlanmış 'message' alanı, 'message_key' ve 'message_params' ile değiştirildi.
-        try:
-            from makarna_project.asgi import sio
-            if sio:
-                room_name = f'business_{order.business.id}'
-                payload = {
-                    'event_type': 'order_item_updated',
-                    'message_key': 'notificationOrderItemUpdated',
-                    'message_params': [str(order.id), updated_item.menu_item.name],
-                    'updated_order_data': convert_decimals_to_strings(final_order_serializer.data),
-                }
-                async_to_sync(sio.emit)('order_status_update', payload, room=room_name)
-        except Exception as e_socket:
-            logger.error(f"Socket.IO olayı gönderilirken hata (OrderItem update - sipariş {order.id}): {e_socket}", exc_info=True)
+        payload = {
+            'event_type': 'order_item_updated',
+            'message_key': 'notificationOrderItemUpdated',
+            'message_params': [str(order.id), updated_item.menu_item.name],
+            **record_order_revision(order.id, final_order_serializer.data),
+        }
+        enqueue_business_notification(order.business_id, 'order_status_update', payload)
         
         return Response(final_order_serializer.data, status=status.HTTP_200_OK)
 
@@ -536,55 +532,41 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
             logger.info(f"OrderItem ID {removed_item_id_for_log} ({item_name_for_log}) from Order ID {order_id_for_log} deleted by user {user.username}.")
 
             try:
-                order.refresh_from_db()
-                order_serializer_data = OrderSerializer(order, context={'request': self.request}).data
+                order = load_order_for_response(order_id_for_log)
                 
                 # GÜNCELLEME: Bildirim payload yapısı değiştirildi.
                 event_type = 'order_item_removed'
                 message_key = 'notificationOrderItemRemoved'
                 message_params = [str(order_id_for_log), item_name_for_log]
 
-                if is_last_item and order.order_items.count() == 0 and \
+                if is_last_item and not order.order_items.all() and \
                    order.status not in [Order.STATUS_COMPLETED, Order.STATUS_CANCELLED, Order.STATUS_REJECTED]:
                     order.status = Order.STATUS_CANCELLED
                     order.save(update_fields=['status'])
                     logger.info(f"Order ID {order_id_for_log} (son kalemi silindiği için) İPTAL EDİLDİ olarak işaretlendi.")
-                    order_serializer_data = OrderSerializer(order, context={'request': self.request}).data
                     
                     event_type = 'order_cancelled'
                     message_key = 'notificationOrderCancelledAllItemsRemoved'
                     message_params = [str(order_id_for_log)]
-                
-                try:
-                    from makarna_project.asgi import sio
-                    if sio:
-                        room_name = f'business_{business_id_for_log}'
-                        payload = {
-                            'event_type': event_type,
-                            'message_key': message_key,
-                            'message_params': message_params,
-                            'updated_order_data': convert_decimals_to_strings(order_serializer_data),
-                        }
-                        async_to_sync(sio.emit)('order_status_update', payload, room=room_name)
-                        logger.info(f"Socket.IO olayı ({event_type}) Order ID {order_id_for_log} için {room_name} odasına gönderildi.")
-                except Exception as e_socket:
-                    logger.error(f"Socket.IO olayı gönderilirken hata (OrderItem delete - sipariş {order_id_for_log}): {e_socket}", exc_info=True)
+
+                order_serializer_data = OrderSerializer(order, context={'request': self.request}).data
+                payload = {
+                    'event_type': event_type,
+                    'message_key': message_key,
+                    'message_params': message_params,
+                    **record_order_revision(order_id_for_log, order_serializer_data),
+                }
+                enqueue_business_notification(business_id_for_log, 'order_status_update', payload)
 
             except Order.DoesNotExist:
                 logger.warning(f"Order ID {order_id_for_log} bulunamadı (OrderItem silindikten sonra).")
-                try:
-                    from makarna_project.asgi import sio
-                    if sio:
-                        room_name = f'business_{business_id_for_log}'
-                        payload = {
-                            'event_type': 'order_deleted', 
-                            'order_id': order_id_for_log, 
-                            'table_id': table_id_for_log, 
-                            'business_id': business_id_for_log 
-                        }
-                        async_to_sync(sio.emit)('order_status_update', payload, room=room_name)
-                except Exception as e_socket:
-                    logger.error(f"Socket.IO olayı gönderilirken hata (Order not found - sipariş {order_id_for_log}): {e_socket}", exc_info=True)
+                payload = {
+                    'event_type': 'order_deleted',
+                    'order_id': order_id_for_log,
+                    'table_id': table_id_for_log,
+                    'business_id': business_id_for_log
+                }
+                enqueue_business_notification(business_id_for_log, 'order_status_update', payload)
 
     @action(detail=True, methods=['post'], url_path='start-preparing')
     @transaction.atomic
@@ -603,7 +585,8 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
 
             order_item.kds_status = OrderItem.KDS_ITEM_STATUS_CHOICES[1][0] # 'preparing_kds'
             order_item.item_prepared_by_staff = request.user
-            order_item.save(update_fields=['kds_status', 'item_prepared_by_staff'])
+            order_item.kds_preparing_at = timezone.now()
+            order_item.save(update_fields=['kds_status', 'item_prepared_by_staff', 'kds_preparing_at'])
 
             if order.status == Order.STATUS_APPROVED:
                 order.status = Order.STATUS_PREPARING
@@ -619,7 +602,7 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
                 )
             )
             
-            serializer = OrderSerializer(order_item.order, context={'request': request})
+            serializer = OrderSerializer(load_order_for_response(order.id), context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='mark-ready')
@@ -640,7 +623,8 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
             order_item.kds_status = OrderItem.KDS_ITEM_STATUS_CHOICES[2][0] # 'ready_kds'
             if not order_item.item_prepared_by_staff:
                 order_item.item_prepared_by_staff = request.user
-            order_item.save(update_fields=['kds_status', 'item_prepared_by_staff'])
+            order_item.kds_ready_at = timezone.now()
+            order_item.save(update_fields=['kds_status', 'item_prepared_by_staff', 'kds_ready_at'])
             logger.info(f"OrderItem ID {order_item.id} (Order #{order.id}) 'ready_kds' olarak işaretlendi.")
 
             all_kds_items_in_order = order.order_items.filter(
@@ -673,7 +657,7 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
                 )
             )
             
-            serializer = OrderSerializer(order_item.order, context={'request': request})
+            serializer = OrderSerializer(load_order_for_response(order.id), context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='mark-picked-up')
@@ -709,5 +693,4 @@ class OrderItemViewSet(mixins.DestroyModelMixin, mixins.UpdateModelMixin, viewse
             else:
                 transaction.on_commit(lambda: send_order_update_notification(order=order, created=False, update_fields=['order_items']))
 
-            order.refresh_from_db()
-            return Response(OrderSerializer(order, context=self.get_serializer_context()).data, status=status.HTTP_200_OK)
\ No newline at end of file
+            return Response(OrderSerializer(load_order_for_response(order.id), context=self.get_serializer_context()).data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -69,6 +69,7 @@ class PagerViewSet(viewsets.ModelViewSet):
         #     return Pager.objects.all().select_related('business', 'current_order')
         return Pager.objects.none()
 
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
         user_business = get_user_business(user)
@@ -83,9 +84,10 @@ class PagerViewSet(viewsets.ModelViewSet):
         logger.info(f"Pager #{instance.id} ({instance.device_id}) işletme '{user_business.name}' için oluşturuldu.")
         
         # Yeni pager eklendiğinde bildirim gönder (signals.py içindeki fonksiyonu çağır)
-        from ..signals import send_pager_status_update_notification_on_commit
-        transaction.on_commit(lambda: send_pager_status_update_notification_on_commit(instance.id))
+        from ..signals import send_pager_status_update_notification
+        send_pager_status_update_notification(instance)
 
+    @transaction.atomic
     def perform_update(self, serializer):
         instance_before_update = self.get_object()
         old_status = instance_before_update.status
@@ -101,15 +103,15 @@ class PagerViewSet(viewsets.ModelViewSet):
 
         new_current_order_id = instance.current_order_id # Save sonrası instance'tan al
         if instance.status != old_status or new_current_order_id != old_current_order_id:
-            from ..signals import send_pager_status_update_notification_on_commit
-            transaction.on_commit(lambda: send_pager_status_update_notification_on_commit(instance.id))
+            from ..signals import send_pager_status_update_notification
+            send_pager_status_update_notification(instance)
         
         if instance.status != 'in_use' and instance.current_order is not None:
             logger.info(f"Pager #{instance.id} durumu '{instance.get_status_display()}' olarak güncellendi, sipariş bağlantısı kaldırılıyor.")
             instance.current_order = None
             instance.save(update_fields=['current_order'])
             # Bu save işlemi Pager için post_save sinyalini tekrar tetikleyebilir.
-            # Eğer `send_pager_status_update_notification_on_commit` `update_fields` kontrolü yapıyorsa sorun olmaz.
+            # Eğer `send_pager_status_update_notification` `update_fields` kontrolü yapıyorsa sorun olmaz.
 
 
     def perform_destroy(self, instance: Pager):
@@ -4,19 +4,192 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Sum, Count, Value, CharField, Func, F, ExpressionWrapper, DecimalField
 from django.db.models.functions import TruncMonth, TruncDay, TruncHour, Coalesce
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, date
+import logging
 
-from ..models import Business, Payment, Order, OrderItem, MenuItem, CustomUser as User
+from ..models import (
+    Business, Payment, Order, OrderItem, MenuItem, CustomUser as User,
+    SalesHourlyRollup, ItemSalesDailyRollup, PaymentTypeDailyRollup, ReportExportJob, ReportJob
+)
 # YENİ: Yeni serializer import edildi
-from ..serializers import StaffPerformanceSerializer, DetailedSaleItemSerializer 
+from ..serializers import (
+    StaffPerformanceSerializer, DetailedSaleItemSerializer, ReportExportJobSerializer, ReportJobSerializer
+)
 from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.sales_export import (
+    EXPORT_FORMATS, detailed_sales_queryset, to_export_row, iter_export_rows, streaming_export_response
+)
+from ..utils.kds_latency import build_kds_latency_report
+from ..utils.report_jobs import report_job_response, is_owner_only_report
+from ..tasks import generate_report_export_task
+
+logger = logging.getLogger(__name__)
+
+def resolve_general_report_params(query_params):
+    """
+    Genel raporun tarih aralığını çözümler. Göreli aralıklar ('day', 'week' ...) mutlak
+    tarihlere çevrilir; böylece saklanan sonuçlar aynı dönem için yeniden kullanılabilir.
+    """
+    start_date_str = query_params.get('start_date')
+    end_date_str = query_params.get('end_date')
+    time_range_filter = query_params.get('time_range', 'day')
+
+    start_date = None
+    end_date = None
+    effective_time_range = time_range_filter
+
+    current_tz = timezone.get_current_timezone()
+
+    if start_date_str and end_date_str:
+        try:
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+            start_date = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), current_tz)
+            end_date = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), current_tz)
+            if start_date > end_date:
+                raise ValidationError({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."})
+            effective_time_range = 'custom'
+        except ValueError:
+            raise ValidationError({"detail": "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."})
+    else:
+        now = timezone.now()
+        if time_range_filter == 'day':
+            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        elif time_range_filter == 'week':
+            start_of_week = now - timedelta(days=now.weekday())
+            start_date = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+            end_of_week = start_of_week + timedelta(days=6)
+            end_date = end_of_week.replace(hour=23, minute=59, second=59, microsecond=999999)
+        elif time_range_filter == 'month':
+            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            next_month = (start_date.replace(day=28) + timedelta(days=4))
+            end_of_month = next_month - timedelta(days=next_month.day)
+            end_date = end_of_month.replace(hour=23, minute=59, second=59, microsecond=999999)
+        elif time_range_filter == 'year':
+            start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+            end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=999999)
+        else:
+            time_range_filter = 'day'
+            effective_time_range = 'day'
+            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    return {
+        'time_range': effective_time_range,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+    }
+
+
+def build_general_report(business_for_report, params):
+    """Genel raporu (ciro, sipariş sayısı, en çok/az satanlar, grafikler) özet tablolarından üretir."""
+    current_tz = timezone.get_current_timezone()
+    effective_time_range = params['time_range']
+    start_date = datetime.fromisoformat(params['start_date'])
+    end_date = datetime.fromisoformat(params['end_date'])
+
+    # Tüm değerler özet (rollup) tablolarından okunur; maliyet aralığın uzunluğundan
+    # değil, aralıktaki saat/gün kovası sayısından etkilenir.
+    hourly_in_range = SalesHourlyRollup.objects.filter(
+        business=business_for_report,
+        hour_start__gte=start_date,
+        hour_start__lte=end_date
+    )
+    daily_payments_in_range = PaymentTypeDailyRollup.objects.filter(
+        business=business_for_report,
+        date__gte=timezone.localtime(start_date, current_tz).date(),
+        date__lte=timezone.localtime(end_date, current_tz).date()
+    )
+    item_sales_in_range = ItemSalesDailyRollup.objects.filter(
+        business=business_for_report,
+        date__gte=timezone.localtime(start_date, current_tz).date(),
+        date__lte=timezone.localtime(end_date, current_tz).date()
+    )
+
+    totals = hourly_in_range.aggregate(total_turnover=Sum('turnover'), total_orders=Sum('order_count'))
+    total_turnover = totals['total_turnover'] or 0
+    total_orders = totals['total_orders'] or 0
+
+    selling_stats = item_sales_in_range.values(
+        'menu_item__id',
+        'menu_item__name'
+    ).annotate(
+        total_qty=Sum('quantity')
+    ).filter(total_qty__gt=0).order_by('-total_qty')
+
+    best_selling_item_data = selling_stats.first()
+    best_selling_item = {
+        'id': best_selling_item_data['menu_item__id'],
+        'name': best_selling_item_data['menu_item__name'],
+        'total_sold': best_selling_item_data['total_qty']
+    } if best_selling_item_data else None
+
+    least_selling_item_data = selling_stats.last()
+    least_selling_item = {
+        'id': least_selling_item_data['menu_item__id'],
+        'name': least_selling_item_data['menu_item__name'],
+        'total_sold': least_selling_item_data['total_qty']
+    } if least_selling_item_data and best_selling_item_data != least_selling_item_data else None
+
+    daily_turnover_for_chart = []
+    weekly_turnover_for_chart = []
+    monthly_turnover_for_chart = []
+
+    if effective_time_range == 'day':
+        daily_turnover_for_chart = [
+            {'hour': timezone.localtime(row['hour_start'], current_tz), 'turnover': row['turnover']}
+            for row in hourly_in_range.filter(payment_count__gt=0).order_by('hour_start').values('hour_start', 'turnover')
+        ]
+        for item in daily_turnover_for_chart:
+            item['hour_str'] = item['hour'].strftime('%H:00')
+
+    elif effective_time_range == 'week' or (effective_time_range == 'custom' and (end_date - start_date).days <= 30):
+        weekly_turnover_for_chart = [
+            {'day': timezone.make_aware(datetime.combine(row['date'], datetime.min.time()), current_tz), 'turnover': row['turnover']}
+            for row in daily_payments_in_range.values('date').annotate(
+                turnover=Sum('amount'), payment_total=Sum('payment_count')
+            ).filter(payment_total__gt=0).order_by('date')
+        ]
+        for item in weekly_turnover_for_chart:
+            item['day_str'] = item['day'].strftime('%d %b')
+
+    elif effective_time_range == 'month' or effective_time_range == 'year' or \
+         (effective_time_range == 'custom' and (end_date - start_date).days > 30):
+        monthly_turnover_for_chart = [
+            {'month_year': timezone.make_aware(datetime.combine(row['month'], datetime.min.time()), current_tz), 'turnover': row['turnover']}
+            for row in daily_payments_in_range.annotate(
+                month=TruncMonth('date')
+            ).values('month').annotate(
+                turnover=Sum('amount'), payment_total=Sum('payment_count')
+            ).filter(payment_total__gt=0).order_by('month')
+        ]
+        for item in monthly_turnover_for_chart:
+            item['month_year_str'] = item['month_year'].strftime('%Y-%m')
+
+    return {
+        "total_turnover": total_turnover,
+        "total_orders": total_orders,
+        "best_selling_item": best_selling_item,
+        "least_selling_item": least_selling_item,
+        "start_date": start_date.strftime("%Y-%m-%d") if start_date else None,
+        "end_date": end_date.strftime("%Y-%m-%d") if end_date else None,
+        "time_range_selected": effective_time_range,
+        "daily_turnover_for_chart": daily_turnover_for_chart,
+        "weekly_turnover_for_chart": weekly_turnover_for_chart,
+        "monthly_turnover_for_chart": monthly_turnover_for_chart,
+    }
+
 
 class ReportView(APIView):
-    # Bu sınıfın içeriğinde bir değişiklik yok, olduğu gibi kalıyor...
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -33,152 +206,8 @@ class ReportView(APIView):
             if PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
                 return Response({"detail": "Raporları görüntüleme yetkiniz yok."}, status=status.HTTP_403_FORBIDDEN)
 
-        start_date_str = request.query_params.get('start_date')
-        end_date_str = request.query_params.get('end_date')
-        time_range_filter = request.query_params.get('time_range', 'day')
-
-        start_date = None
-        end_date = None
-        effective_time_range = time_range_filter
-
-        current_tz = timezone.get_current_timezone()
-
-        if start_date_str and end_date_str:
-            try:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-                start_date = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), current_tz)
-                end_date = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), current_tz)
-                if start_date > end_date:
-                    return Response({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."}, status=status.HTTP_400_BAD_REQUEST)
-                effective_time_range = 'custom'
-            except ValueError:
-                return Response({"detail": "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            now = timezone.now()
-            if time_range_filter == 'day':
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-            elif time_range_filter == 'week':
-                start_of_week = now - timedelta(days=now.weekday())
-                start_date = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_of_week = start_of_week + timedelta(days=6)
-                end_date = end_of_week.replace(hour=23, minute=59, second=59, microsecond=999999)
-            elif time_range_filter == 'month':
-                start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                next_month = (start_date.replace(day=28) + timedelta(days=4))
-                end_of_month = next_month - timedelta(days=next_month.day)
-                end_date = end_of_month.replace(hour=23, minute=59, second=59, microsecond=999999)
-            elif time_range_filter == 'year':
-                start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-                end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=999999)
-            else:
-                time_range_filter = 'day'
-                effective_time_range = 'day'
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        payments_in_range = Payment.objects.filter(
-            order__business=business_for_report,
-            payment_date__gte=start_date,
-            payment_date__lte=end_date
-        )
-        orders_in_range = Order.objects.filter(
-            business=business_for_report,
-            created_at__gte=start_date,
-            created_at__lte=end_date,
-            is_paid=True
-        )
-        order_items_in_range = OrderItem.objects.filter(
-            order__business=business_for_report,
-            order__is_paid=True,
-            order__created_at__gte=start_date,
-            order__created_at__lte=end_date
-        )
-
-        total_turnover = payments_in_range.aggregate(total=Sum('amount'))['total'] or 0
-        total_orders = orders_in_range.count()
-
-        selling_stats = order_items_in_range.values(
-            'menu_item__id',
-            'menu_item__name'
-        ).annotate(
-            total_qty=Sum('quantity')
-        ).filter(total_qty__gt=0).order_by('-total_qty')
-
-        best_selling_item_data = selling_stats.first()
-        best_selling_item = {
-            'id': best_selling_item_data['menu_item__id'],
-            'name': best_selling_item_data['menu_item__name'],
-            'total_sold': best_selling_item_data['total_qty']
-        } if best_selling_item_data else None
-
-        least_selling_item_data = selling_stats.last()
-        least_selling_item = {
-            'id': least_selling_item_data['menu_item__id'],
-            'name': least_selling_item_data['menu_item__name'],
-            'total_sold': least_selling_item_data['total_qty']
-        } if least_selling_item_data and best_selling_item_data != least_selling_item_data else None
-
-        daily_turnover_for_chart = []
-        weekly_turnover_for_chart = []
-        monthly_turnover_for_chart = []
-
-        if effective_time_range == 'day':
-            daily_turnover_for_chart = list(
-                payments_in_range.annotate(
-                    hour=TruncHour('payment_date', tzinfo=current_tz)
-                ).values('hour').annotate(
-                    turnover=Sum('amount')
-                ).order_by('hour').values('hour', 'turnover')
-            )
-            for item in daily_turnover_for_chart:
-                if isinstance(item['hour'], datetime):
-                    item['hour_str'] = item['hour'].strftime('%H:00')
-                else:
-                    item['hour_str'] = str(item['hour'])
-
-        elif effective_time_range == 'week' or (effective_time_range == 'custom' and (end_date - start_date).days <= 30):
-            weekly_turnover_for_chart = list(
-                payments_in_range.annotate(
-                    day=TruncDay('payment_date', tzinfo=current_tz)
-                ).values('day').annotate(
-                    turnover=Sum('amount')
-                ).order_by('day').values('day', 'turnover')
-            )
-            for item in weekly_turnover_for_chart:
-                if isinstance(item['day'], datetime):
-                    item['day_str'] = item['day'].strftime('%d %b')
-                else:
-                    item['day_str'] = str(item['day'])
-
-        elif effective_time_range == 'month' or effective_time_range == 'year' or \
-             (effective_time_range == 'custom' and (end_date - start_date).days > 30):
-            monthly_turnover_for_chart = list(
-                payments_in_range.annotate(
-                    month_year=TruncMonth('payment_date', tzinfo=current_tz)
-                ).values('month_year').annotate(
-                    turnover=Sum('amount')
-                ).order_by('month_year').values('month_year', 'turnover')
-            )
-            for item in monthly_turnover_for_chart:
-                if isinstance(item['month_year'], datetime):
-                    item['month_year_str'] = item['month_year'].strftime('%Y-%m')
-                else:
-                    item['month_year_str'] = str(item['month_year'])
-
-        return Response({
-            "total_turnover": total_turnover,
-            "total_orders": total_orders,
-            "best_selling_item": best_selling_item,
-            "least_selling_item": least_selling_item,
-            "start_date": start_date.strftime("%Y-%m-%d") if start_date else None,
-            "end_date": end_date.strftime("%Y-%m-%d") if end_date else None,
-            "time_range_selected": effective_time_range,
-            "daily_turnover_for_chart": daily_turnover_for_chart,
-            "weekly_turnover_for_chart": weekly_turnover_for_chart,
-            "monthly_turnover_for_chart": monthly_turnover_for_chart,
-        })
+        params = resolve_general_report_params(request.query_params)
+        return report_job_response(request, business_for_report, 'general', params)
 
 
 # ==================== YENİ EKLENEN BÖLÜM ====================
@@ -231,41 +260,167 @@ class DetailedSalesReportView(APIView):
             end_date = now
 
         if start_date is None:
-             start_date = (timezone.now() - timedelta(days=365*5)) # Hata olmaması için çok eski bir tarih
+             start_date = (timezone.now() - timedelta(days=365*5)).replace(hour=0, minute=0, second=0, microsecond=0) # Hata olmaması için çok eski bir tarih
         
         # Detaylı rapor için veritabanı sorgusu
-        sales_data = OrderItem.objects.filter(
-            order__business=business_for_report,
-            order__is_paid=True,
-            order__created_at__range=(start_date, end_date)
-        ).select_related(
-            'order', 'order__table', 'menu_item', 'variant'
-        ).annotate(
-            line_total=ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField())
-        ).values(
-            'order__id', 'order__created_at', 'order__order_type', 'order__table__table_number',
-            'order__customer_name', 'menu_item__name', 'variant__name', 'quantity',
-            'price', 'line_total'
-        ).order_by('order__created_at')
+        sales_data = detailed_sales_queryset(business_for_report, start_date, end_date)
+
+        export_format = request.query_params.get('export')
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                return Response({"detail": "Geçersiz dışa aktarım biçimi. 'csv' veya 'xlsx' kullanın."}, status=status.HTTP_400_BAD_REQUEST)
+
+            run_in_background = request.query_params.get('background') in ('1', 'true', 'True')
+            if not run_in_background and sales_data.count() > settings.REPORT_EXPORT_SYNC_ROW_LIMIT:
+                run_in_background = True
+            if run_in_background and not settings.REPORT_EXPORT_SHARED_STORAGE:
+                # Worker'ın yazdığı dosyayı web süreci okuyamaz; dosya istek içinde akıtılır.
+                logger.warning("[Report Export] Ortak dışa aktarım depolaması yapılandırılmamış; dışa aktarım istek içinde akıtılıyor.")
+                run_in_background = False
+
+            if run_in_background:
+                job = ReportExportJob.objects.create(
+                    business=business_for_report,
+                    requested_by=user,
+                    report_type='detailed_sales',
+                    export_format=export_format,
+                    params={'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
+                )
+                transaction.on_commit(lambda: generate_report_export_task.delay(job.id))
+                return Response(
+                    ReportExportJobSerializer(job, context={'request': request}).data,
+                    status=status.HTTP_202_ACCEPTED
+                )
+
+            filename = f"detayli_satis_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+            return streaming_export_response(request, export_format, iter_export_rows(sales_data), filename)
+
+        # JSON yanıtı bellekte oluşturulur; büyük aralıklar dışa aktarım (?export=csv|xlsx) ile alınmalıdır.
+        if sales_data.count() > settings.DETAILED_SALES_JSON_ROW_LIMIT:
+            return Response(
+                {"detail": f"Seçilen aralıkta {settings.DETAILED_SALES_JSON_ROW_LIMIT} satırdan fazla satış var. "
+                           "Lütfen aralığı daraltın veya ?export=csv / ?export=xlsx ile dışa aktarın."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         # Alan isimlerini Flutter tarafının beklediği şekilde yeniden adlandır
-        renamed_data = [
-            {
-                'order_id': item['order__id'],
-                'created_at': item['order__created_at'],
-                'order_type': item['order__order_type'],
-                'table_number': item['order__table__table_number'],
-                'customer_name': item['order__customer_name'],
-                'item_name': item['menu_item__name'],
-                'variant_name': item['variant__name'],
-                'quantity': item['quantity'],
-                'unit_price': item['price'],
-                'line_total': item['line_total'],
-            }
-            for item in sales_data
-        ]
-        
+        renamed_data = [to_export_row(item) for item in iter_export_rows(sales_data)]
         serializer = self.serializer_class(renamed_data, many=True)
         return Response(serializer.data)
 
+
+class ReportExportJobView(APIView):
+    """Arka plan dışa aktarım işinin durumunu ve hazırsa indirme bağlantısını döner."""
+    permission_classes = [IsAuthenticated]
+
+    def get_job(self, request, pk):
+        user = request.user
+        business = get_user_business(user)
+        job = get_object_or_404(ReportExportJob, pk=pk, business=business)
+        if user.user_type != 'business_owner' and job.requested_by_id != user.id:
+            raise PermissionDenied("Bu dışa aktarıma erişim yetkiniz yok.")
+        return job
+
+    def get(self, request, pk):
+        job = self.get_job(request, pk)
+        return Response(ReportExportJobSerializer(job, context={'request': request}).data)
+
+
+class ReportExportDownloadView(ReportExportJobView):
+    """Tamamlanmış dışa aktarım dosyasını depolama alanından parça parça akıtır."""
+
+    def get(self, request, pk):
+        job = self.get_job(request, pk)
+        if job.status != ReportExportJob.STATUS_COMPLETED or not job.file:
+            return Response({"detail": "Dışa aktarım henüz hazır değil."}, status=status.HTTP_409_CONFLICT)
+        filename = f"detayli_satis_{job.id}.{job.export_format}"
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True, filename=filename,
+            content_type=EXPORT_FORMATS[job.export_format]
+        )
+
+def build_kds_latency_report_data(business_for_report, params):
+    start_date = date.fromisoformat(params['start_date'])
+    end_date = date.fromisoformat(params['end_date'])
+    report = build_kds_latency_report(
+        business_for_report, start_date, end_date,
+        kds_screen_id=params.get('kds_screen'), category_id=params.get('category')
+    )
+    report.update({'start_date': start_date, 'end_date': end_date})
+    return report
+
+
+class KDSLatencyReportView(APIView):
+    """
+    KDS hazırlama ve garson alma sürelerinin p50/p90/p99 değerlerini KDS ekranı, kategori ve
+    günün saati kırılımlarında döner. Veriler artımlı tutulan gecikme histogramından okunur;
+    sorgu sayısı tarih aralığından ve kalem sayısından bağımsızdır.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        try:
+            business_for_report = get_user_business(user)
+        except PermissionDenied as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        if not business_for_report:
+            return Response({"detail": "Raporları görüntülemek için yetkili bir işletmeniz bulunmuyor."}, status=status.HTTP_403_FORBIDDEN)
+
+        if user.user_type == 'staff' and PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
+            return Response({"detail": "Raporları görüntüleme yetkiniz yok."}, status=status.HTTP_403_FORBIDDEN)
+
+        start_date_str = request.query_params.get('start_date')
+        end_date_str = request.query_params.get('end_date')
+        time_range_filter = request.query_params.get('time_range', 'week')
+        today = timezone.localdate()
+
+        if start_date_str and end_date_str:
+            try:
+                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return Response({"detail": "Geçersiz tarih formatı. YYYY-MM-DD formatını kullanın."}, status=status.HTTP_400_BAD_REQUEST)
+            if start_date > end_date:
+                return Response({"detail": "Başlangıç tarihi, bitiş tarihinden sonra olamaz."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            end_date = today
+            if time_range_filter == 'day':
+                start_date = today
+            elif time_range_filter == 'month':
+                start_date = today.replace(day=1)
+            elif time_range_filter == 'year':
+                start_date = today.replace(month=1, day=1)
+            else:
+                start_date = today - timedelta(days=today.weekday())
+
+        try:
+            kds_screen_id = int(request.query_params['kds_screen']) if request.query_params.get('kds_screen') else None
+            category_id = int(request.query_params['category']) if request.query_params.get('category') else None
+        except ValueError:
+            return Response({"detail": "Geçersiz KDS ekranı veya kategori ID'si."}, status=status.HTTP_400_BAD_REQUEST)
+
+        params = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'kds_screen': kds_screen_id,
+            'category': category_id,
+        }
+        return report_job_response(request, business_for_report, 'kds_latency', params)
+
+class ReportJobView(APIView):
+    """Arka plan rapor işinin durumunu ve tamamlandıysa sonucunu döner."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        user = request.user
+        business = get_user_business(user)
+        job = get_object_or_404(ReportJob, pk=pk, business=business)
+        if user.user_type != 'business_owner' and job.requested_by_id != user.id:
+            if is_owner_only_report(job.report_type) or PermissionKeys.VIEW_REPORTS not in user.staff_permissions:
+                raise PermissionDenied("Bu rapora erişim yetkiniz yok.")
+        return Response(ReportJobSerializer(job, context={'request': request}).data)
+
+
 # ==================== YENİ EKLENEN BÖLÜM SONU ====================
\ No newline at end of file
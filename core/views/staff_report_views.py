@@ -1,9 +1,8 @@
 # core/views/staff_report_views.py
 
 from django.utils import timezone
-from django.db.models import Count, Sum, Value, DecimalField, Q, OuterRef, Subquery
-from django.db.models.functions import Coalesce
-from datetime import timedelta, datetime
+from django.db.models import Sum, Prefetch
+from datetime import timedelta, datetime, date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -12,12 +11,65 @@ from rest_framework.exceptions import PermissionDenied
 import logging
 from decimal import Decimal
 
-from ..models import Order, CustomUser, Payment, OrderItem, Business
+from ..models import CustomUser, KDSScreen, StaffDailyMetrics
 from ..serializers import StaffPerformanceSerializer
 from ..utils.order_helpers import get_user_business, PermissionKeys
+from ..utils.report_jobs import report_job_response
 
 logger = logging.getLogger(__name__)
 
+def build_staff_performance_report(business_for_report, params):
+    """Personel performans raporunu günlük personel özetlerinden üretir."""
+    # Metrikler günlük personel özetlerinden (StaffDailyMetrics) tek sorguda okunur;
+    # KDS erişim listeleri tek bir prefetch sorgusuyla gelir.
+    metrics_by_staff = {
+        row['staff_id']: row
+        for row in StaffDailyMetrics.objects.filter(
+            business=business_for_report,
+            date__range=(date.fromisoformat(params['start_date']), date.fromisoformat(params['end_date']))
+        ).values('staff_id').annotate(
+            order_count=Sum('orders_taken'),
+            total_turnover=Sum('revenue_handled'),
+            prepared_item_count=Sum('items_prepared'),
+            prep_seconds_total=Sum('prep_seconds_total'),
+            prep_sample_count=Sum('prep_sample_count'),
+        ).order_by()
+    }
+
+    staff_members = CustomUser.objects.filter(
+        associated_business=business_for_report,
+        user_type__in=['staff', 'kitchen_staff'],
+        is_active=True,
+        id__in=list(metrics_by_staff.keys())
+    ).prefetch_related(
+        Prefetch('accessible_kds_screens', queryset=KDSScreen.objects.only('id', 'name'))
+    )
+
+    staff_performance_data = []
+    for staff in staff_members:
+        metrics = metrics_by_staff[staff.id]
+        # Sadece ilgili personelleri rapora dahil et
+        if metrics['order_count'] > 0 or metrics['prepared_item_count'] > 0:
+            staff_performance_data.append({
+                'staff_id': staff.id,
+                'username': staff.username,
+                'first_name': staff.first_name,
+                'last_name': staff.last_name,
+                'order_count': metrics['order_count'],
+                'total_turnover': metrics['total_turnover'] or Decimal('0.00'),
+                'prepared_item_count': metrics['prepared_item_count'],
+                'avg_prep_seconds': (
+                    round(metrics['prep_seconds_total'] / metrics['prep_sample_count'])
+                    if metrics['prep_sample_count'] else None
+                ),
+                'staff_permissions': staff.staff_permissions,
+                'accessible_kds_names': [kds.name for kds in staff.accessible_kds_screens.all()],
+                'profile_image_url': staff.profile_image_url,
+            })
+
+    return StaffPerformanceSerializer(staff_performance_data, many=True).data
+
+
 class StaffPerformanceReportView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -64,59 +116,8 @@ class StaffPerformanceReportView(APIView):
         else: # Varsayılan
             start_date_dt = (end_date_dt - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # ================= OPTİMİZASYON GÜNCELLEMESİ =================
-        # Döngü içinde sorgu yapmak yerine, tüm verileri tek bir sorguda
-        # annotate ile hesaplıyoruz.
-        
-        staff_with_performance = CustomUser.objects.filter(
-            associated_business=business_for_report,
-            user_type__in=['staff', 'kitchen_staff'],
-            is_active=True
-        ).annotate(
-            order_count=Count(
-                'orders_taken_by_staff',
-                filter=Q(
-                    orders_taken_by_staff__is_paid=True,
-                    orders_taken_by_staff__created_at__range=(start_date_dt, end_date_dt)
-                )
-            ),
-            total_turnover=Coalesce(
-                Sum(
-                    'orders_taken_by_staff__payment_info__amount',
-                    filter=Q(
-                        orders_taken_by_staff__is_paid=True,
-                        orders_taken_by_staff__created_at__range=(start_date_dt, end_date_dt)
-                    )
-                ),
-                Value(Decimal('0.00')),
-                output_field=DecimalField()
-            ),
-            prepared_item_count=Count(
-                'prepared_order_items',
-                filter=Q(
-                    prepared_order_items__order__created_at__range=(start_date_dt, end_date_dt)
-                )
-            )
-        ).prefetch_related('accessible_kds_screens')
-
-        # Serializer'a uygun formatta veri listesi oluşturuyoruz.
-        staff_performance_data = []
-        for staff in staff_with_performance:
-            # Sadece ilgili personelleri rapora dahil et
-            if staff.order_count > 0 or staff.prepared_item_count > 0:
-                staff_performance_data.append({
-                    'staff_id': staff.id,
-                    'username': staff.username,
-                    'first_name': staff.first_name,
-                    'last_name': staff.last_name,
-                    'order_count': staff.order_count,
-                    'total_turnover': staff.total_turnover,
-                    'prepared_item_count': staff.prepared_item_count,
-                    'staff_permissions': staff.staff_permissions,
-                    'accessible_kds_names': list(staff.accessible_kds_screens.values_list('name', flat=True)),
-                    'profile_image_url': staff.profile_image_url,
-                })
-        # ================= GÜNCELLEME SONU =========================
-
-        serializer = StaffPerformanceSerializer(staff_performance_data, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        params = {
+            'start_date': timezone.localtime(start_date_dt).date().isoformat(),
+            'end_date': timezone.localtime(end_date_dt).date().isoformat(),
+        }
+        return report_job_response(request, business_for_report, 'staff_performance', params)
@@ -3,15 +3,13 @@
 from rest_framework import generics, status # status eklendi
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError # ValidationError eklendi
+from django.db import transaction
 from django.utils import timezone # Opsiyonel: called_at, seated_at için
 import logging
 
-# Socket.IO için importlar
-from asgiref.sync import async_to_sync
-from makarna_project.asgi import sio # asgi.py dosyanızdaki sio instance'ı
-
 from ..models import WaitingCustomer, Business, CustomUser as User
 from ..serializers import WaitingCustomerSerializer # WaitingCustomerSerializer'ı import ettiğinizden emin olun
+from ..utils.outbox import enqueue_business_notification
 
 # get_user_business helper fonksiyonunu ve PermissionKeys'i import edelim
 # Bu fonksiyonu ve sınıfı bir utils.py veya permissions.py dosyasında merkezi olarak tanımlamanız en iyisidir
@@ -43,6 +41,8 @@ class WaitingCustomerList(generics.ListCreateAPIView):
             # is_waiting=True # Listelemede sadece bekleyenleri değil, tümünü (veya parametreye göre) getirebiliriz
         ).order_by('-is_waiting', 'created_at') # Önce bekleyenler, sonra oluşturulma tarihine göre
 
+    # Kayıt ve giden kutusu olayı aynı işlemde yazılır; biri başarısız olursa ikisi de geri alınır.
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
         user_business = get_user_business(user)
@@ -73,20 +73,14 @@ class WaitingCustomerList(generics.ListCreateAPIView):
         )
         logger.info(f"Waiting customer {waiting_customer.name} (ID: {waiting_customer.id}) created for business {user_business.name} by {user.username}")
 
-        # Socket.IO bildirimi gönder
-        if sio:
-            room_name = f'business_{user_business.id}'
-            payload = {
-                'event_type': 'waiting_customer_added',
-                'message': f"Yeni bekleyen müşteri eklendi: {waiting_customer.name}",
-                'business_id': user_business.id,
-                'customer_data': WaitingCustomerSerializer(waiting_customer).data # Yeni müşteri verisini gönder
-            }
-            try:
-                async_to_sync(sio.emit)('waiting_list_update', payload, room=room_name)
-                logger.info(f"Socket.IO 'waiting_list_update' (added) sent for customer {waiting_customer.id}")
-            except Exception as e:
-                logger.error(f"Socket.IO error sending waiting_customer_added event: {e}", exc_info=True)
+        # Socket.IO bildirimi giden kutusu üzerinden gönderilir
+        payload = {
+            'event_type': 'waiting_customer_added',
+            'message': f"Yeni bekleyen müşteri eklendi: {waiting_customer.name}",
+            'business_id': user_business.id,
+            'customer_data': WaitingCustomerSerializer(waiting_customer).data # Yeni müşteri verisini gönder
+        }
+        enqueue_business_notification(user_business.id, 'waiting_list_update', payload)
 
 
 class WaitingCustomerDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -113,6 +107,7 @@ class WaitingCustomerDetail(generics.RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Bu bekleyen müşteri kaydına erişim yetkiniz yok.")
         return obj
 
+    @transaction.atomic
     def perform_update(self, serializer):
         user = self.request.user
         if not (user.user_type == 'business_owner' or 
@@ -144,20 +139,15 @@ class WaitingCustomerDetail(generics.RetrieveUpdateDestroyAPIView):
 
         # Socket.IO bildirimi gönder (durum değiştiyse veya her zaman)
         # if old_is_waiting != new_is_waiting: # Sadece is_waiting değiştiyse gönder
-        if sio:
-            room_name = f'business_{updated_customer.business.id}'
-            payload = {
-                'event_type': 'waiting_customer_updated',
-                'message': f"Bekleyen müşteri durumu güncellendi: {updated_customer.name}",
-                'business_id': updated_customer.business.id,
-                'customer_data': WaitingCustomerSerializer(updated_customer).data # Güncellenmiş müşteri verisini gönder
-            }
-            try:
-                async_to_sync(sio.emit)('waiting_list_update', payload, room=room_name)
-                logger.info(f"Socket.IO 'waiting_list_update' (updated) sent for customer {updated_customer.id}")
-            except Exception as e:
-                logger.error(f"Socket.IO error sending waiting_customer_updated event: {e}", exc_info=True)
-
+        payload = {
+            'event_type': 'waiting_customer_updated',
+            'message': f"Bekleyen müşteri durumu güncellendi: {updated_customer.name}",
+            'business_id': updated_customer.business_id,
+            'customer_data': WaitingCustomerSerializer(updated_customer).data # Güncellenmiş müşteri verisini gönder
+        }
+        enqueue_business_notification(updated_customer.business_id, 'waiting_list_update', payload)
+
+    @transaction.atomic
     def perform_destroy(self, instance: WaitingCustomer): # Tip WaitingCustomer olarak belirtildi
         user = self.request.user
         if not (user.user_type == 'business_owner' or 
@@ -171,17 +161,11 @@ class WaitingCustomerDetail(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
         logger.info(f"Waiting customer {customer_name} (ID: {customer_id}) deleted by {user.username}")
 
-        # Socket.IO bildirimi gönder
-        if sio:
-            room_name = f'business_{business_id}'
-            payload = {
-                'event_type': 'waiting_customer_removed',
-                'message': f"Bekleyen müşteri silindi: {customer_name} (ID: {customer_id})",
-                'business_id': business_id,
-                'customer_id': customer_id, # Silinen müşterinin ID'sini gönder
-            }
-            try:
-                async_to_sync(sio.emit)('waiting_list_update', payload, room=room_name)
-                logger.info(f"Socket.IO 'waiting_list_update' (removed) sent for customer {customer_id}")
-            except Exception as e:
-                logger.error(f"Socket.IO error sending waiting_customer_removed event: {e}", exc_info=True)
\ No newline at end of file
+        # Socket.IO bildirimi giden kutusu üzerinden gönderilir
+        payload = {
+            'event_type': 'waiting_customer_removed',
+            'message': f"Bekleyen müşteri silindi: {customer_name} (ID: {customer_id})",
+            'business_id': business_id,
+            'customer_id': customer_id, # Silinen müşterinin ID'sini gönder
+        }
+        enqueue_business_notification(business_id, 'waiting_list_update', payload)
\ No newline at end of file
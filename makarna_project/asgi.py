@@ -13,7 +13,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'makarna_project.settings')
 django.setup() 
 
 # Celery worker gibi diğer süreçlerden gelen mesajları dinlemek için bir Redis yöneticisi oluştur.
-redis_manager = socketio.AsyncRedisManager(settings.REDIS_URL)
+redis_manager = socketio.AsyncRedisManager(settings.REDIS_URL, channel=settings.SOCKETIO_REDIS_CHANNEL)
 
 # Socket.IO sunucu instance'ı
 sio = socketio.AsyncServer(
@@ -1,9 +1,11 @@
 # makarna_project/settings.py
 
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 import json
 import ssl  # SSL ayarları için gerekli
@@ -71,6 +73,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.ReadReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'makarna_project.urls'
@@ -129,6 +132,27 @@ elif DEBUG:
 else:
     raise Exception("DATABASE_URL ortam değişkeni ayarlanmamış ve DEBUG=False. Production için Neon.tech veritabanı yapılandırılmalı.")
 
+# --- OKUMA REPLİKALARI ---
+# Raporlar ('reporting') ve herkese açık uçlar ('public_read') için isteğe bağlı okuma replikaları.
+# Tanımlanmazsa bu takma adlara yönlendirilen okumalar birincil veritabanına düşer.
+# Lokal testte ikinci bir SQLite dosyası kullanılabilir: REPORTING_DATABASE_URL=sqlite:////tmp/replica.sqlite3
+for replica_alias, replica_env in (('reporting', 'REPORTING_DATABASE_URL'), ('public_read', 'PUBLIC_READ_DATABASE_URL')):
+    replica_url = os.environ.get(replica_env, '').strip()
+    if replica_url:
+        DATABASES[replica_alias] = dj_database_url.parse(
+            replica_url, conn_max_age=600, ssl_require=replica_url.startswith('postgres')
+        )
+        DATABASES[replica_alias]['TEST'] = {'MIRROR': 'default'}
+
+# Testlerde replika tanımlı değilse 'reporting', birincil test veritabanının aynası olarak eklenir;
+# böylece yönlendirme testleri ayrı bir veritabanı gerektirmeden çalışır.
+if len(sys.argv) > 1 and sys.argv[1] == 'test' and 'reporting' not in DATABASES:
+    DATABASES['reporting'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['core.db_router.ReadReplicaRouter']
+# Yazma yapan kullanıcının okumaları bu süre (saniye) boyunca birincil veritabanında kalır.
+READ_REPLICA_PIN_SECONDS = int(os.environ.get('READ_REPLICA_PIN_SECONDS', '10'))
+
 # --- ŞİFRE DOĞRULAMA ---
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -149,6 +173,33 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'mediafiles')
+
+# Arka plan dışa aktarım dosyalarını worker yazar, web süreci indirir. Render'da bu süreçler ayrı
+# makinelerde çalışır ve yerel diski paylaşmaz; dosyalar S3 uyumlu ortak bir depolamaya yazılmalıdır.
+REPORT_EXPORT_S3_BUCKET = os.environ.get('REPORT_EXPORT_S3_BUCKET')
+if REPORT_EXPORT_S3_BUCKET:
+    # Kimlik bilgileri AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY ortam değişkenlerinden okunur.
+    REPORT_EXPORT_STORAGE = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': REPORT_EXPORT_S3_BUCKET,
+            'region_name': os.environ.get('AWS_S3_REGION_NAME'),
+            'endpoint_url': os.environ.get('AWS_S3_ENDPOINT_URL'),  # R2, MinIO vb. için
+            'default_acl': 'private',
+            'file_overwrite': False,
+        },
+    }
+else:
+    REPORT_EXPORT_STORAGE = {'BACKEND': 'django.core.files.storage.FileSystemStorage'}
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'report_exports': REPORT_EXPORT_STORAGE,
+}
+# Web ve worker dışa aktarım dosyalarına ortak erişebiliyor mu? Yerel disk yalnızca ikisi aynı makinedeyse
+# (geliştirme ortamı) paylaşılır. Ortak depolama yoksa dışa aktarımlar arka plana alınmaz, istek içinde akıtılır.
+REPORT_EXPORT_SHARED_STORAGE = bool(REPORT_EXPORT_S3_BUCKET) or \
+    os.environ.get('REPORT_EXPORT_SHARED_STORAGE', str(DEBUG)) == 'True'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # --- REST FRAMEWORK AYARLARI ---
@@ -176,6 +227,8 @@ CORS_ALLOWED_ORIGINS = [
 RENDER_EXTERNAL_URL = os.environ.get('RENDER_EXTERNAL_URL')
 if RENDER_EXTERNAL_URL:
     CORS_ALLOWED_ORIGINS.append(RENDER_EXTERNAL_URL)
+# Misafir menüsü tarayıcıdan tekrar koruma anahtarı gönderebilir.
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # === REDIS SSL BAĞLANTI YAPILANDIRMASI ===
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
@@ -237,6 +290,122 @@ CELERY_TASK_REJECT_ON_WORKER_LOST = True
 CELERY_WORKER_POOL_RESTARTS = True
 CELERY_WORKER_MAX_MEMORY_PER_CHILD = 200000
 
+# --- ÖNBELLEK (CACHE) YAPILANDIRMASI ---
+# Web ve Celery süreçlerinin aynı önbelleği paylaşması için Redis kullanılır.
+# 'redis' (varsayılan, REDIS_URL tanımlıysa) veya süreç içi 'local'
+CACHE_BACKEND = os.environ.get(
+    'CACHE_BACKEND',
+    'redis' if os.environ.get('REDIS_URL') else 'local'
+)
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': patch_redis_url(
+                REDIS_URL,
+                {
+                    "ssl_cert_reqs": "required",
+                    "ssl_ca_certs": os.path.join(BASE_DIR, "upstash.crt"),
+                }
+            ),
+            'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'makarna'),
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'SOCKET_CONNECT_TIMEOUT': 5,
+                'SOCKET_TIMEOUT': 5,
+                # Redis erişilemezse istekler hata vermez, önbellek ıskalanmış sayılır.
+                'IGNORE_EXCEPTIONS': True,
+            },
+        },
+    }
+    DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'makarna-local-cache',
+        },
+    }
+
+# --- SİPARİŞ BİLDİRİMİ BİRLEŞTİRME (DEBOUNCE) AYARLARI ---
+# Aynı sipariş için bu pencere içinde gelen olaylar tek bir yayında birleştirilir. 0 ise kapalıdır.
+ORDER_UPDATE_COALESCE_WINDOW_SECONDS = float(os.environ.get('ORDER_UPDATE_COALESCE_WINDOW_SECONDS', '1.0'))
+# 'redis' (varsayılan, REDIS_URL tanımlıysa) veya süreç içi 'local'
+ORDER_UPDATE_COALESCE_BACKEND = os.environ.get(
+    'ORDER_UPDATE_COALESCE_BACKEND',
+    'redis' if os.environ.get('REDIS_URL') else 'local'
+)
+
+# --- TEKRAR KORUMA (IDEMPOTENCY) AYARLARI ---
+# 'Idempotency-Key' ile kaydedilen ilk yanıtın tekrarlara karşı saklanma süresi (saat)
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+# Yanıtı kaydedilmemiş (işleniyor) bir anahtar bu süreden sonra terk edilmiş sayılır (saniye)
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS = int(os.environ.get('IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS', '60'))
+
+# Socket.IO bağlantılarında kullanıcı/işletme/KDS yetki bilgisinin önbellekte kalma süresi (saniye)
+SOCKET_AUTH_CACHE_TIMEOUT = int(os.environ.get('SOCKET_AUTH_CACHE_TIMEOUT', '300'))
+
+# 'order_status_update' olaylarında tam sipariş yerine revizyon farkı (diff) gönderilir
+ORDER_UPDATE_DELTA_PAYLOADS = os.environ.get('ORDER_UPDATE_DELTA_PAYLOADS', 'True') == 'True'
+
+# --- BİLDİRİM GİDEN KUTUSU (OUTBOX) AYARLARI ---
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.environ.get('NOTIFICATION_OUTBOX_BATCH_SIZE', '100'))
+NOTIFICATION_OUTBOX_MAX_BATCHES = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_BATCHES', '20'))
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', '8'))
+# Bu görevler yalnızca beat tarafından tetiklenir; tam olarak bir 'celery beat' süreci zorunludur
+# (Procfile: beat, render.yaml: orderai-beat). Beat yoksa outbox yeniden denemeleri ve temizlikler hiç çalışmaz.
+CELERY_BEAT_SCHEDULE = {
+    # on_commit tetiklemesi kaçırılırsa veya geri çekilmedeki olaylar için güvenlik ağı
+    'relay-notification-outbox': {
+        'task': 'relay_notification_outbox',
+        'schedule': 15.0,
+    },
+    'cleanup-old-notifications': {
+        'task': 'cleanup_old_notifications',
+        'schedule': 60.0 * 60 * 6,
+    },
+    'cleanup-old-report-exports': {
+        'task': 'cleanup_old_report_exports',
+        'schedule': 60.0 * 60,
+    },
+    'cleanup-old-report-jobs': {
+        'task': 'cleanup_old_report_jobs',
+        'schedule': 60.0 * 60,
+    },
+    'cleanup-expired-idempotency-keys': {
+        'task': 'cleanup_expired_idempotency_keys',
+        'schedule': 60.0 * 60,
+    },
+    # Her işletmenin kapanış saati farklı olabildiği için sık çalışır; kapatılmış günler atlanır.
+    'close-business-days': {
+        'task': 'close_business_days',
+        'schedule': 60.0 * 15,
+    },
+}
+# Rapor görevleri ayrı bir kuyrukta ve ayrı bir worker'da çalışır; uzun raporlar sipariş bildirimlerini geciktirmez.
+# Bu kuyruğu tüketen bir worker zorunludur (Procfile: report_worker, render.yaml: orderai-report-worker).
+REPORT_TASK_QUEUE = os.environ.get('REPORT_TASK_QUEUE', 'reports')
+CELERY_TASK_ROUTES = {
+    'generate_report_job': {'queue': REPORT_TASK_QUEUE},
+    'generate_report_export': {'queue': REPORT_TASK_QUEUE},
+    'close_business_days': {'queue': REPORT_TASK_QUEUE},
+}
+
+# --- RAPOR DIŞA AKTARIM AYARLARI ---
+# Bu satır sayısını aşan dışa aktarımlar istek içinde akıtılmak yerine arka plan işine yönlendirilir.
+REPORT_EXPORT_SYNC_ROW_LIMIT = int(os.environ.get('REPORT_EXPORT_SYNC_ROW_LIMIT', '50000'))
+# Detaylı satış raporunun JSON olarak dönebileceği en fazla satır; üstü için dışa aktarım kullanılır.
+DETAILED_SALES_JSON_ROW_LIMIT = int(os.environ.get('DETAILED_SALES_JSON_ROW_LIMIT', '5000'))
+# Arka planda oluşturulan dışa aktarım dosyalarının saklanma süresi (saat)
+REPORT_EXPORT_RETENTION_HOURS = int(os.environ.get('REPORT_EXPORT_RETENTION_HOURS', '24'))
+# Rapor istekleri web sürecinde hesaplanmaz; Celery işine yönlendirilir ve sonuç saklanır.
+REPORT_JOBS_ENABLED = os.environ.get('REPORT_JOBS_ENABLED', 'True') == 'True'
+# Saklanan rapor sonucunun, veri sürümü değişmese bile en fazla kullanılacağı süre (saniye)
+REPORT_RESULT_MAX_AGE_SECONDS = int(os.environ.get('REPORT_RESULT_MAX_AGE_SECONDS', '900'))
+# Bu süre içinde bir worker tarafından alınmayan bekleyen iş terk edilmiş sayılır; sonraki istek yeni iş açar (saniye)
+REPORT_JOB_PENDING_TIMEOUT_SECONDS = int(os.environ.get('REPORT_JOB_PENDING_TIMEOUT_SECONDS', '120'))
+
 # --- SIMPLE JWT AYARLARI ---
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_LIFETIME_MINUTES', '120'))),
@@ -345,6 +514,9 @@ SOCKETIO_SETTINGS = {
 SOCKETIO_SETTINGS['cors_allowed_origins'] = CORS_ALLOWED_ORIGINS
 print("🏠 Production ortam - Memory Optimized Socket.IO ayarları kullanılıyor")
 SOCKETIO_ASYNC_MODE = 'threading'
+# ASGI sunucusundaki AsyncRedisManager ile Celery worker'larındaki yayıncının
+# ortak kullandığı Redis pub/sub kanalı.
+SOCKETIO_REDIS_CHANNEL = os.environ.get('SOCKETIO_REDIS_CHANNEL', 'socketio')
 
 # --- DEBUG LOG AYARLARI ---
 print(f"🔧 Socket.IO Ayarları:")